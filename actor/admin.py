@@ -4,20 +4,31 @@ from .models import Merchant
 from .models import RIB
 from .models import Bank
 from .models import Country
+from .models import OutboundMessage
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 
+from transaction.services.search import SearchService
+
 
 @admin.register(Wallet)
 class WalletAdmin(admin.ModelAdmin):
     list_display = ("user", "phone_number", "currency")  # Colonnes visibles
-    search_fields = ("user__username", "phone_number", "currency")  # Recherche
+    search_fields = ("phone_number",)  # Recherche (voir get_search_results)
     list_filter = ("currency",)  # Filtres latéraux
+    list_select_related = ("user",)
     fieldsets = (
         ("Informations du Wallet", {"fields": ("user", "phone_number", "currency")}),
     )
     ordering = ("user",)
 
+    def get_search_results(self, request, queryset, search_term):
+        # Index trigrammes sur le numéro (SearchService)
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(SearchService.wallet_condition(term)), False
+
 
 @admin.register(Merchant)
 class MerchantAdmin(admin.ModelAdmin):
@@ -28,11 +39,12 @@ class MerchantAdmin(admin.ModelAdmin):
         "address",
     )  # Colonnes visibles
     search_fields = (
-        "wallet__user__username",
         "business_name",
-        "merchant_code",
-    )  # Recherche
+        "=merchant_code",
+    )  # Recherche (voir get_search_results)
     list_filter = ("business_name",)  # Filtres par nom commercial
+    list_select_related = ("wallet__user",)
+    raw_id_fields = ("wallet",)
     fieldsets = (
         (
             "Informations du Marchand",
@@ -40,6 +52,13 @@ class MerchantAdmin(admin.ModelAdmin):
         ),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Index trigrammes sur le nom commercial (SearchService)
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(SearchService.merchant_condition(term)), False
+
 
 @admin.register(Bank)
 class BankAdmin(admin.ModelAdmin):
@@ -54,6 +73,15 @@ class CountryAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
 
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ("channel", "recipient", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    list_filter = ("channel", "status")
+    search_fields = ("=recipient",)
+    ordering = ("-id",)
+    readonly_fields = ("provider_reference", "error", "locked_at", "locked_by", "created_at", "sent_at")
+
+
 @admin.register(RIB)
 class RIBAdmin(admin.ModelAdmin):
     list_display = ("titulaire", "banque", "numero_compte", "user", "created_at")
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ActorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'actor'
+
+    def ready(self):
+        from actor import signals  # noqa: F401
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services.messaging import MessageDispatcher, SMS_PROVIDERS
+
+
+class Command(BaseCommand):
+    """
+    Dispatcher des SMS et emails en file (OutboundMessage).
+
+    Tourne en continu : envoie les messages dus par lots et attend
+    --interval secondes quand aucun n'est dû (les échecs sont replanifiés
+    avec un backoff). Plusieurs instances peuvent tourner en parallèle
+    (réservation SKIP LOCKED) ; les messages d'une instance tuée sont remis
+    en file toutes les REAP_INTERVAL secondes.
+
+    Usage:
+        python manage.py dispatch_messages
+        python manage.py dispatch_messages --once
+        python manage.py dispatch_messages --provider fake --batch-size 500
+    """
+
+    help = "Send queued OTP SMS and emails"
+
+    REAP_INTERVAL = 60
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=MessageDispatcher.BATCH_SIZE)
+        parser.add_argument(
+            "--interval", type=float, default=1.0, help="Attente (s) quand la file est vide"
+        )
+        parser.add_argument("--provider", choices=SMS_PROVIDERS, help="Remplace SMS_PROVIDER")
+        parser.add_argument("--once", action="store_true", help="Vider la file puis s'arrêter")
+
+    def handle(self, *args, **options):
+        provider = SMS_PROVIDERS[options["provider"]]() if options["provider"] else None
+        dispatcher = MessageDispatcher(sms_provider=provider)
+
+        total = 0
+        last_reap = 0
+        while True:
+            if time.monotonic() - last_reap > self.REAP_INTERVAL:
+                dispatcher.requeue_stale()
+                last_reap = time.monotonic()
+
+            sent = dispatcher.dispatch_batch(options["batch_size"])
+            total += sent
+            if sent:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} message(s) traité(s)"))
@@ -0,0 +1,411 @@
+import csv
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+
+from actor.models import CustomUser, Merchant, Wallet
+from transaction.models import WalletBalanceHistory, WalletDailySummary
+
+
+COPY_BUFFER = 1024 * 1024
+
+OPENING_BALANCE_DESCRIPTION = "Solde d'ouverture"
+
+
+# Fichiers reconnus, dans l'ordre d'import : les marchands et les soldes
+# peuvent référencer des comptes créés par le fichier users du même lot.
+IMPORTS = {
+    "users": {
+        "columns": ["phone_number", "first_name", "last_name", "user_type", "currency"],
+        "required": ["phone_number"],
+    },
+    "merchants": {
+        "columns": ["phone_number", "merchant_code", "business_name", "address"],
+        "required": ["phone_number", "merchant_code", "business_name"],
+    },
+    "balances": {
+        "columns": ["phone_number", "amount"],
+        "required": ["phone_number", "amount"],
+    },
+}
+
+
+def table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def staging(kind):
+    return f"pg_temp.import_{kind}"
+
+
+def duplicate(kind, column):
+    """Condition : la ligne n'est pas la première de son groupe pour `column`."""
+    return f"""s.line IN (
+        SELECT line FROM (
+            SELECT line, row_number() OVER (PARTITION BY {column} ORDER BY line) AS rank
+            FROM {staging(kind)} WHERE error IS NULL
+        ) d WHERE d.rank > 1
+    )"""
+
+
+# Contrôles appliqués dans l'ordre ; une ligne garde la première erreur trouvée
+CHECKS = {
+    "users": lambda: [
+        ("INVALID_PHONE", r"s.phone_number IS NULL OR s.phone_number !~ '^\+?[0-9]{6,14}$'"),
+        ("INVALID_NAME", "length(s.first_name) > 150 OR length(s.last_name) > 150"),
+        ("INVALID_USER_TYPE", "s.user_type NOT IN ('user', 'merchant')"),
+        ("INVALID_CURRENCY", "length(s.currency) > 10"),
+        ("DUPLICATE_IN_FILE", duplicate("users", "phone_number")),
+        (
+            "ALREADY_EXISTS",
+            f"EXISTS (SELECT 1 FROM {table(CustomUser)} u WHERE u.username = s.phone_number) "
+            f"OR EXISTS (SELECT 1 FROM {table(Wallet)} w WHERE w.phone_number = s.phone_number)",
+        ),
+    ],
+    "merchants": lambda: [
+        ("INVALID_MERCHANT_CODE", "s.merchant_code IS NULL OR length(s.merchant_code) > 15"),
+        ("INVALID_BUSINESS_NAME", "s.business_name IS NULL OR length(s.business_name) > 255"),
+        ("DUPLICATE_IN_FILE", duplicate("merchants", "merchant_code")),
+        ("DUPLICATE_IN_FILE", duplicate("merchants", "phone_number")),
+        (
+            "MERCHANT_CODE_EXISTS",
+            f"EXISTS (SELECT 1 FROM {table(Merchant)} m WHERE m.merchant_code = s.merchant_code)",
+        ),
+        (
+            "WALLET_NOT_FOUND",
+            f"NOT EXISTS (SELECT 1 FROM {table(Wallet)} w WHERE w.phone_number = s.phone_number)",
+        ),
+        (
+            "ALREADY_MERCHANT",
+            f"EXISTS (SELECT 1 FROM {table(Merchant)} m JOIN {table(Wallet)} w "
+            f"ON w.id = m.wallet_id WHERE w.phone_number = s.phone_number)",
+        ),
+    ],
+    "balances": lambda: [
+        (
+            "INVALID_AMOUNT",
+            r"CASE WHEN s.amount ~ '^[0-9]{1,10}(\.[0-9]{1,2})?$' "
+            "THEN s.amount::numeric <= 0 ELSE true END",
+        ),
+        ("DUPLICATE_IN_FILE", duplicate("balances", "phone_number")),
+        (
+            "WALLET_NOT_FOUND",
+            f"NOT EXISTS (SELECT 1 FROM {table(Wallet)} w WHERE w.phone_number = s.phone_number)",
+        ),
+    ],
+}
+
+
+class Command(BaseCommand):
+    """
+    Import en masse de comptes depuis des fichiers CSV (PostgreSQL uniquement).
+
+    Chaque fichier est chargé avec COPY dans une table temporaire, validé
+    par des UPDATE ensemblistes (colonne error), puis fusionné par
+    INSERT ... SELECT : quelques requêtes par fichier quel que soit le nombre
+    de lignes, au lieu de trois INSERT par compte comme à l'inscription.
+
+    Fichiers (première ligne = en-tête, colonnes dans n'importe quel ordre) :
+        users.csv      phone_number, first_name, last_name, user_type, currency
+        merchants.csv  phone_number, merchant_code, business_name, address
+        balances.csv   phone_number, amount
+
+    Les comptes créés ont un mot de passe inutilisable et sont inactifs
+    (activation par OTP comme à l'inscription) sauf --activate. Les lignes
+    rejetées sont écrites dans <fichier>.rejected.csv avec leur code d'erreur.
+    Tout le lot est importé dans une seule transaction ; --dry-run l'exécute
+    entièrement puis l'annule.
+
+    Usage:
+        python manage.py import_accounts
+        python manage.py import_accounts --dir /app/imports/2025-10-31
+        python manage.py import_accounts --users new_users.csv --delimiter ";"
+        python manage.py import_accounts --dry-run
+    """
+
+    help = "Bulk import users, wallets, merchants and opening balances from CSV files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dir",
+            default=settings.ACCOUNT_IMPORTS_DIR,
+            help="Répertoire contenant users.csv, merchants.csv et balances.csv",
+        )
+        for kind in IMPORTS:
+            parser.add_argument(f"--{kind}", help=f"Chemin du fichier {kind} (prioritaire sur --dir)")
+        parser.add_argument("--delimiter", default=",", choices=[",", ";"])
+        parser.add_argument(
+            "--activate", action="store_true", help="Créer les comptes actifs"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Importer puis tout annuler"
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("import_accounts nécessite PostgreSQL (COPY)")
+
+        files = {}
+        for kind in IMPORTS:
+            path = options[kind] or os.path.join(options["dir"], f"{kind}.csv")
+            if options[kind] and not os.path.exists(path):
+                raise CommandError(f"Fichier introuvable : {path}")
+            if os.path.exists(path):
+                files[kind] = path
+        if not files:
+            raise CommandError(f"Aucun fichier à importer dans {options['dir']}")
+
+        self.delimiter = options["delimiter"]
+        self.activate = options["activate"]
+
+        with db_transaction.atomic():
+            with connection.cursor() as cursor:
+                for kind, path in files.items():
+                    started = time.monotonic()
+                    loaded = self.load(cursor, kind, path)
+                    rejected = self.validate(cursor, kind)
+                    self.write_rejects(cursor, kind, path, rejected)
+                    imported = getattr(self, f"merge_{kind}")(cursor)
+
+                    self.stdout.write(
+                        f"{kind}: {loaded} rows, {imported} imported, "
+                        f"{sum(rejected.values())} rejected "
+                        f"({time.monotonic() - started:.1f}s)"
+                    )
+                    for code, count in sorted(rejected.items()):
+                        self.stdout.write(f"  {code}: {count}")
+
+            if options["dry_run"]:
+                db_transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING("Dry run: rolled back"))
+                return
+
+        self.stdout.write(self.style.SUCCESS("Import completed"))
+
+    def load(self, cursor, kind, path):
+        """Crée la table temporaire et y charge le fichier avec COPY."""
+        columns = IMPORTS[kind]["columns"]
+        name = staging(kind)
+        cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        cursor.execute(
+            f"CREATE TEMP TABLE {name} ("
+            "line bigint GENERATED ALWAYS AS IDENTITY PRIMARY KEY, "
+            + ", ".join(f"{column} text" for column in columns)
+            + ", error text) ON COMMIT DROP"
+        )
+
+        with open(path, newline="", encoding="utf-8-sig") as stream:
+            header = next(csv.reader([stream.readline()], delimiter=self.delimiter), [])
+            header = [column.strip().lower() for column in header]
+            unknown = set(header) - set(columns)
+            missing = set(IMPORTS[kind]["required"]) - set(header)
+            if unknown or missing:
+                raise CommandError(
+                    f"{path} : en-tête invalide (inconnues : {sorted(unknown) or '-'}, "
+                    f"manquantes : {sorted(missing) or '-'})"
+                )
+
+            self.copy_in(
+                cursor,
+                f"COPY {name} ({', '.join(header)}) FROM STDIN "
+                f"WITH (FORMAT csv, DELIMITER '{self.delimiter}')",
+                stream,
+            )
+
+        # Normalisation : espaces superflus et chaînes vides -> NULL
+        cursor.execute(
+            f"UPDATE {name} SET "
+            + ", ".join(f"{column} = nullif(btrim({column}), '')" for column in columns)
+        )
+        if kind == "users":
+            cursor.execute(
+                f"UPDATE {name} SET first_name = coalesce(first_name, ''), "
+                "last_name = coalesce(last_name, ''), "
+                "user_type = coalesce(user_type, 'user'), currency = coalesce(currency, 'XOF')"
+            )
+        cursor.execute(f"CREATE INDEX ON {name} (phone_number)")
+        cursor.execute(f"ANALYZE {name}")
+        cursor.execute(f"SELECT count(*) FROM {name}")
+        return cursor.fetchone()[0]
+
+    def copy_in(self, cursor, sql, stream):
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            # psycopg2
+            raw.copy_expert(sql, stream, size=COPY_BUFFER)
+        else:
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                while data := stream.read(COPY_BUFFER):
+                    copy.write(data)
+
+    def validate(self, cursor, kind):
+        """Marque les lignes invalides ; retourne le nombre de rejets par code."""
+        name = staging(kind)
+        for code, condition in CHECKS[kind]():
+            cursor.execute(
+                f"UPDATE {name} s SET error = %s WHERE s.error IS NULL AND ({condition})",
+                [code],
+            )
+        cursor.execute(
+            f"SELECT error, count(*) FROM {name} WHERE error IS NOT NULL GROUP BY error"
+        )
+        return dict(cursor.fetchall())
+
+    def write_rejects(self, cursor, kind, path, rejected):
+        rejects_path = f"{os.path.splitext(path)[0]}.rejected.csv"
+        if not rejected:
+            if os.path.exists(rejects_path):
+                os.remove(rejects_path)
+            return
+
+        # Numéro de ligne du fichier (l'en-tête est la ligne 1)
+        sql = (
+            f"COPY (SELECT line + 1 AS line, {', '.join(IMPORTS[kind]['columns'])}, error "
+            f"FROM {staging(kind)} WHERE error IS NOT NULL ORDER BY line) "
+            f"TO STDOUT WITH (FORMAT csv, HEADER true, DELIMITER '{self.delimiter}')"
+        )
+        raw = cursor.cursor
+        with open(rejects_path, "w", newline="", encoding="utf-8") as stream:
+            if hasattr(raw, "copy_expert"):
+                raw.copy_expert(sql, stream, size=COPY_BUFFER)
+            else:
+                with raw.copy(sql) as copy:
+                    for data in copy:
+                        stream.write(bytes(data).decode("utf-8"))
+        self.stdout.write(f"  rejected rows written to {rejects_path}")
+
+    def merge_users(self, cursor):
+        """Utilisateurs, wallets et entrée INIT de chaque wallet, en trois requêtes."""
+        name = staging("users")
+        cursor.execute(
+            f"""
+            INSERT INTO {table(CustomUser)} (
+                password, last_login, is_superuser, username, first_name, last_name,
+                email, is_staff, is_active, date_joined, user_type, is_subscribed,
+                uuid, fcm_token
+            )
+            SELECT '!', NULL, false, s.phone_number, s.first_name, s.last_name,
+                   '', false, %s, now(), s.user_type, false, gen_random_uuid(), NULL
+            FROM {name} s
+            WHERE s.error IS NULL
+            ORDER BY s.line
+            """,
+            [self.activate],
+        )
+        imported = cursor.rowcount
+
+        cursor.execute(
+            f"""
+            INSERT INTO {table(Wallet)} (user_id, phone_number, currency, is_platform)
+            SELECT u.id, s.phone_number, s.currency, false
+            FROM {name} s
+            JOIN {table(CustomUser)} u ON u.username = s.phone_number
+            WHERE s.error IS NULL
+            ORDER BY s.line
+            """
+        )
+
+        cursor.execute(
+            f"""
+            INSERT INTO {table(WalletBalanceHistory)} (
+                wallet_id, balance_before, balance_after, transaction_id,
+                description, transaction_type, "timestamp"
+            )
+            SELECT w.id, 0, 0, NULL, 'Initialisation du portefeuille', 'INIT', now()
+            FROM {name} s
+            JOIN {table(Wallet)} w ON w.phone_number = s.phone_number
+            WHERE s.error IS NULL
+            ORDER BY s.line
+            """
+        )
+        return imported
+
+    def merge_merchants(self, cursor):
+        name = staging("merchants")
+        cursor.execute(
+            f"""
+            INSERT INTO {table(Merchant)} (wallet_id, merchant_code, business_name, address)
+            SELECT w.id, s.merchant_code, s.business_name, coalesce(s.address, '')
+            FROM {name} s
+            JOIN {table(Wallet)} w ON w.phone_number = s.phone_number
+            WHERE s.error IS NULL
+            ORDER BY s.line
+            """
+        )
+        imported = cursor.rowcount
+
+        cursor.execute(
+            f"""
+            UPDATE {table(CustomUser)} u SET user_type = 'merchant'
+            FROM {name} s
+            JOIN {table(Wallet)} w ON w.phone_number = s.phone_number
+            WHERE s.error IS NULL AND u.id = w.user_id AND u.user_type <> 'merchant'
+            """
+        )
+        return imported
+
+    def merge_balances(self, cursor):
+        """
+        Crédit d'ouverture à la suite du dernier solde de chaque wallet, sous
+        verrou des wallets concernés, et report dans les agrégats du jour.
+        """
+        name = staging("balances")
+        history = table(WalletBalanceHistory)
+        cursor.execute(
+            f"""
+            SELECT w.id FROM {table(Wallet)} w
+            JOIN {name} s ON s.phone_number = w.phone_number
+            WHERE s.error IS NULL
+            ORDER BY w.id
+            FOR UPDATE OF w
+            """
+        )
+
+        cursor.execute(
+            f"""
+            INSERT INTO {history} (
+                wallet_id, balance_before, balance_after, transaction_id,
+                description, transaction_type, "timestamp"
+            )
+            SELECT w.id, coalesce(b.balance_after, 0),
+                   coalesce(b.balance_after, 0) + s.amount::numeric,
+                   NULL, %s, 'credit', now()
+            FROM {name} s
+            JOIN {table(Wallet)} w ON w.phone_number = s.phone_number
+            LEFT JOIN LATERAL (
+                SELECT h.balance_after FROM {history} h
+                WHERE h.wallet_id = w.id
+                ORDER BY h."timestamp" DESC, h.id DESC
+                LIMIT 1
+            ) b ON true
+            WHERE s.error IS NULL
+            ORDER BY s.line
+            """,
+            [OPENING_BALANCE_DESCRIPTION],
+        )
+        imported = cursor.rowcount
+
+        # Même classement que WalletSummaryService : un crédit = une entrée
+        summary = table(WalletDailySummary)
+        cursor.execute(
+            f"""
+            INSERT INTO {summary} (
+                wallet_id, day, transaction_type, tx_count, inflow, outflow, fees, updated_at
+            )
+            SELECT w.id, %s, 'credit', 1, s.amount::numeric, 0, 0, now()
+            FROM {name} s
+            JOIN {table(Wallet)} w ON w.phone_number = s.phone_number
+            WHERE s.error IS NULL
+            ON CONFLICT (wallet_id, day, transaction_type) DO UPDATE SET
+                tx_count = {summary}.tx_count + excluded.tx_count,
+                inflow = {summary}.inflow + excluded.inflow,
+                updated_at = excluded.updated_at
+            """,
+            [timezone.localdate()],
+        )
+        return imported
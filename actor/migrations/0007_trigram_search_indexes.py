@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+# Index trigrammes pour la recherche partielle (SearchService, admin, API
+# staff), sur UPPER(colonne) comme l'expression générée par icontains.
+INDEXES = [
+    ("actor_wallet_phone_trgm_idx", "actor_wallet", "phone_number"),
+    ("actor_merchant_name_trgm_idx", "actor_merchant", "business_name"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("actor", "0006_customuser_fcm_token"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.1.2 on 2026-10-19 20:06
+
+from django.db import migrations, models
+
+
+# Codes OTP en table UNLOGGED : pas de WAL pour des codes de quelques
+# minutes, perdus sans dommage en cas de crash.
+def use_unlogged_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("ALTER TABLE actor_otpcode SET UNLOGGED")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actor', '0009_outboundmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OTPCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=20, unique=True)),
+                ('code_hash', models.CharField(blank=True, max_length=64)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('expires_at', models.DateTimeField()),
+                ('sends', models.PositiveSmallIntegerField(default=0)),
+                ('window_started_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(use_unlogged_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.1.2 on 2026-10-19 20:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actor', '0010_otpcode'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='outboundmessage',
+            name='outbound_pending_idx',
+        ),
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='locked_by',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='outboundmessage',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'En attente'), ('SENDING', "En cours d'envoi"), ('SENT', 'Envoyé'), ('FAILED', 'Échec')], default='PENDING', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='outboundmessage',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['next_attempt_at'], name='outbound_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outboundmessage',
+            index=models.Index(condition=models.Q(('status', 'SENDING')), fields=['locked_at'], name='outbound_sending_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 import uuid
 
 class CustomUser(AbstractUser):
@@ -80,3 +81,67 @@ class Bank(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.bank_code}) - {self.pays.name}"
+
+
+class OutboundMessage(models.Model):
+    """
+    SMS ou email (OTP) en file d'attente : la requête l'enregistre, le
+    dispatcher (commande dispatch_messages) l'envoie et trace son état.
+    """
+    CHANNELS = [
+        ("sms", "SMS"),
+        ("email", "Email"),
+    ]
+    STATUSES = [
+        ("PENDING", "En attente"),
+        ("SENDING", "En cours d'envoi"),
+        ("SENT", "Envoyé"),
+        ("FAILED", "Échec"),
+    ]
+    channel = models.CharField(max_length=10, choices=CHANNELS)
+    recipient = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUSES, default="PENDING")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    provider_reference = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outbound_due_idx",
+                condition=models.Q(status="PENDING"),
+            ),
+            models.Index(
+                fields=["locked_at"],
+                name="outbound_sending_idx",
+                condition=models.Q(status="SENDING"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} - {self.recipient} - {self.status}"
+
+
+class OTPCode(models.Model):
+    """
+    Code OTP courant d'un numéro de téléphone (OTPStore) : HMAC du code,
+    essais ratés, et compteur d'envois sur une fenêtre fixe. Une ligne par
+    numéro, modifiée sous verrou (select_for_update) et par incréments F().
+    """
+    phone_number = models.CharField(max_length=20, unique=True)
+    code_hash = models.CharField(max_length=64, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    sends = models.PositiveSmallIntegerField(default=0)
+    window_started_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.phone_number} - {self.expires_at}"
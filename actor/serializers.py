@@ -95,10 +95,11 @@ class AccountActivationSerializer(serializers.Serializer):
             )
 
         # Vérifier si l'utilisateur est déjà actif
-        raise serializers.ValidationError(
-            detail="Ce compte est déjà actif.",
-            code="ACCOUNT_ALREADY_ACTIVE"
-        )
+        if user.is_active:
+            raise serializers.ValidationError(
+                detail="Ce compte est déjà actif.",
+                code="ACCOUNT_ALREADY_ACTIVE"
+            )
 
         return user
 
@@ -108,6 +109,8 @@ class SendOTPSerializer(serializers.Serializer):
 
 
 class CheckOTPSerializer(serializers.Serializer):
+    # Facultatif : à défaut, numéro de l'utilisateur authentifié
+    phone_number = serializers.CharField(max_length=15, required=False)
     otp = serializers.CharField(max_length=6)
 
 
@@ -241,7 +244,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             try:
                 last_balance = WalletBalanceHistory.objects.filter(
                     wallet=wallet
-                ).latest('timestamp')
+                ).latest('timestamp', 'id')
                 balance = float(last_balance.balance_after)
             except WalletBalanceHistory.DoesNotExist:
                 balance = 0.0
@@ -259,13 +262,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def get_merchant(self, obj):
         if obj.user_type == "merchant":
             try:
-                from actor.models import Merchant
-                merchant = Merchant.objects.get(wallet__user=obj)
+                from actor.models import Merchant, Wallet
+                merchant = obj.wallet.merchant_wallet
                 return {
                     "merchant_code": merchant.merchant_code,
                     "business_name": merchant.business_name,
                     "address": merchant.address
                 }
-            except Merchant.DoesNotExist:
+            except (Wallet.DoesNotExist, Merchant.DoesNotExist):
                 return None
         return None
\ No newline at end of file
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from actor.models import CustomUser, Merchant, Wallet
+from services.authentication import invalidate_user_cache
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_user_cache(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Wallet)
+def invalidate_wallet_owner(sender, instance, **kwargs):
+    invalidate_user_cache(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Merchant)
+def invalidate_merchant_owner(sender, instance, **kwargs):
+    if instance.wallet_id:
+        user_id = Wallet.objects.filter(pk=instance.wallet_id).values_list("user_id", flat=True).first()
+        if user_id:
+            invalidate_user_cache(user_id)
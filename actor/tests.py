@@ -1,2 +1,301 @@
+import os
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import caches
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from actor.models import CustomUser, Merchant, OTPCode, OutboundMessage, Wallet
+from services.authentication import WalletJWTAuthentication
+from services.messaging import FakeSMSProvider, MessageDispatcher
+from services.otp import OTPResendLimitError, OTPService, OTPStore
+from transaction.models import WalletBalanceHistory
+
+
+@skipUnless(connection.vendor == "postgresql", "COPY disponible uniquement sur PostgreSQL")
+class ImportAccountsTests(TestCase):
+    def setUp(self):
+        existing = CustomUser.objects.create(username="770000009")
+        Wallet.objects.create(user=existing, phone_number="770000009")
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.directory.name, name), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_import_merges_valid_rows_and_reports_rejects(self):
+        self.write(
+            "users.csv",
+            "phone_number,first_name,last_name\n"
+            "770000001,Awa,Diop\n"
+            "770000002,Moussa,Ba\n"
+            "770000002,Moussa,Ba\n"
+            "770000009,Déjà,Inscrit\n"
+            "abc,Numéro,Invalide\n",
+        )
+        self.write(
+            "merchants.csv",
+            "phone_number,merchant_code,business_name\n770000002,BOUT01,Boutique Ba\n",
+        )
+        self.write("balances.csv", "phone_number,amount\n770000001,2500.50\n770000404,10\n")
+
+        call_command("import_accounts", dir=self.directory.name, stdout=StringIO())
+
+        wallet = Wallet.objects.get(phone_number="770000001")
+        self.assertFalse(wallet.user.is_active)
+        self.assertFalse(wallet.user.has_usable_password())
+        self.assertEqual(
+            WalletBalanceHistory.objects.filter(wallet=wallet).latest("timestamp", "id").balance_after,
+            Decimal("2500.50"),
+        )
+        merchant = Merchant.objects.get(merchant_code="BOUT01")
+        self.assertEqual(merchant.wallet.user.user_type, "merchant")
+        self.assertEqual(CustomUser.objects.filter(username="770000002").count(), 1)
+
+        with open(os.path.join(self.directory.name, "users.rejected.csv"), encoding="utf-8") as f:
+            errors = [line.rsplit(",", 1)[1].strip() for line in f.readlines()[1:]]
+        self.assertEqual(errors, ["DUPLICATE_IN_FILE", "ALREADY_EXISTS", "INVALID_PHONE"])
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "balances.rejected.csv")))
+
+    def test_dry_run_rolls_back(self):
+        self.write("users.csv", "phone_number\n770000001\n")
+
+        call_command("import_accounts", dir=self.directory.name, dry_run=True, stdout=StringIO())
+
+        self.assertFalse(Wallet.objects.filter(phone_number="770000001").exists())
+
+
+class WalletJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.user = CustomUser.objects.create_user(
+            username="770000001", password="password123", user_type="merchant"
+        )
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="770000001")
+        Merchant.objects.create(
+            wallet=self.wallet, merchant_code="BOUT01", business_name="Boutique", address=""
+        )
+        self.token = AccessToken.for_user(self.user)
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_loads_user_wallet_and_merchant_in_one_query(self):
+        authentication = WalletJWTAuthentication()
+        with self.assertNumQueries(1):
+            user = authentication.get_user(self.token)
+            self.assertEqual(user.wallet.phone_number, "770000001")
+            self.assertEqual(user.wallet.merchant_wallet.merchant_code, "BOUT01")
+
+    def test_user_served_from_shared_cache(self):
+        authentication = WalletJWTAuthentication()
+        authentication.get_user(self.token)
+
+        # Une seule lecture de la table de cache, visible de tous les processus
+        with CaptureQueriesContext(connection) as queries:
+            user = authentication.get_user(self.token)
+            self.assertEqual(user.wallet.merchant_wallet.merchant_code, "BOUT01")
+        self.assertEqual(len(queries), 1)
+        self.assertIn("shared_cache", queries[0]["sql"])
+
+    def test_cache_invalidated_on_change(self):
+        authentication = WalletJWTAuthentication()
+        authentication.get_user(self.token)
+
+        self.wallet.merchant_wallet.business_name = "Nouvelle boutique"
+        self.wallet.merchant_wallet.save()
+        user = authentication.get_user(self.token)
+        self.assertEqual(user.wallet.merchant_wallet.business_name, "Nouvelle boutique")
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            authentication.get_user(self.token)
+
+
+class LoginViewTests(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.user = CustomUser.objects.create_user(username="770000001", password="1234")
+        Wallet.objects.create(user=self.user, phone_number="770000001")
+
+    def login(self):
+        return self.client.post(
+            reverse("login"), {"phone_number": "770000001", "pin": "1234"}
+        )
+
+    @override_settings(STATELESS_LOGIN=True)
+    def test_stateless_login_writes_no_session(self):
+        response = self.login()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.data)
+        self.assertFalse(Session.objects.exists())
+        self.assertNotIn("sessionid", response.cookies)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    @override_settings(STATELESS_LOGIN=False)
+    def test_session_login_still_available(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class OTPStoreTests(TestCase):
+    def test_codes_are_per_phone_and_single_use(self):
+        first = OTPStore.issue("770000001")
+        second = OTPStore.issue("770000002")
+
+        if first != second:
+            self.assertFalse(OTPStore.verify("770000002", first))
+        self.assertTrue(OTPStore.verify("770000001", first))
+        self.assertFalse(OTPStore.verify("770000001", first))
+        self.assertTrue(OTPStore.verify("770000002", second))
+
+    def test_attempt_and_resend_limits(self):
+        otp = OTPStore.issue("770000001")
+        wrong = f"{(int(otp) + 1) % 10 ** OTPStore.LENGTH:06d}"
+        for _ in range(OTPStore.MAX_ATTEMPTS):
+            self.assertFalse(OTPStore.verify("770000001", wrong))
+        # Code invalidé après trop d'essais
+        self.assertFalse(OTPStore.verify("770000001", otp))
+        self.assertEqual(OTPCode.objects.get(phone_number="770000001").attempts, OTPStore.MAX_ATTEMPTS)
+
+        for _ in range(OTPStore.MAX_SENDS - 1):
+            OTPStore.issue("770000001")
+        with self.assertRaises(OTPResendLimitError):
+            OTPStore.issue("770000001")
+
+    def test_send_window_is_fixed(self):
+        for _ in range(OTPStore.MAX_SENDS):
+            OTPStore.issue("770000001")
+
+        # La fenêtre court depuis le premier envoi, sans être prolongée
+        later = timezone.now() + timedelta(seconds=OTPStore.SEND_WINDOW)
+        with mock.patch("services.otp.timezone.now", return_value=later):
+            otp = OTPStore.issue("770000001")
+        self.assertEqual(OTPCode.objects.get(phone_number="770000001").sends, 1)
+
+        # Code expiré OTP_TTL_SECONDS après son émission
+        with mock.patch(
+            "services.otp.timezone.now",
+            return_value=later + timedelta(seconds=settings.OTP_TTL_SECONDS),
+        ):
+            self.assertFalse(OTPStore.verify("770000001", otp))
+
+    def test_check_otp_view_verifies_against_phone(self):
+        otp = OTPStore.issue("770000001")
+        url = reverse("check-otp")
+
+        response = self.client.post(url, {"phone_number": "770000002", "otp": otp})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, {"phone_number": "770000001", "otp": otp})
+        self.assertEqual(response.status_code, 200)
+
+    def test_check_otp_view_falls_back_to_authenticated_user(self):
+        user = CustomUser.objects.create_user(username="770000001", password="1234")
+        otp = OTPStore.issue("770000001")
+        url = reverse("check-otp")
+
+        response = self.client.post(url, {"otp": otp})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["code"], "PHONE_NUMBER_REQUIRED")
+
+        token = AccessToken.for_user(user)
+        response = self.client.post(url, {"otp": otp}, HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(response.status_code, 200)
+
+
+class MessageDispatcherTests(TestCase):
+    def setUp(self):
+        FakeSMSProvider.outbox.clear()
+
+    def test_send_otp_queues_message_for_dispatcher(self):
+        response = self.client.post(reverse("send-otp"), {"phone_number": "770000001"})
+
+        self.assertEqual(response.status_code, 200)
+        message = OutboundMessage.objects.get()
+        self.assertEqual((message.channel, message.status), ("sms", "PENDING"))
+
+        user = CustomUser(first_name="Awa", email="awa@example.com")
+        OTPService.send_otp_by_email(user, "123456")
+
+        self.assertEqual(MessageDispatcher(sms_provider=FakeSMSProvider()).dispatch_batch(), 2)
+        self.assertEqual(FakeSMSProvider.outbox[0][0], "770000001")
+        self.assertEqual(mail.outbox[0].to, ["awa@example.com"])
+        self.assertEqual(
+            set(OutboundMessage.objects.values_list("status", flat=True)), {"SENT"}
+        )
+
+    def test_failed_sends_are_retried_then_marked_failed(self):
+        class BrokenProvider:
+            def send(self, recipient, body):
+                raise ConnectionError("Twilio indisponible")
+
+        OTPService.send_otp_by_sms("770000001", "123456")
+        dispatcher = MessageDispatcher(sms_provider=BrokenProvider())
+        self.assertEqual(dispatcher.dispatch_batch(), 1)
+
+        # Replanifié avec un délai : pas de nouvel essai immédiat
+        message = OutboundMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), ("PENDING", 1))
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertEqual(dispatcher.dispatch_batch(), 0)
+
+        for _ in range(MessageDispatcher.MAX_ATTEMPTS - 1):
+            later = OutboundMessage.objects.get().next_attempt_at
+            with mock.patch("services.messaging.timezone.now", return_value=later):
+                self.assertEqual(dispatcher.dispatch_batch(), 1)
+
+        message = OutboundMessage.objects.get()
+        self.assertEqual(message.status, "FAILED")
+        self.assertEqual(message.attempts, MessageDispatcher.MAX_ATTEMPTS)
+        with mock.patch(
+            "services.messaging.timezone.now", return_value=timezone.now() + timedelta(days=1)
+        ):
+            self.assertEqual(dispatcher.dispatch_batch(), 0)
+
+    def test_messages_are_claimed_before_sending(self):
+        statuses = []
+
+        class RecordingProvider:
+            def send(self, recipient, body):
+                statuses.append(OutboundMessage.objects.get(recipient=recipient).status)
+                return "ref-1"
+
+        OTPService.send_otp_by_sms("770000001", "123456")
+        MessageDispatcher(sms_provider=RecordingProvider()).dispatch_batch()
+
+        self.assertEqual(statuses, ["SENDING"])
+        message = OutboundMessage.objects.get()
+        self.assertEqual((message.status, message.provider_reference), ("SENT", "ref-1"))
+        self.assertEqual(message.locked_by, "")
+
+    def test_stale_claims_are_requeued(self):
+        OTPService.send_otp_by_sms("770000001", "123456")
+        crashed = MessageDispatcher(sms_provider=FakeSMSProvider(), name="crashed")
+        self.assertEqual(len(crashed.claim()), 1)
+
+        dispatcher = MessageDispatcher(sms_provider=FakeSMSProvider())
+        self.assertEqual(dispatcher.requeue_stale(), 0)
+        later = timezone.now() + timedelta(seconds=MessageDispatcher.VISIBILITY_TIMEOUT + 1)
+        with mock.patch("services.messaging.timezone.now", return_value=later):
+            self.assertEqual(dispatcher.requeue_stale(), 1)
+            self.assertEqual(dispatcher.dispatch_batch(), 1)
+
+        message = OutboundMessage.objects.get()
+        self.assertEqual((message.status, message.attempts), ("SENT", 2))
@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from actor.serializers import AccountActivationSerializer
-from services.otp import OTPService  # Assurez-vous que ce chemin est correct
+from services.otp import OTPStore
 
 class UserAccountActivationView(APIView):
     """
@@ -31,7 +31,7 @@ class UserAccountActivationView(APIView):
                 )
 
             # Vérifier l'OTP
-            if not OTPService.validate_otp(user, otp):
+            if not OTPStore.verify(user.username, otp):
                 return Response(
                     {"error": "OTP invalide ou expiré."},
                     status=status.HTTP_400_BAD_REQUEST
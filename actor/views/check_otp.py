@@ -3,7 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from services.otp import OTPService
+from services.otp import OTPStore
 from actor.serializers import CheckOTPSerializer
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -17,7 +17,12 @@ class CheckOTPView(APIView):
     permission_classes = [AllowAny]
 
     @swagger_auto_schema(
-        operation_description="Vérifier le code OTP reçu par SMS",
+        operation_description=(
+            "Vérifier le code OTP reçu par SMS. Le code est lié au numéro qui "
+            "l'a demandé : sans phone_number, le numéro de l'utilisateur "
+            "authentifié est utilisé. Une requête anonyme sans phone_number "
+            "est refusée (PHONE_NUMBER_REQUIRED)."
+        ),
         request_body=CheckOTPSerializer,
         responses={
             200: openapi.Response(
@@ -29,7 +34,7 @@ class CheckOTPView(APIView):
                 }
             ),
             400: openapi.Response(
-                description="OTP invalide ou expiré",
+                description="OTP invalide ou expiré, ou numéro manquant",
                 examples={
                     "application/json": {
                         "error": "OTP invalide ou expiré."
@@ -45,8 +50,22 @@ class CheckOTPView(APIView):
         if serializer.is_valid():
             otp = serializer.validated_data["otp"]
 
+            # Les codes sont propres à chaque numéro : sans numéro fourni,
+            # on prend celui de l'utilisateur authentifié
+            phone_number = serializer.validated_data.get("phone_number")
+            if not phone_number and request.user.is_authenticated:
+                phone_number = request.user.username
+            if not phone_number:
+                return Response(
+                    {
+                        "error": "Le numéro de téléphone est requis.",
+                        "code": "PHONE_NUMBER_REQUIRED"
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
             # Vérifier si l'OTP est valide
-            if not OTPService.validate_otp(otp):
+            if not OTPStore.verify(phone_number, otp):
                 return Response(
                     {"error": "OTP invalide ou expiré."},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -7,7 +7,9 @@ from actor.serializers import LoginSerializer
 from actor.models import CustomUser
 from services.token import TokenService
 from services.throttling import AuthRateThrottle
+from django.conf import settings
 from django.contrib.auth import login
+from django.contrib.auth.signals import user_logged_in
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 import logging
@@ -80,7 +82,12 @@ class LoginView(APIView):
                 )
             
             tokens = TokenService.generate_tokens_for_user(user)
-            login(request, user)
+            if settings.STATELESS_LOGIN:
+                # Authentification JWT : pas de session en base, seul le
+                # signal est émis (mise à jour de last_login)
+                user_logged_in.send(sender=user.__class__, request=request, user=user)
+            else:
+                login(request, user)
             logger.info(f"LOGIN_SUCCESS: User {phone_number} ({user.user_type}) logged in successfully")
 
             # Préparer la réponse avec les infos utilisateur
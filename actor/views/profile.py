@@ -5,7 +5,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from actor.serializers import UserProfileSerializer
-from actor.models import Merchant
+from actor.models import Merchant, Wallet
 
 
 class UserProfileView(APIView):
@@ -110,13 +110,13 @@ class UserProfileView(APIView):
         # Si c'est un marchand, mettre à jour les infos spécifiques
         if user.user_type == "merchant":
             try:
-                merchant = Merchant.objects.get(wallet__user=user)
+                merchant = user.wallet.merchant_wallet
                 if 'business_name' in data:
                     merchant.business_name = data['business_name']
                 if 'address' in data:
                     merchant.address = data['address']
                 merchant.save()
-            except Merchant.DoesNotExist:
+            except (Wallet.DoesNotExist, Merchant.DoesNotExist):
                 return Response(
                     {
                         "detail": "Profil marchand non trouvé",
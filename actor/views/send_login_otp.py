@@ -6,7 +6,9 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 from actor.models import CustomUser
 from services.otp import (
+    OTPResendLimitError,
     OTPService,
+    OTPStore,
 )
 from actor.serializers import SendOTPSerializer
 
@@ -42,7 +44,16 @@ class SendLoginOTPView(APIView):
                 )
 
             # Générer l'OTP et l'envoyer par SMS
-            otp = OTPService.generate_otp()
+            try:
+                otp = OTPStore.issue(phone_number)
+            except OTPResendLimitError:
+                return Response(
+                    {
+                        "error": "Trop de codes demandés. Réessayez plus tard.",
+                        "code": "OTP_RESEND_LIMIT"
+                    },
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                )
             logger.info(f"OTP généré pour {phone_number}")
 
             # Vérifier si l'envoi d'OTP est activé
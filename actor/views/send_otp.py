@@ -6,7 +6,9 @@ from rest_framework import status
 from rest_framework.permissions import AllowAny
 
 from services.otp import (
+    OTPResendLimitError,
     OTPService,
+    OTPStore,
 )
 from services.throttling import AuthRateThrottle
 from actor.serializers import SendOTPSerializer
@@ -31,7 +33,7 @@ class SendOTPView(APIView):
                 description="OTP envoyé avec succès",
                 examples={
                     "application/json": {
-                        "message": "OTP envoyé avec succès. Vérifiez votre SMS - 123456"
+                        "message": "OTP envoyé avec succès. Vérifiez votre SMS"
                     }
                 }
             ),
@@ -53,7 +55,16 @@ class SendOTPView(APIView):
             phone_number = serializer.validated_data["phone_number"]
 
             # Générer l'OTP et l'envoyer par SMS
-            otp = OTPService.generate_otp()
+            try:
+                otp = OTPStore.issue(phone_number)
+            except OTPResendLimitError:
+                return Response(
+                    {
+                        "error": "Trop de codes demandés. Réessayez plus tard.",
+                        "code": "OTP_RESEND_LIMIT"
+                    },
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                )
 
             # Vérifier si l'envoi d'OTP est activé
             otp_sending_enabled = os.getenv(
@@ -62,9 +73,14 @@ class SendOTPView(APIView):
 
             if otp_sending_enabled:
                 OTPService.send_otp_by_sms(phone_number, otp)
+                return Response(
+                    {"message": "OTP envoyé avec succès. Vérifiez votre SMS"},
+                    status=status.HTTP_200_OK,
+                )
 
+            # Mode dev/test : retourner l'OTP dans la réponse (SMS désactivé)
             return Response(
-                {"message": f"OTP envoyé avec succès. Vérifiez votre SMS - {otp}"},
+                {"message": f"Mode test - OTP: {otp} (SMS non envoyé)"},
                 status=status.HTTP_200_OK,
             )
 
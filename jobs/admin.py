@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("task", "queue", "priority", "status", "attempts", "run_at", "locked_by")
+    list_filter = ("status", "queue")
+    search_fields = ("task",)
+    ordering = ("-id",)
+    readonly_fields = ("locked_at", "locked_by", "last_error", "created_at", "finished_at")
+    actions = ["requeue"]
+
+    @admin.action(description="Remettre en file")
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status="RUNNING").update(
+            status="QUEUED", attempts=0, run_at=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"{count} tâche(s) remise(s) en file")
@@ -0,0 +1,70 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.management.commands.run_workers import run_worker
+from jobs.models import Job
+from jobs.queue import enqueue
+from jobs.tasks import noop
+
+
+class Command(BaseCommand):
+    """
+    Mesure le débit de la file de tâches : enfilage puis consommation de
+    --jobs tâches vides (jobs.tasks.noop) par 1, 2, ... N workers.
+
+    Seul le coût de la file est mesuré (réservation SKIP LOCKED, solde).
+    À lancer sur PostgreSQL, sur une base de test ou de pré-production.
+
+    Usage:
+        python manage.py benchmark_jobs --jobs 20000 --workers 1 2 4 8
+    """
+
+    help = "Benchmark du débit de la file de tâches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--jobs", type=int, default=10000)
+        parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+        parser.add_argument("--batch-size", type=int, default=50)
+
+    def handle(self, *args, **options):
+        Job.objects.filter(queue="benchmark").delete()
+        total = options["jobs"]
+
+        start = time.perf_counter()
+        for _ in range(total):
+            enqueue(noop, queue="benchmark")
+        elapsed = time.perf_counter() - start
+        Job.objects.filter(queue="benchmark").delete()
+        self.stdout.write(f"Enfilage unitaire : {total / elapsed:,.0f} tâches/s")
+
+        for workers in options["workers"]:
+            Job.objects.bulk_create(
+                [Job(task=noop.path, queue="benchmark") for _ in range(total)], batch_size=5000
+            )
+            elapsed = self._consume(workers, options["batch_size"])
+            remaining = Job.objects.filter(queue="benchmark").count()
+            self.stdout.write(
+                f"{workers} worker(s), lots de {options['batch_size']} : "
+                f"{total / elapsed:,.0f} tâches/s ({elapsed:.2f}s, restantes : {remaining})"
+            )
+            Job.objects.filter(queue="benchmark").delete()
+
+    def _consume(self, workers, batch_size):
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        connections.close_all()
+        processes = [
+            context.Process(
+                target=run_worker, args=(index, ["benchmark"], batch_size, 0.1, True, stop)
+            )
+            for index in range(workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return time.perf_counter() - start
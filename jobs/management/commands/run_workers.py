@@ -0,0 +1,76 @@
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import Worker
+
+
+def run_worker(index, queues, batch_size, interval, burst, stop):
+    # Un processus enfant ne réutilise jamais la connexion du parent
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker = Worker(queues=queues, batch_size=batch_size)
+    worker.name = f"{worker.name}#{index}"
+    worker.run(interval=interval, burst=burst, stop=stop)
+
+
+class Command(BaseCommand):
+    """
+    Lance N workers de la file de tâches (jobs.queue.Worker), chacun dans
+    son processus. Aucun broker : la file est la table jobs_job.
+
+    SIGTERM / Ctrl-C : les workers terminent leur lot en cours puis s'arrêtent.
+
+    Usage:
+        python manage.py run_workers --workers 4
+        python manage.py run_workers --queues push default --batch-size 50
+        python manage.py run_workers --burst
+    """
+
+    help = "Run background job workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--queues", nargs="+", help="Files à consommer (défaut : toutes)")
+        parser.add_argument("--batch-size", type=int, default=Worker.BATCH_SIZE)
+        parser.add_argument(
+            "--interval", type=float, default=0.5, help="Attente (s) quand la file est vide"
+        )
+        parser.add_argument("--burst", action="store_true", help="Vider la file puis s'arrêter")
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context("fork")
+        stop = context.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+        connections.close_all()
+        processes = [
+            context.Process(
+                target=run_worker,
+                args=(
+                    index,
+                    options["queues"],
+                    options["batch_size"],
+                    options["interval"],
+                    options["burst"],
+                    stop,
+                ),
+                daemon=True,
+            )
+            for index in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"{len(processes)} worker(s) démarré(s)")
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for process in processes:
+                process.join()
+
+        self.stdout.write(self.style.SUCCESS("Workers arrêtés"))
@@ -0,0 +1,38 @@
+# Generated by Django 6.1.2 on 2026-10-19 19:20
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=200)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('queue', models.CharField(default='default', max_length=50)),
+                ('priority', models.SmallIntegerField(default=100)),
+                ('status', models.CharField(choices=[('QUEUED', 'En attente'), ('RUNNING', 'En cours'), ('DEAD', 'Abandonnée')], default='QUEUED', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=5)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'QUEUED')), fields=['queue', 'priority', 'run_at'], name='job_queued_idx'), models.Index(condition=models.Q(('status', 'RUNNING')), fields=['locked_at'], name='job_running_idx')],
+            },
+        ),
+    ]
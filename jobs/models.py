@@ -0,0 +1,48 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Tâche de fond en file d'attente PostgreSQL (voir jobs.queue).
+
+    task est le chemin pointé de la fonction à exécuter, payload ses
+    arguments nommés. priority : plus petit = plus prioritaire. Une tâche
+    réussie est supprimée ; après max_attempts échecs elle reste en DEAD.
+    """
+    STATUSES = [
+        ("QUEUED", "En attente"),
+        ("RUNNING", "En cours"),
+        ("DEAD", "Abandonnée"),
+    ]
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    queue = models.CharField(max_length=50, default="default")
+    priority = models.SmallIntegerField(default=100)
+    status = models.CharField(max_length=10, choices=STATUSES, default="QUEUED")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["queue", "priority", "run_at"],
+                name="job_queued_idx",
+                condition=models.Q(status="QUEUED"),
+            ),
+            models.Index(
+                fields=["locked_at"],
+                name="job_running_idx",
+                condition=models.Q(status="RUNNING"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} - {self.status} ({self.attempts}/{self.max_attempts})"
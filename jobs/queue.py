@@ -0,0 +1,201 @@
+import logging
+import os
+import random
+import socket
+import time
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, payload=None, queue="default", priority=100, delay=0, max_attempts=5):
+    """
+    Ajoute une tâche à la file. task est le chemin pointé d'une fonction
+    (ou une fonction décorée par @job), payload ses arguments nommés.
+
+    L'insertion suit la transaction en cours : la tâche n'est visible des
+    workers qu'après le commit, et disparaît avec un rollback.
+    """
+    return Job.objects.create(
+        task=getattr(task, "path", task),
+        payload=payload or {},
+        queue=queue,
+        priority=priority,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_many(task, payloads, queue="default", priority=100, max_attempts=5):
+    """Variante d'enqueue pour un lot : un seul INSERT multi-lignes."""
+    now = timezone.now()
+    return Job.objects.bulk_create(
+        [
+            Job(
+                task=getattr(task, "path", task),
+                payload=payload,
+                queue=queue,
+                priority=priority,
+                max_attempts=max_attempts,
+                run_at=now,
+            )
+            for payload in payloads
+        ]
+    )
+
+
+def job(queue="default", priority=100, max_attempts=5):
+    """
+    Déclare une fonction exécutable en tâche de fond :
+
+        @job(queue="push", priority=10)
+        def send_push(token, title): ...
+
+        send_push.delay(token="...", title="...")
+    """
+    def decorator(func):
+        func.path = f"{func.__module__}.{func.__qualname__}"
+
+        def delay(**payload):
+            return enqueue(
+                func.path, payload, queue=queue, priority=priority, max_attempts=max_attempts
+            )
+
+        func.delay = delay
+        return func
+
+    return decorator
+
+
+class Worker:
+    """
+    Consomme la file : réserve un lot de tâches par SELECT ... FOR UPDATE
+    SKIP LOCKED (plusieurs workers ne prennent jamais la même tâche et ne
+    s'attendent pas), les exécute hors verrou puis les solde.
+
+    Un échec replanifie la tâche avec un backoff exponentiel ; au-delà de
+    max_attempts, elle passe en DEAD (dead-letter, relançable depuis l'admin).
+    Une tâche RUNNING dont le verrou date de plus de VISIBILITY_TIMEOUT
+    (worker tué) est remise en file. Le verrou est reposé juste avant
+    l'exécution de chaque tâche du lot, et chaque tâche est soldée dès sa
+    fin, à condition d'être toujours réservée par ce worker : une tâche
+    reprise entre-temps n'est ni exécutée ni soldée deux fois.
+    """
+
+    BATCH_SIZE = 10
+    BACKOFF_BASE = 5
+    BACKOFF_MAX = 3600
+    VISIBILITY_TIMEOUT = 300
+    REAP_INTERVAL = 60
+
+    def __init__(self, queues=None, batch_size=None, name=None):
+        self.queues = queues
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._last_reap = 0
+
+    def claim(self):
+        with db_transaction.atomic():
+            jobs = Job.objects.select_for_update(skip_locked=True).filter(
+                status="QUEUED", run_at__lte=timezone.now()
+            )
+            if self.queues:
+                jobs = jobs.filter(queue__in=self.queues)
+            jobs = list(jobs.order_by("priority", "run_at", "id")[: self.batch_size])
+            if not jobs:
+                return []
+
+            now = timezone.now()
+            for claimed in jobs:
+                claimed.status = "RUNNING"
+                claimed.locked_at = now
+                claimed.locked_by = self.name
+            Job.objects.bulk_update(jobs, ["status", "locked_at", "locked_by"])
+        return jobs
+
+    def _owned(self, claimed):
+        return Job.objects.filter(id=claimed.id, status="RUNNING", locked_by=self.name)
+
+    def start(self, claimed):
+        """
+        Reprend le verrou de la tâche et compte l'essai, juste avant son
+        exécution. Retourne False si la tâche a été remise en file entre la
+        réservation du lot et son tour.
+        """
+        started = self._owned(claimed).update(
+            locked_at=timezone.now(), attempts=F("attempts") + 1
+        )
+        claimed.attempts += 1
+        return bool(started)
+
+    def run_once(self):
+        """Réserve et exécute un lot ; retourne le nombre de tâches traitées."""
+        jobs = self.claim()
+        for claimed in jobs:
+            if not self.start(claimed):
+                logger.warning(f"JOB_LOST: {claimed.task} #{claimed.id} requeued before start")
+                continue
+            try:
+                import_string(claimed.task)(**claimed.payload)
+            except Exception as e:
+                self.fail(claimed, e)
+            else:
+                self._owned(claimed).delete()
+        return len(jobs)
+
+    def fail(self, failed, error):
+        logger.error(f"JOB_FAILED: {failed.task} #{failed.id} ({failed.attempts}/{failed.max_attempts}): {error}")
+        update = {"last_error": f"{type(error).__name__}: {error}", "locked_at": None}
+        if failed.attempts >= failed.max_attempts:
+            update.update(status="DEAD", finished_at=timezone.now())
+        else:
+            backoff = min(self.BACKOFF_BASE * 2 ** (failed.attempts - 1), self.BACKOFF_MAX)
+            update.update(
+                status="QUEUED",
+                run_at=timezone.now() + timedelta(seconds=backoff * random.uniform(0.8, 1.2)),
+            )
+        self._owned(failed).update(**update)
+
+    def requeue_stale(self):
+        """Remet en file (ou abandonne) les tâches d'un worker disparu."""
+        cutoff = timezone.now() - timedelta(seconds=self.VISIBILITY_TIMEOUT)
+        stale = Job.objects.filter(status="RUNNING", locked_at__lt=cutoff)
+        dead = stale.filter(attempts__gte=F("max_attempts")).update(
+            status="DEAD",
+            locked_by="",
+            finished_at=timezone.now(),
+            last_error="Délai d'exécution dépassé",
+        )
+        requeued = stale.update(
+            status="QUEUED", locked_at=None, locked_by="", run_at=timezone.now()
+        )
+        return requeued + dead
+
+    def run(self, interval=0.5, burst=False, stop=None):
+        """
+        Boucle du worker. burst : s'arrête quand la file est vide.
+        stop : événement (multiprocessing) qui demande l'arrêt.
+        """
+        processed = 0
+        while not (stop and stop.is_set()):
+            if time.monotonic() - self._last_reap > self.REAP_INTERVAL:
+                self.requeue_stale()
+                self._last_reap = time.monotonic()
+
+            count = self.run_once()
+            processed += count
+            if count:
+                continue
+            if burst:
+                break
+            close_old_connections()
+            time.sleep(interval)
+        return processed
@@ -0,0 +1,6 @@
+from jobs.queue import job
+
+
+@job(queue="benchmark")
+def noop(**payload):
+    """Tâche vide : mesure du débit propre de la file (benchmark_jobs)."""
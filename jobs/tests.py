@@ -0,0 +1,97 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import Worker, enqueue, job
+
+calls = []
+
+
+@job(queue="test")
+def record(value):
+    calls.append(value)
+
+
+@job(queue="test", max_attempts=2)
+def explode():
+    raise ValueError("partenaire indisponible")
+
+
+@job(queue="test")
+def requeue_recorded(value):
+    # Simule la reprise, par un autre worker, des tâches en attente du lot
+    calls.append(value)
+    Job.objects.filter(task=record.path).update(status="QUEUED", locked_by="", locked_at=None)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_by_priority_and_are_removed(self):
+        record.delay(value="normal")
+        enqueue(record, {"value": "urgent"}, queue="test", priority=1)
+        enqueue(record, {"value": "plus tard"}, queue="test", delay=60)
+
+        processed = Worker(queues=["test"]).run(burst=True)
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(calls, ["urgent", "normal"])
+        self.assertEqual(list(Job.objects.values_list("payload", flat=True)), [{"value": "plus tard"}])
+
+    def test_failures_back_off_then_dead_letter(self):
+        failing = explode.delay()
+        worker = Worker(queues=["test"])
+
+        worker.run_once()
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), ("QUEUED", 1))
+        self.assertGreater(failing.run_at, timezone.now())
+        self.assertIn("partenaire indisponible", failing.last_error)
+
+        Job.objects.filter(id=failing.id).update(run_at=timezone.now())
+        worker.run_once()
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, "DEAD")
+        self.assertEqual(worker.run_once(), 0)
+
+    def test_stale_running_jobs_are_requeued(self):
+        stale = record.delay(value="repris")
+        Job.objects.filter(id=stale.id).update(
+            status="RUNNING", attempts=1, locked_at=timezone.now() - timedelta(hours=1)
+        )
+
+        Worker(queues=["test"]).run(burst=True)
+
+        self.assertEqual(calls, ["repris"])
+
+    def test_requeued_jobs_are_not_run_twice(self):
+        enqueue(requeue_recorded, {"value": "premier"}, queue="test", priority=1)
+        taken = record.delay(value="repris ailleurs")
+
+        self.assertEqual(Worker(queues=["test"]).run_once(), 2)
+
+        self.assertEqual(calls, ["premier"])
+        taken.refresh_from_db()
+        self.assertEqual((taken.status, taken.attempts), ("QUEUED", 0))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_push_notifications_are_queued(self):
+        from services.firebase import firebase_service
+
+        firebase_service.queue_transaction_notification(
+            fcm_token="token", action="topup", status="success", title="OK", message="OK"
+        )
+        firebase_service.queue_transaction_notification(
+            fcm_token=None, action="topup", status="success", title="OK", message="OK"
+        )
+
+        self.assertEqual(Job.objects.filter(queue="push").count(), 1)
+        with mock.patch.object(firebase_service, "send_transaction_notification") as send:
+            Worker(queues=["push"]).run(burst=True)
+        send.assert_called_once_with(
+            fcm_token="token", action="topup", status="success", title="OK", message="OK"
+        )
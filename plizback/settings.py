@@ -44,7 +44,8 @@ INSTALLED_APPS = [
     'drf_yasg',
 
     'actor',
-    'transaction'
+    'transaction',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -92,6 +93,11 @@ DATABASES = {
         'PORT': os.getenv('DB_PORT'),
     }
 }
+# Même base, connexion distincte : l'état des disjoncteurs et du routage
+# partenaires (transaction.partners.state) s'y écrit en autocommit, hors de
+# la transaction de la requête, pour qu'un échec partenaire reste compté
+# quand la requête est annulée.
+DATABASES['partner_state'] = dict(DATABASES['default'])
 
 
 # Password validation
@@ -137,6 +143,78 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Moteur d'exécution des transferts internes
+# "orm" : chemin ORM historique, "sql" : fonction PL/pgSQL en un aller-retour
+TRANSFER_ENGINE = os.getenv("TRANSFER_ENGINE", "orm")
+
+# Répertoire des segments d'archive du ledger (commande archive_ledger)
+LEDGER_ARCHIVE_DIR = os.getenv(
+    "LEDGER_ARCHIVE_DIR", os.path.join(BASE_DIR, "archives", "ledger")
+)
+
+# Répertoire des fichiers CSV déposés pour import_accounts (volume FTP)
+ACCOUNT_IMPORTS_DIR = os.getenv(
+    "ACCOUNT_IMPORTS_DIR", os.path.join(BASE_DIR, "imports")
+)
+
+# Nombre maximal de lignes par virement groupé (send-money/bulk/)
+BULK_TRANSFER_MAX_ITEMS = int(os.getenv("BULK_TRANSFER_MAX_ITEMS", "5000"))
+
+# Cache : utilisateurs authentifiés, throttling DRF
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pliz",
+    },
+    # État partagé entre processus (cache utilisateur, compteurs des bulkheads),
+    # table UNLOGGED sur PostgreSQL (migration transaction 0021)
+    "shared": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "shared_cache",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    },
+}
+
+# Fournisseur SMS du dispatcher de messages : "twilio", ou "fake" (tests, tirs de charge)
+SMS_PROVIDER = os.getenv("SMS_PROVIDER", "twilio")
+
+# Durée de validité d'un code OTP (secondes)
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", "300"))
+
+# Durée (secondes) du cache utilisateur + wallet de WalletJWTAuthentication (0 : désactivé)
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+# Alias du cache utilisateur : partagé entre processus, pour que l'invalidation
+# (actor.signals) atteigne tous les workers
+AUTH_USER_CACHE = os.getenv("AUTH_USER_CACHE", "shared")
+
+# Connexion mobile sans session Django (JWT uniquement) : aucune écriture
+# dans django_session au login. Les sessions restent utilisées par l'admin.
+STATELESS_LOGIN = os.getenv("STATELESS_LOGIN", "True") == "True"
+
+# Appels simultanés maximum par fournisseur partenaire (bulkhead), tous
+# workers confondus. Fournisseur absent de la liste : 8
+PARTNER_BULKHEAD_LIMITS = {
+    name.strip(): int(limit)
+    for name, limit in (
+        item.split("=")
+        for item in os.getenv("PARTNER_BULKHEAD_LIMITS", "samir=8,djamo=4,samir_merchant=4").split(",")
+        if item.strip()
+    )
+}
+
+# Services marchands payés via une API externe : code du service -> processeur
+# (GatewayRegistry.MERCHANT_PROCESSORS)
+MERCHANT_API_SERVICES = {
+    code.strip().lower(): processor.strip()
+    for code, processor in (
+        item.split("=")
+        for item in os.getenv(
+            "MERCHANT_API_SERVICES", "airtime=samir,woyofal=samir,rapido=samir"
+        ).split(",")
+        if item.strip()
+    )
+}
+
 # Custom User Model
 
 AUTH_USER_MODEL = 'actor.CustomUser'
@@ -147,7 +225,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "services.authentication.WalletJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -58,6 +58,38 @@ def health_check(request):
         }
         logger.warning(f"Health check - Firebase check failed: {e}")
 
+    # État des disjoncteurs et compartiments partenaires (un circuit ouvert dégrade sans rendre indisponible)
+    try:
+        from django.conf import settings
+        from transaction.partners.bulkhead import Bulkhead
+        from transaction.partners.circuit_breaker import CircuitBreaker
+        from transaction.partners.router import GatewayRouter
+        partners = {
+            f"{partner}:{gateway}": {
+                **GatewayRouter.breaker(partner, gateway).stats(),
+                "route": GatewayRouter(partner).stats(gateway),
+            }
+            for partner, gateways in GatewayRouter.ROUTES.items()
+            for gateway in gateways
+        }
+        unavailable = [p for p, stats in partners.items() if stats["state"] != CircuitBreaker.CLOSED]
+        bulkheads = {
+            name: Bulkhead(name).stats()
+            for name in settings.PARTNER_BULKHEAD_LIMITS
+        }
+        health_status["checks"]["partners"] = {
+            "status": "degraded" if unavailable else "healthy",
+            "message": f"Open circuits: {', '.join(unavailable)}" if unavailable else "All partner circuits closed",
+            "circuits": partners,
+            "bulkheads": bulkheads,
+        }
+    except Exception as e:
+        health_status["checks"]["partners"] = {
+            "status": "degraded",
+            "message": f"Partner circuits check failed: {str(e)}"
+        }
+        logger.warning(f"Health check - Partner circuits check failed: {e}")
+
     # Vérifier l'environnement
     health_status["environment"] = "production" if not os.getenv("DEBUG", "True") == "True" else "development"
 
@@ -0,0 +1,84 @@
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.views import APIView
+
+from services.http import SharedAsyncClient
+
+
+async def db_call(func, *args, **kwargs):
+    """
+    Exécute une fonction synchrone (ORM, cache base de données) depuis une
+    vue asynchrone, dans le pool de threads de la boucle : le nombre de
+    connexions ouvertes reste borné par la taille du pool, et aucune
+    connexion n'est retenue pendant un appel partenaire.
+
+    La fonction doit être autonome (sa propre transaction, atomic compris) :
+    deux appels successifs peuvent s'exécuter dans deux threads différents.
+    """
+    return await sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+
+
+def is_asgi(request):
+    """Vrai si la requête (Django ou DRF) est servie par le serveur ASGI."""
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+async def aiter_sync(iterator):
+    """
+    Itérateur asynchrone sur un générateur synchrone (flux ORM), pour
+    StreamingHttpResponse sous ASGI : Django consommerait sinon tout le
+    générateur (sync_to_async(list)) avant d'envoyer le premier octet.
+    Le générateur doit produire des morceaux déjà regroupés.
+
+    Les morceaux sont lus dans le thread de la requête (thread_sensitive) :
+    le curseur serveur d'un .iterator() reste sur sa connexion.
+    """
+    done = object()
+    next_chunk = sync_to_async(lambda: next(iterator, done), thread_sensitive=True)
+    try:
+        while (chunk := await next_chunk()) is not done:
+            yield chunk
+    finally:
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close, thread_sensitive=True)()
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView dont les handlers (post...) sont des coroutines, servie par ASGI.
+
+    Authentification, permissions et throttling passent par db_call ; le
+    handler accède lui-même à la base via db_call et attend les partenaires
+    sans bloquer de thread. Hors ASGI, la vue s'exécute dans une boucle
+    créée pour la requête, dont les clients HTTP sont fermés à la fin.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await db_call(self.initial, request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        if not is_asgi(request):
+            # Boucle temporaire d'async_to_sync (WSGI, tests) : ses clients
+            # HTTP ne serviront plus
+            await SharedAsyncClient.close_loop_clients()
+        return self.response
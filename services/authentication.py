@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from actor.models import CustomUser
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def user_cache():
+    return caches[settings.AUTH_USER_CACHE]
+
+
+def invalidate_user_cache(user_id):
+    user_cache().delete(user_cache_key(user_id))
+
+
+def load_user(user_id):
+    """
+    Charge l'utilisateur avec son wallet et son profil marchand en une requête,
+    en passant par un cache court (AUTH_USER_CACHE_TTL secondes) partagé entre
+    processus (AUTH_USER_CACHE) : une invalidation vaut pour tous les workers.
+
+    Après cet appel, user.wallet et user.wallet.merchant_wallet ne coûtent
+    plus de requête : un accès sur une relation absente lève directement
+    DoesNotExist.
+    """
+    queryset = CustomUser.objects.select_related("wallet", "wallet__merchant_wallet")
+    if not settings.AUTH_USER_CACHE_TTL:
+        return queryset.get(**{api_settings.USER_ID_FIELD: user_id})
+
+    key = user_cache_key(user_id)
+    cache = user_cache()
+    user = cache.get(key)
+    if user is None:
+        user = queryset.get(**{api_settings.USER_ID_FIELD: user_id})
+        cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+class WalletJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication qui remplace la lecture seule de l'utilisateur par
+    load_user : wallet et marchand sont disponibles sur request.user pour
+    toute la requête.
+
+    Le cache est invalidé par les signaux de actor.signals à chaque
+    modification d'un utilisateur, d'un wallet ou d'un marchand.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        try:
+            user = load_user(user_id)
+        except CustomUser.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+class QueryTokenJWTAuthentication(WalletJWTAuthentication):
+    """
+    WalletJWTAuthentication qui accepte aussi le jeton en paramètre ?token= :
+    EventSource (navigateurs) ne sait pas envoyer d'en-tête Authorization.
+
+    Réservée aux flux (SSE) : un jeton passé dans l'URL peut apparaître dans
+    les logs d'accès.
+    """
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            return result
+
+        raw_token = request.query_params.get("token")
+        if not raw_token:
+            return None
+
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
@@ -2,6 +2,8 @@ import os
 import logging
 from typing import Optional, Dict, Any
 
+from jobs.queue import enqueue_many, job
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +24,14 @@ class FirebaseService:
 
     def _initialize(self):
         """Initialise l'application Firebase Admin SDK"""
+        # Simulateur local (partner_simulator) : les envois y sont redirigés
+        self.simulator_url = os.getenv("FCM_SIMULATOR_URL", "")
+        if self.simulator_url:
+            import requests
+
+            self._simulator_session = requests.Session()
+            logger.info(f"FCM redirected to simulator {self.simulator_url}")
+
         try:
             import firebase_admin
             from firebase_admin import credentials
@@ -82,7 +92,7 @@ class FirebaseService:
         Returns:
             bool: True si envoi réussi, False sinon (graceful degradation)
         """
-        if not self._app:
+        if not self._app and not self.simulator_url:
             logger.warning(
                 "Firebase not initialized. Skipping push notification. "
                 "Transactions continue normally."
@@ -97,14 +107,19 @@ class FirebaseService:
             return False
 
         try:
-            from firebase_admin import messaging
-
             data = transaction_data or {}
             data["action"] = action
             data["status"] = status
             # FCM data payload doit être dict[str, str]
             data_str = {k: str(v) for k, v in data.items() if v is not None}
 
+            if self.simulator_url:
+                response = self._send_to_simulator(fcm_token, title, message, data_str)
+                logger.info(f"FCM notification sent to simulator (action={action}): {response}")
+                return True
+
+            from firebase_admin import messaging
+
             fcm_message = messaging.Message(
                 notification=messaging.Notification(
                     title=title,
@@ -135,6 +150,39 @@ class FirebaseService:
             )
             return False
 
+    def _send_to_simulator(self, fcm_token, title, message, data):
+        """Envoi au stub FCM du simulateur (même forme que l'API HTTP v1)."""
+        response = self._simulator_session.post(
+            f"{self.simulator_url}/messages:send",
+            json={
+                "message": {
+                    "token": fcm_token,
+                    "notification": {"title": title, "body": message},
+                    "data": data,
+                }
+            },
+            timeout=10,
+        )
+        response.raise_for_status()
+        return response.json()["name"]
+
+    def queue_transaction_notification(self, fcm_token: Optional[str], **kwargs):
+        """
+        Met en file l'envoi de send_transaction_notification (file "push") :
+        la requête ou la transaction n'attend pas FCM. Mêmes arguments.
+        """
+        self.queue_transaction_notifications([dict(fcm_token=fcm_token, **kwargs)])
+
+    def queue_transaction_notifications(self, notifications):
+        """Met en file plusieurs notifications en un seul INSERT."""
+        payloads = [n for n in notifications if n.get("fcm_token")]
+        if len(payloads) < len(notifications):
+            logger.warning(
+                f"{len(notifications) - len(payloads)} notification(s) skipped: no FCM token"
+            )
+        if payloads:
+            enqueue_many(send_transaction_push, payloads, queue="push", priority=10)
+
     def send_system_notification(
         self,
         fcm_token: Optional[str],
@@ -154,7 +202,7 @@ class FirebaseService:
         Returns:
             bool: True si envoi réussi, False sinon (graceful degradation)
         """
-        if not self._app:
+        if not self._app and not self.simulator_url:
             logger.warning("Firebase not initialized. Skipping system notification.")
             return False
 
@@ -163,12 +211,17 @@ class FirebaseService:
             return False
 
         try:
-            from firebase_admin import messaging
-
             data_payload = data or {}
             data_payload["type"] = "system"
             data_str = {k: str(v) for k, v in data_payload.items() if v is not None}
 
+            if self.simulator_url:
+                response = self._send_to_simulator(fcm_token, title, message, data_str)
+                logger.info(f"FCM system notification sent to simulator: {response}")
+                return True
+
+            from firebase_admin import messaging
+
             fcm_message = messaging.Message(
                 notification=messaging.Notification(
                     title=title,
@@ -189,3 +242,9 @@ class FirebaseService:
 
 # Instance singleton
 firebase_service = FirebaseService()
+
+
+@job(queue="push", priority=10)
+def send_transaction_push(**notification):
+    """Tâche de fond des notifications mises en file par queue_transaction_notification."""
+    firebase_service.send_transaction_notification(**notification)
@@ -0,0 +1,60 @@
+import asyncio
+import weakref
+
+import httpx
+
+
+class SharedAsyncClient:
+    """
+    httpx.AsyncClient partagé par tous les appels asynchrones vers un même
+    fournisseur : connexions conservées (keep-alive) et réutilisées.
+
+    Un client est lié à la boucle d'événements qui l'a créé. Sous ASGI, une
+    seule boucle par worker : le client vit autant que le processus. Une
+    boucle temporaire (async_to_sync : WSGI, tests, commandes) ferme ses
+    clients avant de se terminer (close_loop_clients) ; un client resté
+    ouvert sur une autre boucle encore active est fermé sur celle-ci quand
+    il est remplacé.
+    """
+
+    MAX_CONNECTIONS = 500
+    MAX_KEEPALIVE_CONNECTIONS = 100
+    # Pas de délai côté requests : on borne ici l'attente d'un partenaire
+    TIMEOUT = 30
+
+    _instances = weakref.WeakSet()
+
+    def __init__(self):
+        self._loop = None
+        self._client = None
+        SharedAsyncClient._instances.add(self)
+
+    def __call__(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._discard()
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.MAX_CONNECTIONS,
+                    max_keepalive_connections=self.MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=self.TIMEOUT,
+            )
+            self._loop = loop
+        return self._client
+
+    def _discard(self):
+        client, loop = self._client, self._loop
+        self._client, self._loop = None, None
+        if client is not None and loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    @classmethod
+    async def close_loop_clients(cls):
+        """Ferme les clients liés à la boucle courante."""
+        loop = asyncio.get_running_loop()
+        for instance in list(cls._instances):
+            if instance._loop is loop:
+                client = instance._client
+                instance._client, instance._loop = None, None
+                await client.aclose()
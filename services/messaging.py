@@ -0,0 +1,218 @@
+import logging
+import os
+import random
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from actor.models import OutboundMessage
+
+logger = logging.getLogger(__name__)
+
+
+class TwilioSMSProvider:
+    """Client Twilio créé une fois et réutilisé pour tous les envois du processus."""
+
+    def __init__(self):
+        from twilio.rest import Client
+
+        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+        auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+        self.from_number = os.getenv("TWILIO_PHONE_NUMBER")
+
+        if not account_sid or not auth_token or not self.from_number:
+            raise Exception(
+                "Les variables Twilio sont manquantes : "
+                "TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER."
+            )
+        self.client = Client(account_sid, auth_token)
+
+    def send(self, recipient, body):
+        message = self.client.messages.create(body=body, from_=self.from_number, to=recipient)
+        return message.sid
+
+
+class FakeSMSProvider:
+    """Fournisseur local pour les tests et les tirs de charge : rien ne sort."""
+
+    outbox = []
+
+    def send(self, recipient, body):
+        FakeSMSProvider.outbox.append((recipient, body))
+        logger.info(f"SMS (fake) to {recipient}")
+        return f"fake-{len(FakeSMSProvider.outbox)}"
+
+
+SMS_PROVIDERS = {
+    "twilio": TwilioSMSProvider,
+    "fake": FakeSMSProvider,
+}
+
+
+class MessageDispatcher:
+    """
+    File d'envoi des SMS et emails.
+
+    enqueue_* n'écrit qu'une ligne OutboundMessage : la requête HTTP n'attend
+    ni Twilio ni le SMTP. dispatch_batch, appelé en boucle par la commande
+    dispatch_messages, réserve les messages dus dans une transaction courte
+    (SKIP LOCKED, plusieurs dispatchers possibles ; passage en SENDING et
+    essai compté), les envoie hors transaction avec un client fournisseur
+    conservé d'un lot à l'autre et une seule connexion SMTP par lot, puis
+    enregistre les résultats dans une seconde transaction courte.
+
+    Un échec replanifie le message avec un backoff exponentiel
+    (next_attempt_at) ; au-delà de MAX_ATTEMPTS, il passe en FAILED. Un
+    message SENDING réservé depuis plus de VISIBILITY_TIMEOUT (dispatcher
+    tué) est remis en file par requeue_stale.
+    """
+
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 3
+    BACKOFF_BASE = 30
+    BACKOFF_MAX = 900
+    VISIBILITY_TIMEOUT = 300
+
+    def __init__(self, sms_provider=None, name=None):
+        self._sms_provider = sms_provider
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def sms_provider(self):
+        if self._sms_provider is None:
+            self._sms_provider = SMS_PROVIDERS[settings.SMS_PROVIDER]()
+        return self._sms_provider
+
+    @staticmethod
+    def enqueue_sms(recipient, body):
+        return OutboundMessage.objects.create(channel="sms", recipient=recipient, body=body)
+
+    @staticmethod
+    def enqueue_email(recipient, subject, body):
+        return OutboundMessage.objects.create(
+            channel="email", recipient=recipient, subject=subject, body=body
+        )
+
+    def claim(self, batch_size=None):
+        """Réserve un lot de messages dus et compte leur essai."""
+        with db_transaction.atomic():
+            messages = list(
+                OutboundMessage.objects.select_for_update(skip_locked=True)
+                .filter(status="PENDING", next_attempt_at__lte=timezone.now())
+                .order_by("next_attempt_at")[: batch_size or self.BATCH_SIZE]
+            )
+            if not messages:
+                return []
+
+            now = timezone.now()
+            for message in messages:
+                message.status = "SENDING"
+                message.attempts += 1
+                message.locked_at = now
+                message.locked_by = self.name
+            OutboundMessage.objects.bulk_update(
+                messages, ["status", "attempts", "locked_at", "locked_by"]
+            )
+        return messages
+
+    def dispatch_batch(self, batch_size=None):
+        """Envoie un lot de messages dus et retourne le nombre traité."""
+        messages = self.claim(batch_size)
+        if not messages:
+            return 0
+
+        self._send_sms([m for m in messages if m.channel == "sms"])
+        self._send_emails([m for m in messages if m.channel == "email"])
+
+        with db_transaction.atomic():
+            # Seuls les messages encore réservés par ce dispatcher sont soldés :
+            # un message repris entre-temps par requeue_stale ne l'est pas deux fois
+            owned = set(
+                OutboundMessage.objects.select_for_update()
+                .filter(
+                    id__in=[m.id for m in messages],
+                    status="SENDING",
+                    locked_by=self.name,
+                )
+                .values_list("id", flat=True)
+            )
+            OutboundMessage.objects.bulk_update(
+                [m for m in messages if m.id in owned],
+                [
+                    "status",
+                    "provider_reference",
+                    "error",
+                    "sent_at",
+                    "next_attempt_at",
+                    "locked_at",
+                    "locked_by",
+                ],
+            )
+        return len(messages)
+
+    def requeue_stale(self):
+        """Remet en file (ou abandonne) les messages d'un dispatcher disparu."""
+        cutoff = timezone.now() - timedelta(seconds=self.VISIBILITY_TIMEOUT)
+        stale = OutboundMessage.objects.filter(status="SENDING", locked_at__lt=cutoff)
+        failed = stale.filter(attempts__gte=self.MAX_ATTEMPTS).update(
+            status="FAILED", locked_at=None, locked_by="", error="Délai d'envoi dépassé"
+        )
+        requeued = stale.update(
+            status="PENDING", locked_at=None, locked_by="", next_attempt_at=timezone.now()
+        )
+        return requeued + failed
+
+    def _send_sms(self, messages):
+        for message in messages:
+            try:
+                reference = self.sms_provider.send(message.recipient, message.body)
+                self._mark_sent(message, reference)
+            except Exception as e:
+                self._mark_failed(message, e)
+
+    def _send_emails(self, messages):
+        if not messages:
+            return
+        with get_connection() as connection:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        message.subject,
+                        message.body,
+                        settings.DEFAULT_FROM_EMAIL,
+                        [message.recipient],
+                        connection=connection,
+                    ).send()
+                    self._mark_sent(message, "")
+                except Exception as e:
+                    self._mark_failed(message, e)
+
+    @staticmethod
+    def _mark_sent(message, reference):
+        message.status = "SENT"
+        message.provider_reference = reference or ""
+        message.sent_at = timezone.now()
+        message.locked_at = None
+        message.locked_by = ""
+
+    def _mark_failed(self, message, error):
+        message.error = str(error)
+        message.locked_at = None
+        message.locked_by = ""
+        if message.attempts >= self.MAX_ATTEMPTS:
+            message.status = "FAILED"
+        else:
+            # Réessayé après un délai croissant tant que MAX_ATTEMPTS n'est pas atteint
+            backoff = min(self.BACKOFF_BASE * 2 ** (message.attempts - 1), self.BACKOFF_MAX)
+            message.status = "PENDING"
+            message.next_attempt_at = timezone.now() + timedelta(
+                seconds=backoff * random.uniform(0.8, 1.2)
+            )
+        logger.error(
+            f"MESSAGE_SEND_FAILED: {message.channel} to {message.recipient} "
+            f"({message.attempts}/{self.MAX_ATTEMPTS}): {error}"
+        )
@@ -1,98 +1,126 @@
-import pyotp
-from django.core.mail import send_mail
+import hashlib
+import hmac
+import secrets
+from datetime import timedelta
+
 from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
 import os
 import logging
 
+from actor.models import OTPCode
+from services.messaging import MessageDispatcher
+
 logger = logging.getLogger(__name__)
 
 
-class OTPService:
-    @staticmethod
-    def generate_otp(validity_duration=5):
-        """
-        Génère un OTP pour un utilisateur donné en utilisant pyotp.
-        L'OTP est valide par défaut pendant 15 minutes, mais ce délai peut être modifié via le paramètre validity_duration.
+class OTPResendLimitError(Exception):
+    """Trop de codes demandés pour ce numéro sur la fenêtre courante."""
 
-        :param validity_duration: Durée de validité de l'OTP en minutes (par défaut 15).
-        :return: Le code OTP généré.
-        """
-        # Clé secrète unique pour l'utilisateur
-        secret = os.getenv("OTP_SECRET_KEY")
 
-        # Paramétrage de la durée de validité de l'OTP (en secondes)
-        totp = pyotp.TOTP(secret, interval=validity_duration * 60)
+class OTPStore:
+    """
+    Codes OTP par numéro de téléphone, conservés dans OTPCode (table
+    UNLOGGED sur PostgreSQL, partagée entre processus).
+
+    Seul un HMAC du code est stocké. Un code expire OTP_TTL_SECONDS après
+    son émission, est invalidé après MAX_ATTEMPTS essais ratés et consommé
+    au premier succès. Les envois sont limités à MAX_SENDS par fenêtre fixe
+    de SEND_WINDOW secondes. Chaque opération verrouille la ligne du numéro :
+    des essais parallèles sont tous comptés.
+    """
 
-        # Générer l'OTP
-        otp = totp.now()
-        logger.info(f"Generated OTP: {otp}")
+    LENGTH = 6
+    MAX_ATTEMPTS = 5
+    MAX_SENDS = 5
+    SEND_WINDOW = 3600
 
+    @staticmethod
+    def _hash(phone_number, otp):
+        secret = (os.getenv("OTP_SECRET_KEY") or settings.SECRET_KEY).encode()
+        return hmac.new(secret, f"{phone_number}:{otp}".encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    @db_transaction.atomic
+    def issue(phone_number):
+        """
+        Génère un nouveau code pour le numéro et remplace le précédent.
+        Lève OTPResendLimitError au-delà de MAX_SENDS envois sur la fenêtre.
+        """
+        now = timezone.now()
+        entry, _ = OTPCode.objects.select_for_update().get_or_create(
+            phone_number=phone_number,
+            defaults={"expires_at": now, "window_started_at": now},
+        )
+        if entry.window_started_at <= now - timedelta(seconds=OTPStore.SEND_WINDOW):
+            entry.window_started_at = now
+            entry.sends = 0
+        if entry.sends >= OTPStore.MAX_SENDS:
+            raise OTPResendLimitError(phone_number)
+
+        otp = f"{secrets.randbelow(10 ** OTPStore.LENGTH):0{OTPStore.LENGTH}d}"
+        entry.code_hash = OTPStore._hash(phone_number, otp)
+        entry.attempts = 0
+        entry.expires_at = now + timedelta(seconds=settings.OTP_TTL_SECONDS)
+        entry.sends += 1
+        entry.save()
         return otp
 
     @staticmethod
-    def validate_otp(otp, validity_duration=5) -> bool:
+    @db_transaction.atomic
+    def verify(phone_number, otp) -> bool:
         """
-        Valide un OTP en le comparant à celui généré avec pyotp.
-        Retourne True si l'OTP est valide, sinon False.
+        Vérifie le code en temps constant. L'essai est compté avant la
+        comparaison ; un succès consomme le code, qui n'est plus accepté
+        une fois MAX_ATTEMPTS essais atteints ou son délai dépassé.
         """
-        secret = os.getenv("OTP_SECRET_KEY")
-        totp = pyotp.TOTP(secret, interval=validity_duration * 60)
+        entry = (
+            OTPCode.objects.select_for_update()
+            .filter(
+                phone_number=phone_number,
+                attempts__lt=OTPStore.MAX_ATTEMPTS,
+                expires_at__gt=timezone.now(),
+            )
+            .exclude(code_hash="")
+            .first()
+        )
+        if entry is None:
+            return False
+
+        OTPCode.objects.filter(pk=entry.pk).update(attempts=F("attempts") + 1)
+        if hmac.compare_digest(entry.code_hash, OTPStore._hash(phone_number, str(otp))):
+            OTPCode.objects.filter(pk=entry.pk).update(code_hash="")
+            return True
 
-        result = totp.verify(otp)
-        logger.info(f"OTP validation result: {result}")
-        return result
+        logger.warning(f"OTP_INVALID: attempt {entry.attempts + 1} for {phone_number}")
+        return False
 
+
+class OTPService:
     @staticmethod
-    def send_otp_by_sms(user_phone_number: str, otp: str) -> dict:
+    def send_otp_by_sms(user_phone_number: str, otp: str):
         """
-        Envoie un code OTP par SMS via Twilio.
+        Met en file l'envoi du code OTP par SMS ; le dispatcher
+        (dispatch_messages) l'envoie via le fournisseur SMS_PROVIDER.
 
         Args:
             user_phone_number (str): Numéro de téléphone du destinataire (format international, ex: +221771234567).
             otp (str): Code OTP à envoyer.
 
         Returns:
-            dict: Informations sur le message envoyé (sid, status).
-
-        Raises:
-            Exception: Si les credentials Twilio sont manquants ou si l'envoi échoue.
+            OutboundMessage: Le message en attente, dont l'état est suivi.
         """
-        from twilio.rest import Client
-        from twilio.base.exceptions import TwilioRestException
+        message = MessageDispatcher.enqueue_sms(user_phone_number, f"Votre code OTP est : {otp}")
+        logger.info(f"SMS OTP queued for {user_phone_number} (message={message.id})")
+        return message
 
-        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-        auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-        from_number = os.getenv("TWILIO_PHONE_NUMBER")
-
-        if not account_sid or not auth_token or not from_number:
-            raise Exception(
-                "Les variables Twilio sont manquantes : "
-                "TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_PHONE_NUMBER."
-            )
-
-        try:
-            client = Client(account_sid, auth_token)
-            message = client.messages.create(
-                body=f"Votre code OTP est : {otp}",
-                from_=from_number,
-                to=user_phone_number,
-            )
-            logger.info(f"SMS OTP sent via Twilio to {user_phone_number} (sid={message.sid})")
-            return {"sid": message.sid, "status": message.status}
-
-        except TwilioRestException as e:
-            raise Exception(f"Échec de l'envoi du SMS via Twilio : {e}")
     @staticmethod
     def send_otp_by_email(user, otp):
         """
-        Envoie l'OTP à l'utilisateur par email.
+        Met en file l'envoi de l'OTP à l'utilisateur par email.
         """
         subject = "Votre code OTP"
         message = f"Bonjour {user.first_name},\n\nVotre code OTP est: {otp}\n\nMerci!"
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        return MessageDispatcher.enqueue_email(user.email, subject, message)
@@ -0,0 +1,50 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_table_rows(model, using="default"):
+    """
+    Nombre de lignes estimé par PostgreSQL (pg_class.reltuples, tenu à jour par
+    ANALYZE/autovacuum), partitions comprises. None sur les autres bases.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+            FROM pg_class c
+            WHERE c.oid = %s::regclass
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)
+            """,
+            [model._meta.db_table, model._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator de l'admin pour les tables de plusieurs millions de lignes.
+
+    Sans filtre, le total affiché est l'estimation du planificateur au lieu
+    d'un COUNT(*) qui parcourt toute la table ; les petites tables gardent le
+    comptage exact. Avec filtre ou recherche, le comptage est borné à
+    FILTERED_COUNT_LIMIT lignes. À combiner avec show_full_result_count = False.
+    """
+
+    ESTIMATE_THRESHOLD = 100_000
+    FILTERED_COUNT_LIMIT = 10_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.ESTIMATE_THRESHOLD:
+                return estimate
+            return super().count
+
+        return queryset.order_by()[: self.FILTERED_COUNT_LIMIT].count()
@@ -1,11 +1,49 @@
 from django.contrib import admin
+from django.db.models import Q
+
+from actor.models import Wallet
+from services.pagination import EstimatedCountPaginator
 from .models import (
     Transaction,
     Fee,
     TariffGrid,
     WalletBalanceHistory,
+    WalletBalanceCheckpoint,
+    WalletDailySummary,
+    FeeRevenueDaily,
     TransactionStatusCheck,
+    PartnerRoute,
+    TransactionStatus,
+    TransactionType,
 )
+from .partners.router import GatewayRouter
+from .services.reconciliation import TransactionReconciliationService
+from .services.search import SearchService
+
+
+def choices_filter(field, label, choices):
+    """
+    Filtre latéral à valeurs fixes : AllValuesFieldListFilter (le filtre par
+    défaut d'un CharField) lance un SELECT DISTINCT sur toute la table.
+    """
+
+    class ChoicesListFilter(admin.SimpleListFilter):
+        title = label
+        parameter_name = field
+
+        def lookups(self, request, model_admin):
+            return [(value, value) for value in choices]
+
+        def queryset(self, request, queryset):
+            if self.value():
+                return queryset.filter(**{field: self.value()})
+            return queryset
+
+    return ChoicesListFilter
+
+
+def wallet_ids_for_phone(term):
+    return list(Wallet.objects.filter(phone_number=term).values_list("id", flat=True))
 
 
 @admin.register(Transaction)
@@ -20,14 +58,25 @@ class TransactionAdmin(admin.ModelAdmin):
         "description",
         "external_reference",
     )  # Colonnes affichées
+    list_select_related = ("sender__user", "receiver__user")
+    # Recherche indexée (trigrammes), voir get_search_results
     search_fields = (
-        "sender__username",
-        "receiver__username",
-        "transaction_type",
-        "status",
-    )  # Recherche
-    list_filter = ("transaction_type", "status", "timestamp")  # Filtres latéraux
+        "order_id",
+        "external_reference",
+        "=sender__phone_number",
+        "=receiver__phone_number",
+    )
+    search_help_text = (
+        "order_id ou référence externe (3 caractères minimum), "
+        "ou numéro de téléphone exact"
+    )
+    list_filter = (
+        choices_filter("transaction_type", "type", [t.value for t in TransactionType]),
+        choices_filter("status", "statut", [s.value for s in TransactionStatus]),
+        "timestamp",
+    )  # Filtres latéraux
     readonly_fields = ("timestamp",)  # Champs en lecture seule
+    raw_id_fields = ("sender", "receiver")
     fieldsets = (  # Organisation des champs
         (
             "Détails de la transaction",
@@ -36,26 +85,44 @@ class TransactionAdmin(admin.ModelAdmin):
         ("Participants", {"fields": ("sender", "receiver")}),
         ("Dates", {"fields": ("timestamp",)}),
     )
-    ordering = ("-timestamp",)
-    date_hierarchy = "timestamp"
+    # -id suit l'ordre chronologique et parcourt l'index de la clé primaire ;
+    # pas de date_hierarchy, qui agrège les dates de toute la table
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     list_per_page = 20
     list_max_show_all = 100
 
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+
+        return queryset.filter(SearchService.transaction_condition(term)), False
+
     actions = ["mark_as_completed", "mark_as_failed"]
 
-    def mark_as_completed(self, request, queryset):
-        queryset.update(status="completed")
+    def _transition(self, request, queryset, status, label):
+        # Une seule lecture de la sélection ; seules les transactions PENDING
+        # sont clôturées, avec leurs écritures (voir TransactionReconciliationService)
+        selected = list(queryset.values_list("id", "status"))
+        pending = [pk for pk, current in selected if current == TransactionStatus.PENDING.value]
+
+        result = TransactionReconciliationService.bulk_transition(pending, status)
         self.message_user(
-            request, f"{queryset.count()} transactions marquées comme réussies."
+            request,
+            f"{result['transitioned']} transactions marquées comme {label} "
+            f"({result['entries']} écritures), "
+            f"{len(selected) - result['transitioned']} ignorées (statut déjà final).",
         )
 
+    def mark_as_completed(self, request, queryset):
+        self._transition(request, queryset, TransactionStatus.SUCCESS.value, "réussies")
+
     mark_as_completed.short_description = "Marquer comme réussie"
 
     def mark_as_failed(self, request, queryset):
-        queryset.update(status="failed")
-        self.message_user(
-            request, f"{queryset.count()} transactions marquées comme échouées."
-        )
+        self._transition(request, queryset, TransactionStatus.FAILED.value, "échouées")
 
     mark_as_failed.short_description = "Marquer comme échouée"
 
@@ -119,8 +186,15 @@ class WalletBalanceHistoryAdmin(admin.ModelAdmin):
         "transaction_type",
         "timestamp",
     )
-    list_filter = ("transaction_type", "timestamp")
-    search_fields = ("wallet__user__username", "description", "transaction__id")
+    list_select_related = ("wallet__user",)
+    list_filter = (
+        choices_filter("transaction_type", "type", ["debit", "credit", "INIT"]),
+        "timestamp",
+    )
+    # Recherche exacte et indexée, voir get_search_results
+    search_fields = ("=wallet__phone_number", "=transaction__order_id")
+    search_help_text = "Numéro de téléphone, order_id ou référence externe (exact)"
+    raw_id_fields = ("wallet", "transaction")
     # readonly_fields = (
     #     "wallet",
     #     "balance_before",
@@ -130,7 +204,23 @@ class WalletBalanceHistoryAdmin(admin.ModelAdmin):
     #     "timestamp",
     #     "description",
     # )
-    ordering = ("-timestamp",)
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+
+        transaction_ids = list(
+            Transaction.objects.filter(Q(order_id=term) | Q(external_reference=term))
+            .values_list("id", flat=True)
+        )
+        condition = Q(wallet_id__in=wallet_ids_for_phone(term)) | Q(
+            transaction_id__in=transaction_ids
+        )
+        return queryset.filter(condition), False
 
     def wallet_user(self, obj):
         return obj.wallet.user.username
@@ -146,7 +236,75 @@ class TransactionStatusCheckAdmin(admin.ModelAdmin):
         "status",
         "transaction_type",
         "partner",
+        "gateway",
         "last_checked_at",
     )
-    search_fields = ("order_id", "external_reference", "partner")
-    list_filter = ("partner", "status")
+    search_fields = ("=order_id", "=external_reference")
+    list_filter = (
+        "partner",
+        choices_filter("gateway", "passerelle", ["samir", "djamo", "mtn_money", "ecobank"]),
+        "status",
+    )
+    ordering = ("-id",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(PartnerRoute)
+class PartnerRouteAdmin(admin.ModelAdmin):
+    list_display = ("partner", "gateway", "is_active", "updated_at", "route_health")
+    list_filter = ("is_active",)
+
+    def route_health(self, obj):
+        stats = GatewayRouter(obj.partner).stats(obj.gateway)
+        return f"{stats['calls']} appels, succès {stats['success_rate']:.0%}, p95 {stats['p95']}s"
+
+    route_health.short_description = "Santé (fenêtre courante)"
+
+
+@admin.register(WalletBalanceCheckpoint)
+class WalletBalanceCheckpointAdmin(admin.ModelAdmin):
+    list_display = (
+        "wallet",
+        "balance",
+        "last_history_id",
+        "entries_count",
+        "archived",
+        "created_at",
+    )
+    search_fields = ("=wallet__phone_number",)
+    readonly_fields = (
+        "wallet",
+        "balance",
+        "last_history_id",
+        "entries_count",
+        "archived",
+        "created_at",
+    )
+    list_select_related = ("wallet__user",)
+    ordering = ("-created_at",)
+
+
+@admin.register(WalletDailySummary)
+class WalletDailySummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        "wallet",
+        "day",
+        "transaction_type",
+        "tx_count",
+        "inflow",
+        "outflow",
+        "fees",
+    )
+    search_fields = ("=wallet__phone_number",)
+    list_select_related = ("wallet__user",)
+    list_filter = ("transaction_type", "day")
+    readonly_fields = list_display + ("updated_at",)
+
+
+@admin.register(FeeRevenueDaily)
+class FeeRevenueDailyAdmin(admin.ModelAdmin):
+    list_display = ("day", "actor_type", "actor_id", "distributions_count", "amount")
+    list_filter = ("actor_type", "day")
+    search_fields = ("actor_id",)
+    readonly_fields = list_display + ("updated_at",)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TransactionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transaction'
+
+    def ready(self):
+        # Passerelles et processeurs marchands construits une fois par processus
+        from transaction.partners.registry import gateway_registry
+
+        gateway_registry.build()
@@ -4,3 +4,25 @@ class PaymentProcessingError(APIException):
     status_code = 500  # Le code de statut HTTP pour une erreur interne du serveur
     default_detail = 'Une erreur est survenue lors du traitement du paiement.'  # Détail par défaut de l'erreur
     default_code = 'payment_processing_error'  # Code d'erreur spécifique pour le traitement du paiement
+
+
+class PartnerUnavailableError(APIException):
+    """
+    Partenaire hors service (circuit ouvert) : échec immédiat. Le détail est
+    un dict pour que la réponse DRF porte directement detail et code.
+    """
+    status_code = 503
+    default_code = 'PARTNER_UNAVAILABLE'
+    default_detail = {
+        'detail': 'Le partenaire est momentanément indisponible. Veuillez réessayer plus tard.',
+        'code': 'PARTNER_UNAVAILABLE',
+    }
+
+
+class PartnerBusyError(PartnerUnavailableError):
+    """Toutes les places du compartiment partenaire sont occupées (bulkhead)."""
+    default_code = 'PARTNER_BUSY'
+    default_detail = {
+        'detail': 'Le partenaire est saturé. Veuillez réessayer dans quelques instants.',
+        'code': 'PARTNER_BUSY',
+    }
@@ -0,0 +1,208 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.db.models import BigIntegerField, Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from transaction.models import (
+    FeeDistribution,
+    Transaction,
+    TransactionStatus,
+    TransactionStatusCheck,
+    WalletBalanceCheckpoint,
+    WalletBalanceHistory,
+)
+from transaction.services.ledger_archive import LedgerArchiveWriter
+
+
+def archive_boundary(cutoff):
+    """
+    Limite d'archivage d'une entrée d'historique : le dernier checkpoint de son
+    wallet créé avant cutoff et antérieur à sa dernière entrée (le solde
+    courant reste toujours en base). 0 si le wallet n'en a pas.
+    """
+    latest_id = (
+        WalletBalanceHistory.objects.filter(wallet_id=OuterRef(OuterRef("wallet_id")))
+        .order_by("-id")
+        .values("id")[:1]
+    )
+    checkpoint = (
+        WalletBalanceCheckpoint.objects.filter(
+            wallet_id=OuterRef("wallet_id"),
+            created_at__lt=cutoff,
+            last_history_id__lt=Subquery(latest_id),
+        )
+        .order_by("-last_history_id")
+        .values("last_history_id")[:1]
+    )
+    return Coalesce(Subquery(checkpoint), Value(0), output_field=BigIntegerField())
+
+
+class Command(BaseCommand):
+    """
+    Archive les données du ledger plus anciennes que --months mois.
+
+    Les lignes sont écrites dans des segments JSONL gzip (sha256 et index dans
+    le manifest, voir LedgerArchiveWriter) puis supprimées par lots, enfants
+    d'abord. Une transaction n'est archivée qu'avec toutes ses entrées
+    d'historique, et une entrée d'historique seulement si elle est couverte
+    par un checkpoint de son wallet : lancer create_balance_checkpoints au
+    préalable. Les transactions PENDING et le solde courant de chaque wallet
+    restent en base.
+
+    Usage:
+        python manage.py archive_ledger --months 12
+        python manage.py archive_ledger --months 12 --dry-run
+    """
+
+    help = "Archive old ledger rows to compressed segment files and delete them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months", type=int, required=True, help="Période de rétention en mois"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Nombre de transactions par segment",
+        )
+        parser.add_argument("--dir", help="Répertoire d'archive (LEDGER_ARCHIVE_DIR)")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Compter les transactions archivables sans rien écrire",
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] < 1:
+            raise CommandError("--months doit être supérieur ou égal à 1")
+
+        self.cutoff = timezone.now() - timedelta(days=30 * options["months"])
+        self.batch_size = options["batch_size"]
+
+        if options["dry_run"]:
+            count = self.archivable_transactions().count()
+            self.stdout.write(f"{count} transactions before {self.cutoff:%Y-%m-%d} to archive")
+            return
+
+        self.writer = LedgerArchiveWriter(self.cutoff, options["dir"])
+        transactions = self.archive_transactions()
+        entries = self.archive_standalone_entries()
+        checks = self.archive_status_checks()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Archived {transactions} transactions, {entries} standalone history "
+                f"entries and {checks} status checks to {self.writer.directory}"
+            )
+        )
+
+    def archivable_transactions(self):
+        blocking_entries = (
+            WalletBalanceHistory.objects.filter(transaction_id=OuterRef("id"))
+            .annotate(boundary=archive_boundary(self.cutoff))
+            .filter(id__gt=F("boundary"))
+        )
+        return (
+            Transaction.objects.filter(timestamp__lt=self.cutoff)
+            .exclude(status=TransactionStatus.PENDING.value)
+            .filter(~Exists(blocking_entries))
+        )
+
+    def archive_transactions(self):
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(
+                self.archivable_transactions().filter(id__gt=last_id).order_by("id")[
+                    : self.batch_size
+                ]
+            )
+            if not batch:
+                return total
+
+            ids = [transaction.id for transaction in batch]
+            entries = list(
+                WalletBalanceHistory.objects.filter(transaction_id__in=ids)
+                .annotate(boundary=archive_boundary(self.cutoff))
+                .order_by("id")
+            )
+            fees = list(FeeDistribution.objects.filter(transaction_id__in=ids).order_by("id"))
+
+            wallets = {
+                wallet_id
+                for transaction in batch
+                for wallet_id in (transaction.sender_id, transaction.receiver_id)
+                if wallet_id
+            }
+            self.writer.write_segment(
+                [*batch, *entries, *fees],
+                orders=[transaction.order_id for transaction in batch if transaction.order_id],
+                wallets=wallets,
+            )
+
+            with db_transaction.atomic():
+                FeeDistribution.objects.filter(id__in=[fee.id for fee in fees]).delete()
+                self.delete_entries(entries)
+                Transaction.objects.filter(id__in=ids).delete()
+
+            total += len(batch)
+            last_id = ids[-1]
+            self.stdout.write(f"  {total} transactions archived")
+
+    def archive_standalone_entries(self):
+        """Entrées d'historique sans transaction (ouverture de compte, ajustements)."""
+        total = 0
+        last_id = 0
+        while True:
+            entries = list(
+                WalletBalanceHistory.objects.filter(
+                    transaction_id__isnull=True, id__gt=last_id
+                )
+                .annotate(boundary=archive_boundary(self.cutoff))
+                .filter(id__lte=F("boundary"))
+                .order_by("id")[: self.batch_size]
+            )
+            if not entries:
+                return total
+
+            self.writer.write_segment(entries)
+            with db_transaction.atomic():
+                self.delete_entries(entries)
+
+            total += len(entries)
+            last_id = entries[-1].id
+
+    def delete_entries(self, entries):
+        WalletBalanceHistory.objects.filter(id__in=[entry.id for entry in entries]).delete()
+
+        # Les checkpoints utilisés comme limite deviennent le point de départ
+        # des vérifications complètes (verify_ledger --full)
+        boundaries = {(entry.wallet_id, entry.boundary) for entry in entries}
+        for wallet_id, boundary in boundaries:
+            WalletBalanceCheckpoint.objects.filter(
+                wallet_id=wallet_id, last_history_id=boundary
+            ).update(archived=True)
+
+    def archive_status_checks(self):
+        total = 0
+        last_id = 0
+        while True:
+            checks = list(
+                TransactionStatusCheck.objects.filter(
+                    created_at__lt=self.cutoff, id__gt=last_id
+                )
+                .exclude(status=TransactionStatus.PENDING.value)
+                .order_by("id")[: self.batch_size]
+            )
+            if not checks:
+                return total
+
+            self.writer.write_segment(checks)
+            TransactionStatusCheck.objects.filter(id__in=[check.id for check in checks]).delete()
+
+            total += len(checks)
+            last_id = checks[-1].id
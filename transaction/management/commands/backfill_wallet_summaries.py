@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from transaction.models import WalletBalanceHistory
+from transaction.services.wallet_summary import WalletSummaryService
+
+
+class Command(BaseCommand):
+    """
+    Reconstruit WalletDailySummary depuis WalletBalanceHistory, jour par jour.
+
+    Par défaut, de la première entrée d'historique jusqu'à la veille : le jour
+    courant reçoit des mises à jour incrémentales qui seraient écrasées.
+
+    Usage:
+        python manage.py backfill_wallet_summaries
+        python manage.py backfill_wallet_summaries --start 2025-01-01 --end 2025-01-31
+    """
+
+    help = "Rebuild wallet daily summaries from balance history"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="Premier jour (YYYY-MM-DD)")
+        parser.add_argument("--end", help="Dernier jour inclus (YYYY-MM-DD), défaut : hier")
+        parser.add_argument(
+            "--wallet", type=int, action="append", help="Limiter à ces wallets"
+        )
+
+    def parse_day(self, value, option):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"{option} doit être au format YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        end = (
+            self.parse_day(options["end"], "--end")
+            if options["end"]
+            else timezone.localdate() - timedelta(days=1)
+        )
+        if options["start"]:
+            start = self.parse_day(options["start"], "--start")
+        else:
+            oldest = WalletBalanceHistory.objects.aggregate(oldest=Min("timestamp"))["oldest"]
+            if oldest is None:
+                self.stdout.write("No balance history")
+                return
+            start = timezone.localdate(oldest)
+
+        day = start
+        total = 0
+        while day <= end:
+            count = WalletSummaryService.rebuild_day(day, options["wallet"])
+            total += count
+            if count:
+                self.stdout.write(f"  {day}: {count} summaries")
+            day += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"{total} summaries rebuilt from {start} to {end}"))
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.core.management.base import BaseCommand
+
+from services.http import SharedAsyncClient
+from transaction.partners.processors.samir_pay import SamirPaymentGateway
+from transaction.partners.simulator import PartnerSimulator
+
+
+class Command(BaseCommand):
+    """
+    Compare le débit des appels partenaires entre le chemin synchrone (un
+    thread bloqué par appel, comme un worker WSGI) et le chemin asynchrone
+    (httpx.AsyncClient, comme les vues ASGI).
+
+    Les appels (rechargements Samir) visent le simulateur des partenaires,
+    lancé dans le processus avec la latence demandée, ou un simulateur
+    existant (--simulator-url). Aucune écriture en base.
+
+    Usage:
+        python manage.py benchmark_partner_calls --calls 2000 --threads 16 --concurrency 500
+    """
+
+    help = "Benchmark des appels partenaires (threads vs asyncio)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--calls", type=int, default=1000)
+        parser.add_argument("--threads", type=int, default=16, help="Threads du chemin synchrone")
+        parser.add_argument(
+            "--concurrency", type=int, default=200, help="Appels simultanés du chemin asynchrone"
+        )
+        parser.add_argument("--latency-ms", type=float, default=200)
+        parser.add_argument("--p99-ms", type=float, default=800)
+        parser.add_argument("--simulator-url", help="Simulateur déjà lancé (make simulator)")
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            default=["sync", "async"],
+            choices=["sync", "async"],
+        )
+
+    def handle(self, *args, **options):
+        os.environ.setdefault("SAMIR_API_KEY", "benchmark")
+        os.environ.setdefault("SAMIR_SECRET_KEY", "benchmark")
+
+        simulator = None
+        url = options["simulator_url"]
+        if not url:
+            simulator = PartnerSimulator(
+                port=0,
+                profiles={"samir": {"latency_ms": options["latency_ms"], "p99_ms": options["p99_ms"]}},
+            ).start()
+            url = simulator.url
+
+        try:
+            for mode in options["modes"]:
+                gateway = self._gateway(url, options["threads"])
+                start = time.perf_counter()
+                if mode == "sync":
+                    durations, errors = self._run_sync(gateway, options["calls"], options["threads"])
+                    label = f"sync threads={options['threads']}"
+                else:
+                    durations, errors = asyncio.run(
+                        self._run_async(gateway, options["calls"], options["concurrency"])
+                    )
+                    label = f"async concurrency={options['concurrency']}"
+                self._report(label, durations, errors, time.perf_counter() - start)
+        finally:
+            if simulator:
+                simulator.stop()
+
+    def _gateway(self, url, pool_size):
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_maxsize=pool_size))
+        gateway = SamirPaymentGateway(session=session, async_client=SharedAsyncClient())
+        gateway.base_url = f"{url.rstrip('/')}/samir"
+        return gateway
+
+    @staticmethod
+    def _transaction(index):
+        return SimpleNamespace(
+            order_id=f"BENCH-{index}",
+            amount=Decimal("1000"),
+            receiver=SimpleNamespace(phone_number="770000000"),
+        )
+
+    @staticmethod
+    def _timed(func):
+        start = time.perf_counter()
+        try:
+            result = func()
+            ok = str(result.get("status", "")).upper() != "FAILED"
+        except Exception:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    def _run_sync(self, gateway, calls, threads):
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(
+                executor.map(
+                    lambda i: self._timed(lambda: gateway.initiate_topup(self._transaction(i))),
+                    range(calls),
+                )
+            )
+        return [duration for duration, _ in results], sum(1 for _, ok in results if not ok)
+
+    async def _run_async(self, gateway, calls, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(index):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await gateway.ainitiate_topup(self._transaction(index))
+                    ok = str(result.get("status", "")).upper() != "FAILED"
+                except Exception:
+                    ok = False
+                return (time.perf_counter() - start) * 1000, ok
+
+        try:
+            results = await asyncio.gather(*(call(i) for i in range(calls)))
+        finally:
+            await SharedAsyncClient.close_loop_clients()
+        return [duration for duration, _ in results], sum(1 for _, ok in results if not ok)
+
+    def _report(self, label, durations, errors, elapsed):
+        durations.sort()
+
+        def percentile(p):
+            index = min(len(durations) - 1, int(round(p / 100 * len(durations))) - 1)
+            return durations[max(index, 0)]
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"[{label}] n={len(durations)} errors={errors} "
+                f"throughput={len(durations) / elapsed:.1f} appels/s "
+                f"mean={statistics.mean(durations):.2f}ms "
+                f"p50={percentile(50):.2f}ms "
+                f"p95={percentile(95):.2f}ms"
+            )
+        )
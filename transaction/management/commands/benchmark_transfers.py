@@ -0,0 +1,108 @@
+import statistics
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from actor.models import CustomUser, Wallet
+from transaction.models import WalletBalanceHistory
+from transaction.serializers import SendMoneySerializer
+
+
+class Command(BaseCommand):
+    """
+    Compare la latence des transferts internes entre le moteur ORM et le moteur SQL.
+
+    Chaque itération passe par SendMoneySerializer (validate + create), comme
+    SendMoneyView, et compte les requêtes SQL exécutées. À lancer sur une base
+    de test ou de pré-production : des wallets de benchmark sont créés.
+
+    Usage:
+        python manage.py benchmark_transfers --iterations 500
+    """
+
+    help = "Benchmark des transferts internes (ORM vs SQL)"
+
+    SENDER = "bench_sender"
+    RECEIVER = "bench_receiver"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--amount", type=str, default="10.00")
+        parser.add_argument(
+            "--engines",
+            nargs="+",
+            default=["orm", "sql"],
+            choices=["orm", "sql"],
+        )
+
+    def handle(self, *args, **options):
+        if "sql" in options["engines"] and connection.vendor != "postgresql":
+            raise CommandError("Le moteur SQL nécessite PostgreSQL.")
+
+        amount = Decimal(options["amount"])
+        iterations = options["iterations"]
+        sender, receiver = self._setup_wallets(amount * iterations * 4)
+
+        for engine in options["engines"]:
+            with override_settings(TRANSFER_ENGINE=engine):
+                durations, queries = self._run(sender, receiver, amount, iterations)
+            self._report(engine, durations, queries)
+
+    def _setup_wallets(self, opening_balance):
+        wallets = []
+        for username, phone in [(self.SENDER, "000000001"), (self.RECEIVER, "000000002")]:
+            user, _ = CustomUser.objects.get_or_create(
+                username=username, defaults={"is_active": True}
+            )
+            wallet, created = Wallet.objects.get_or_create(
+                user=user, defaults={"phone_number": phone}
+            )
+            if created:
+                WalletBalanceHistory.objects.create(
+                    wallet=wallet,
+                    balance_before=0,
+                    balance_after=opening_balance,
+                    transaction_type="INIT",
+                    description="Initialisation benchmark",
+                )
+            wallets.append(user)
+        return wallets
+
+    def _run(self, sender, receiver, amount, iterations):
+        request = SimpleNamespace(user=sender)
+        durations = []
+        queries = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                serializer = SendMoneySerializer(
+                    data={"receiver": receiver.username, "amount": str(amount)},
+                    context={"request": request},
+                )
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                durations.append((time.perf_counter() - start) * 1000)
+            queries.append(len(ctx.captured_queries))
+        return durations, queries
+
+    def _report(self, engine, durations, queries):
+        durations.sort()
+
+        def percentile(p):
+            index = min(len(durations) - 1, int(round(p / 100 * len(durations))) - 1)
+            return durations[max(index, 0)]
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"[{engine}] n={len(durations)} "
+                f"mean={statistics.mean(durations):.2f}ms "
+                f"p50={percentile(50):.2f}ms "
+                f"p95={percentile(95):.2f}ms "
+                f"p99={percentile(99):.2f}ms "
+                f"queries/transfer={statistics.mean(queries):.1f}"
+            )
+        )
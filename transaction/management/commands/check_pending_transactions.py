@@ -29,7 +29,7 @@ class Command(BaseCommand):
 
         for check in pending_checks:
             new_status = self.get_status_from_partner(
-                check.partner, check.external_reference
+                check.partner, check.external_reference, check.gateway
             )
 
             if new_status and new_status != check.status:
@@ -44,20 +44,22 @@ class Command(BaseCommand):
                         status=new_status.upper()
                     )
 
-    def get_status_from_partner(self, partner, external_reference):
+    def get_status_from_partner(self, partner, external_reference, gateway=""):
         """
         Interroge le partenaire de paiement pour obtenir le statut d'une transaction.
         
         Args:
             partner (str): Le nom du partenaire de paiement (ex: "WAVE", "ORANGE_MONEY")
             external_reference (str): La référence externe de la transaction chez le partenaire
+            gateway (str): La passerelle ayant porté la transaction (ex: "samir", "djamo") ;
+                vide pour les transactions antérieures au routage
             
         Returns:
             str | None: Le nouveau statut de la transaction, ou None en cas d'erreur
         """
         try:
-            gateway = PartnerGatewayFactory(partner)
-            status = gateway.get_transaction_status(external_reference)
+            factory = PartnerGatewayFactory(partner, gateway=gateway)
+            status = factory.get_transaction_status(external_reference)
             return status
         except Exception as e:
             self.stdout.write(f"Error checking {external_reference}: {e}")
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+
+from actor.models import Wallet
+from transaction.services.balance_checkpoint import BalanceCheckpointService
+
+
+class Command(BaseCommand):
+    """
+    Crée les checkpoints de solde des wallets.
+
+    Pour chaque wallet, la fin de chaîne de WalletBalanceHistory (depuis le
+    dernier checkpoint) est vérifiée ; un nouveau checkpoint est créé si elle
+    est cohérente et contient au moins --min-entries entrées. À planifier
+    périodiquement (cron).
+
+    Usage:
+        python manage.py create_balance_checkpoints --min-entries 500
+    """
+
+    help = "Create periodic balance checkpoints for wallets"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-entries",
+            type=int,
+            default=100,
+            help="Nombre minimal d'entrées depuis le dernier checkpoint",
+        )
+        parser.add_argument(
+            "--settle-seconds",
+            type=int,
+            default=BalanceCheckpointService.SETTLE_SECONDS,
+            help="Ignore les entrées plus récentes que ce délai",
+        )
+        parser.add_argument(
+            "--wallet", type=int, action="append", help="Limiter à ces wallets"
+        )
+
+    def handle(self, *args, **options):
+        wallets = Wallet.objects.order_by("id")
+        if options["wallet"]:
+            wallets = wallets.filter(id__in=options["wallet"])
+
+        created = 0
+        broken = 0
+        for wallet_id in wallets.values_list("id", flat=True).iterator():
+            result, checkpoint = BalanceCheckpointService.create_checkpoint(
+                wallet_id,
+                min_entries=options["min_entries"],
+                settle_seconds=options["settle_seconds"],
+            )
+            if checkpoint:
+                created += 1
+            if result.mismatches:
+                broken += 1
+                self.stdout.write(
+                    self.style.ERROR(
+                        f"Wallet {wallet_id}: {len(result.mismatches)} mismatches "
+                        f"(first at history #{result.mismatches[0].history_id})"
+                    )
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{created} checkpoints created, {broken} wallets with broken chains")
+        )
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction as db_transaction
+
+from transaction.services.partitioning import PartitionService
+
+
+class Command(BaseCommand):
+    """
+    Gère les partitions mensuelles de transaction_transaction et
+    transaction_walletbalancehistory.
+
+    Crée à l'avance les partitions des prochains mois (à planifier chaque mois
+    via cron) et détache, avec --detach-before, les mois plus anciens : ils
+    deviennent des tables autonomes à archiver (pg_dump) puis supprimer.
+
+    Usage:
+        python manage.py manage_partitions --months-ahead 3
+        python manage.py manage_partitions --detach-before 2025-01 --dry-run
+    """
+
+    help = "Create upcoming monthly ledger partitions and detach old ones"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Nombre de mois à créer après le mois courant",
+        )
+        parser.add_argument(
+            "--detach-before",
+            help="Détacher les partitions antérieures à ce mois (YYYY-MM)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Afficher les partitions à détacher sans les détacher",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Le partitionnement nécessite PostgreSQL")
+
+        detach_before = None
+        if options["detach_before"]:
+            try:
+                detach_before = datetime.strptime(options["detach_before"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("--detach-before doit être au format YYYY-MM")
+
+        with connection.cursor() as cursor:
+            for table in PartitionService.TABLES:
+                if not PartitionService.is_partitioned(cursor, table):
+                    raise CommandError(f"{table} n'est pas partitionnée")
+
+            for table in PartitionService.TABLES:
+                with db_transaction.atomic():
+                    created = PartitionService.ensure_partitions(
+                        cursor, table, options["months_ahead"]
+                    )
+                for name in created:
+                    self.stdout.write(self.style.SUCCESS(f"Created {name}"))
+
+            if detach_before:
+                self.detach(cursor, detach_before, options["dry_run"])
+
+    def detach(self, cursor, before, dry_run):
+        # Un mois n'est détaché que si ses deux partitions peuvent l'être
+        months = {}
+        for table in PartitionService.TABLES:
+            for partition in PartitionService.list_partitions(cursor, table):
+                if partition.end <= before:
+                    months.setdefault(partition.start, []).append(partition)
+
+        for month, partitions in sorted(months.items()):
+            blockers = [
+                f"{partition.name}: {reason}"
+                for partition in partitions
+                for reason in PartitionService.detach_blockers(cursor, partition)
+            ]
+            if blockers:
+                self.stdout.write(
+                    self.style.ERROR(f"{month:%Y-%m} kept ({'; '.join(blockers)})")
+                )
+                continue
+
+            if dry_run:
+                names = ", ".join(partition.name for partition in partitions)
+                self.stdout.write(f"{month:%Y-%m} would be detached: {names}")
+                continue
+
+            with db_transaction.atomic():
+                for partition in partitions:
+                    PartitionService.detach_partition(cursor, partition)
+            for partition in partitions:
+                self.stdout.write(self.style.SUCCESS(f"Detached {partition.name}"))
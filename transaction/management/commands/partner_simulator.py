@@ -0,0 +1,66 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transaction.partners.simulator import PartnerSimulator
+
+
+class Command(BaseCommand):
+    """
+    Lance le simulateur des API partenaires (Samir, Djamo, FCM) pour les tirs
+    de charge et les tests de panne hors ligne.
+
+    Les webhooks Djamo sont signés avec DJAMO_SECRET_KEY, comme en production.
+
+    Usage:
+        python manage.py partner_simulator --port 8100 \\
+            --set samir.latency_ms=300 --set samir.p99_ms=4000 --set djamo.error_rate=0.05 \\
+            --webhook-url http://web:8000/api/transaction/webhooks/djamo/
+    """
+
+    help = "Simulateur local des API Samir, Djamo et FCM"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8100)
+        parser.add_argument(
+            "--set",
+            action="append",
+            default=[],
+            metavar="SERVICE.PARAM=VALEUR",
+            help="Profil d'un service, ex. djamo.error_rate=0.1 (répétable)",
+        )
+        parser.add_argument("--webhook-url", help="Destination des webhooks Djamo simulés")
+        parser.add_argument("--seed", type=int, help="Graine aléatoire (tirs reproductibles)")
+
+    def handle(self, *args, **options):
+        profiles = {}
+        for item in options["set"]:
+            try:
+                key, value = item.split("=", 1)
+                service, param = key.split(".", 1)
+                profiles.setdefault(service, {})[param] = float(value)
+            except ValueError:
+                raise CommandError(f"Paramètre invalide : {item} (attendu SERVICE.PARAM=VALEUR)")
+
+        try:
+            simulator = PartnerSimulator(
+                host=options["host"],
+                port=options["port"],
+                profiles=profiles,
+                webhook_url=options["webhook_url"],
+                webhook_secret=os.getenv("DJAMO_SECRET_KEY", ""),
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f"Simulateur partenaires sur {simulator.url}")
+        for service, profile in simulator.profiles.items():
+            self.stdout.write(f"  {service}: {profile}")
+        try:
+            simulator.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            simulator.server.server_close()
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transaction.models import Transaction, TransactionStatus, TransactionStatusCheck
+from transaction.services.reconciliation import TransactionReconciliationService
+
+
+class Command(BaseCommand):
+    """
+    Clôture en masse des transactions PENDING après un incident partenaire.
+
+    Les transactions sont désignées par order_id (--order-id, --file) ou par
+    partenaire (--partner, éventuellement --older-than en heures), puis
+    passées à --status par lots avec leurs écritures
+    (TransactionReconciliationService).
+
+    Usage:
+        python manage.py reconcile_transactions --status FAILED --file incident.txt
+        python manage.py reconcile_transactions --status SUCCESS --partner wave --older-than 2
+        python manage.py reconcile_transactions --status FAILED --order-id PLZ-... --dry-run
+    """
+
+    help = "Bulk transition PENDING transactions to SUCCESS or FAILED with ledger postings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--status",
+            required=True,
+            type=str.upper,
+            choices=TransactionReconciliationService.FINAL_STATUSES,
+        )
+        parser.add_argument("--order-id", action="append", default=[], help="order_id à clôturer")
+        parser.add_argument("--file", help="Fichier d'order_id (un par ligne)")
+        parser.add_argument("--partner", help="Toutes les transactions PENDING de ce partenaire")
+        parser.add_argument(
+            "--older-than", type=float, help="Avec --partner : PENDING depuis plus de N heures"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=TransactionReconciliationService.BATCH_SIZE
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Compter sans modifier")
+
+    def handle(self, *args, **options):
+        order_ids = list(options["order_id"])
+        if options["file"]:
+            try:
+                with open(options["file"], encoding="utf-8") as f:
+                    order_ids += [line.strip() for line in f if line.strip()]
+            except OSError as e:
+                raise CommandError(f"Lecture impossible : {e}")
+
+        if not order_ids and not options["partner"]:
+            raise CommandError("Indiquer --order-id, --file ou --partner")
+
+        pending = Transaction.objects.filter(status=TransactionStatus.PENDING.value)
+        if order_ids:
+            pending = pending.filter(order_id__in=order_ids)
+        if options["partner"]:
+            checks = TransactionStatusCheck.objects.filter(
+                partner__iexact=options["partner"], status=TransactionStatus.PENDING.value
+            )
+            if options["older_than"]:
+                checks = checks.filter(
+                    created_at__lt=timezone.now() - timedelta(hours=options["older_than"])
+                )
+            pending = pending.filter(order_id__in=checks.values("order_id"))
+
+        transaction_ids = list(pending.order_by("id").values_list("id", flat=True))
+        self.stdout.write(f"{len(transaction_ids)} PENDING transactions selected")
+        if options["dry_run"] or not transaction_ids:
+            return
+
+        def progress(done, total, result):
+            self.stdout.write(
+                f"  {done}/{total} processed, {result['transitioned']} -> {options['status']}, "
+                f"{result['skipped']} skipped"
+            )
+
+        result = TransactionReconciliationService.bulk_transition(
+            transaction_ids,
+            options["status"],
+            batch_size=options["batch_size"],
+            progress=progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['transitioned']} transactions -> {options['status']}, "
+                f"{result['entries']} ledger entries, {result['skipped']} skipped"
+            )
+        )
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from transaction.models import FeeDistribution
+from transaction.services.fee_revenue import FeeRevenueService
+
+
+class Command(BaseCommand):
+    """
+    Recalcule les agrégats FeeRevenueDaily depuis FeeDistribution.
+
+    Par défaut seule la veille est recalculée (à planifier chaque nuit pour
+    corriger une éventuelle dérive des mises à jour incrémentales) ; --all
+    reprend tout l'historique.
+
+    Usage:
+        python manage.py refresh_fee_reports
+        python manage.py refresh_fee_reports --start 2025-01-01 --end 2025-01-31
+        python manage.py refresh_fee_reports --all
+    """
+
+    help = "Refresh daily fee revenue reports from fee distributions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="Premier jour (YYYY-MM-DD), défaut : hier")
+        parser.add_argument("--end", help="Dernier jour inclus (YYYY-MM-DD), défaut : hier")
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Depuis la première distribution de frais",
+        )
+
+    def parse_day(self, value, option):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date()
+        except ValueError:
+            raise CommandError(f"{option} doit être au format YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        end = self.parse_day(options["end"], "--end") if options["end"] else yesterday
+
+        if options["all"]:
+            oldest = FeeDistribution.objects.aggregate(oldest=Min("created_at"))["oldest"]
+            if oldest is None:
+                self.stdout.write("No fee distributions")
+                return
+            start = timezone.localdate(oldest)
+        elif options["start"]:
+            start = self.parse_day(options["start"], "--start")
+        else:
+            start = end
+
+        day = start
+        total = 0
+        while day <= end:
+            total += FeeRevenueService.rebuild_day(day)
+            day += timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} fee revenue rows refreshed from {start} to {end}")
+        )
@@ -0,0 +1,251 @@
+import itertools
+import multiprocessing
+import os
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Mod
+
+from transaction.models import WalletBalanceCheckpoint, WalletBalanceHistory
+from transaction.services.balance_checkpoint import BalanceCheckpointService
+
+# Nombre maximal de ruptures détaillées par wallet dans le rapport
+MAX_REPORTED_MISMATCHES = 5
+
+
+def _init_worker():
+    # Chaque process ouvre sa propre connexion : celles héritées du parent
+    # ne doivent pas être partagées.
+    django.setup()
+    connections.close_all()
+
+
+def _verify_shard(args):
+    """
+    Vérifie les chaînes d'historique des wallets du shard (wallet_id % workers).
+
+    L'historique est lu en un seul parcours trié par (wallet, id) avec un curseur
+    côté serveur, puis découpé par wallet en mémoire.
+    """
+    shard, workers, full, rebuild, chunk_size = args
+
+    entries = WalletBalanceHistory.objects.annotate(
+        shard=Mod("wallet_id", Value(workers))
+    ).filter(shard=shard)
+
+    # Avec --full, seules les limites d'archivage servent de point de départ
+    checkpoint_set = WalletBalanceCheckpoint.objects.all()
+    if full:
+        checkpoint_set = checkpoint_set.filter(archived=True)
+
+    latest = checkpoint_set.filter(wallet_id=OuterRef("wallet_id")).order_by(
+        "-last_history_id"
+    )
+    entries = entries.annotate(
+        checkpoint_id=Coalesce(
+            Subquery(latest.values("last_history_id")[:1]),
+            Value(0),
+            output_field=IntegerField(),
+        )
+    ).filter(id__gt=F("checkpoint_id"))
+    checkpoints = {
+        wallet_id: (balance, last_history_id)
+        for wallet_id, balance, last_history_id in checkpoint_set.annotate(
+            shard=Mod("wallet_id", Value(workers))
+        )
+        .filter(shard=shard)
+        .order_by("wallet_id", "last_history_id")
+        .values_list("wallet_id", "balance", "last_history_id")
+    }
+
+    rows = (
+        entries.order_by("wallet_id", "id")
+        .values_list("wallet_id", "id", "balance_before", "balance_after")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    wallets = 0
+    total_entries = 0
+    broken = []
+    for wallet_id, wallet_rows in itertools.groupby(rows, key=lambda row: row[0]):
+        balance, last_history_id = checkpoints.get(wallet_id, (0, 0))
+        result = BalanceCheckpointService.verify_entries(
+            wallet_id,
+            (row[1:] for row in wallet_rows),
+            balance,
+            last_history_id,
+        )
+        wallets += 1
+        total_entries += result.entries
+        if not result.mismatches:
+            continue
+
+        repaired = None
+        if rebuild:
+            repaired = BalanceCheckpointService.repair_chain(
+                wallet_id, from_checkpoint=not full
+            )
+        broken.append(
+            {
+                "wallet_id": wallet_id,
+                "count": len(result.mismatches),
+                "mismatches": result.mismatches[:MAX_REPORTED_MISMATCHES],
+                "repaired": repaired,
+            }
+        )
+
+    return {"wallets": wallets, "entries": total_entries, "broken": broken}
+
+
+def _verify_transaction_legs(args):
+    """
+    Vérifie que les mouvements d'une transaction entre deux wallets s'annulent
+    (débit expéditeur + crédit destinataire + frais). Une requête d'agrégation
+    par shard de transactions.
+    """
+    shard, workers = args
+
+    unbalanced = list(
+        WalletBalanceHistory.objects.annotate(
+            shard=Mod("transaction_id", Value(workers))
+        )
+        .filter(
+            shard=shard,
+            transaction__sender__isnull=False,
+            transaction__receiver__isnull=False,
+        )
+        .values("transaction_id")
+        .annotate(net=Sum(F("balance_after") - F("balance_before")))
+        .exclude(net=0)
+        .order_by("transaction_id")
+        .values_list("transaction_id", "net")
+    )
+
+    return unbalanced
+
+
+class Command(BaseCommand):
+    """
+    Vérifie l'intégrité du ledger en parallèle.
+
+    Les wallets sont répartis en shards (wallet_id % --workers) traités par un
+    pool de process. Pour chaque wallet, la chaîne balance_before/balance_after
+    est vérifiée depuis son dernier checkpoint (ou, avec --full, depuis le début
+    de l'historique en ligne, c'est-à-dire la limite d'archivage),
+    puis l'équilibre des mouvements de chaque transaction est contrôlé.
+
+    Avec --rebuild, les chaînes rompues sont recalculées à partir des mouvements
+    de chaque entrée. À lancer pendant une fenêtre de maintenance.
+
+    Usage:
+        python manage.py verify_ledger --workers 8
+        python manage.py verify_ledger --full --rebuild
+    """
+
+    help = "Verify ledger integrity (balance chains and transaction legs) in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Nombre de process (et de shards)",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignorer les checkpoints et relire tout l'historique en ligne",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recalculer les soldes des chaînes rompues",
+        )
+        parser.add_argument(
+            "--skip-legs",
+            action="store_true",
+            help="Ne pas vérifier l'équilibre des transactions",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=BalanceCheckpointService.CHUNK_SIZE,
+            help="Taille des lots lus par le curseur",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers doit être supérieur ou égal à 1")
+
+        start = time.monotonic()
+        shards = [
+            (shard, workers, options["full"], options["rebuild"], options["chunk_size"])
+            for shard in range(workers)
+        ]
+
+        if workers == 1:
+            chain_results = [_verify_shard(shards[0])]
+            legs_results = (
+                [] if options["skip_legs"] else [_verify_transaction_legs((0, 1))]
+            )
+        else:
+            # Les connexions ouvertes ne doivent pas être héritées par les process
+            connections.close_all()
+            with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+                chain_results = pool.map(_verify_shard, shards)
+                legs_results = (
+                    []
+                    if options["skip_legs"]
+                    else pool.map(
+                        _verify_transaction_legs,
+                        [(shard, workers) for shard in range(workers)],
+                    )
+                )
+
+        wallets = sum(result["wallets"] for result in chain_results)
+        entries = sum(result["entries"] for result in chain_results)
+        broken = [item for result in chain_results for item in result["broken"]]
+        unbalanced = [item for result in legs_results for item in result]
+
+        for item in sorted(broken, key=lambda item: item["wallet_id"]):
+            details = ", ".join(
+                f"#{m.history_id} attendu {m.expected_before} trouvé {m.actual_before}"
+                for m in item["mismatches"]
+            )
+            self.stdout.write(
+                self.style.ERROR(
+                    f"Wallet {item['wallet_id']}: {item['count']} mismatches ({details})"
+                )
+            )
+            if item["repaired"] is not None:
+                self.stdout.write(f"  -> {item['repaired']} entries rebuilt")
+
+        for transaction_id, net in unbalanced:
+            self.stdout.write(
+                self.style.ERROR(f"Transaction {transaction_id}: legs unbalanced by {net}")
+            )
+
+        elapsed = time.monotonic() - start
+        rate = entries / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{wallets} wallets, {entries} entries verified in {elapsed:.1f}s "
+            f"({rate:.0f} entries/s, {workers} workers)"
+        )
+
+        if unbalanced or (broken and not options["rebuild"]):
+            raise CommandError(
+                f"{len(broken)} wallets with broken chains, "
+                f"{len(unbalanced)} unbalanced transactions"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ledger OK ({len(broken)} wallets rebuilt)"
+                if broken
+                else "Ledger OK"
+            )
+        )
@@ -2,6 +2,7 @@ import os
 import requests
 import logging
 
+from services.http import SharedAsyncClient
 from transaction.models import TransactionStatus
 
 logger = logging.getLogger(__name__)
@@ -12,10 +13,14 @@ class SamirPayMerchantPaymentProcessor:
     Connecteur pour effectuer des opérations Cashin et Cashout via l'API SAMIR.
     """
 
-    BASE_URL = f'{os.environ.get("SAMIR_API_BASE_URL")}/api/invoice/v1/WIZALL'
+    # Compartiment de concurrence distinct du cash-in/cash-out SAMIR (Bulkhead)
+    BULKHEAD = "samir_merchant"
 
-    def __init__(self, merchant_code="airtime"):
+    def __init__(self, merchant_code="airtime", session=None, async_client=None):
         self.merchant_code = merchant_code
+        self.session = session or requests.Session()
+        self.async_client = async_client or SharedAsyncClient()
+        self.base_url = f'{os.environ.get("SAMIR_API_BASE_URL")}/api/invoice/v1/WIZALL'
 
         self.api_key = os.environ.get("SAMIR_API_KEY")
         self.secret_key = os.environ.get("SAMIR_SECRET_KEY")
@@ -35,11 +40,11 @@ class SamirPayMerchantPaymentProcessor:
     def _get_merchant_endpoint(self):
         match self.merchant_code:
             case "airtime":
-                return f"{self.BASE_URL}/airtime-reload"
+                return f"{self.base_url}/airtime-reload"
             case "woyofal":
-                return f"{self.BASE_URL}/woyofal-reload"
+                return f"{self.base_url}/woyofal-reload"
             case "rapido-reload":
-                return f"{self.BASE_URL}/rapido"
+                return f"{self.base_url}/rapido"
 
     def initiate_payment(
         self,
@@ -50,16 +55,11 @@ class SamirPayMerchantPaymentProcessor:
         Effectue un paiement marchand via l'API SAMIR.
         """
         url = self._get_merchant_endpoint()
-        payload = {
-            "amount": "{:.0f}".format(transaction.amount),
-        }
-
-        for detail in details:
-            payload.update({detail: details[detail]})
+        payload = self._payload(transaction, details)
 
         logger.info(f"Initiating merchant payment with payload: {payload}")
 
-        response = requests.post(url, headers=self._headers(), json=payload)
+        response = self.session.post(url, headers=self._headers(), json=payload)
 
         try:
             response.raise_for_status()
@@ -69,3 +69,29 @@ class SamirPayMerchantPaymentProcessor:
         except requests.HTTPError as e:
             logger.error(f"Cashout HTTP Error: {e} | Response: {response.text}")
             return {"status": TransactionStatus.FAILED.value, "details": response.text}
+
+    @staticmethod
+    def _payload(transaction, details):
+        payload = {
+            "amount": "{:.0f}".format(transaction.amount),
+        }
+
+        for detail in details:
+            payload.update({detail: details[detail]})
+        return payload
+
+    async def ainitiate_payment(self, transaction, details: dict):
+        """
+        Variante asynchrone d'initiate_payment (vues ASGI).
+        """
+        response = await self.async_client().post(
+            self._get_merchant_endpoint(),
+            headers=self._headers(),
+            json=self._payload(transaction, details),
+        )
+        if response.status_code >= 400:
+            logger.error(f"Cashout HTTP Error: {response.status_code} | Response: {response.text}")
+            return {"status": TransactionStatus.FAILED.value, "details": response.text}
+        data = response.json()
+        logger.info(f"Merchant payment response: {data}")
+        return data
@@ -1,5 +1,8 @@
+from services.async_views import db_call
 from transaction.errors import PaymentProcessingError
 from transaction.merchants.factory import MerchantPaymentFactory
+from transaction.partners.bulkhead import Bulkhead
+from transaction.partners.registry import gateway_registry
 
 from django.db import transaction as tr
 
@@ -14,6 +17,88 @@ logger = logging.getLogger(__name__)
 
 
 class MerchantPaymentService:
+    @staticmethod
+    def prepare_payment(merchant, sender_wallet, amount):
+        """
+        Vérifie le solde et crée la transaction en attente (avant tout appel externe).
+        """
+        TransactionService.check_sufficient_funds(sender_wallet, amount)
+
+        description = f"Paiement au marchand {merchant.merchant_code}"
+
+        logger.info(
+            f"Initiating payment to merchant {merchant.merchant_code} for amount {amount}"
+        )
+
+        transaction = TransactionService.create_pending_transaction(
+            sender_wallet,
+            merchant.wallet,
+            TransactionType.PAYMENT.value,
+            amount,
+            description,
+        )
+
+        logger.info(
+            f"Pending transaction created with ID {transaction.order_id} for merchant {merchant.merchant_code}"
+        )
+        return transaction
+
+    @staticmethod
+    def complete_payment(merchant, sender_wallet, amount, transaction, response):
+        """
+        Valide la réponse du service marchand puis crédite le marchand, débite
+        le client et applique les frais. Lève PaymentProcessingError si le
+        service a refusé le paiement.
+        """
+        if gateway_registry.is_merchant_service(merchant.merchant_code):
+            logger.info(
+                f"Payment processor response for transaction ID {transaction.order_id}: {response}"
+            )
+            status = response.get("data", {}).get("status")
+            if status not in ["success", "pending"]:
+                raise PaymentProcessingError(
+                    detail="Le traitement du paiement a échoué.",
+                    code="PAYMENT_PROCESSING_ERROR",
+                )
+
+        description = f"Paiement au marchand {merchant.merchant_code}"
+
+        # Créditer le marchand et débiter le client
+        TransactionService.credit_wallet(
+            merchant.wallet, amount, transaction, description
+        )
+        TransactionService.debit_wallet(
+            sender_wallet, amount, transaction, description
+        )
+        TransactionService.update_transaction_status(
+            transaction, TransactionStatus.SUCCESS.value
+        )
+
+        # Appliquer les frais après confirmation du succès
+        FeeService.apply_fee(
+            user=sender_wallet.user,
+            wallet=sender_wallet,
+            transaction=transaction,
+            transaction_type=TransactionType.PAYMENT.value,
+            merchant=merchant
+        )
+
+        return response
+
+    @staticmethod
+    def direct_payment_response(merchant, transaction, amount):
+        # Cas 2: Marchand Pliz - Paiement direct (pas d'API externe)
+        logger.info(f"Processing direct merchant payment for {merchant.merchant_code}")
+        return {
+            "status": "success",
+            "data": {
+                "order_id": transaction.order_id,
+                "amount": float(amount),
+                "merchant_code": merchant.merchant_code,
+                "merchant_name": merchant.business_name  # Info bonus utile
+            }
+        }
+
     @staticmethod
     @tr.atomic
     def process_payment(merchant, sender_wallet, amount, details):
@@ -26,30 +111,10 @@ class MerchantPaymentService:
         - Marchands Pliz (MCHxxxxx): Paiement direct
         """
         try:
-            TransactionService.check_sufficient_funds(sender_wallet, amount)
-
-            description = f"Paiement au marchand {merchant.merchant_code}"
-
-            logger.info(
-                f"Initiating payment to merchant {merchant.merchant_code} for amount {amount}"
-            )
-
-            transaction = TransactionService.create_pending_transaction(
-                sender_wallet,
-                merchant.wallet,
-                TransactionType.PAYMENT.value,
-                amount,
-                description,
-            )
-
-            logger.info(
-                f"Pending transaction created with ID {transaction.order_id} for merchant {merchant.merchant_code}"
-            )
+            transaction = MerchantPaymentService.prepare_payment(merchant, sender_wallet, amount)
 
             # Vérifier si c'est un service API (woyofal, rapido, airtime) ou un marchand Pliz
-            is_api_service = merchant.merchant_code.lower() in ["airtime", "woyofal", "rapido"]
-            
-            if is_api_service:
+            if gateway_registry.is_merchant_service(merchant.merchant_code):
                 # Cas 1: Service API - Appel externe
                 logger.info(f"Processing API service payment for {merchant.merchant_code}")
                 payment_processor = MerchantPaymentFactory.get_merchant_processor(
@@ -59,52 +124,57 @@ class MerchantPaymentService:
                 logger.info(
                     f"Using payment processor {payment_processor.__class__.__name__} for merchant {merchant.merchant_code}"
                 )
-                response = payment_processor.initiate_payment(transaction, details)
-                logger.info(
-                    f"Payment processor response for transaction ID {transaction.order_id}: {response}"
+                bulkhead = getattr(
+                    type(payment_processor), "BULKHEAD", merchant.merchant_code.lower()
                 )
-                status = response.get("data", {}).get("status")
-                if status not in ["success", "pending"]:
-                    raise PaymentProcessingError(
-                        detail="Le traitement du paiement a échoué.",
-                        code="PAYMENT_PROCESSING_ERROR",
-                    )
+                with Bulkhead(bulkhead):
+                    response = payment_processor.initiate_payment(transaction, details)
             else:
-                # Cas 2: Marchand Pliz - Paiement direct (pas d'API externe)
-                logger.info(f"Processing direct merchant payment for {merchant.merchant_code}")
-                response = {
-                    "status": "success",
-                    "data": {
-                        "order_id": transaction.order_id,
-                        "amount": float(amount),
-                        "merchant_code": merchant.merchant_code,
-                        "merchant_name": merchant.business_name  # Info bonus utile
-                    }
-                }
-            
-            # Créditer le marchand et débiter le client
-            TransactionService.credit_wallet(
-                merchant.wallet, amount, transaction, description
-            )
-            TransactionService.debit_wallet(
-                sender_wallet, amount, transaction, description
+                response = MerchantPaymentService.direct_payment_response(
+                    merchant, transaction, amount
+                )
+
+            return MerchantPaymentService.complete_payment(
+                merchant, sender_wallet, amount, transaction, response
             )
-            TransactionService.update_transaction_status(
-                transaction, TransactionStatus.SUCCESS.value
+
+        except PaymentProcessingError:
+            raise PaymentProcessingError(
+                detail="Le traitement du paiement a échoué.",
+                code="PAYMENT_PROCESSING_ERROR",
             )
-            
-            # Appliquer les frais après confirmation du succès
-            FeeService.apply_fee(
-                user=sender_wallet.user,
-                wallet=sender_wallet,
-                transaction=transaction,
-                transaction_type=TransactionType.PAYMENT.value,
-                merchant=merchant
+
+    @staticmethod
+    async def aprocess_payment(merchant, sender_wallet, amount, details):
+        """
+        Variante asynchrone de process_payment (vues ASGI) : la transaction en
+        attente est validée avant l'appel au service marchand, et aucune
+        transaction base de données ni aucun thread n'est retenu pendant cet
+        appel. Un refus du service passe la transaction en échec.
+        """
+        if not gateway_registry.is_merchant_service(merchant.merchant_code):
+            return await db_call(
+                MerchantPaymentService.process_payment, merchant, sender_wallet, amount, details
             )
 
-            return response
+        transaction = await db_call(
+            tr.atomic(MerchantPaymentService.prepare_payment), merchant, sender_wallet, amount
+        )
+        payment_processor = MerchantPaymentFactory.get_merchant_processor(merchant.merchant_code)
+        bulkhead = getattr(type(payment_processor), "BULKHEAD", merchant.merchant_code.lower())
+        async with Bulkhead(bulkhead).async_slot():
+            response = await payment_processor.ainitiate_payment(transaction, details)
 
+        try:
+            return await db_call(
+                tr.atomic(MerchantPaymentService.complete_payment),
+                merchant, sender_wallet, amount, transaction, response,
+            )
         except PaymentProcessingError:
+            await db_call(
+                TransactionService.update_transaction_status,
+                transaction, TransactionStatus.FAILED.value,
+            )
             raise PaymentProcessingError(
                 detail="Le traitement du paiement a échoué.",
                 code="PAYMENT_PROCESSING_ERROR",
@@ -0,0 +1,222 @@
+from django.db import migrations
+
+
+# Fonction PL/pgSQL utilisée par le moteur de transfert "sql"
+# (transaction.services.transfer_engine). Elle reproduit en un seul aller-retour
+# le chemin ORM d'un transfert interne : vérification du solde, jambes
+# débit/crédit, frais, distribution des frais et statut final.
+CREATE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION pliz_internal_transfer(
+    p_sender_wallet_id bigint,
+    p_receiver_username text,
+    p_amount numeric,
+    p_order_id text,
+    p_description text,
+    p_apply_fee boolean
+)
+RETURNS TABLE (
+    transaction_id bigint,
+    receiver_wallet_id bigint,
+    sender_balance numeric,
+    fee_amount numeric,
+    created_at timestamptz
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_receiver bigint;
+    v_platform bigint;
+    v_fee numeric := 0;
+    v_grid bigint;
+    v_percentage numeric;
+    v_fixed numeric;
+    v_provider_percentage numeric;
+    v_provider_amount numeric;
+    v_balance numeric;
+    v_sender_balance numeric;
+    v_tx bigint;
+    v_timestamp timestamptz;
+BEGIN
+    SELECT w.id INTO v_receiver
+    FROM actor_wallet w
+    JOIN actor_customuser u ON u.id = w.user_id
+    WHERE u.username = p_receiver_username;
+
+    IF v_receiver IS NULL THEN
+        RAISE EXCEPTION 'WALLET_NOT_FOUND';
+    END IF;
+
+    -- Frais : même résolution que FeeService.get_applicable_fee (règle globale)
+    IF p_apply_fee THEN
+        SELECT id INTO v_grid
+        FROM transaction_tariffgrid
+        WHERE is_active
+        ORDER BY id
+        LIMIT 1;
+
+        SELECT percentage, fixed_amount INTO v_percentage, v_fixed
+        FROM transaction_fee
+        WHERE tariff_grid_id IS NOT DISTINCT FROM v_grid
+          AND transaction_type = 'TRANSFER'
+          AND min_amount <= p_amount
+          AND max_amount >= p_amount
+          AND is_active
+          AND merchant_id IS NULL
+          AND bank_id IS NULL
+        ORDER BY id
+        LIMIT 1;
+
+        v_fee := round(
+            p_amount * COALESCE(v_percentage, 0) / 100 + COALESCE(v_fixed, 0), 2
+        );
+    END IF;
+
+    IF v_fee > 0 THEN
+        SELECT id INTO v_platform FROM actor_wallet WHERE is_platform;
+        IF v_platform IS NULL THEN
+            RAISE EXCEPTION 'PLATFORM_WALLET_NOT_FOUND';
+        END IF;
+    END IF;
+
+    -- Verrouillage des wallets concernés dans un ordre stable (pas d'interblocage)
+    PERFORM 1
+    FROM actor_wallet
+    WHERE id IN (p_sender_wallet_id, v_receiver, v_platform)
+    ORDER BY id
+    FOR UPDATE;
+
+    SELECT balance_after INTO v_balance
+    FROM transaction_walletbalancehistory
+    WHERE wallet_id = p_sender_wallet_id
+    ORDER BY "timestamp" DESC, id DESC
+    LIMIT 1;
+    v_balance := COALESCE(v_balance, 0);
+
+    IF v_balance < p_amount THEN
+        RAISE EXCEPTION 'INSUFFICIENT_FUNDS';
+    END IF;
+
+    v_timestamp := clock_timestamp();
+    INSERT INTO transaction_transaction (
+        order_id, sender_id, receiver_id, transaction_type, amount,
+        "timestamp", description, status, fee_applied
+    )
+    VALUES (
+        p_order_id, p_sender_wallet_id, v_receiver, 'TRANSFER', p_amount,
+        v_timestamp, p_description, 'SUCCESS', v_fee
+    )
+    RETURNING id INTO v_tx;
+
+    -- Jambe débit de l'envoyeur
+    INSERT INTO transaction_walletbalancehistory (
+        wallet_id, balance_before, balance_after, transaction_id,
+        description, transaction_type, "timestamp"
+    )
+    VALUES (
+        p_sender_wallet_id, v_balance, v_balance - p_amount, v_tx,
+        p_description, 'debit', clock_timestamp()
+    );
+    v_sender_balance := v_balance - p_amount;
+
+    -- Jambe crédit du destinataire (lu après le débit : gère l'auto-transfert)
+    SELECT balance_after INTO v_balance
+    FROM transaction_walletbalancehistory
+    WHERE wallet_id = v_receiver
+    ORDER BY "timestamp" DESC, id DESC
+    LIMIT 1;
+    v_balance := COALESCE(v_balance, 0);
+
+    INSERT INTO transaction_walletbalancehistory (
+        wallet_id, balance_before, balance_after, transaction_id,
+        description, transaction_type, "timestamp"
+    )
+    VALUES (
+        v_receiver, v_balance, v_balance + p_amount, v_tx,
+        p_description, 'credit', clock_timestamp()
+    );
+    IF v_receiver = p_sender_wallet_id THEN
+        v_sender_balance := v_balance + p_amount;
+    END IF;
+
+    IF v_fee > 0 THEN
+        INSERT INTO transaction_walletbalancehistory (
+            wallet_id, balance_before, balance_after, transaction_id,
+            description, transaction_type, "timestamp"
+        )
+        VALUES (
+            p_sender_wallet_id, v_sender_balance, v_sender_balance - v_fee, v_tx,
+            'Frais de transaction', 'debit', clock_timestamp()
+        );
+        v_sender_balance := v_sender_balance - v_fee;
+
+        SELECT balance_after INTO v_balance
+        FROM transaction_walletbalancehistory
+        WHERE wallet_id = v_platform
+        ORDER BY "timestamp" DESC, id DESC
+        LIMIT 1;
+        v_balance := COALESCE(v_balance, 0);
+
+        INSERT INTO transaction_walletbalancehistory (
+            wallet_id, balance_before, balance_after, transaction_id,
+            description, transaction_type, "timestamp"
+        )
+        VALUES (
+            v_platform, v_balance, v_balance + v_fee, v_tx,
+            'Frais collecté', 'credit', clock_timestamp()
+        );
+
+        -- Distribution : règle globale, sinon tout au provider
+        SELECT provider_percentage INTO v_provider_percentage
+        FROM transaction_feedistributionrule
+        WHERE transaction_type = 'TRANSFER'
+          AND is_active
+          AND merchant_id IS NULL
+          AND bank_id IS NULL
+        ORDER BY id
+        LIMIT 1;
+
+        IF FOUND THEN
+            v_provider_amount := round(v_fee * v_provider_percentage / 100, 2);
+        ELSE
+            v_provider_amount := v_fee;
+        END IF;
+
+        IF v_provider_amount > 0 THEN
+            INSERT INTO transaction_feedistribution (
+                transaction_id, actor_type, actor_id, amount, created_at
+            )
+            VALUES (v_tx, 'provider', 0, v_provider_amount, clock_timestamp());
+        END IF;
+    END IF;
+
+    RETURN QUERY SELECT v_tx, v_receiver, v_sender_balance, v_fee, v_timestamp;
+END;
+$$;
+"""
+
+DROP_FUNCTION_SQL = """
+DROP FUNCTION IF EXISTS pliz_internal_transfer(bigint, text, numeric, text, text, boolean);
+"""
+
+
+def create_function(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_FUNCTION_SQL)
+
+
+def drop_function(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(DROP_FUNCTION_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("actor", "0006_customuser_fcm_token"),
+        ("transaction", "0012_transactionstatuscheck"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_function, drop_function),
+    ]
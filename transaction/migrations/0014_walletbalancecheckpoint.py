@@ -0,0 +1,41 @@
+# Generated by Django 6.1.2 on 2026-10-19 18:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actor', '0006_customuser_fcm_token'),
+        ('transaction', '0013_internal_transfer_function'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletBalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('last_history_id', models.BigIntegerField()),
+                ('entries_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('-last_history_id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='walletbalancehistory',
+            index=models.Index(fields=['wallet', 'id'], name='walletbalance_wallet_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='walletbalancecheckpoint',
+            name='wallet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to='actor.wallet'),
+        ),
+        migrations.AddIndex(
+            model_name='walletbalancecheckpoint',
+            index=models.Index(fields=['wallet', '-last_history_id'], name='checkpoint_wallet_last_idx'),
+        ),
+    ]
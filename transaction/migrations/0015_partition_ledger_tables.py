@@ -0,0 +1,61 @@
+# Generated by Django 6.1.2 on 2026-10-19 18:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from transaction.services.partitioning import PartitionService
+
+
+# Conversion en tables partitionnées par mois (PostgreSQL uniquement).
+# Les clés étrangères vers transaction_transaction sont supprimées au préalable :
+# une table partitionnée ne peut être référencée que via sa clé (id, timestamp).
+# La copie des données se fait dans la transaction de la migration : prévoir
+# une fenêtre de maintenance sur une base volumineuse.
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in PartitionService.TABLES:
+            PartitionService.convert_table(cursor, table)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in PartitionService.TABLES:
+            PartitionService.revert_table(cursor, table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actor', '0006_customuser_fcm_token'),
+        ('transaction', '0014_walletbalancecheckpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='feedistribution',
+            name='transaction',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='transaction.transaction'),
+        ),
+        migrations.AlterField(
+            model_name='walletbalancehistory',
+            name='transaction',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='balance_histories', to='transaction.transaction'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['sender', 'timestamp'], name='transaction_sender_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['receiver', 'timestamp'], name='transaction_receiver_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='walletbalancehistory',
+            index=models.Index(fields=['wallet', 'timestamp'], name='walletbalance_wallet_ts_idx'),
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-19 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction', '0015_partition_ledger_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='walletbalancecheckpoint',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+    ]
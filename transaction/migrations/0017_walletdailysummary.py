@@ -0,0 +1,33 @@
+# Generated by Django 6.1.2 on 2026-10-19 18:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actor', '0006_customuser_fcm_token'),
+        ('transaction', '0016_walletbalancecheckpoint_archived'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('transaction_type', models.CharField(max_length=50)),
+                ('tx_count', models.PositiveIntegerField(default=0)),
+                ('inflow', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('outflow', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('fees', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='actor.wallet')),
+            ],
+            options={
+                'ordering': ('-day',),
+                'constraints': [models.UniqueConstraint(fields=('wallet', 'day', 'transaction_type'), name='wallet_daily_summary_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.1.2 on 2026-10-19 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction', '0017_walletdailysummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeeRevenueDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actor_type', models.CharField(max_length=30)),
+                ('actor_id', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('distributions_count', models.PositiveIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Fee revenue (daily)',
+                'verbose_name_plural': 'Fee revenue (daily)',
+                'ordering': ('-day',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedistribution',
+            index=models.Index(fields=['actor_type', 'actor_id', 'created_at'], name='feedistribution_actor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedistribution',
+            index=models.Index(fields=['created_at'], name='feedistribution_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='feerevenuedaily',
+            constraint=models.UniqueConstraint(fields=('actor_type', 'actor_id', 'day'), name='fee_revenue_daily_unique'),
+        ),
+    ]
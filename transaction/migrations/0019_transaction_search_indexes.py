@@ -0,0 +1,22 @@
+# Generated by Django 6.1.2 on 2026-10-19 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('actor', '0006_customuser_fcm_token'),
+        ('transaction', '0018_feerevenuedaily'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['order_id'], name='transaction_order_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['external_reference'], name='transaction_ext_ref_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+# Index trigrammes pour la recherche partielle (SearchService, admin, API
+# staff). Ils indexent UPPER(colonne), l'expression générée par icontains sur
+# PostgreSQL : UPPER("order_id"::text) LIKE UPPER('%...%').
+INDEXES = [
+    ("transaction_order_id_trgm_idx", "transaction_transaction", "order_id"),
+    ("transaction_ext_ref_trgm_idx", "transaction_transaction", "external_reference"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transaction", "0019_transaction_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
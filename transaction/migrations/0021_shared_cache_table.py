@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# Table du cache "shared" (état des disjoncteurs partenaires), au format de
+# createcachetable. UNLOGGED : pas de WAL pour des compteurs de quelques
+# minutes, perdus sans dommage en cas de crash. Sur les autres bases, la
+# table vient de createcachetable.
+def create_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        """
+        CREATE UNLOGGED TABLE IF NOT EXISTS shared_cache (
+            cache_key varchar(255) PRIMARY KEY,
+            value text NOT NULL,
+            expires timestamp with time zone NOT NULL
+        )
+        """
+    )
+    schema_editor.execute("CREATE INDEX IF NOT EXISTS shared_cache_expires ON shared_cache (expires)")
+
+
+def drop_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS shared_cache")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transaction", "0020_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_table, drop_table),
+    ]
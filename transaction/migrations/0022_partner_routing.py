@@ -0,0 +1,28 @@
+# Generated by Django 6.1.2 on 2026-10-19 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction', '0021_shared_cache_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerRoute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('partner', models.CharField(choices=[('WAVE', 'Wave'), ('ORANGE_MONEY', 'Orange Money'), ('DJAMO', 'Djamo'), ('MTN_MONEY', 'MTN Money'), ('ECOBANK', 'Ecobank')], max_length=50, unique=True)),
+                ('gateway', models.CharField(choices=[('samir', 'Samir'), ('djamo', 'Djamo'), ('mtn_money', 'MTN Money'), ('ecobank', 'Ecobank')], max_length=50)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='transactionstatuscheck',
+            name='gateway',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.db import migrations
+
+
+# Notifications PostgreSQL (NOTIFY wallet_events) consommées par le flux SSE
+# des wallets (transaction.services.wallet_events). NOTIFY n'est délivré
+# qu'au commit : un événement correspond toujours à une écriture validée.
+# Les triggers posés sur les tables partitionnées sont hérités par leurs
+# partitions, y compris celles créées ensuite (manage_partitions).
+CREATE_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION pliz_notify_wallet_balance()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM pg_notify('wallet_events', json_build_object(
+        'event', 'balance',
+        'wallets', json_build_array(NEW.wallet_id),
+        'balance', NEW.balance_after::text,
+        'transaction_type', NEW.transaction_type,
+        'timestamp', NEW.timestamp
+    )::text);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION pliz_notify_transaction_status()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+    PERFORM pg_notify('wallet_events', json_build_object(
+        'event', 'transaction',
+        'wallets', to_json(array_remove(ARRAY[NEW.sender_id, NEW.receiver_id], NULL)),
+        'order_id', NEW.order_id,
+        'status', NEW.status,
+        'amount', NEW.amount::text,
+        'transaction_type', NEW.transaction_type
+    )::text);
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS walletbalance_notify ON transaction_walletbalancehistory;
+CREATE TRIGGER walletbalance_notify
+    AFTER INSERT ON transaction_walletbalancehistory
+    FOR EACH ROW EXECUTE FUNCTION pliz_notify_wallet_balance();
+
+DROP TRIGGER IF EXISTS transaction_status_notify ON transaction_transaction;
+CREATE TRIGGER transaction_status_notify
+    AFTER INSERT OR UPDATE OF status ON transaction_transaction
+    FOR EACH ROW EXECUTE FUNCTION pliz_notify_transaction_status();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS walletbalance_notify ON transaction_walletbalancehistory;
+DROP TRIGGER IF EXISTS transaction_status_notify ON transaction_transaction;
+DROP FUNCTION IF EXISTS pliz_notify_wallet_balance();
+DROP FUNCTION IF EXISTS pliz_notify_transaction_status();
+"""
+
+
+def create_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_TRIGGERS_SQL)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(DROP_TRIGGERS_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transaction", "0022_partner_routing"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
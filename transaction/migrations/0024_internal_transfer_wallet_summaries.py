@@ -0,0 +1,282 @@
+from importlib import import_module
+
+from django.db import migrations
+
+
+# pliz_internal_transfer alimente lui-même WalletDailySummary : les jambes
+# sont reportées dans les agrégats du jour par la même transaction, sans
+# requête supplémentaire côté Python. Le jour est calculé dans le fuseau
+# passé par l'appelant (p_time_zone), comme timezone.localdate.
+CREATE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION pliz_record_wallet_entry(
+    p_wallet_id bigint,
+    p_day date,
+    p_transaction_type text,
+    p_delta numeric,
+    p_description text
+)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_count integer := 1;
+    v_inflow numeric := 0;
+    v_outflow numeric := 0;
+    v_fees numeric := 0;
+BEGIN
+    -- Même classement que WalletSummaryService.classify
+    IF p_description = 'Frais de transaction' AND p_delta < 0 THEN
+        v_count := 0;
+        v_fees := -p_delta;
+    ELSIF p_delta >= 0 THEN
+        v_inflow := p_delta;
+    ELSE
+        v_outflow := -p_delta;
+    END IF;
+
+    INSERT INTO transaction_walletdailysummary (
+        wallet_id, day, transaction_type, tx_count, inflow, outflow, fees, updated_at
+    )
+    VALUES (p_wallet_id, p_day, p_transaction_type, v_count, v_inflow, v_outflow, v_fees, now())
+    ON CONFLICT (wallet_id, day, transaction_type) DO UPDATE SET
+        tx_count = transaction_walletdailysummary.tx_count + excluded.tx_count,
+        inflow = transaction_walletdailysummary.inflow + excluded.inflow,
+        outflow = transaction_walletdailysummary.outflow + excluded.outflow,
+        fees = transaction_walletdailysummary.fees + excluded.fees,
+        updated_at = excluded.updated_at;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS pliz_internal_transfer(bigint, text, numeric, text, text, boolean);
+
+CREATE OR REPLACE FUNCTION pliz_internal_transfer(
+    p_sender_wallet_id bigint,
+    p_receiver_username text,
+    p_amount numeric,
+    p_order_id text,
+    p_description text,
+    p_apply_fee boolean,
+    p_time_zone text
+)
+RETURNS TABLE (
+    transaction_id bigint,
+    receiver_wallet_id bigint,
+    sender_balance numeric,
+    fee_amount numeric,
+    created_at timestamptz
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_receiver bigint;
+    v_platform bigint;
+    v_fee numeric := 0;
+    v_grid bigint;
+    v_percentage numeric;
+    v_fixed numeric;
+    v_provider_percentage numeric;
+    v_provider_amount numeric;
+    v_balance numeric;
+    v_sender_balance numeric;
+    v_tx bigint;
+    v_timestamp timestamptz;
+    v_day date;
+BEGIN
+    SELECT w.id INTO v_receiver
+    FROM actor_wallet w
+    JOIN actor_customuser u ON u.id = w.user_id
+    WHERE u.username = p_receiver_username;
+
+    IF v_receiver IS NULL THEN
+        RAISE EXCEPTION 'WALLET_NOT_FOUND';
+    END IF;
+
+    -- Frais : même résolution que FeeService.get_applicable_fee (règle globale)
+    IF p_apply_fee THEN
+        SELECT id INTO v_grid
+        FROM transaction_tariffgrid
+        WHERE is_active
+        ORDER BY id
+        LIMIT 1;
+
+        SELECT percentage, fixed_amount INTO v_percentage, v_fixed
+        FROM transaction_fee
+        WHERE tariff_grid_id IS NOT DISTINCT FROM v_grid
+          AND transaction_type = 'TRANSFER'
+          AND min_amount <= p_amount
+          AND max_amount >= p_amount
+          AND is_active
+          AND merchant_id IS NULL
+          AND bank_id IS NULL
+        ORDER BY id
+        LIMIT 1;
+
+        v_fee := round(
+            p_amount * COALESCE(v_percentage, 0) / 100 + COALESCE(v_fixed, 0), 2
+        );
+    END IF;
+
+    IF v_fee > 0 THEN
+        SELECT id INTO v_platform FROM actor_wallet WHERE is_platform;
+        IF v_platform IS NULL THEN
+            RAISE EXCEPTION 'PLATFORM_WALLET_NOT_FOUND';
+        END IF;
+    END IF;
+
+    -- Verrouillage des wallets concernés dans un ordre stable (pas d'interblocage)
+    PERFORM 1
+    FROM actor_wallet
+    WHERE id IN (p_sender_wallet_id, v_receiver, v_platform)
+    ORDER BY id
+    FOR UPDATE;
+
+    SELECT balance_after INTO v_balance
+    FROM transaction_walletbalancehistory
+    WHERE wallet_id = p_sender_wallet_id
+    ORDER BY "timestamp" DESC, id DESC
+    LIMIT 1;
+    v_balance := COALESCE(v_balance, 0);
+
+    IF v_balance < p_amount THEN
+        RAISE EXCEPTION 'INSUFFICIENT_FUNDS';
+    END IF;
+
+    v_timestamp := clock_timestamp();
+    INSERT INTO transaction_transaction (
+        order_id, sender_id, receiver_id, transaction_type, amount,
+        "timestamp", description, status, fee_applied
+    )
+    VALUES (
+        p_order_id, p_sender_wallet_id, v_receiver, 'TRANSFER', p_amount,
+        v_timestamp, p_description, 'SUCCESS', v_fee
+    )
+    RETURNING id INTO v_tx;
+
+    -- Jambe débit de l'envoyeur
+    INSERT INTO transaction_walletbalancehistory (
+        wallet_id, balance_before, balance_after, transaction_id,
+        description, transaction_type, "timestamp"
+    )
+    VALUES (
+        p_sender_wallet_id, v_balance, v_balance - p_amount, v_tx,
+        p_description, 'debit', clock_timestamp()
+    );
+    v_sender_balance := v_balance - p_amount;
+
+    -- Jambe crédit du destinataire (lu après le débit : gère l'auto-transfert)
+    SELECT balance_after INTO v_balance
+    FROM transaction_walletbalancehistory
+    WHERE wallet_id = v_receiver
+    ORDER BY "timestamp" DESC, id DESC
+    LIMIT 1;
+    v_balance := COALESCE(v_balance, 0);
+
+    INSERT INTO transaction_walletbalancehistory (
+        wallet_id, balance_before, balance_after, transaction_id,
+        description, transaction_type, "timestamp"
+    )
+    VALUES (
+        v_receiver, v_balance, v_balance + p_amount, v_tx,
+        p_description, 'credit', clock_timestamp()
+    );
+    IF v_receiver = p_sender_wallet_id THEN
+        v_sender_balance := v_balance + p_amount;
+    END IF;
+
+    IF v_fee > 0 THEN
+        INSERT INTO transaction_walletbalancehistory (
+            wallet_id, balance_before, balance_after, transaction_id,
+            description, transaction_type, "timestamp"
+        )
+        VALUES (
+            p_sender_wallet_id, v_sender_balance, v_sender_balance - v_fee, v_tx,
+            'Frais de transaction', 'debit', clock_timestamp()
+        );
+        v_sender_balance := v_sender_balance - v_fee;
+
+        SELECT balance_after INTO v_balance
+        FROM transaction_walletbalancehistory
+        WHERE wallet_id = v_platform
+        ORDER BY "timestamp" DESC, id DESC
+        LIMIT 1;
+        v_balance := COALESCE(v_balance, 0);
+
+        INSERT INTO transaction_walletbalancehistory (
+            wallet_id, balance_before, balance_after, transaction_id,
+            description, transaction_type, "timestamp"
+        )
+        VALUES (
+            v_platform, v_balance, v_balance + v_fee, v_tx,
+            'Frais collecté', 'credit', clock_timestamp()
+        );
+
+        -- Distribution : règle globale, sinon tout au provider
+        SELECT provider_percentage INTO v_provider_percentage
+        FROM transaction_feedistributionrule
+        WHERE transaction_type = 'TRANSFER'
+          AND is_active
+          AND merchant_id IS NULL
+          AND bank_id IS NULL
+        ORDER BY id
+        LIMIT 1;
+
+        IF FOUND THEN
+            v_provider_amount := round(v_fee * v_provider_percentage / 100, 2);
+        ELSE
+            v_provider_amount := v_fee;
+        END IF;
+
+        IF v_provider_amount > 0 THEN
+            INSERT INTO transaction_feedistribution (
+                transaction_id, actor_type, actor_id, amount, created_at
+            )
+            VALUES (v_tx, 'provider', 0, v_provider_amount, clock_timestamp());
+        END IF;
+    END IF;
+
+    -- Agrégats journaliers des jambes, dans la même transaction (voir
+    -- WalletSummaryService.record_entry)
+    v_day := (v_timestamp AT TIME ZONE p_time_zone)::date;
+    PERFORM pliz_record_wallet_entry(p_sender_wallet_id, v_day, 'TRANSFER', -p_amount, p_description);
+    PERFORM pliz_record_wallet_entry(v_receiver, v_day, 'TRANSFER', p_amount, p_description);
+    IF v_fee > 0 THEN
+        PERFORM pliz_record_wallet_entry(
+            p_sender_wallet_id, v_day, 'TRANSFER', -v_fee, 'Frais de transaction'
+        );
+        PERFORM pliz_record_wallet_entry(v_platform, v_day, 'TRANSFER', v_fee, 'Frais collecté');
+    END IF;
+
+    RETURN QUERY SELECT v_tx, v_receiver, v_sender_balance, v_fee, v_timestamp;
+END;
+$$;
+"""
+
+DROP_FUNCTION_SQL = """
+DROP FUNCTION IF EXISTS pliz_internal_transfer(bigint, text, numeric, text, text, boolean, text);
+DROP FUNCTION IF EXISTS pliz_record_wallet_entry(bigint, date, text, numeric, text);
+"""
+
+
+def create_function(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_FUNCTION_SQL)
+
+
+def drop_function(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(DROP_FUNCTION_SQL)
+    # Retour à la version de la migration 0013
+    previous = import_module("transaction.migrations.0013_internal_transfer_function")
+    schema_editor.execute(previous.CREATE_FUNCTION_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transaction", "0023_wallet_events_notify"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_function, drop_function),
+    ]
@@ -0,0 +1,249 @@
+from importlib import import_module
+
+from django.db import migrations
+
+
+# pliz_internal_transfer alimente aussi FeeRevenueDaily : la distribution
+# des frais est reportée dans l'agrégat du jour par la même transaction,
+# sans relire FeeDistribution côté Python.
+CREATE_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION pliz_internal_transfer(
+    p_sender_wallet_id bigint,
+    p_receiver_username text,
+    p_amount numeric,
+    p_order_id text,
+    p_description text,
+    p_apply_fee boolean,
+    p_time_zone text
+)
+RETURNS TABLE (
+    transaction_id bigint,
+    receiver_wallet_id bigint,
+    sender_balance numeric,
+    fee_amount numeric,
+    created_at timestamptz
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_receiver bigint;
+    v_platform bigint;
+    v_fee numeric := 0;
+    v_grid bigint;
+    v_percentage numeric;
+    v_fixed numeric;
+    v_provider_percentage numeric;
+    v_provider_amount numeric;
+    v_balance numeric;
+    v_sender_balance numeric;
+    v_tx bigint;
+    v_timestamp timestamptz;
+    v_day date;
+    v_distributed_at timestamptz;
+BEGIN
+    SELECT w.id INTO v_receiver
+    FROM actor_wallet w
+    JOIN actor_customuser u ON u.id = w.user_id
+    WHERE u.username = p_receiver_username;
+
+    IF v_receiver IS NULL THEN
+        RAISE EXCEPTION 'WALLET_NOT_FOUND';
+    END IF;
+
+    -- Frais : même résolution que FeeService.get_applicable_fee (règle globale)
+    IF p_apply_fee THEN
+        SELECT id INTO v_grid
+        FROM transaction_tariffgrid
+        WHERE is_active
+        ORDER BY id
+        LIMIT 1;
+
+        SELECT percentage, fixed_amount INTO v_percentage, v_fixed
+        FROM transaction_fee
+        WHERE tariff_grid_id IS NOT DISTINCT FROM v_grid
+          AND transaction_type = 'TRANSFER'
+          AND min_amount <= p_amount
+          AND max_amount >= p_amount
+          AND is_active
+          AND merchant_id IS NULL
+          AND bank_id IS NULL
+        ORDER BY id
+        LIMIT 1;
+
+        v_fee := round(
+            p_amount * COALESCE(v_percentage, 0) / 100 + COALESCE(v_fixed, 0), 2
+        );
+    END IF;
+
+    IF v_fee > 0 THEN
+        SELECT id INTO v_platform FROM actor_wallet WHERE is_platform;
+        IF v_platform IS NULL THEN
+            RAISE EXCEPTION 'PLATFORM_WALLET_NOT_FOUND';
+        END IF;
+    END IF;
+
+    -- Verrouillage des wallets concernés dans un ordre stable (pas d'interblocage)
+    PERFORM 1
+    FROM actor_wallet
+    WHERE id IN (p_sender_wallet_id, v_receiver, v_platform)
+    ORDER BY id
+    FOR UPDATE;
+
+    SELECT balance_after INTO v_balance
+    FROM transaction_walletbalancehistory
+    WHERE wallet_id = p_sender_wallet_id
+    ORDER BY "timestamp" DESC, id DESC
+    LIMIT 1;
+    v_balance := COALESCE(v_balance, 0);
+
+    IF v_balance < p_amount THEN
+        RAISE EXCEPTION 'INSUFFICIENT_FUNDS';
+    END IF;
+
+    v_timestamp := clock_timestamp();
+    INSERT INTO transaction_transaction (
+        order_id, sender_id, receiver_id, transaction_type, amount,
+        "timestamp", description, status, fee_applied
+    )
+    VALUES (
+        p_order_id, p_sender_wallet_id, v_receiver, 'TRANSFER', p_amount,
+        v_timestamp, p_description, 'SUCCESS', v_fee
+    )
+    RETURNING id INTO v_tx;
+
+    -- Jambe débit de l'envoyeur
+    INSERT INTO transaction_walletbalancehistory (
+        wallet_id, balance_before, balance_after, transaction_id,
+        description, transaction_type, "timestamp"
+    )
+    VALUES (
+        p_sender_wallet_id, v_balance, v_balance - p_amount, v_tx,
+        p_description, 'debit', clock_timestamp()
+    );
+    v_sender_balance := v_balance - p_amount;
+
+    -- Jambe crédit du destinataire (lu après le débit : gère l'auto-transfert)
+    SELECT balance_after INTO v_balance
+    FROM transaction_walletbalancehistory
+    WHERE wallet_id = v_receiver
+    ORDER BY "timestamp" DESC, id DESC
+    LIMIT 1;
+    v_balance := COALESCE(v_balance, 0);
+
+    INSERT INTO transaction_walletbalancehistory (
+        wallet_id, balance_before, balance_after, transaction_id,
+        description, transaction_type, "timestamp"
+    )
+    VALUES (
+        v_receiver, v_balance, v_balance + p_amount, v_tx,
+        p_description, 'credit', clock_timestamp()
+    );
+    IF v_receiver = p_sender_wallet_id THEN
+        v_sender_balance := v_balance + p_amount;
+    END IF;
+
+    IF v_fee > 0 THEN
+        INSERT INTO transaction_walletbalancehistory (
+            wallet_id, balance_before, balance_after, transaction_id,
+            description, transaction_type, "timestamp"
+        )
+        VALUES (
+            p_sender_wallet_id, v_sender_balance, v_sender_balance - v_fee, v_tx,
+            'Frais de transaction', 'debit', clock_timestamp()
+        );
+        v_sender_balance := v_sender_balance - v_fee;
+
+        SELECT balance_after INTO v_balance
+        FROM transaction_walletbalancehistory
+        WHERE wallet_id = v_platform
+        ORDER BY "timestamp" DESC, id DESC
+        LIMIT 1;
+        v_balance := COALESCE(v_balance, 0);
+
+        INSERT INTO transaction_walletbalancehistory (
+            wallet_id, balance_before, balance_after, transaction_id,
+            description, transaction_type, "timestamp"
+        )
+        VALUES (
+            v_platform, v_balance, v_balance + v_fee, v_tx,
+            'Frais collecté', 'credit', clock_timestamp()
+        );
+
+        -- Distribution : règle globale, sinon tout au provider
+        SELECT provider_percentage INTO v_provider_percentage
+        FROM transaction_feedistributionrule
+        WHERE transaction_type = 'TRANSFER'
+          AND is_active
+          AND merchant_id IS NULL
+          AND bank_id IS NULL
+        ORDER BY id
+        LIMIT 1;
+
+        IF FOUND THEN
+            v_provider_amount := round(v_fee * v_provider_percentage / 100, 2);
+        ELSE
+            v_provider_amount := v_fee;
+        END IF;
+
+        IF v_provider_amount > 0 THEN
+            v_distributed_at := clock_timestamp();
+            INSERT INTO transaction_feedistribution (
+                transaction_id, actor_type, actor_id, amount, created_at
+            )
+            VALUES (v_tx, 'provider', 0, v_provider_amount, v_distributed_at);
+
+            -- Agrégat du jour (voir FeeRevenueService.record_distributions)
+            INSERT INTO transaction_feerevenuedaily (
+                actor_type, actor_id, day, distributions_count, amount, updated_at
+            )
+            VALUES (
+                'provider', 0, (v_distributed_at AT TIME ZONE p_time_zone)::date,
+                1, v_provider_amount, now()
+            )
+            ON CONFLICT (actor_type, actor_id, day) DO UPDATE SET
+                distributions_count = transaction_feerevenuedaily.distributions_count + 1,
+                amount = transaction_feerevenuedaily.amount + excluded.amount,
+                updated_at = excluded.updated_at;
+        END IF;
+    END IF;
+
+    -- Agrégats journaliers des jambes, dans la même transaction (voir
+    -- WalletSummaryService.record_entry)
+    v_day := (v_timestamp AT TIME ZONE p_time_zone)::date;
+    PERFORM pliz_record_wallet_entry(p_sender_wallet_id, v_day, 'TRANSFER', -p_amount, p_description);
+    PERFORM pliz_record_wallet_entry(v_receiver, v_day, 'TRANSFER', p_amount, p_description);
+    IF v_fee > 0 THEN
+        PERFORM pliz_record_wallet_entry(
+            p_sender_wallet_id, v_day, 'TRANSFER', -v_fee, 'Frais de transaction'
+        );
+        PERFORM pliz_record_wallet_entry(v_platform, v_day, 'TRANSFER', v_fee, 'Frais collecté');
+    END IF;
+
+    RETURN QUERY SELECT v_tx, v_receiver, v_sender_balance, v_fee, v_timestamp;
+END;
+$$;
+"""
+
+
+def create_function(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_FUNCTION_SQL)
+
+
+def restore_function(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # Retour à la version de la migration 0024
+    previous = import_module("transaction.migrations.0024_internal_transfer_wallet_summaries")
+    schema_editor.execute(previous.CREATE_FUNCTION_SQL)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transaction", "0024_internal_transfer_wallet_summaries"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_function, restore_function),
+    ]
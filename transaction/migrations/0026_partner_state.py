@@ -0,0 +1,47 @@
+# Generated by Django 6.1.2 on 2026-10-19 20:33
+
+from django.db import migrations, models
+
+
+# Compteurs et états de quelques minutes, perdus sans dommage en cas de
+# crash : tables UNLOGGED, sans WAL, comme shared_cache (0021).
+def use_unlogged_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("ALTER TABLE transaction_partnercircuit SET UNLOGGED")
+    schema_editor.execute("ALTER TABLE transaction_partnercallbucket SET UNLOGGED")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transaction', '0025_internal_transfer_fee_revenue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerCircuit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('opened_at', models.FloatField(blank=True, null=True)),
+                ('probe_at', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PartnerCallBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=100)),
+                ('bucket', models.BigIntegerField()),
+                ('latency_bin', models.PositiveSmallIntegerField(default=0)),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('slow', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'bucket', 'latency_bin'), name='partner_call_bucket_unique')],
+            },
+        ),
+        migrations.RunPython(use_unlogged_tables, migrations.RunPython.noop),
+    ]
@@ -21,6 +21,11 @@ class TransactionType(Enum):
     TOPUP = "TOPUP"
 
 
+# Libellés des jambes de frais (FeeService.apply_fee et pliz_internal_transfer)
+FEE_DEBIT_DESCRIPTION = "Frais de transaction"
+FEE_CREDIT_DESCRIPTION = "Frais collecté"
+
+
 # Create your models here.
 class Transaction(models.Model):
     order_id = models.CharField(max_length=100, null=True, blank=True)
@@ -55,6 +60,14 @@ class Transaction(models.Model):
         ordering = ("-timestamp",)
         verbose_name = "Transaction"
         verbose_name_plural = "Transactions"
+        indexes = [
+            # Historique récent d'un wallet : parcours ordonné des partitions
+            models.Index(fields=["sender", "timestamp"], name="transaction_sender_ts_idx"),
+            models.Index(fields=["receiver", "timestamp"], name="transaction_receiver_ts_idx"),
+            # Recherche exacte (admin, réconciliation partenaires)
+            models.Index(fields=["order_id"], name="transaction_order_id_idx"),
+            models.Index(fields=["external_reference"], name="transaction_ext_ref_idx"),
+        ]
 
 
 class WalletBalanceHistory(models.Model):
@@ -63,11 +76,14 @@ class WalletBalanceHistory(models.Model):
     )
     balance_before = models.DecimalField(max_digits=12, decimal_places=2)
     balance_after = models.DecimalField(max_digits=12, decimal_places=2)
+    # Pas de contrainte en base : transaction_transaction est partitionnée par
+    # mois et sa clé primaire (id, timestamp) ne peut pas être référencée.
     transaction = models.ForeignKey(
         "Transaction",
         on_delete=models.CASCADE,
         related_name="balance_histories",
         null=True,
+        db_constraint=False,
     )
     description = models.TextField(blank=True, null=True)
     transaction_type = models.CharField(max_length=50)
@@ -76,6 +92,79 @@ class WalletBalanceHistory(models.Model):
     def __str__(self):
         return f"Historique du solde - {self.wallet.user.username} - {self.timestamp} - Avant: {self.balance_before}, Après: {self.balance_after}"
 
+    class Meta:
+        indexes = [
+            # Parcours de la chaîne d'un wallet depuis un checkpoint
+            models.Index(fields=["wallet", "id"], name="walletbalance_wallet_id_idx"),
+            # Dernier solde d'un wallet : parcours ordonné des partitions
+            models.Index(fields=["wallet", "timestamp"], name="walletbalance_wallet_ts_idx"),
+        ]
+
+
+class WalletBalanceCheckpoint(models.Model):
+    """
+    Point de contrôle périodique du solde d'un wallet.
+
+    `balance` est le solde vérifié après l'entrée `last_history_id` de
+    WalletBalanceHistory : un solde se vérifie ou se reconstruit à partir du
+    dernier checkpoint et des seules entrées suivantes.
+    """
+
+    wallet = models.ForeignKey(
+        Wallet, on_delete=models.CASCADE, related_name="balance_checkpoints"
+    )
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    # Pas de FK : l'historique peut être partitionné ou archivé
+    last_history_id = models.BigIntegerField()
+    entries_count = models.PositiveIntegerField(default=0)
+    # Les entrées jusqu'à last_history_id ont pu être archivées (archive_ledger)
+    archived = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-last_history_id",)
+        indexes = [
+            models.Index(
+                fields=["wallet", "-last_history_id"],
+                name="checkpoint_wallet_last_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Checkpoint wallet {self.wallet_id} - {self.balance} (#{self.last_history_id})"
+
+
+class WalletDailySummary(models.Model):
+    """
+    Agrégat journalier des mouvements d'un wallet par type de transaction.
+
+    Mis à jour au commit de chaque mouvement (WalletSummaryService), ou par
+    pliz_internal_transfer pour le moteur SQL, et reconstructible depuis WalletBalanceHistory (backfill_wallet_summaries).
+    """
+
+    wallet = models.ForeignKey(
+        Wallet, on_delete=models.CASCADE, related_name="daily_summaries"
+    )
+    day = models.DateField()
+    transaction_type = models.CharField(max_length=50)
+    tx_count = models.PositiveIntegerField(default=0)
+    inflow = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    outflow = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    fees = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-day",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["wallet", "day", "transaction_type"],
+                name="wallet_daily_summary_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.wallet} - {self.day} - {self.transaction_type}"
+
 
 class TariffGrid(models.Model):
     name = models.CharField(max_length=100)
@@ -159,7 +248,10 @@ class FeeDistributionRule(models.Model):
 
 
 class FeeDistribution(models.Model):
-    transaction = models.ForeignKey("Transaction", on_delete=models.CASCADE)
+    # Pas de contrainte en base : transaction_transaction est partitionnée
+    transaction = models.ForeignKey(
+        "Transaction", on_delete=models.CASCADE, db_constraint=False
+    )
     actor_type = models.CharField(
         max_length=30,
         choices=[
@@ -173,6 +265,47 @@ class FeeDistribution(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Relevés par acteur et recalcul des agrégats par jour
+            models.Index(
+                fields=["actor_type", "actor_id", "created_at"],
+                name="feedistribution_actor_idx",
+            ),
+            models.Index(fields=["created_at"], name="feedistribution_created_idx"),
+        ]
+
+
+class FeeRevenueDaily(models.Model):
+    """
+    Agrégat journalier des distributions de frais par acteur : base des
+    relevés de reversement (montant dû à chaque banque ou marchand, revenu du
+    provider). Mis à jour au commit de chaque distribution (FeeRevenueService),
+    ou par pliz_internal_transfer pour le moteur SQL, et recalculé par
+    refresh_fee_reports.
+    """
+
+    actor_type = models.CharField(max_length=30)
+    actor_id = models.PositiveIntegerField()
+    day = models.DateField()
+    distributions_count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-day",)
+        verbose_name = "Fee revenue (daily)"
+        verbose_name_plural = "Fee revenue (daily)"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["actor_type", "actor_id", "day"],
+                name="fee_revenue_daily_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_type} #{self.actor_id} - {self.day} - {self.amount}"
+
 
 class TransactionStatusCheck(models.Model):
     order_id = models.CharField(max_length=100, db_index=True)
@@ -180,6 +313,8 @@ class TransactionStatusCheck(models.Model):
     status = models.CharField(max_length=50)
     transaction_type = models.CharField(max_length=50)
     partner = models.CharField(max_length=50)
+    # Passerelle ayant porté la transaction : le statut y est vérifié
+    gateway = models.CharField(max_length=50, blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     last_checked_at = models.DateTimeField(auto_now=True)
 
@@ -189,3 +324,78 @@ class TransactionStatusCheck(models.Model):
 
     def __str__(self):
         return f"{self.partner} - {self.external_reference} - {self.status}"
+
+
+class PartnerRoute(models.Model):
+    """
+    Aiguillage imposé depuis l'admin : tant qu'il est actif, toutes les
+    opérations de l'opérateur passent par cette passerelle, quel que soit
+    l'état mesuré par le GatewayRouter (hors opérations qu'elle ne sait pas
+    traiter).
+    """
+
+    partner = models.CharField(
+        max_length=50,
+        unique=True,
+        choices=[
+            ("WAVE", "Wave"),
+            ("ORANGE_MONEY", "Orange Money"),
+            ("DJAMO", "Djamo"),
+            ("MTN_MONEY", "MTN Money"),
+            ("ECOBANK", "Ecobank"),
+        ],
+    )
+    gateway = models.CharField(
+        max_length=50,
+        choices=[
+            ("samir", "Samir"),
+            ("djamo", "Djamo"),
+            ("mtn_money", "MTN Money"),
+            ("ecobank", "Ecobank"),
+        ],
+    )
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.partner} -> {self.gateway}"
+
+
+class PartnerCallBucket(models.Model):
+    """
+    Compteurs d'appels vers une passerelle sur une tranche de temps
+    (CircuitBreaker, GatewayRouter), par tranche de latence pour le p95 du
+    routage. Écrits par la connexion partner_state, hors de la transaction
+    de la requête (transaction.partners.state).
+    """
+
+    scope = models.CharField(max_length=100)
+    bucket = models.BigIntegerField()
+    latency_bin = models.PositiveSmallIntegerField(default=0)
+    calls = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    slow = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "bucket", "latency_bin"], name="partner_call_bucket_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} #{self.bucket} - {self.calls} appels"
+
+
+class PartnerCircuit(models.Model):
+    """
+    État d'un disjoncteur partenaire : ouvert depuis opened_at, appel de
+    test du mode semi-ouvert réservé à probe_at (horodatages time.time()).
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    opened_at = models.FloatField(null=True, blank=True)
+    probe_at = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} - {'ouvert' if self.opened_at else 'fermé'}"
@@ -0,0 +1,146 @@
+import contextlib
+import logging
+import threading
+import time
+import zlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from transaction.errors import PartnerBusyError
+
+logger = logging.getLogger(__name__)
+
+
+class Bulkhead:
+    """
+    Limite le nombre d'appels simultanés vers un même fournisseur (samir,
+    djamo, samir_merchant...), tous workers confondus : une panne lente d'un
+    partenaire ne peut occuper plus de sa part des workers web.
+
+    Sur PostgreSQL, les places sont des verrous consultatifs de session
+    (pg_try_advisory_lock(compartiment, place)) : partagés entre processus et
+    libérés d'office si le processus meurt. Ailleurs, un sémaphore local au
+    processus. Sans place libre après MAX_WAIT secondes, l'appel est refusé
+    (PartnerBusyError, 503).
+
+    Les compteurs (attente, refus) sont tenus dans le cache "shared".
+
+    Les vues asynchrones passent par async_slot : prise et libération de la
+    place s'exécutent dans le thread de la requête (thread_sensitive), donc
+    sur la même connexion, et la limite reste commune à tous les workers.
+    """
+
+    DEFAULT_LIMIT = 8
+    MAX_WAIT = 0.5
+    POLL_INTERVAL = 0.05
+
+    _semaphores = {}
+    _semaphores_lock = threading.Lock()
+
+    def __init__(self, name):
+        self.name = name
+        self.limit = settings.PARTNER_BULKHEAD_LIMITS.get(name, self.DEFAULT_LIMIT)
+        self.lock_class = zlib.crc32(name.encode()) & 0x7FFFFFFF
+        self.cache = caches["shared"]
+        self._slot = None
+
+    def _key(self, metric):
+        return f"bulkhead:{self.name}:{metric}"
+
+    def _incr(self, metric, delta=1):
+        key = self._key(metric)
+        self.cache.add(key, 0, None)
+        try:
+            self.cache.incr(key, delta)
+        except ValueError:
+            pass
+
+    def _try_acquire(self):
+        if connection.vendor != "postgresql":
+            return self._semaphore().acquire(blocking=False)
+
+        with connection.cursor() as cursor:
+            for slot in range(self.limit):
+                cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", [self.lock_class, slot])
+                if cursor.fetchone()[0]:
+                    self._slot = slot
+                    return True
+        return False
+
+    def _semaphore(self):
+        with self._semaphores_lock:
+            if self.name not in self._semaphores:
+                self._semaphores[self.name] = threading.BoundedSemaphore(self.limit)
+            return self._semaphores[self.name]
+
+    def acquire(self):
+        if self._try_acquire():
+            return
+
+        self._incr("waiting")
+        try:
+            deadline = time.monotonic() + self.MAX_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(self.POLL_INTERVAL)
+                if self._try_acquire():
+                    return
+        finally:
+            self._incr("waiting", -1)
+
+        self._incr("rejected")
+        logger.warning(f"BULKHEAD_FULL: {self.name} ({self.limit} appels en cours)")
+        raise PartnerBusyError()
+
+    def release(self):
+        if connection.vendor != "postgresql":
+            self._semaphore().release()
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s, %s)", [self.lock_class, self._slot])
+        self._slot = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+        return False
+
+    @contextlib.asynccontextmanager
+    async def async_slot(self):
+        # Le verrou consultatif appartient à la connexion du thread de la
+        # requête : acquire et release doivent y passer tous les deux
+        await sync_to_async(self.acquire, thread_sensitive=True)()
+        try:
+            yield self
+        finally:
+            await sync_to_async(self.release, thread_sensitive=True)()
+
+    def in_flight(self):
+        if connection.vendor != "postgresql":
+            return self.limit - self._semaphore()._value
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT COUNT(*) FROM pg_locks
+                WHERE locktype = 'advisory' AND granted AND classid = %s AND objsubid = 2
+                """,
+                [self.lock_class],
+            )
+            return cursor.fetchone()[0]
+
+    def stats(self):
+        """Capacité, appels en cours, file d'attente et refus cumulés (health_check)."""
+        metrics = self.cache.get_many([self._key("waiting"), self._key("rejected")])
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight(),
+            "waiting": max(metrics.get(self._key("waiting"), 0), 0),
+            "rejected": metrics.get(self._key("rejected"), 0),
+        }
@@ -0,0 +1,129 @@
+import logging
+import time
+
+from transaction.errors import PartnerUnavailableError
+from transaction.partners import state
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur par partenaire, partagé entre processus. L'état est écrit
+    par la connexion partner_state (transaction.partners.state), hors de la
+    transaction de la requête : l'échec d'un appel fait dans un bloc atomic
+    annulé reste compté.
+
+    Fermé : les appels passent ; appels, échecs (exception) et appels lents
+    (> SLOW_CALL_SECONDS) sont comptés par tranches de BUCKET_SECONDS sur une
+    fenêtre glissante de WINDOW_SECONDS. Dès MIN_CALLS appels, un taux
+    d'échecs ou d'appels lents >= FAILURE_RATE ouvre le circuit.
+
+    Ouvert : échec immédiat (PartnerUnavailableError, 503) pendant
+    OPEN_SECONDS, sans appel ni attente.
+
+    Semi-ouvert : passé ce délai, un seul appel de test est autorisé (réservé
+    par un UPDATE conditionnel) ; son succès referme le circuit, son échec le
+    rouvre.
+    """
+
+    WINDOW_SECONDS = 60
+    BUCKET_SECONDS = 10
+    MIN_CALLS = 10
+    FAILURE_RATE = 0.5
+    SLOW_CALL_SECONDS = 10
+    OPEN_SECONDS = 30
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, partner):
+        self.partner = partner
+        self.scope = f"circuit:{partner}"
+
+    def _buckets(self, now):
+        current = int(now // self.BUCKET_SECONDS)
+        count = self.WINDOW_SECONDS // self.BUCKET_SECONDS
+        return list(range(current - count + 1, current + 1))
+
+    def state(self):
+        opened_at = state.opened_at(self.partner)
+        if opened_at is None:
+            return self.CLOSED
+        if time.time() - opened_at < self.OPEN_SECONDS:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def stats(self):
+        """État et compteurs de la fenêtre courante (health_check)."""
+        return {"state": self.state(), **self._totals(time.time())}
+
+    def _totals(self, now):
+        rows = state.window(self.scope, self._buckets(now)).values()
+        return {
+            "calls": sum(row["calls"] for row in rows),
+            "failures": sum(row["failures"] for row in rows),
+            "slow_calls": sum(row["slow"] for row in rows),
+        }
+
+    def ensure_available(self):
+        """
+        Contrôle anticipé (validation) : lève PartnerUnavailableError si le
+        circuit est ouvert, sans réserver l'appel de test du mode semi-ouvert.
+        """
+        if self.state() == self.OPEN:
+            raise PartnerUnavailableError()
+
+    def before_call(self):
+        """
+        Lève PartnerUnavailableError si le circuit est ouvert. Retourne True
+        si l'appel est l'appel de test du mode semi-ouvert.
+        """
+        current = self.state()
+        if current == self.CLOSED:
+            return False
+        if current == self.HALF_OPEN and state.claim_probe(
+            self.partner, time.time(), self.OPEN_SECONDS
+        ):
+            return True
+        raise PartnerUnavailableError()
+
+    def call(self, func, *args, **kwargs):
+        probe = self.before_call()
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record(False, time.monotonic() - start, probe)
+            raise
+        self.record(True, time.monotonic() - start, probe)
+        return result
+
+    def record(self, success, duration, probe=False):
+        slow = duration > self.SLOW_CALL_SECONDS
+        if probe:
+            if success and not slow:
+                state.close_circuit(self.partner)
+                state.clear_calls(self.scope)
+                logger.info(f"CIRCUIT_CLOSED: {self.partner}")
+            else:
+                self.trip()
+            return
+
+        now = time.time()
+        buckets = self._buckets(now)
+        state.add_call(
+            self.scope, buckets[-1], failed=not success, slow=slow, keep=len(buckets)
+        )
+
+        totals = self._totals(now)
+        if totals["calls"] >= self.MIN_CALLS and (
+            totals["failures"] / totals["calls"] >= self.FAILURE_RATE
+            or totals["slow_calls"] / totals["calls"] >= self.FAILURE_RATE
+        ):
+            self.trip()
+
+    def trip(self):
+        state.open_circuit(self.partner, time.time())
+        logger.error(f"CIRCUIT_OPEN: {self.partner} for {self.OPEN_SECONDS}s")
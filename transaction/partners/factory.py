@@ -1,49 +1,111 @@
-from .processors.ecobank import EcobankGateway
-from .processors.samir_pay import SamirPaymentGateway
-from .processors.mtn_money import (
-    MtnMoneyGateway,
-)
-from .processors.djamo import DjamoPaymentGateway
+import time
+
+from services.async_views import db_call
+from transaction.errors import PartnerUnavailableError
+
+from .bulkhead import Bulkhead
+from .registry import gateway_registry
+from .router import GatewayRouter
 
 
 class PartnerGatewayFactory:
     """
     Factory pour gérer le rechargement du compte en fonction de la banque sélectionnée.
+
+    La passerelle (agrégateur) est choisie à chaque opération par le
+    GatewayRouter, sauf si elle est imposée (gateway=...) : c'est le cas des
+    vérifications de statut, qui doivent interroger la passerelle ayant
+    porté la transaction.
+
+    Chaque appel prend une place dans le compartiment (Bulkhead) de la
+    passerelle puis passe par le disjoncteur du couple opérateur/passerelle :
+    circuit ouvert, PartnerUnavailableError est levée sans appeler le
+    partenaire.
+
+    Les méthodes aprocess_* sont leurs variantes asynchrones (vues ASGI) :
+    même routage, disjoncteur et mesures, appel via httpx.AsyncClient.
     """
 
-    def __init__(self, partner: str):
+    PARTNERS = list(GatewayRouter.ROUTES)
+
+    def __init__(self, partner: str, gateway: str = None):
+        self.router = GatewayRouter(partner)
         self.partner = partner
-        self.gateway = self._get_gateway()
+        self.gateway_name = gateway or None
+        self.gateway = None
 
-    def _get_gateway(self):
+    def _get_gateway(self, operation):
         """
-        Retourne le connecteur correspondant au partenaire.
+        Retourne le connecteur de la passerelle retenue pour operation
+        (instance partagée du GatewayRegistry).
         """
-        if self.partner in ["ORANGE_MONEY", "WAVE"]:
-            return SamirPaymentGateway(partner=self.partner)
-        elif self.partner == "MTN_MONEY":
-            return MtnMoneyGateway()
-        elif self.partner == "DJAMO":
-            return DjamoPaymentGateway(partner=self.partner)
-        elif self.partner == "ECOBANK":
-            return EcobankGateway()
-        else:
-            raise ValueError(f"Partenaire {self.partner} non supporté.")
+        self.gateway_name = self.gateway_name or self.router.select(operation)
+        self.gateway = gateway_registry.gateway(self.gateway_name, self.partner)
+        return self.gateway
+
+    def _call(self, operation, *args):
+        gateway = self._get_gateway(operation)
+        breaker = GatewayRouter.breaker(self.partner, self.gateway_name)
+        with Bulkhead(getattr(gateway, "BULKHEAD", self.gateway_name)):
+            start = time.monotonic()
+            success = False
+            try:
+                result = breaker.call(getattr(gateway, operation), *args)
+                success = str(result.get("status", "")).upper() != "FAILED"
+                return result
+            except PartnerUnavailableError:
+                # Circuit ouvert : le partenaire n'a pas été appelé
+                start = None
+                raise
+            finally:
+                if start is not None:
+                    self.router.record(self.gateway_name, success, time.monotonic() - start)
+
+    async def _acall(self, operation, *args):
+        gateway = await db_call(self._get_gateway, operation)
+        breaker = GatewayRouter.breaker(self.partner, self.gateway_name)
+        async with Bulkhead(getattr(gateway, "BULKHEAD", self.gateway_name)).async_slot():
+            probe = await db_call(breaker.before_call)
+            start = time.monotonic()
+            raised, success = True, False
+            try:
+                result = await getattr(gateway, f"a{operation}")(*args)
+                raised = False
+                success = str(result.get("status", "")).upper() != "FAILED"
+                return result
+            finally:
+                await db_call(self._record, breaker, probe, raised, success, time.monotonic() - start)
+
+    def _record(self, breaker, probe, raised, success, duration):
+        breaker.record(not raised, duration, probe)
+        self.router.record(self.gateway_name, success, duration)
 
     def process_top_up(self, transaction):
         """
         Traite le rechargement (cash-in).
         """
-        return self.gateway.initiate_topup(transaction)
+        return self._call("initiate_topup", transaction)
 
     def process_transfer(self, transaction, receiver: str):
         """
         Traite le transfert (cash-out).
         """
-        return self.gateway.initiate_transfer(transaction, receiver)
+        return self._call("initiate_transfer", transaction, receiver)
     
+    async def aprocess_top_up(self, transaction):
+        """
+        Variante asynchrone de process_top_up.
+        """
+        return await self._acall("initiate_topup", transaction)
+
+    async def aprocess_transfer(self, transaction, receiver: str):
+        """
+        Variante asynchrone de process_transfer.
+        """
+        return await self._acall("initiate_transfer", transaction, receiver)
+
     def get_transaction_status(self, external_reference):
         """
         Vérifie le statut d'une transaction via l'API partenaire.
         """
-        return self.gateway.update_transaction_status(external_reference)
+        return self._call("update_transaction_status", external_reference)
@@ -2,6 +2,7 @@ import os
 import requests
 import logging
 
+from services.http import SharedAsyncClient
 from transaction.models import TransactionStatus
 
 logger = logging.getLogger(__name__)
@@ -12,8 +13,12 @@ class DjamoPaymentGateway:
     Connecteur pour effectuer des opérations Cashin et Cashout via l'API DJAMO.
     """
 
-    def __init__(self, partner="WAVE"):
+    BULKHEAD = "djamo"
+
+    def __init__(self, partner="WAVE", session=None, async_client=None):
         self.partner = partner
+        self.session = session or requests.Session()
+        self.async_client = async_client or SharedAsyncClient()
 
         self.access_token = os.environ.get("DJAMO_ACCESS_TOKEN")
         self.secret_key = os.environ.get("DJAMO_SECRET_KEY")  # Pour vérifier les webhooks
@@ -51,16 +56,9 @@ class DjamoPaymentGateway:
         Recharge un wallet via DJAMO (Cashout).
         """
 
-        description = f"Transfer Pliiz to {receiver}"
-        payload = {
-            "reference": transaction.order_id,
-            "amount": float(transaction.amount),
-            "msisdn": receiver,
-            "description": description,
-            "type": "transfer",
-        }
+        payload = self._transfer_payload(transaction, receiver)
 
-        response = requests.post(self.base_url, headers=self._headers(), json=payload)
+        response = self.session.post(self.base_url, headers=self._headers(), json=payload)
 
         try:
             response.raise_for_status()
@@ -71,13 +69,37 @@ class DjamoPaymentGateway:
             logger.error(f"Cashout HTTP Error: {e} | Response: {response.text}")
             return {"status": TransactionStatus.FAILED.value, "details": response.text}
 
+    @staticmethod
+    def _transfer_payload(transaction, receiver):
+        return {
+            "reference": transaction.order_id,
+            "amount": float(transaction.amount),
+            "msisdn": receiver,
+            "description": f"Transfer Pliiz to {receiver}",
+            "type": "transfer",
+        }
+
+    async def ainitiate_transfer(self, transaction, receiver):
+        """
+        Variante asynchrone d'initiate_transfer (vues ASGI).
+        """
+        response = await self.async_client().post(
+            self.base_url, headers=self._headers(), json=self._transfer_payload(transaction, receiver)
+        )
+        if response.status_code >= 400:
+            logger.error(f"Cashout HTTP Error: {response.status_code} | Response: {response.text}")
+            return {"status": TransactionStatus.FAILED.value, "details": response.text}
+        data = response.json()
+        logger.info(f"Djamo payment response: {data}")
+        return data
+
     def update_transaction_status(self, external_reference):
         """
         Vérifie le statut d'une transaction via l'API DJAMO.
         """
         url = f"{self.base_url}s/{external_reference}"
 
-        response = requests.get(url, headers=self._headers())
+        response = self.session.get(url, headers=self._headers())
 
         try:
             response.raise_for_status()
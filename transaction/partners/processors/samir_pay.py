@@ -2,6 +2,7 @@ import os
 import requests
 import logging
 
+from services.http import SharedAsyncClient
 from transaction.models import TransactionStatus
 
 logger = logging.getLogger(__name__)
@@ -12,8 +13,14 @@ class SamirPaymentGateway:
     Connecteur pour effectuer des opérations Cashin et Cashout via l'API SAMIR.
     """
 
-    def __init__(self, partner="WAVE"):
+    # Compartiment de concurrence partagé par WAVE et ORANGE_MONEY (Bulkhead)
+    BULKHEAD = "samir"
+
+    def __init__(self, partner="WAVE", session=None, async_client=None):
         self.partner = partner
+        self.session = session or requests.Session()
+        self.async_client = async_client or SharedAsyncClient()
+        self.base_url = os.environ.get("SAMIR_API_BASE_URL")
 
         self.api_key = os.environ.get("SAMIR_API_KEY")
         self.secret_key = os.environ.get("SAMIR_SECRET_KEY")
@@ -30,19 +37,39 @@ class SamirPaymentGateway:
             "Content-Type": "application/json",
         }
 
+    @staticmethod
+    def _result(response, label):
+        """Réponse requests ou httpx : données, ou FAILED sur une erreur HTTP."""
+        if response.status_code >= 400:
+            logger.error(f"{label} HTTP Error: {response.status_code} | Response: {response.text}")
+            return {"status": TransactionStatus.FAILED.value, "details": response.text}
+        data = response.json()
+        logger.info(f"{label} response: {data}")
+        return data
+
+    def _topup_payload(self, transaction):
+        return {
+            "orderId": transaction.order_id,
+            "amount": "{:.0f}".format(transaction.amount),
+            "telephone": transaction.receiver.phone_number,
+        }
+
+    def _transfer_payload(self, receiver, amount):
+        return {
+            "amount": "{:.0f}".format(amount),
+            "phoneNumber": receiver,
+            "operatorName": self.partner,
+        }
+
     def initiate_topup(self, transaction):
         """
         Effectue un Cashin (dépôt d'argent depuis un wallet).
         """
-        url = f'{os.environ.get("SAMIR_API_BASE_URL")}/api/tiers/initPayment'
+        url = f"{self.base_url}/api/tiers/initPayment"
 
-        payload = {
-            "orderId": transaction.order_id,
-            "amount": "{:.0f}".format(transaction.amount),
-            "telephone": transaction.receiver.user.phone_number,
-        }
+        payload = self._topup_payload(transaction)
 
-        response = requests.post(url, headers=self._headers(), json=payload)
+        response = self.session.post(url, headers=self._headers(), json=payload)
 
         try:
             response.raise_for_status()
@@ -61,16 +88,12 @@ class SamirPaymentGateway:
         """
         Effectue un Cashout (retrait d'argent vers un wallet).
         """
-        url = f'{os.environ.get("SAMIR_API_BASE_URL")}/api/tiers/payments/send'
-        payload = {
-            "amount": "{:.0f}".format(transaction.amount),
-            "phoneNumber": receiver,
-            "operatorName": self.partner,
-        }
+        url = f"{self.base_url}/api/tiers/payments/send"
+        payload = self._transfer_payload(receiver, transaction.amount)
 
         logger.info(f"Initiating transfer with payload: {payload}")
 
-        response = requests.post(url, headers=self._headers(), json=payload)
+        response = self.session.post(url, headers=self._headers(), json=payload)
 
         logger.info(f"Samir transfer response status: {response.status_code}")
         logger.info(f"Samir transfer response text: {response.text}")
@@ -88,13 +111,35 @@ class SamirPaymentGateway:
             logger.error(f"Cashout HTTP Error: {e} | Response: {response.text}")
             return {"status": TransactionStatus.FAILED.value, "details": response.text}
 
+    async def ainitiate_topup(self, transaction):
+        """
+        Variante asynchrone d'initiate_topup (vues ASGI).
+        """
+        response = await self.async_client().post(
+            f"{self.base_url}/api/tiers/initPayment",
+            headers=self._headers(),
+            json=self._topup_payload(transaction),
+        )
+        return self._result(response, "Cashin")
+
+    async def ainitiate_transfer(self, transaction, receiver):
+        """
+        Variante asynchrone d'initiate_transfer (vues ASGI).
+        """
+        response = await self.async_client().post(
+            f"{self.base_url}/api/tiers/payments/send",
+            headers=self._headers(),
+            json=self._transfer_payload(receiver, transaction.amount),
+        )
+        return self._result(response, "Cashout")
+
     def update_transaction_status(self, external_reference):
         """
         Vérifie le statut d'une transaction via l'API SAMIR.
         """
-        url = f'{os.environ.get("SAMIR_API_BASE_URL")}/api/tiers/payments/{external_reference}/status'
+        url = f"{self.base_url}/api/tiers/payments/{external_reference}/status"
 
-        response = requests.get(url, headers=self._headers())
+        response = self.session.get(url, headers=self._headers())
 
         logger.info(f"Check status response status: {response.status_code}")
         logger.info(f"Check status response text: {response.text}")
@@ -0,0 +1,150 @@
+import logging
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from services.http import SharedAsyncClient
+
+from transaction.merchants.processors.samir_pay import SamirPayMerchantPaymentProcessor
+
+from .processors.djamo import DjamoPaymentGateway
+from .processors.ecobank import EcobankGateway
+from .processors.mtn_money import MtnMoneyGateway
+from .processors.samir_pay import SamirPaymentGateway
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayRegistry:
+    """
+    Instances des passerelles partenaires et des processeurs marchands,
+    construites une fois par processus (TransactionConfig.ready) : la
+    configuration (variables d'environnement) est lue et validée à ce
+    moment-là, et chaque agrégateur dispose d'une requests.Session et d'un
+    httpx.AsyncClient (vues ASGI) partagés : connexions HTTP réutilisées
+    d'un appel à l'autre.
+
+    Une passerelle mal configurée ne bloque pas le démarrage : l'erreur est
+    conservée et levée (ValueError) à chaque demande de cette passerelle.
+    """
+
+    GATEWAYS = {
+        "samir": SamirPaymentGateway,
+        "djamo": DjamoPaymentGateway,
+        "mtn_money": MtnMoneyGateway,
+        "ecobank": EcobankGateway,
+    }
+
+    # Processeurs des services marchands appelés via une API externe
+    # (settings.MERCHANT_API_SERVICES : code du service -> processeur) ; les
+    # autres marchands sont des marchands Pliz, payés directement
+    MERCHANT_PROCESSORS = {
+        "samir": SamirPayMerchantPaymentProcessor,
+    }
+
+    SESSION_POOL_SIZE = 16
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._sessions = {}
+        self._async_clients = {}
+        self._gateways = {}
+        self._merchant_processors = {}
+        self._errors = {}
+
+    def _session(self, provider):
+        if provider not in self._sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.SESSION_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._sessions[provider] = session
+        return self._sessions[provider]
+
+    def _async_client(self, provider):
+        if provider not in self._async_clients:
+            self._async_clients[provider] = SharedAsyncClient()
+        return self._async_clients[provider]
+
+    def _clients(self, provider):
+        return {"session": self._session(provider), "async_client": self._async_client(provider)}
+
+    def _create_gateway(self, name, partner):
+        if name == "samir":
+            return SamirPaymentGateway(partner=partner, **self._clients("samir"))
+        elif name == "djamo":
+            return DjamoPaymentGateway(partner=partner, **self._clients("djamo"))
+        return self.GATEWAYS[name]()
+
+    def _create_merchant_processor(self, code, processor):
+        if processor not in self.MERCHANT_PROCESSORS:
+            raise ValueError(f"Processeur marchand {processor} inconnu pour le service {code}.")
+        return self.MERCHANT_PROCESSORS[processor](code, **self._clients(processor))
+
+    def build(self):
+        """Construit toutes les instances (une seule fois par processus)."""
+        from transaction.partners.router import GatewayRouter
+
+        with self._lock:
+            if self._built:
+                return
+            for partner, gateways in GatewayRouter.ROUTES.items():
+                for name in gateways:
+                    try:
+                        self._gateways[(name, partner)] = self._create_gateway(name, partner)
+                    except ValueError as e:
+                        self._errors[(name, partner)] = str(e)
+            for code, processor in settings.MERCHANT_API_SERVICES.items():
+                try:
+                    self._merchant_processors[code] = self._create_merchant_processor(
+                        code, processor
+                    )
+                except ValueError as e:
+                    self._errors[code] = str(e)
+            self._built = True
+
+        if self._errors:
+            logger.warning(f"GATEWAY_REGISTRY: configuration incomplète {sorted(set(self._errors.values()))}")
+
+    def reload(self):
+        """Relit la configuration (changement de variables d'environnement, tests)."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions, self._async_clients = {}, {}
+            self._gateways, self._merchant_processors, self._errors = {}, {}, {}
+            self._built = False
+        self.build()
+
+    def gateway(self, name, partner):
+        """Connecteur de la passerelle name pour l'opérateur partner."""
+        if not self._built:
+            self.build()
+        key = (name, partner)
+        if key in self._errors:
+            raise ValueError(self._errors[key])
+        try:
+            return self._gateways[key]
+        except KeyError:
+            raise ValueError(f"Passerelle {name} non disponible pour {partner}.")
+
+    def is_merchant_service(self, merchant_code):
+        return merchant_code.lower() in settings.MERCHANT_API_SERVICES
+
+    def merchant_processor(self, merchant_code):
+        """Processeur du service marchand (settings.MERCHANT_API_SERVICES)."""
+        if not self._built:
+            self.build()
+        code = merchant_code.lower()
+        if code in self._errors:
+            raise ValueError(self._errors[code])
+        try:
+            return self._merchant_processors[code]
+        except KeyError:
+            raise ValueError(f"Le code marchand {merchant_code} est inconnu.")
+
+
+gateway_registry = GatewayRegistry()
@@ -0,0 +1,161 @@
+import bisect
+import logging
+import math
+import time
+
+from transaction.errors import PartnerUnavailableError
+from transaction.partners import state
+from transaction.partners.circuit_breaker import CircuitBreaker
+from transaction.partners.registry import GatewayRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayRouter:
+    """
+    Choisit l'agrégateur (samir, djamo...) qui porte un appel vers un
+    opérateur (WAVE, ORANGE_MONEY...).
+
+    Pour chaque couple opérateur/agrégateur, le taux de succès et le p95 de
+    latence sont suivis sur une fenêtre glissante (tranches de
+    BUCKET_SECONDS, écrites hors de la transaction de la requête par
+    transaction.partners.state). Les latences sont comptées par classes
+    (LATENCY_BOUNDS) : le p95 est la borne haute de la classe qui le
+    contient. Une passerelle est saine tant que son taux de succès
+    reste >= MIN_SUCCESS_RATE et son p95 <= MAX_P95_SECONDS ; la première
+    passerelle saine dans l'ordre de ROUTES est retenue, ce qui évite de
+    basculer sans raison entre deux agrégateurs en bonne santé. Sans
+    passerelle saine, la moins dégradée l'emporte. Les passerelles dont le
+    disjoncteur est ouvert sont écartées.
+
+    Un PartnerRoute actif (admin) impose la passerelle d'un opérateur.
+    """
+
+    # Passerelles capables de servir chaque opérateur, par ordre de préférence
+    ROUTES = {
+        "WAVE": ["samir", "djamo"],
+        "ORANGE_MONEY": ["samir"],
+        "DJAMO": ["djamo"],
+        "MTN_MONEY": ["mtn_money"],
+        "ECOBANK": ["ecobank"],
+    }
+
+    WINDOW_SECONDS = 300
+    BUCKET_SECONDS = 30
+    MIN_CALLS = 20
+    MIN_SUCCESS_RATE = 0.9
+    MAX_P95_SECONDS = 5
+    # Bornes hautes (secondes) des classes de latence ; au-delà, la dernière
+    LATENCY_BOUNDS = (0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 30)
+
+    def __init__(self, partner):
+        if partner not in self.ROUTES:
+            raise ValueError(f"Partenaire {partner} non supporté.")
+        self.partner = partner
+
+    @staticmethod
+    def breaker(partner, gateway):
+        return CircuitBreaker(f"{partner}:{gateway}")
+
+    def _scope(self, gateway):
+        return f"route:{self.partner}:{gateway}"
+
+    def _buckets(self, now):
+        current = int(now // self.BUCKET_SECONDS)
+        count = self.WINDOW_SECONDS // self.BUCKET_SECONDS
+        return list(range(current - count + 1, current + 1))
+
+    def candidates(self, operation):
+        """Passerelles de l'opérateur qui savent traiter operation (initiate_topup...)."""
+        return [
+            gateway
+            for gateway in self.ROUTES[self.partner]
+            if hasattr(GatewayRegistry.GATEWAYS[gateway], operation)
+        ]
+
+    def override(self):
+        from transaction.models import PartnerRoute
+
+        return (
+            PartnerRoute.objects.filter(partner=self.partner, is_active=True)
+            .values_list("gateway", flat=True)
+            .first()
+        )
+
+    def select(self, operation):
+        """
+        Retourne la passerelle à utiliser pour operation. Lève
+        PartnerUnavailableError si toutes les passerelles capables ont leur
+        disjoncteur ouvert, ValueError si aucune ne sait traiter operation.
+        """
+        candidates = self.candidates(operation)
+        if not candidates:
+            raise ValueError(f"Opération {operation} non supportée pour {self.partner}.")
+
+        forced = self.override()
+        if forced in candidates:
+            return forced
+
+        available = [
+            gateway
+            for gateway in candidates
+            if self.breaker(self.partner, gateway).state() != CircuitBreaker.OPEN
+        ]
+        if not available:
+            raise PartnerUnavailableError()
+
+        stats = {gateway: self.stats(gateway) for gateway in available}
+        for gateway in available:
+            if self._healthy(stats[gateway]):
+                return gateway
+
+        best = min(available, key=lambda g: (-stats[g]["success_rate"], stats[g]["p95"]))
+        logger.warning(f"ROUTE_DEGRADED: {self.partner} -> {best} ({stats[best]})")
+        return best
+
+    def ensure_available(self, operation):
+        """Contrôle anticipé (validation) : au moins une passerelle joignable."""
+        try:
+            self.select(operation)
+        except ValueError:
+            # Opération non supportée : l'appel échouera comme avant le routage
+            pass
+
+    def _healthy(self, stats):
+        if stats["calls"] < self.MIN_CALLS:
+            return True
+        return stats["success_rate"] >= self.MIN_SUCCESS_RATE and stats["p95"] <= self.MAX_P95_SECONDS
+
+    def record(self, gateway, success, duration):
+        buckets = self._buckets(time.time())
+        latency_bin = min(
+            bisect.bisect_left(self.LATENCY_BOUNDS, duration), len(self.LATENCY_BOUNDS) - 1
+        )
+        state.add_call(
+            self._scope(gateway),
+            buckets[-1],
+            failed=not success,
+            latency_bin=latency_bin,
+            keep=len(buckets),
+        )
+
+    def stats(self, gateway):
+        """Appels, taux de succès et p95 (secondes) sur la fenêtre courante."""
+        bins = state.window(self._scope(gateway), self._buckets(time.time()))
+        calls = sum(row["calls"] for row in bins.values())
+        failures = sum(row["failures"] for row in bins.values())
+        return {
+            "calls": calls,
+            "success_rate": round(1 - failures / calls, 3) if calls else 1.0,
+            "p95": self._percentile(bins, calls, 0.95),
+        }
+
+    def _percentile(self, bins, calls, rank):
+        if not calls:
+            return 0.0
+        target, seen = math.ceil(calls * rank), 0
+        for latency_bin in sorted(bins):
+            seen += bins[latency_bin]["calls"]
+            if seen >= target:
+                return float(self.LATENCY_BOUNDS[latency_bin])
+        return float(self.LATENCY_BOUNDS[-1])
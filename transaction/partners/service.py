@@ -3,7 +3,6 @@ from transaction.services.transaction import TransactionService
 from transaction.errors import PaymentProcessingError
 from transaction.models import TransactionType
 from actor.models import RIB
-from actor.models import Wallet
 
 
 class BankTopUpService:
@@ -24,7 +23,7 @@ class BankTopUpService:
                     )
 
                 # 2. Récupérer le wallet de l'utilisateur
-                wallet = Wallet.objects.get(user=user)
+                wallet = user.wallet
 
                 # 3. Créer une transaction en attente
                 description = f"Rechargement depuis {rib.banque} - {rib.numero_compte}"
@@ -0,0 +1,301 @@
+import hashlib
+import hmac
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def sign_webhook(secret, body):
+    """Signature x-djamo-hmac-sha256 d'un corps de webhook (voir DjamoWebhookView)."""
+    return hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+class PartnerSimulator:
+    """
+    Simulateur local des API partenaires, pour les tirs de charge et les
+    tests de panne sans appeler Samir, Djamo ni FCM.
+
+    Chaque service est servi sous son préfixe ; il suffit de pointer la
+    configuration de l'application sur le simulateur :
+
+        SAMIR_API_BASE_URL=http://simulator:8100/samir
+        DJAMO_API_BASE_URL=http://simulator:8100/djamo
+        FCM_SIMULATOR_URL=http://simulator:8100/fcm
+
+    Par service (profil), la latence suit une loi log-normale définie par sa
+    médiane et son p99 (latency_ms, p99_ms) ; error_rate est la part des
+    appels en erreur HTTP 503 et decline_rate la part des transactions qui
+    finissent en échec. Les transactions passent en succès (ou en échec)
+    après settle_seconds : statut interrogeable, et webhook Djamo signé
+    envoyé à webhook_url.
+
+    GET /__simulator retourne profils et compteurs, POST /__simulator
+    ({"samir": {"error_rate": 0.5}}) modifie les profils à chaud.
+
+    Utilisable en processus (tests) :
+
+        with PartnerSimulator(port=0) as simulator:
+            simulator.url
+    """
+
+    SERVICES = ("samir", "djamo", "fcm")
+
+    DEFAULT_PROFILE = {
+        "latency_ms": 150,
+        "p99_ms": 1500,
+        "error_rate": 0.0,
+        "decline_rate": 0.0,
+        "settle_seconds": 2.0,
+    }
+
+    SAMIR_ROUTES = [
+        ("POST", re.compile(r"/api/tiers/initPayment$"), "_samir_topup"),
+        ("POST", re.compile(r"/api/tiers/payments/send$"), "_samir_transfer"),
+        ("GET", re.compile(r"/api/tiers/payments/(?P<id>[^/]+)/status$"), "_samir_status"),
+        ("POST", re.compile(r"/api/invoice/v1/WIZALL/(?P<service>[^/]+)$"), "_samir_invoice"),
+    ]
+    DJAMO_ROUTES = [
+        ("POST", re.compile(r"/v1/transaction$"), "_djamo_transfer"),
+        ("GET", re.compile(r"/v1/transactions/(?P<id>[^/]+)$"), "_djamo_status"),
+    ]
+    FCM_ROUTES = [
+        ("POST", re.compile(r"(/send|/messages:send)$"), "_fcm_send"),
+    ]
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8100,
+        profiles=None,
+        webhook_url=None,
+        webhook_secret="",
+        seed=None,
+    ):
+        self.profiles = {service: dict(self.DEFAULT_PROFILE) for service in self.SERVICES}
+        for service, values in (profiles or {}).items():
+            self.configure(service, **values)
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.transactions = {}
+        self.counters = {service: {"requests": 0, "errors": 0} for service in self.SERVICES}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+        handler = type("Handler", (_SimulatorHandler,), {"simulator": self})
+        self.server = _SimulatorServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, service, **values):
+        if service not in self.SERVICES:
+            raise ValueError(f"Service simulé inconnu : {service}")
+        unknown = set(values) - set(self.DEFAULT_PROFILE)
+        if unknown:
+            raise ValueError(f"Paramètres inconnus pour {service} : {sorted(unknown)}")
+        self.profiles[service].update({key: float(value) for key, value in values.items()})
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+
+    # Tirages aléatoires
+
+    def _latency(self, profile):
+        median = profile["latency_ms"] / 1000
+        if median <= 0:
+            return 0
+        p99 = max(profile["p99_ms"] / 1000, median)
+        sigma = (math.log(p99) - math.log(median)) / 2.326
+        with self._lock:
+            return self._random.lognormvariate(math.log(median), sigma)
+
+    def _chance(self, rate):
+        with self._lock:
+            return self._random.random() < rate
+
+    # Dispatch
+
+    def handle(self, method, path, body):
+        """Retourne (statut HTTP, réponse JSON) pour une requête."""
+        path = path.split("?", 1)[0]
+        if path.rstrip("/") == "/__simulator":
+            return self._control(method, body)
+
+        service, _, rest = path.lstrip("/").partition("/")
+        routes = {
+            "samir": self.SAMIR_ROUTES,
+            "djamo": self.DJAMO_ROUTES,
+            "fcm": self.FCM_ROUTES,
+        }.get(service, [])
+        for route_method, pattern, handler in routes:
+            match = pattern.search("/" + rest)
+            if route_method == method and match:
+                break
+        else:
+            return 404, {"error": f"Route simulée inconnue : {method} {path}"}
+
+        profile = self.profiles[service]
+        time.sleep(self._latency(profile))
+        with self._lock:
+            self.counters[service]["requests"] += 1
+        if self._chance(profile["error_rate"]):
+            with self._lock:
+                self.counters[service]["errors"] += 1
+            return 503, {"status": "FAILED", "error": "Erreur simulée"}
+
+        try:
+            payload = json.loads(body) if body else {}
+        except json.JSONDecodeError:
+            return 400, {"error": "JSON invalide"}
+        return getattr(self, handler)(payload, **match.groupdict())
+
+    def _control(self, method, body):
+        if method == "POST":
+            try:
+                for service, values in json.loads(body or b"{}").items():
+                    self.configure(service, **values)
+            except (ValueError, TypeError, AttributeError) as e:
+                return 400, {"error": str(e)}
+        return 200, {"profiles": self.profiles, "counters": self.counters}
+
+    # Transactions simulées
+
+    def _create_transaction(self, service, reference=None):
+        profile = self.profiles[service]
+        transaction = {
+            "id": uuid.uuid4().hex,
+            "reference": reference,
+            "declined": self._chance(profile["decline_rate"]),
+            "settles_at": time.time() + profile["settle_seconds"],
+        }
+        with self._lock:
+            self.transactions[transaction["id"]] = transaction
+        return transaction
+
+    def _settled_status(self, transaction_id):
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return None
+        if time.time() < transaction["settles_at"]:
+            return "PENDING"
+        return "FAILED" if transaction["declined"] else "SUCCESS"
+
+    def _samir_topup(self, payload):
+        transaction = self._create_transaction("samir", payload.get("orderId"))
+        return 200, {"status": "PENDING", "body": {"id": transaction["id"]}}
+
+    def _samir_transfer(self, payload):
+        transaction = self._create_transaction("samir")
+        return 200, {"status": "pending", "body": {"id": transaction["id"]}}
+
+    def _samir_status(self, payload, id):
+        status = self._settled_status(id)
+        if status is None:
+            return 404, {"status": "FAILED", "error": "Transaction inconnue"}
+        return 200, {"status": status, "body": {"id": id}}
+
+    def _samir_invoice(self, payload, service):
+        transaction = self._create_transaction("samir")
+        status = "failed" if transaction["declined"] else "success"
+        return 200, {"data": {"status": status, "reference": transaction["id"], "service": service}}
+
+    def _djamo_transfer(self, payload):
+        transaction = self._create_transaction("djamo", payload.get("reference"))
+        if self.webhook_url:
+            timer = threading.Timer(
+                max(transaction["settles_at"] - time.time(), 0), self._send_webhook, [transaction]
+            )
+            timer.daemon = True
+            timer.start()
+        return 200, {"id": transaction["id"], "reference": transaction["reference"], "status": "pending"}
+
+    def _djamo_status(self, payload, id):
+        status = self._settled_status(id)
+        if status is None:
+            return 404, {"status": "FAILED", "error": "Transaction inconnue"}
+        djamo_status = {"PENDING": "started", "SUCCESS": "completed", "FAILED": "failed"}[status]
+        return 200, {"id": id, "reference": self.transactions[id]["reference"], "status": djamo_status}
+
+    def _send_webhook(self, transaction):
+        status = "failed" if transaction["declined"] else "completed"
+        data = {"id": transaction["id"], "reference": transaction["reference"], "status": status}
+        if transaction["declined"]:
+            data["failureReason"] = "Refus simulé"
+        body = json.dumps({"topic": f"transactions/{status}", "data": data}).encode()
+        try:
+            requests.post(
+                self.webhook_url,
+                data=body,
+                headers={
+                    "Content-Type": "application/json",
+                    "x-djamo-hmac-sha256": sign_webhook(self.webhook_secret, body),
+                    "x-djamo-webhook-topic": f"transactions/{status}",
+                },
+                timeout=10,
+            )
+        except requests.RequestException as e:
+            logger.warning(f"SIMULATOR_WEBHOOK_FAILED: {transaction['reference']}: {e}")
+
+    def _fcm_send(self, payload):
+        return 200, {"name": f"projects/simulator/messages/{uuid.uuid4().hex}"}
+
+
+class _SimulatorServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # File d'attente d'acceptation à la mesure des tirs de charge (5 par défaut)
+    request_queue_size = 1024
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    simulator = None
+    # Keep-alive : les sessions HTTP de l'application réutilisent leurs connexions
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        status, payload = self.simulator.handle(method, self.path, body)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug(f"SIMULATOR {self.address_string()} {format % args}")
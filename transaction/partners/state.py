@@ -0,0 +1,99 @@
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
+from django.db.models import F, Q, Sum
+
+from transaction.models import PartnerCallBucket, PartnerCircuit
+
+# Connexion distincte de celle de la requête (settings.DATABASES) : chaque
+# écriture est validée aussitôt, même si la transaction de la requête qui a
+# appelé le partenaire est ensuite annulée.
+DB = "partner_state"
+
+
+def add_call(scope, bucket, failed=False, slow=False, latency_bin=0, keep=0):
+    """
+    Compte un appel dans la tranche bucket de scope. Incrément atomique
+    (UPDATE ... SET calls = calls + 1) : aucun appel concurrent n'est perdu.
+    À la création d'une tranche, les tranches antérieures à bucket - keep
+    sont purgées.
+    """
+    rows = PartnerCallBucket.objects.using(DB).filter(
+        scope=scope, bucket=bucket, latency_bin=latency_bin
+    )
+    increments = {
+        "calls": F("calls") + 1,
+        "failures": F("failures") + int(failed),
+        "slow": F("slow") + int(slow),
+    }
+    if rows.update(**increments):
+        return
+
+    try:
+        with db_transaction.atomic(using=DB):
+            PartnerCallBucket.objects.using(DB).create(
+                scope=scope,
+                bucket=bucket,
+                latency_bin=latency_bin,
+                calls=1,
+                failures=int(failed),
+                slow=int(slow),
+            )
+    except IntegrityError:
+        # Tranche créée entre-temps par un autre processus
+        rows.update(**increments)
+        return
+
+    PartnerCallBucket.objects.using(DB).filter(scope=scope, bucket__lt=bucket - keep).delete()
+
+
+def window(scope, buckets):
+    """Totaux par tranche de latence sur les tranches buckets : {latency_bin: {...}}."""
+    rows = (
+        PartnerCallBucket.objects.using(DB)
+        .filter(scope=scope, bucket__in=buckets)
+        .values("latency_bin")
+        .annotate(calls=Sum("calls"), failures=Sum("failures"), slow=Sum("slow"))
+    )
+    return {row.pop("latency_bin"): row for row in rows}
+
+
+def clear_calls(scope):
+    PartnerCallBucket.objects.using(DB).filter(scope=scope).delete()
+
+
+def opened_at(name):
+    return (
+        PartnerCircuit.objects.using(DB)
+        .filter(name=name)
+        .values_list("opened_at", flat=True)
+        .first()
+    )
+
+
+def open_circuit(name, now):
+    circuits = PartnerCircuit.objects.using(DB).filter(name=name)
+    if circuits.update(opened_at=now, probe_at=None):
+        return
+    try:
+        with db_transaction.atomic(using=DB):
+            PartnerCircuit.objects.using(DB).create(name=name, opened_at=now)
+    except IntegrityError:
+        circuits.update(opened_at=now, probe_at=None)
+
+
+def close_circuit(name):
+    PartnerCircuit.objects.using(DB).filter(name=name).update(opened_at=None, probe_at=None)
+
+
+def claim_probe(name, now, open_seconds):
+    """
+    Réserve l'appel de test d'un circuit ouvert depuis plus de open_seconds.
+    Un seul appelant obtient True ; une réservation expire après
+    open_seconds (appel de test interrompu).
+    """
+    return bool(
+        PartnerCircuit.objects.using(DB)
+        .filter(name=name, opened_at__lte=now - open_seconds)
+        .filter(Q(probe_at__isnull=True) | Q(probe_at__lte=now - open_seconds))
+        .update(probe_at=now)
+    )
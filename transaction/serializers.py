@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction as db_transaction
 
@@ -12,10 +13,13 @@ from actor.models import Wallet
 from actor.merchant_policy import MERCHANT_POLICIES
 from transaction.services.transaction import TransactionService
 from transaction.services.transaction_status import TransactionStatusService
+from transaction.services.transfer_engine import SqlTransferEngine
+from transaction.services.bulk_transfer import BulkTransferService
 
 from transaction.errors import PaymentProcessingError
 
 from transaction.partners.factory import PartnerGatewayFactory
+from transaction.partners.router import GatewayRouter
 from transaction.utils import get_external_reference
 from transaction.services.fee import FeeService
 
@@ -45,15 +49,29 @@ class SendMoneySerializer(serializers.ModelSerializer):
         try:
             logging.info(f"Validating data: {data}")
 
-            sender_wallet = Wallet.objects.get(user=self.context["request"].user)
+            sender_wallet = Wallet.objects.select_related("user").get(
+                user=self.context["request"].user
+            )
 
             if not sender_wallet.user.is_active:
                 raise serializers.ValidationError(
                     detail="L'utilisateur envoyeur est inactif.",
                     code="SENDER_INACTIVE_ERROR",
                 )
-            logger.info(f"Checking sufficient funds for {sender_wallet.user.username}")
-            TransactionService.check_sufficient_funds(sender_wallet, data["amount"])
+
+            # Partenaire hors service : échec immédiat, avant toute écriture
+            if data.get("partner"):
+                GatewayRouter(data["partner"]).ensure_available("initiate_transfer")
+
+            # Le moteur SQL vérifie le solde dans la même instruction que l'écriture
+            if "partner" in data or not SqlTransferEngine.is_enabled():
+                logger.info(
+                    f"Checking sufficient funds for {sender_wallet.user.username}"
+                )
+                TransactionService.check_sufficient_funds(
+                    sender_wallet, data["amount"]
+                )
+            data["sender_wallet"] = sender_wallet
 
         except Wallet.DoesNotExist:
             raise serializers.ValidationError(
@@ -72,11 +90,74 @@ class SendMoneySerializer(serializers.ModelSerializer):
 
         return data
 
+    def prepare_partner_transfer(self, validated_data):
+        """
+        Crée la transaction en attente d'un transfert via partenaire (avant l'appel).
+        """
+        partner = validated_data["partner"]
+        receiver = validated_data["receiver"]
+        return TransactionService.create_pending_transaction(
+            validated_data["sender_wallet"],
+            None,
+            TransactionType.TRANSFER.value,
+            validated_data["amount"],
+            f"Transfer VIA {partner} à {receiver}",
+        )
+
+    def complete_partner_transfer(self, transaction, factory, response):
+        """
+        Applique la réponse du partenaire : statut, débit du wallet, référence
+        externe. Lève PaymentProcessingError si le partenaire refuse le transfert.
+        """
+        partner = self.validated_data["partner"]
+        sender_wallet = self.validated_data["sender_wallet"]
+
+        logger.info(f"Transfer response: {response}")
+        result = response.get("status")
+        logger.info(f"Transfer result status: {result}")
+
+        TransactionService.update_transaction_status(transaction, result.upper())
+        if result not in ["success", "pending"]:
+            raise PaymentProcessingError(
+                detail="Le traitement du transfer a échoué.",
+                code="PAYMENT_PROCESSING_ERROR",
+            )
+
+        TransactionService.debit_wallet(
+            sender_wallet, transaction.amount, transaction, transaction.description
+        )
+        TransactionService.add_additional_data(transaction, response)
+        try:
+            external_reference = get_external_reference(partner, response, factory.gateway_name)
+            TransactionService.add_external_reference(
+                transaction, external_reference
+            )
+        except Exception as e:
+            logger.warning(f"Could not extract external reference: {e}")
+            external_reference = ""
+
+        TransactionStatusService.register(
+            order_id=transaction.order_id,
+            partner=partner,
+            gateway=factory.gateway_name,
+            external_reference=external_reference,
+            transaction_type=transaction.transaction_type,
+            status=result.upper(),
+        )
+
     @db_transaction.atomic
     def create(self, validated_data):
         logger.info(f"Creating transaction with data: {self.context["request"].user}")
 
-        sender_wallet = Wallet.objects.get(user__username=self.context["request"].user)
+        sender_wallet = validated_data["sender_wallet"]
+
+        if "partner" not in validated_data and SqlTransferEngine.is_enabled():
+            return SqlTransferEngine.execute_internal_transfer(
+                user=self.context["request"].user,
+                sender_wallet=sender_wallet,
+                receiver_username=validated_data["receiver"],
+                amount=validated_data["amount"],
+            )
 
         if "partner" not in validated_data:
             receiver_wallet = Wallet.objects.get(
@@ -113,53 +194,74 @@ class SendMoneySerializer(serializers.ModelSerializer):
             )
 
         else:
-            partner = validated_data["partner"]
-            receiver = validated_data["receiver"]
-            description = f"Transfer VIA {partner} à {receiver}"
-            transaction = TransactionService.create_pending_transaction(
-                sender_wallet,
-                None,
-                TransactionType.TRANSFER.value,
-                validated_data["amount"],
-                description,
-            )
+            transaction = self.prepare_partner_transfer(validated_data)
+            factory = PartnerGatewayFactory(validated_data["partner"])
+            response = factory.process_transfer(transaction, receiver=validated_data["receiver"])
+            self.complete_partner_transfer(transaction, factory, response)
 
-            factory = PartnerGatewayFactory(partner)
+        return transaction
 
-            response = factory.process_transfer(transaction, receiver=receiver)
-            logger.info(f"Transfer response: {response}")
-            result = response.get("status")
-            logger.info(f"Transfer result status: {result}")
 
-            TransactionService.update_transaction_status(transaction, result.upper())
-            if result not in ["success", "pending"]:
-                raise PaymentProcessingError(
-                    detail="Le traitement du transfer a échoué.",
-                    code="PAYMENT_PROCESSING_ERROR",
-                )
+class BulkTransferItemSerializer(serializers.Serializer):
+    receiver = serializers.CharField()
+    # Montant non borné ici : un montant négatif ou nul est rejeté par le service
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
 
-            TransactionService.debit_wallet(
-                sender_wallet, transaction.amount, transaction, description
+
+class BulkSendMoneySerializer(serializers.Serializer):
+    # Lignes validées une à une (validate_items) : une ligne invalide est
+    # rejetée seule, avec son erreur, sans faire échouer le lot
+    items = serializers.ListField(
+        child=serializers.JSONField(),
+        min_length=1,
+        max_length=settings.BULK_TRANSFER_MAX_ITEMS,
+        help_text="Lignes {receiver, amount}",
+    )
+    description = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+    def validate_items(self, items):
+        """
+        Valide chaque ligne avec BulkTransferItemSerializer. Une ligne
+        invalide est conservée avec ses erreurs ("errors") pour être
+        rapportée à son index.
+        """
+        validated = []
+        for item in items:
+            serializer = BulkTransferItemSerializer(data=item)
+            if serializer.is_valid():
+                validated.append(dict(serializer.validated_data))
+            else:
+                receiver = item.get("receiver") if isinstance(item, dict) else None
+                validated.append({"receiver": receiver, "errors": serializer.errors})
+        return validated
+
+    def validate(self, data):
+        try:
+            sender_wallet = Wallet.objects.select_related("user").get(
+                user=self.context["request"].user
             )
-            TransactionService.add_additional_data(transaction, response)
-            try:
-                external_reference = get_external_reference(partner, response)
-                TransactionService.add_external_reference(
-                    transaction, external_reference
-                )
-            except Exception as e:
-                logger.warning(f"Could not extract external reference: {e}")
-                external_reference = ""
-
-            TransactionStatusService.register(
-                order_id=transaction.order_id,
-                partner=partner,
-                external_reference=external_reference,
-                transaction_type=transaction.transaction_type,
-                status=result.upper(),
+        except Wallet.DoesNotExist:
+            raise serializers.ValidationError(
+                detail="Un des portefeuilles spécifiés n'existe pas.",
+                code="WALLET_NOT_FOUND_ERROR",
             )
 
-        return transaction
+        if not sender_wallet.user.is_active:
+            raise serializers.ValidationError(
+                detail="L'utilisateur envoyeur est inactif.",
+                code="SENDER_INACTIVE_ERROR",
+            )
+
+        data["sender_wallet"] = sender_wallet
+        return data
+
+    def create(self, validated_data):
+        return BulkTransferService.execute(
+            user=self.context["request"].user,
+            sender_wallet=validated_data["sender_wallet"],
+            items=validated_data["items"],
+            description=validated_data.get("description"),
+        )
 
 
 class MerchantPaymentSerializer(serializers.Serializer):
@@ -282,6 +384,22 @@ class TransactionSerializer(serializers.ModelSerializer):
         return result
 
 
+class ArchivedTransactionSerializer(TransactionSerializer):
+    """Transaction relue depuis l'archive (LedgerArchiveReader)"""
+
+    balance_histories = serializers.SerializerMethodField()
+    archived = serializers.SerializerMethodField()
+
+    class Meta(TransactionSerializer.Meta):
+        fields = TransactionSerializer.Meta.fields + ["archived"]
+
+    def get_balance_histories(self, obj):
+        return WalletBalanceHistorySerializer(obj.archived_histories, many=True).data
+
+    def get_archived(self, obj):
+        return True
+
+
 class TopUpSerializer(serializers.Serializer):
     PARTNER_DETAILS = {
         "ORANGE_MONEY": "Recharge via Orange Money",
@@ -304,65 +422,79 @@ class TopUpSerializer(serializers.Serializer):
                 detail="Le montant doit être positif.", code="INVALID_AMOUNT"
             )
 
+        # Partenaire hors service : échec immédiat, avant toute écriture
+        GatewayRouter(data["partner"]).ensure_available("initiate_topup")
+
         return data
 
-    @db_transaction.atomic
-    def create(self, validated_data):
-        user = self.context["request"].user
+    def prepare(self, validated_data):
+        """
+        Crée la transaction de rechargement en attente (avant l'appel partenaire).
+        """
         partner = validated_data["partner"]
-        amount = validated_data["amount"]
-
-        wallet = Wallet.objects.get(user=user)
+        wallet = self.context["request"].user.wallet
 
-        description = f"Rechargement VIA {partner}"
-        order_id = TransactionService.generate_order_id(partner)
-        transaction = TransactionService.create_pending_transaction(
-            sender=None,
-            receiver=wallet,
+        return TransactionService.create_pending_transaction(
+            sender_wallet=None,
+            receiver_wallet=wallet,
             transaction_type=TransactionType.TOPUP.value,
-            amount=amount,
-            description=description,
-            order_id=order_id,
+            amount=validated_data["amount"],
+            description=f"Rechargement VIA {partner}",
+            order_id=TransactionService.generate_order_id(partner),
         )
 
+    def complete(self, transaction, factory, result):
+        """
+        Applique la réponse du partenaire : statut, référence externe, frais.
+        Lève PaymentProcessingError si le partenaire refuse le rechargement.
+        """
+        user = self.context["request"].user
+        partner = self.validated_data["partner"]
+
+        status = result.get("status")
+        if status not in ["PENDING", "SUCCESS"]:
+            raise PaymentProcessingError(
+                detail="Le traitement du rechargement a échoué.",
+                code="PAYMENT_PROCESSING_ERROR",
+            )
+
+        TransactionService.update_transaction_status(transaction, status.upper())
+        TransactionService.add_additional_data(transaction, result)
         try:
-            factory = PartnerGatewayFactory(partner)
-            result = factory.process_top_up(transaction)
-            status = result.get("status")
-            if status not in ["PENDING", "SUCCESS"]:
-                raise PaymentProcessingError(
-                    detail="Le traitement du rechargement a échoué.",
-                    code="PAYMENT_PROCESSING_ERROR",
-                )
+            external_reference = get_external_reference(partner, result, factory.gateway_name)
+            TransactionService.add_external_reference(
+                transaction, external_reference
+            )
+        except Exception as e:
+            logger.warning(f"Could not extract external reference: {e}")
+            external_reference = ""
+
+        TransactionStatusService.register(
+            order_id=transaction.order_id,
+            partner=partner,
+            gateway=factory.gateway_name,
+            external_reference=external_reference,
+            transaction_type=transaction.transaction_type,
+            status=status.upper(),
+        )
 
-            TransactionService.update_transaction_status(transaction, status.upper())
-            TransactionService.add_additional_data(transaction, result)
-            try:
-                external_reference = get_external_reference(partner, result)
-                TransactionService.add_external_reference(
-                    transaction, external_reference
-                )
-            except Exception as e:
-                logger.warning(f"Could not extract external reference: {e}")
-                external_reference = ""
-
-            TransactionStatusService.register(
-                order_id=order_id,
-                partner=partner,
-                external_reference=external_reference,
-                transaction_type=transaction.transaction_type,
-                status=result.upper(),
+        # Appliquer les frais après confirmation du succès (si status = SUCCESS)
+        if status.upper() == "SUCCESS":
+            FeeService.apply_fee(
+                user=user,
+                wallet=user.wallet,
+                transaction=transaction,
+                transaction_type=TransactionType.TOPUP.value
             )
-            
-            # Appliquer les frais après confirmation du succès (si status = SUCCESS)
-            if status.upper() == "SUCCESS":
-                FeeService.apply_fee(
-                    user=user,
-                    wallet=wallet,
-                    transaction=transaction,
-                    transaction_type=TransactionType.TOPUP.value
-                )
 
+    @db_transaction.atomic
+    def create(self, validated_data):
+        transaction = self.prepare(validated_data)
+
+        try:
+            factory = PartnerGatewayFactory(validated_data["partner"])
+            result = factory.process_top_up(transaction)
+            self.complete(transaction, factory, result)
         except PaymentProcessingError as e:
             TransactionService.update_transaction_status(
                 transaction, TransactionStatus.FAILED.value
@@ -0,0 +1,196 @@
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from actor.models import Wallet
+from transaction.models import WalletBalanceCheckpoint, WalletBalanceHistory
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Résultat de la vérification d'une chaîne de WalletBalanceHistory
+ChainVerification = namedtuple(
+    "ChainVerification",
+    ["wallet_id", "balance", "last_history_id", "entries", "mismatches"],
+)
+
+# Rupture de chaîne : balance_before ne correspond pas au balance_after précédent
+ChainMismatch = namedtuple(
+    "ChainMismatch", ["history_id", "expected_before", "actual_before"]
+)
+
+
+class BalanceCheckpointService:
+    # Les entrées plus récentes peuvent encore appartenir à des transactions
+    # non commitées : elles ne sont pas couvertes par un checkpoint.
+    SETTLE_SECONDS = 300
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def get_latest_checkpoint(wallet_id, archived_only=False):
+        checkpoints = WalletBalanceCheckpoint.objects.filter(wallet_id=wallet_id)
+        if archived_only:
+            checkpoints = checkpoints.filter(archived=True)
+        return checkpoints.order_by("-last_history_id").first()
+
+    @staticmethod
+    def get_start_checkpoint(wallet_id, from_checkpoint=True):
+        """
+        Point de départ d'une vérification : le dernier checkpoint, ou sans
+        checkpoint (from_checkpoint=False) la limite d'archivage du wallet,
+        avant laquelle l'historique n'est plus complet en base.
+        """
+        return BalanceCheckpointService.get_latest_checkpoint(
+            wallet_id, archived_only=not from_checkpoint
+        )
+
+    @staticmethod
+    def verify_wallet(wallet_id, from_checkpoint=True, settled_before=None):
+        """
+        Vérifie la chaîne d'historique d'un wallet à partir de son dernier
+        checkpoint (ou depuis le début de l'historique en ligne si
+        from_checkpoint=False).
+
+        Seules les entrées antérieures à settled_before sont lues si ce
+        paramètre est fourni.
+        """
+        checkpoint = BalanceCheckpointService.get_start_checkpoint(
+            wallet_id, from_checkpoint
+        )
+        balance = checkpoint.balance if checkpoint else Decimal("0.00")
+        last_history_id = checkpoint.last_history_id if checkpoint else 0
+
+        entries = WalletBalanceHistory.objects.filter(
+            wallet_id=wallet_id, id__gt=last_history_id
+        )
+        if settled_before is not None:
+            entries = entries.filter(timestamp__lt=settled_before)
+
+        return BalanceCheckpointService.verify_entries(
+            wallet_id,
+            entries.order_by("id")
+            .values_list("id", "balance_before", "balance_after")
+            .iterator(chunk_size=BalanceCheckpointService.CHUNK_SIZE),
+            balance,
+            last_history_id,
+        )
+
+    @staticmethod
+    def verify_entries(wallet_id, rows, balance, last_history_id):
+        """
+        Parcourt des tuples (id, balance_before, balance_after) triés par id et
+        relève chaque entrée dont balance_before diffère du solde attendu.
+        """
+        mismatches = []
+        count = 0
+        for history_id, balance_before, balance_after in rows:
+            if balance_before != balance:
+                mismatches.append(ChainMismatch(history_id, balance, balance_before))
+            balance = balance_after
+            last_history_id = history_id
+            count += 1
+
+        return ChainVerification(wallet_id, balance, last_history_id, count, mismatches)
+
+    @staticmethod
+    def rebuild_balance(wallet_id):
+        """
+        Reconstruit le solde à partir du dernier checkpoint et de la somme des
+        mouvements des entrées suivantes (une seule requête d'agrégation).
+        """
+        checkpoint = BalanceCheckpointService.get_latest_checkpoint(wallet_id)
+        balance = checkpoint.balance if checkpoint else Decimal("0.00")
+        last_history_id = checkpoint.last_history_id if checkpoint else 0
+
+        delta = WalletBalanceHistory.objects.filter(
+            wallet_id=wallet_id, id__gt=last_history_id
+        ).aggregate(delta=Sum(F("balance_after") - F("balance_before")))["delta"]
+
+        return balance + (delta or Decimal("0.00"))
+
+    @staticmethod
+    def create_checkpoint(wallet_id, min_entries=1, settle_seconds=None):
+        """
+        Vérifie la fin de chaîne d'un wallet et enregistre un nouveau checkpoint
+        si elle est cohérente et couvre au moins min_entries entrées.
+
+        Retourne le tuple (ChainVerification, checkpoint ou None).
+        """
+        if settle_seconds is None:
+            settle_seconds = BalanceCheckpointService.SETTLE_SECONDS
+        settled_before = timezone.now() - timedelta(seconds=settle_seconds)
+
+        result = BalanceCheckpointService.verify_wallet(
+            wallet_id, settled_before=settled_before
+        )
+
+        if result.mismatches:
+            logger.warning(
+                f"CHECKPOINT_SKIPPED: wallet {wallet_id} | "
+                f"{len(result.mismatches)} chain mismatches since last checkpoint"
+            )
+            return result, None
+
+        if result.entries == 0 or result.entries < min_entries:
+            return result, None
+
+        checkpoint = WalletBalanceCheckpoint.objects.create(
+            wallet_id=wallet_id,
+            balance=result.balance,
+            last_history_id=result.last_history_id,
+            entries_count=result.entries,
+        )
+        logger.info(
+            f"CHECKPOINT_CREATED: wallet {wallet_id} | balance {result.balance} | "
+            f"history #{result.last_history_id} | {result.entries} entries"
+        )
+        return result, checkpoint
+
+    @staticmethod
+    @db_transaction.atomic
+    def repair_chain(wallet_id, from_checkpoint=True):
+        """
+        Recalcule balance_before/balance_after des entrées d'un wallet à partir
+        du dernier checkpoint, en conservant le mouvement de chaque entrée
+        (balance_after - balance_before). Retourne le nombre d'entrées corrigées.
+
+        À exécuter pendant une fenêtre de maintenance : le wallet est verrouillé
+        mais les écritures ORM ne prennent pas ce verrou.
+        """
+        Wallet.objects.select_for_update().filter(id=wallet_id).first()
+
+        checkpoint = BalanceCheckpointService.get_start_checkpoint(
+            wallet_id, from_checkpoint
+        )
+        balance = checkpoint.balance if checkpoint else Decimal("0.00")
+        last_history_id = checkpoint.last_history_id if checkpoint else 0
+
+        repaired = []
+        entries = WalletBalanceHistory.objects.filter(
+            wallet_id=wallet_id, id__gt=last_history_id
+        ).order_by("id")
+        for entry in entries.iterator(chunk_size=BalanceCheckpointService.CHUNK_SIZE):
+            delta = entry.balance_after - entry.balance_before
+            if entry.balance_before != balance:
+                entry.balance_before = balance
+                entry.balance_after = balance + delta
+                repaired.append(entry)
+            balance = entry.balance_after
+
+        WalletBalanceHistory.objects.bulk_update(
+            repaired,
+            ["balance_before", "balance_after"],
+            batch_size=BalanceCheckpointService.CHUNK_SIZE,
+        )
+        if repaired:
+            logger.warning(
+                f"CHAIN_REPAIRED: wallet {wallet_id} | {len(repaired)} entries | "
+                f"balance {balance}"
+            )
+        return len(repaired)
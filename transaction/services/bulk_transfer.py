@@ -0,0 +1,232 @@
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+
+from rest_framework.exceptions import ValidationError
+
+from actor.models import Wallet
+from transaction.models import (
+    FEE_CREDIT_DESCRIPTION,
+    FEE_DEBIT_DESCRIPTION,
+    FeeDistribution,
+    Transaction,
+    TransactionStatus,
+    TransactionType,
+    WalletBalanceHistory,
+)
+from transaction.services.fee import FeeService
+from transaction.services.fee_revenue import FeeRevenueService
+from transaction.services.transaction import TransactionService
+from transaction.services.wallet_summary import WalletSummaryService
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BulkTransferService:
+    """
+    Virements internes groupés (paie, cash-back) : un envoyeur, plusieurs
+    milliers de destinataires.
+
+    Les destinataires, les soldes et les frais sont résolus en quelques
+    requêtes, le total (montants + frais) est comparé une seule fois au solde
+    de l'envoyeur, puis transactions, jambes et distributions de frais sont
+    écrites avec bulk_create dans un seul bloc atomique. Les lignes en erreur
+    (ligne mal formée, destinataire inconnu, montant invalide) sont rejetées
+    individuellement ; un solde insuffisant rejette tout le lot.
+    """
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    @db_transaction.atomic
+    def execute(user, sender_wallet, items, description=None):
+        """
+        Exécute le lot et retourne un dict avec un résultat par ligne (dans
+        l'ordre de `items`), les totaux, les transactions créées et le solde
+        final de l'envoyeur.
+        """
+        transaction_type = TransactionType.TRANSFER.value
+        receivers = {
+            wallet.user.username: wallet
+            for wallet in Wallet.objects.select_related("user").filter(
+                user__username__in={item["receiver"] for item in items if "errors" not in item}
+            )
+        }
+
+        apply_fee = not getattr(user, "is_subscribed", False)
+        resolve_fee = FeeService.get_fee_resolver(transaction_type) if apply_fee else None
+
+        results = []
+        accepted = []
+        for index, item in enumerate(items):
+            if "errors" in item:
+                # Ligne rejetée à la validation (BulkSendMoneySerializer.validate_items)
+                field, messages = next(iter(item["errors"].items()))
+                code = "INVALID_ITEM" if field == "non_field_errors" else f"INVALID_{field.upper()}"
+                results.append(
+                    {
+                        "index": index,
+                        "receiver": item.get("receiver"),
+                        "status": "REJECTED",
+                        "code": code,
+                        "detail": str(messages[0]),
+                    }
+                )
+                continue
+
+            amount = Decimal(item["amount"])
+            result = {"index": index, "receiver": item["receiver"], "amount": amount}
+            results.append(result)
+
+            receiver_wallet = receivers.get(item["receiver"])
+            if amount <= 0:
+                result.update(
+                    status="REJECTED",
+                    code="INVALID_AMOUNT",
+                    detail="Le montant doit être positif.",
+                )
+            elif receiver_wallet is None:
+                result.update(
+                    status="REJECTED",
+                    code="WALLET_NOT_FOUND_ERROR",
+                    detail="Le portefeuille du destinataire n'existe pas.",
+                )
+            else:
+                fee_amount = (
+                    FeeService.calculate_fee_amount(resolve_fee(amount), amount)
+                    if apply_fee
+                    else Decimal("0.00")
+                )
+                accepted.append((result, receiver_wallet, amount, fee_amount))
+
+        total_amount = sum((amount for _, _, amount, _ in accepted), Decimal("0.00"))
+        total_fees = sum((fee for _, _, _, fee in accepted), Decimal("0.00"))
+        summary = {
+            "accepted": len(accepted),
+            "rejected": len(results) - len(accepted),
+            "total_amount": total_amount,
+            "total_fees": total_fees,
+            "items": results,
+            "transactions": [],
+        }
+
+        platform_wallet = None
+        if total_fees > 0:
+            platform_wallet = Wallet.objects.get(is_platform=True)
+
+        # Verrou sur tous les wallets écrits, dans l'ordre des ids pour ne pas
+        # s'interbloquer avec un autre lot, puis lecture des soldes en une requête
+        wallet_ids = {sender_wallet.id} | {wallet.id for _, wallet, _, _ in accepted}
+        if platform_wallet:
+            wallet_ids.add(platform_wallet.id)
+        balances = TransactionService.lock_balances(wallet_ids)
+
+        if total_amount + total_fees > balances[sender_wallet.id]:
+            logger.warning(
+                f"INSUFFICIENT_FUNDS: Wallet {sender_wallet.phone_number} "
+                f"attempted bulk transfer of {total_amount + total_fees} "
+                f"{sender_wallet.currency} with balance {balances[sender_wallet.id]} "
+                f"{sender_wallet.currency}"
+            )
+            raise ValidationError(
+                detail="Fonds insuffisants.", code="INSUFFICIENT_FUNDS_ERROR"
+            )
+
+        if not accepted:
+            summary["balance_after_operation"] = balances[sender_wallet.id]
+            return summary
+
+        order_ids = set()
+        transactions = []
+        for _, receiver_wallet, amount, fee_amount in accepted:
+            order_id = TransactionService.generate_order_id()
+            while order_id in order_ids:
+                order_id = TransactionService.generate_order_id()
+            order_ids.add(order_id)
+            transactions.append(
+                Transaction(
+                    sender=sender_wallet,
+                    receiver=receiver_wallet,
+                    amount=amount,
+                    transaction_type=transaction_type,
+                    status=TransactionStatus.SUCCESS.value,
+                    description=description,
+                    order_id=order_id,
+                    fee_applied=fee_amount,
+                )
+            )
+        Transaction.objects.bulk_create(transactions, batch_size=BulkTransferService.BATCH_SIZE)
+
+        # Jambes dans le même ordre qu'un envoi unitaire : débit, crédit,
+        # puis débit des frais et crédit de la plateforme
+        histories = []
+
+        def add_leg(wallet, delta, transaction, leg_type, leg_description):
+            balance_before = balances[wallet.id]
+            balances[wallet.id] = balance_before + delta
+            histories.append(
+                WalletBalanceHistory(
+                    wallet=wallet,
+                    balance_before=balance_before,
+                    balance_after=balances[wallet.id],
+                    transaction=transaction,
+                    transaction_type=leg_type,
+                    description=leg_description,
+                )
+            )
+
+        rule = FeeService.get_distribution_rule(transaction_type) if total_fees else None
+        distributions = []
+        for transaction in transactions:
+            add_leg(sender_wallet, -transaction.amount, transaction, "debit", description)
+            add_leg(transaction.receiver, transaction.amount, transaction, "credit", description)
+            if transaction.fee_applied > 0:
+                add_leg(
+                    sender_wallet, -transaction.fee_applied, transaction, "debit",
+                    FEE_DEBIT_DESCRIPTION,
+                )
+                add_leg(
+                    platform_wallet, transaction.fee_applied, transaction, "credit",
+                    FEE_CREDIT_DESCRIPTION,
+                )
+                distributions += FeeService.build_distributions(
+                    transaction, transaction.fee_applied, rule
+                )
+
+        WalletBalanceHistory.objects.bulk_create(
+            histories, batch_size=BulkTransferService.BATCH_SIZE
+        )
+        FeeDistribution.objects.bulk_create(
+            distributions, batch_size=BulkTransferService.BATCH_SIZE
+        )
+
+        WalletSummaryService.record_entries(
+            (
+                history.wallet_id,
+                history.timestamp,
+                transaction_type,
+                history.balance_after - history.balance_before,
+                history.description,
+            )
+            for history in histories
+        )
+        FeeRevenueService.record_distributions(distributions)
+
+        for (result, _, _, fee_amount), transaction in zip(accepted, transactions):
+            result.update(
+                status=TransactionStatus.SUCCESS.value,
+                reference=transaction.order_id,
+                fee=fee_amount,
+            )
+        summary["transactions"] = transactions
+        summary["balance_after_operation"] = balances[sender_wallet.id]
+
+        logger.info(
+            f"BULK_TRANSFER_CREATED: {len(transactions)} transfers | "
+            f"Amount: {total_amount} | Fees: {total_fees} | "
+            f"From: {sender_wallet.phone_number} | Rejected: {summary['rejected']}"
+        )
+
+        return summary
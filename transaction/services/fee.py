@@ -3,7 +3,8 @@ from django.db import transaction as db_transaction
 from transaction.models import Fee, FeeDistributionRule, FeeDistribution
 from actor.models import Wallet
 from transaction.services.transaction import TransactionService
-from transaction.models import TariffGrid
+from transaction.services.fee_revenue import FeeRevenueService
+from transaction.models import TariffGrid, FEE_DEBIT_DESCRIPTION, FEE_CREDIT_DESCRIPTION
 import logging
 
 logger = logging.getLogger(__name__)
@@ -71,13 +72,13 @@ class FeeService:
         if fee_amount > 0:
             # Débit du wallet client
             TransactionService.debit_wallet(
-                wallet, fee_amount, transaction, "Frais de transaction"
+                wallet, fee_amount, transaction, FEE_DEBIT_DESCRIPTION
             )
 
             # Crédit du wallet de la plateforme
             platform_wallet = Wallet.objects.get(is_platform=True)
             TransactionService.credit_wallet(
-                platform_wallet, fee_amount, transaction, "Frais collecté"
+                platform_wallet, fee_amount, transaction, FEE_CREDIT_DESCRIPTION
             )
             
             # Enregistrer le frais dans la transaction
@@ -85,7 +86,10 @@ class FeeService:
             transaction.save(update_fields=['fee_applied'])
             
             # Distribuer les frais entre les acteurs
-            FeeService.distribute_fee(transaction, fee_amount, merchant, bank)
+            distributions = FeeService.distribute_fee(
+                transaction, fee_amount, merchant, bank
+            )
+            FeeRevenueService.record_distributions(distributions)
 
         return fee_amount
 
@@ -107,38 +111,14 @@ class FeeService:
             return []
         
         try:
-            # Chercher la règle de distribution
-            distribution_rule = FeeDistributionRule.objects.filter(
-                transaction_type=transaction.transaction_type,
-                is_active=True
+            rule = FeeService.get_distribution_rule(
+                transaction.transaction_type, merchant, bank
             )
-            
-            # Prioriser les règles spécifiques
-            if merchant:
-                specific_rule = distribution_rule.filter(merchant=merchant).first()
-                if specific_rule:
-                    return FeeService._create_distributions(
-                        transaction, fee_amount, specific_rule, merchant, bank
-                    )
-            
-            if bank:
-                specific_rule = distribution_rule.filter(bank=bank).first()
-                if specific_rule:
-                    return FeeService._create_distributions(
-                        transaction, fee_amount, specific_rule, merchant, bank
-                    )
-            
-            # Règle globale
-            global_rule = distribution_rule.filter(
-                merchant__isnull=True,
-                bank__isnull=True
-            ).first()
-            
-            if global_rule:
+            if rule:
                 return FeeService._create_distributions(
-                    transaction, fee_amount, global_rule, merchant, bank
+                    transaction, fee_amount, rule, merchant, bank
                 )
-            
+
             # Par défaut, tout va au provider
             logger.warning(
                 f"No distribution rule found for transaction {transaction.order_id}, "
@@ -157,6 +137,62 @@ class FeeService:
             logger.error(f"Error distributing fee for transaction {transaction.order_id}: {e}")
             return []
 
+    @staticmethod
+    def get_distribution_rule(transaction_type, merchant=None, bank=None):
+        """
+        Règle de distribution applicable : la plus spécifique (marchand, puis
+        banque), sinon la règle globale. None si aucune règle n'est active.
+        """
+        distribution_rule = FeeDistributionRule.objects.filter(
+            transaction_type=transaction_type,
+            is_active=True
+        )
+
+        # Prioriser les règles spécifiques
+        if merchant:
+            specific_rule = distribution_rule.filter(merchant=merchant).first()
+            if specific_rule:
+                return specific_rule
+
+        if bank:
+            specific_rule = distribution_rule.filter(bank=bank).first()
+            if specific_rule:
+                return specific_rule
+
+        # Règle globale
+        return distribution_rule.filter(
+            merchant__isnull=True,
+            bank__isnull=True
+        ).first()
+
+    @staticmethod
+    def get_fee_resolver(transaction_type):
+        """
+        Retourne une fonction montant -> Fee (règles globales de la grille
+        active), chargées en une seule requête. Utilisée pour les lots où
+        get_applicable_fee ferait une requête par montant.
+        """
+        grid = TariffGrid.objects.filter(is_active=True).first()
+        fees = list(
+            Fee.objects.filter(
+                tariff_grid=grid,
+                transaction_type=transaction_type,
+                is_active=True,
+                merchant__isnull=True,
+                bank__isnull=True,
+                min_amount__isnull=False,
+                max_amount__isnull=False,
+            ).order_by("pk")
+        )
+
+        def resolve(amount):
+            for fee in fees:
+                if fee.min_amount <= amount <= fee.max_amount:
+                    return fee
+            return None
+
+        return resolve
+
     @staticmethod
     def _create_distributions(transaction, fee_amount, rule, merchant, bank):
         """
@@ -172,6 +208,35 @@ class FeeService:
         Returns:
             list: Liste des objets FeeDistribution créés
         """
+        distributions = FeeService.build_distributions(
+            transaction, fee_amount, rule, merchant, bank
+        )
+        for distribution in distributions:
+            distribution.save()
+        
+        logger.info(
+            f"Fee distribution created for transaction {transaction.order_id}: "
+            f"{len(distributions)} distributions totaling {sum(d.amount for d in distributions)}"
+        )
+        
+        return distributions
+
+    @staticmethod
+    def build_distributions(transaction, fee_amount, rule, merchant=None, bank=None):
+        """
+        Construit (sans les enregistrer) les distributions d'un frais selon la
+        règle. Sans règle, tout va au provider.
+        """
+        if rule is None:
+            return [
+                FeeDistribution(
+                    transaction=transaction,
+                    actor_type='provider',
+                    actor_id=0,
+                    amount=fee_amount
+                )
+            ]
+
         distributions = []
         
         # Distribution au provider
@@ -179,7 +244,7 @@ class FeeService:
             provider_amount = (fee_amount * rule.provider_percentage / Decimal('100')).quantize(Decimal('0.01'))
             if provider_amount > 0:
                 distributions.append(
-                    FeeDistribution.objects.create(
+                    FeeDistribution(
                         transaction=transaction,
                         actor_type='provider',
                         actor_id=0,
@@ -192,7 +257,7 @@ class FeeService:
             bank_amount = (fee_amount * rule.bank_percentage / Decimal('100')).quantize(Decimal('0.01'))
             if bank_amount > 0:
                 distributions.append(
-                    FeeDistribution.objects.create(
+                    FeeDistribution(
                         transaction=transaction,
                         actor_type='bank',
                         actor_id=bank.id,
@@ -205,7 +270,7 @@ class FeeService:
             merchant_amount = (fee_amount * rule.merchant_percentage / Decimal('100')).quantize(Decimal('0.01'))
             if merchant_amount > 0:
                 distributions.append(
-                    FeeDistribution.objects.create(
+                    FeeDistribution(
                         transaction=transaction,
                         actor_type='merchant',
                         actor_id=merchant.id,
@@ -213,9 +278,4 @@ class FeeService:
                     )
                 )
         
-        logger.info(
-            f"Fee distribution created for transaction {transaction.order_id}: "
-            f"{len(distributions)} distributions totaling {sum(d.amount for d in distributions)}"
-        )
-        
         return distributions
@@ -0,0 +1,101 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from transaction.models import FeeDistribution, FeeRevenueDaily
+from transaction.services.rollup import upsert_increment
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FeeRevenueService:
+    @staticmethod
+    def record_distributions(distributions):
+        """
+        Ajoute les distributions de frais aux agrégats du jour, au commit de
+        la transaction en cours.
+        """
+        totals = {}
+        for distribution in distributions:
+            key = (
+                distribution.actor_type,
+                distribution.actor_id,
+                timezone.localdate(distribution.created_at),
+            )
+            count, amount = totals.get(key, (0, Decimal("0.00")))
+            totals[key] = (count + 1, amount + Decimal(distribution.amount))
+
+        if totals:
+            db_transaction.on_commit(lambda: FeeRevenueService._upsert(totals))
+
+    @staticmethod
+    def _upsert(totals):
+        for (actor_type, actor_id, day), (count, amount) in totals.items():
+            try:
+                upsert_increment(
+                    FeeRevenueDaily,
+                    {"actor_type": actor_type, "actor_id": actor_id, "day": day},
+                    {"distributions_count": count, "amount": amount},
+                )
+            except Exception as e:
+                # Recalculé par refresh_fee_reports
+                logger.error(
+                    f"FEE_REVENUE_ERROR: {actor_type} #{actor_id} | {day} | {e}"
+                )
+
+    @staticmethod
+    @db_transaction.atomic
+    def rebuild_day(day):
+        """Recalcule les agrégats d'un jour depuis FeeDistribution (une requête)."""
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        rows = (
+            FeeDistribution.objects.filter(
+                created_at__gte=start, created_at__lt=start + timedelta(days=1)
+            )
+            .values("actor_type", "actor_id")
+            .annotate(distributions_count=Count("id"), amount=Sum("amount"))
+            .order_by()
+        )
+
+        FeeRevenueDaily.objects.filter(day=day).delete()
+        created = FeeRevenueDaily.objects.bulk_create(
+            [FeeRevenueDaily(day=day, **row) for row in rows], batch_size=1000
+        )
+        return len(created)
+
+    @staticmethod
+    def get_payouts(start, end, actor_type=None):
+        """Montant dû à chaque acteur entre les jours start et end inclus."""
+        rows = FeeRevenueDaily.objects.filter(day__gte=start, day__lte=end)
+        if actor_type:
+            rows = rows.filter(actor_type=actor_type)
+        return list(
+            rows.values("actor_type", "actor_id")
+            .annotate(distributions_count=Sum("distributions_count"), amount=Sum("amount"))
+            .order_by("actor_type", "actor_id")
+        )
+
+    @staticmethod
+    def get_statement(actor_type, actor_id, start, end):
+        """Relevé journalier d'un acteur entre start et end inclus."""
+        days = list(
+            FeeRevenueDaily.objects.filter(
+                actor_type=actor_type, actor_id=actor_id, day__gte=start, day__lte=end
+            )
+            .order_by("day")
+            .values("day", "distributions_count", "amount")
+        )
+        return {
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+            "start": start,
+            "end": end,
+            "distributions_count": sum(day["distributions_count"] for day in days),
+            "amount": sum((day["amount"] for day in days), Decimal("0.00")),
+            "days": days,
+        }
@@ -0,0 +1,287 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import serializers
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+MANIFEST_NAME = "manifest.json"
+
+SegmentLocation = namedtuple("SegmentLocation", ["path", "sha256", "first", "last"])
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LedgerArchiveWriter:
+    """
+    Écrit un lot d'archivage dans un répertoire horodaté de LEDGER_ARCHIVE_DIR.
+
+    Chaque segment est un fichier JSONL gzip au format de sérialisation Django
+    (une ligne par objet, tous modèles confondus). Le manifest, réécrit après
+    chaque segment, contient l'empreinte sha256 des segments, la période
+    couverte par leurs transactions et l'index order_id / wallet (avec le
+    nombre de transactions par wallet) permettant de les relire à la demande.
+    """
+
+    def __init__(self, cutoff, directory=None):
+        base = directory or settings.LEDGER_ARCHIVE_DIR
+        self.directory = os.path.join(base, timezone.now().strftime("%Y%m%dT%H%M%S"))
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = {
+            "created_at": timezone.now().isoformat(),
+            "cutoff": cutoff.isoformat(),
+            "segments": [],
+        }
+
+    def write_segment(self, objects, orders=(), wallets=()):
+        """
+        Écrit les objets dans un nouveau segment et l'enregistre dans le
+        manifest. Le fichier est synchronisé sur disque avant le retour : les
+        lignes correspondantes peuvent alors être supprimées de la base.
+        """
+        name = f"segment-{len(self.manifest['segments']) + 1:05d}.jsonl.gz"
+        path = os.path.join(self.directory, name)
+
+        counts = {}
+        timestamps = []
+        wallet_counts = {}
+
+        def counted(objects):
+            for obj in objects:
+                label = obj._meta.label_lower
+                counts[label] = counts.get(label, 0) + 1
+                if label == "transaction.transaction":
+                    timestamps.append(obj.timestamp)
+                    for wallet_id in {obj.sender_id, obj.receiver_id} - {None}:
+                        wallet_counts[wallet_id] = wallet_counts.get(wallet_id, 0) + 1
+                yield obj
+
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            serializers.serialize("jsonl", counted(objects), stream=f)
+        with open(path, "rb") as f:
+            os.fsync(f.fileno())
+
+        self.manifest["segments"].append(
+            {
+                "file": name,
+                "sha256": _sha256(path),
+                "counts": counts,
+                "first": min(timestamps).isoformat() if timestamps else None,
+                "last": max(timestamps).isoformat() if timestamps else None,
+                "orders": sorted(set(orders)),
+                "wallets": sorted(set(wallets)),
+                # Transactions par wallet : pagination sans relire le segment
+                "wallet_counts": {str(key): value for key, value in wallet_counts.items()},
+            }
+        )
+        self._save_manifest()
+        return name
+
+    def _save_manifest(self):
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+@lru_cache(maxsize=4)
+def _load_index(manifests):
+    """
+    Index order_id / wallet -> segments, reconstruit quand un manifest change.
+
+    Seuls les manifests sont lus : les empreintes sont vérifiées à la
+    lecture de chaque segment (LedgerArchiveReader._read_segment).
+    """
+    orders = {}
+    wallets = {}
+    for path, _ in manifests:
+        with open(path) as f:
+            manifest = json.load(f)
+        directory = os.path.dirname(path)
+        for segment in manifest["segments"]:
+            location = SegmentLocation(
+                path=os.path.join(directory, segment["file"]),
+                sha256=segment["sha256"],
+                first=parse_datetime(segment["first"]) if segment.get("first") else None,
+                last=parse_datetime(segment["last"]) if segment.get("last") else None,
+            )
+            for order_id in segment["orders"]:
+                orders[order_id] = location
+            wallet_counts = segment.get("wallet_counts", {})
+            for wallet_id in segment["wallets"]:
+                # Anciens manifests sans compteurs : None, le segment est relu
+                count = wallet_counts.get(str(wallet_id))
+                wallets.setdefault(wallet_id, []).append((location, count))
+    return orders, wallets
+
+
+# Segments dont l'empreinte a déjà été vérifiée dans ce processus
+_verified_segments = set()
+
+
+class LedgerArchiveReader:
+    """
+    Relit à la demande les transactions archivées par archive_ledger.
+
+    Les transactions sont reconstruites comme des instances non sauvegardées ;
+    leurs entrées d'historique et distributions de frais archivées sont
+    exposées dans `archived_histories` et `archived_fee_distributions`.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or settings.LEDGER_ARCHIVE_DIR
+
+    def _index(self):
+        manifests = tuple(
+            (path, os.path.getmtime(path))
+            for path in sorted(glob.glob(os.path.join(self.directory, "*", MANIFEST_NAME)))
+        )
+        return _load_index(manifests)
+
+    def _read_segment(self, location):
+        """
+        Objets du segment. Son empreinte est vérifiée à sa première lecture
+        dans le processus ; un segment corrompu est traité comme vide.
+        """
+        key = (location.path, location.sha256)
+        if key not in _verified_segments:
+            if _sha256(location.path) != location.sha256:
+                logger.error(f"ARCHIVE_CORRUPTED: checksum mismatch for {location.path}")
+                return []
+            _verified_segments.add(key)
+        with gzip.open(location.path, "rt", encoding="utf-8") as f:
+            return [obj.object for obj in serializers.deserialize("jsonl", f)]
+
+    @staticmethod
+    def _group(objects):
+        transactions = {}
+        for obj in objects:
+            if obj._meta.label_lower == "transaction.transaction":
+                obj.archived_histories = []
+                obj.archived_fee_distributions = []
+                transactions[obj.id] = obj
+        for obj in objects:
+            transaction = transactions.get(getattr(obj, "transaction_id", None))
+            if transaction is None:
+                continue
+            if obj._meta.label_lower == "transaction.walletbalancehistory":
+                transaction.archived_histories.append(obj)
+            elif obj._meta.label_lower == "transaction.feedistribution":
+                transaction.archived_fee_distributions.append(obj)
+        return transactions
+
+    def get_transaction(self, order_id):
+        """Transaction archivée correspondant à order_id, ou None."""
+        orders, _ = self._index()
+        location = orders.get(order_id)
+        if location is None:
+            return None
+        for transaction in self._group(self._read_segment(location)).values():
+            if transaction.order_id == order_id:
+                return transaction
+        return None
+
+    def get_wallet_transactions(self, wallet_id, since=None):
+        """
+        Transactions archivées envoyées ou reçues par le wallet, plus récentes
+        d'abord, sous forme de séquence paginable (ArchivedWalletTransactions) :
+        seuls les segments de la page demandée sont relus.
+        """
+        _, wallets = self._index()
+        segments = [
+            (location, count)
+            for location, count in wallets.get(wallet_id, [])
+            # Segment entièrement antérieur à la fenêtre demandée
+            if not (since and location.last and location.last < since)
+        ]
+        return ArchivedWalletTransactions(self, wallet_id, segments, since)
+
+
+class ArchivedWalletTransactions:
+    """
+    Transactions archivées d'un wallet, segment par segment (le plus récent
+    d'abord, puis par date dans le segment). Le nombre total vient des
+    compteurs du manifest ; un segment n'est relu que si une tranche
+    demandée le traverse, ou pour compter ses transactions lorsque la
+    fenêtre since le coupe.
+    """
+
+    def __init__(self, reader, wallet_id, segments, since=None):
+        self.reader = reader
+        self.wallet_id = wallet_id
+        self.since = since
+        oldest = datetime.min.replace(tzinfo=dt_timezone.utc)
+        self.segments = sorted(
+            segments,
+            key=lambda segment: (segment[0].last or oldest, segment[0].path),
+            reverse=True,
+        )
+        self._loaded = {}
+
+    def _load(self, location):
+        if location.path not in self._loaded:
+            transactions = [
+                transaction
+                for transaction in self.reader._group(self.reader._read_segment(location)).values()
+                if self.wallet_id in (transaction.sender_id, transaction.receiver_id)
+                and not (self.since and transaction.timestamp < self.since)
+            ]
+            transactions.sort(key=lambda transaction: transaction.timestamp, reverse=True)
+            self._loaded[location.path] = transactions
+        return self._loaded[location.path]
+
+    def _count(self, location, count):
+        if count is not None and not (
+            self.since and (location.first is None or location.first < self.since)
+        ):
+            return count
+        return len(self._load(location))
+
+    def __len__(self):
+        return sum(self._count(location, count) for location, count in self.segments)
+
+    def count(self):
+        return len(self)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = key.stop
+        results = []
+        offset = 0
+        for location, count in self.segments:
+            if stop is not None and offset >= stop:
+                break
+            size = self._count(location, count)
+            if offset + size > start:
+                transactions = self._load(location)
+                results += transactions[
+                    max(start - offset, 0):None if stop is None else stop - offset
+                ]
+            offset += size
+        return results
+
+    def __iter__(self):
+        return iter(self[0:])
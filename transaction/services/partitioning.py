@@ -0,0 +1,361 @@
+import re
+from collections import namedtuple
+from datetime import date
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Partition mensuelle : [start, end[ sur la colonne timestamp
+MonthPartition = namedtuple("MonthPartition", ["table", "name", "start", "end"])
+
+
+class PartitionService:
+    """
+    Partitionnement mensuel (PostgreSQL, RANGE sur timestamp) des tables du
+    ledger. Les méthodes reçoivent un curseur afin d'être utilisables depuis
+    les migrations comme depuis les commandes de gestion.
+    """
+
+    TABLES = ("transaction_transaction", "transaction_walletbalancehistory")
+    PARTITION_KEY = "timestamp"
+
+    @staticmethod
+    def month_start(value):
+        return date(value.year, value.month, 1)
+
+    @staticmethod
+    def add_months(month, count):
+        index = month.year * 12 + month.month - 1 + count
+        return date(index // 12, index % 12 + 1, 1)
+
+    @staticmethod
+    def partition_name(table, month):
+        return f"{table}_p{month.year}_{month.month:02d}"
+
+    @staticmethod
+    def default_partition_name(table):
+        return f"{table}_default"
+
+    @staticmethod
+    def is_partitioned(cursor, table):
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [table])
+        row = cursor.fetchone()
+        return bool(row) and row[0] == "p"
+
+    @staticmethod
+    def list_partitions(cursor, table):
+        """Partitions mensuelles attachées à la table, triées par mois."""
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [table],
+        )
+        pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+        partitions = []
+        for (name,) in cursor.fetchall():
+            match = pattern.match(name)
+            if not match:
+                continue
+            start = date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append(
+                MonthPartition(table, name, start, PartitionService.add_months(start, 1))
+            )
+        return sorted(partitions, key=lambda partition: partition.start)
+
+    @staticmethod
+    def create_month_partition(cursor, table, month):
+        """
+        Crée la partition du mois si elle n'existe pas. Les lignes de ce mois
+        déjà tombées dans la partition par défaut y sont déplacées.
+        """
+        name = PartitionService.partition_name(table, month)
+        cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [name])
+        if cursor.fetchone():
+            return False
+
+        start = month.isoformat()
+        end = PartitionService.add_months(month, 1).isoformat()
+        default = PartitionService.default_partition_name(table)
+        key = PartitionService.PARTITION_KEY
+        bounds = f"FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {default} "
+            f"WHERE {key} >= %s::timestamptz AND {key} < %s::timestamptz)",
+            [f"{start} 00:00:00+00", f"{end} 00:00:00+00"],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+            return True
+
+        # La création échouerait tant que la partition par défaut contient des
+        # lignes du mois : elle est détachée le temps de les déplacer.
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+        condition = f"{key} >= '{start} 00:00:00+00' AND {key} < '{end} 00:00:00+00'"
+        cursor.execute(f"INSERT INTO {name} SELECT * FROM {default} WHERE {condition}")
+        cursor.execute(f"DELETE FROM {default} WHERE {condition}")
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+        logger.warning(f"PARTITION_BACKFILLED: {name} from {default}")
+        return True
+
+    @staticmethod
+    def ensure_partitions(cursor, table, months_ahead, today=None):
+        """Crée les partitions du mois courant et des months_ahead mois suivants."""
+        current = PartitionService.month_start(today or date.today())
+        created = []
+        for offset in range(months_ahead + 1):
+            month = PartitionService.add_months(current, offset)
+            if PartitionService.create_month_partition(cursor, table, month):
+                created.append(PartitionService.partition_name(table, month))
+        return created
+
+    @staticmethod
+    def detach_blockers(cursor, partition):
+        """
+        Raisons empêchant de détacher une partition : le ledger resterait
+        incohérent pour les données encore en ligne.
+        """
+        key = PartitionService.PARTITION_KEY
+        end = f"{partition.end.isoformat()} 00:00:00+00"
+        blockers = []
+
+        if partition.table == "transaction_transaction":
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {partition.name} WHERE status = 'PENDING'"
+            )
+            pending = cursor.fetchone()[0]
+            if pending:
+                blockers.append(f"{pending} transactions PENDING")
+
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM transaction_walletbalancehistory h
+                WHERE h.{key} >= %s::timestamptz
+                  AND h.transaction_id IN (SELECT id FROM {partition.name})
+                """,
+                [end],
+            )
+            referenced = cursor.fetchone()[0]
+            if referenced:
+                blockers.append(f"{referenced} history entries kept reference its transactions")
+
+            # Clés étrangères sans contrainte en base (db_constraint=False) :
+            # rien d'autre n'empêche de rendre ces lignes orphelines
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM transaction_feedistribution d
+                WHERE d.transaction_id IN (SELECT id FROM {partition.name})
+                """
+            )
+            distributions = cursor.fetchone()[0]
+            if distributions:
+                blockers.append(f"{distributions} fee distributions reference its transactions")
+
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM transaction_transactionstatuscheck c
+                WHERE c.order_id IN (SELECT order_id FROM {partition.name})
+                """
+            )
+            checks = cursor.fetchone()[0]
+            if checks:
+                blockers.append(f"{checks} status checks reference its transactions")
+        else:
+            # Le solde d'un wallet est sa dernière entrée d'historique
+            cursor.execute(
+                f"""
+                SELECT COUNT(DISTINCT h.wallet_id) FROM {partition.name} h
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM {partition.table} later
+                    WHERE later.wallet_id = h.wallet_id AND later.{key} >= %s::timestamptz
+                )
+                """,
+                [end],
+            )
+            wallets = cursor.fetchone()[0]
+            if wallets:
+                blockers.append(f"it holds the latest balance of {wallets} wallets")
+
+            # Sans checkpoint archivé couvrant ses entrées, la vérification
+            # complète (verify_ledger --full) repartirait de 0 pour le wallet
+            # et --rebuild réécrirait ses soldes
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM (
+                    SELECT wallet_id, MAX(id) AS last_id FROM {partition.name}
+                    GROUP BY wallet_id
+                ) w
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM transaction_walletbalancecheckpoint c
+                    WHERE c.wallet_id = w.wallet_id AND c.archived
+                      AND c.last_history_id >= w.last_id
+                )
+                """
+            )
+            uncovered = cursor.fetchone()[0]
+            if uncovered:
+                blockers.append(f"{uncovered} wallets have no archived checkpoint covering it")
+
+        return blockers
+
+    @staticmethod
+    def detach_partition(cursor, partition):
+        """Détache la partition : elle reste une table autonome, prête à être archivée."""
+        cursor.execute(f"ALTER TABLE {partition.table} DETACH PARTITION {partition.name}")
+        logger.info(f"PARTITION_DETACHED: {partition.name}")
+
+    @staticmethod
+    def convert_table(cursor, table, months_ahead=3):
+        """
+        Convertit une table classique en table partitionnée par mois.
+
+        La table est renommée, recréée à l'identique (colonnes, valeurs par
+        défaut, identité), les données sont recopiées puis les index, clés
+        étrangères sortantes et la clé primaire (id, timestamp) sont recréés.
+        """
+        if PartitionService.is_partitioned(cursor, table):
+            return
+
+        PartitionService._check_no_incoming_fk(cursor, table)
+        legacy = f"{table}_legacy"
+        key = PartitionService.PARTITION_KEY
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS "
+            f"INCLUDING IDENTITY INCLUDING CONSTRAINTS) PARTITION BY RANGE ({key})"
+        )
+
+        cursor.execute(f"SELECT MIN({key}) FROM {legacy}")
+        oldest = cursor.fetchone()[0]
+        first = PartitionService.month_start(oldest or date.today())
+        current = PartitionService.month_start(date.today())
+        month = first
+        while month <= PartitionService.add_months(current, months_ahead):
+            start = month.isoformat()
+            end = PartitionService.add_months(month, 1).isoformat()
+            cursor.execute(
+                f"CREATE TABLE {PartitionService.partition_name(table, month)} "
+                f"PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start} 00:00:00+00') TO ('{end} 00:00:00+00')"
+            )
+            month = PartitionService.add_months(month, 1)
+        cursor.execute(
+            f"CREATE TABLE {PartitionService.default_partition_name(table)} "
+            f"PARTITION OF {table} DEFAULT"
+        )
+
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        PartitionService._move_table(cursor, table, legacy, primary_key=("id", key))
+
+    @staticmethod
+    def revert_table(cursor, table):
+        """Reconvertit une table partitionnée en table classique (clé primaire id)."""
+        if not PartitionService.is_partitioned(cursor, table):
+            return
+
+        PartitionService._check_no_incoming_fk(cursor, table)
+        legacy = f"{table}_legacy"
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS "
+            f"INCLUDING IDENTITY INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+        PartitionService._move_table(cursor, table, legacy, primary_key=("id",))
+
+    @staticmethod
+    def _check_no_incoming_fk(cursor, table):
+        cursor.execute(
+            """
+            SELECT conname FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = %s::regclass
+            """,
+            [table],
+        )
+        constraints = [row[0] for row in cursor.fetchall()]
+        if constraints:
+            raise RuntimeError(
+                f"{table} est référencée par des clés étrangères : {', '.join(constraints)}"
+            )
+
+    @staticmethod
+    def _move_table(cursor, table, legacy, primary_key):
+        """
+        Termine la bascule de legacy vers table : séquence, suppression de
+        l'ancienne table puis recréation des index, clés étrangères et
+        triggers (NOTIFY wallet_events) sous leurs noms d'origine (les
+        migrations Django s'y réfèrent).
+        """
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+        legacy_sequence = cursor.fetchone()[0]
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+        sequence = cursor.fetchone()[0]
+        if sequence is None:
+            # Colonne serial : la valeur par défaut copiée utilise toujours la
+            # séquence de l'ancienne table, qui doit lui survivre.
+            sequence = legacy_sequence
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        cursor.execute(
+            f"SELECT setval(%s, COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)",
+            [sequence],
+        )
+
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            """,
+            [legacy],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(
+            """
+            SELECT idx.relname, pg_get_indexdef(idx.oid)
+            FROM pg_index
+            JOIN pg_class idx ON idx.oid = pg_index.indexrelid
+            WHERE pg_index.indrelid = %s::regclass AND NOT pg_index.indisprimary
+            """,
+            [legacy],
+        )
+        indexes = cursor.fetchall()
+
+        cursor.execute(
+            """
+            SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger
+            WHERE tgrelid = %s::regclass AND NOT tgisinternal
+            """,
+            [legacy],
+        )
+        triggers = cursor.fetchall()
+
+        cursor.execute(f"DROP TABLE {legacy}")
+
+        cursor.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey "
+            f"PRIMARY KEY ({', '.join(primary_key)})"
+        )
+        for name, definition in indexes:
+            definition = re.sub(
+                rf"ON (ONLY )?(\S+\.)?{re.escape(legacy)} ", rf"ON \g<2>{table} ", definition
+            )
+            if definition.startswith("CREATE UNIQUE"):
+                logger.warning(f"PARTITION_INDEX_SKIPPED: unique index {name} on {table}")
+                continue
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        for name, definition in triggers:
+            cursor.execute(
+                re.sub(rf"ON (\S+\.)?{re.escape(legacy)} ", rf"ON \g<1>{table} ", definition)
+            )
@@ -0,0 +1,288 @@
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+
+from actor.models import Wallet
+from transaction.models import (
+    FEE_CREDIT_DESCRIPTION,
+    FEE_DEBIT_DESCRIPTION,
+    FeeDistribution,
+    Transaction,
+    TransactionStatus,
+    TransactionStatusCheck,
+    TransactionType,
+    WalletBalanceHistory,
+)
+from transaction.services.fee import FeeService
+from transaction.services.fee_revenue import FeeRevenueService
+from transaction.services.transaction import TransactionService
+from transaction.services.wallet_summary import WalletSummaryService
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionReconciliationService:
+    """
+    Clôture en masse de transactions PENDING (incidents partenaires).
+
+    Chaque lot est traité dans son propre bloc atomique : les transactions
+    encore PENDING sont verrouillées puis passées au statut final par un
+    UPDATE conditionnel (compare-and-swap sur status='PENDING'), et les
+    écritures correspondantes sont calculées en mémoire puis insérées avec
+    bulk_create :
+
+    - SUCCESS : les jambes manquantes sont postées (crédit du bénéficiaire
+      d'une recharge, par exemple) et le frais est appliqué comme dans les
+      parcours unitaires : au bénéficiaire d'une recharge, à l'envoyeur d'un
+      transfert interne ou d'un paiement, jamais à un transfert partenaire ;
+    - FAILED : toutes les jambes déjà postées (débit d'un transfert
+      partenaire, frais) sont contre-passées et les distributions de frais
+      annulées par des lignes négatives.
+
+    Une transaction qui n'est plus PENDING (traitée entre-temps par un
+    webhook ou un autre opérateur) est ignorée.
+    """
+
+    BATCH_SIZE = 500
+
+    FINAL_STATUSES = (TransactionStatus.SUCCESS.value, TransactionStatus.FAILED.value)
+
+    @staticmethod
+    def bulk_transition(transaction_ids, status, batch_size=None, progress=None):
+        """
+        Passe les transactions au statut final `status` par lots.
+        `progress(done, total, result)` est appelé après chaque lot.
+        Retourne {"transitioned", "skipped", "entries"}.
+        """
+        status = status.upper()
+        if status not in TransactionReconciliationService.FINAL_STATUSES:
+            raise ValueError(f"Statut final invalide : {status}")
+
+        transaction_ids = list(transaction_ids)
+        batch_size = batch_size or TransactionReconciliationService.BATCH_SIZE
+        result = {"transitioned": 0, "skipped": 0, "entries": 0}
+
+        for start in range(0, len(transaction_ids), batch_size):
+            batch = transaction_ids[start:start + batch_size]
+            transitioned, entries = TransactionReconciliationService._transition_batch(
+                batch, status
+            )
+            result["transitioned"] += transitioned
+            result["skipped"] += len(batch) - transitioned
+            result["entries"] += entries
+
+            done = min(start + batch_size, len(transaction_ids))
+            logger.info(
+                f"RECONCILIATION_PROGRESS: {done}/{len(transaction_ids)} | "
+                f"-> {status} | Transitioned: {result['transitioned']} | "
+                f"Skipped: {result['skipped']}"
+            )
+            if progress:
+                progress(done, len(transaction_ids), result)
+
+        return result
+
+    @staticmethod
+    @db_transaction.atomic
+    def _transition_batch(transaction_ids, status):
+        # Les lignes verrouillées par un autre traitement sont laissées de côté
+        transactions = list(
+            Transaction.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("sender__user", "receiver__user")
+            .filter(id__in=transaction_ids, status=TransactionStatus.PENDING.value)
+            .order_by("id")
+        )
+        if not transactions:
+            return 0, 0
+
+        ids = [transaction.id for transaction in transactions]
+        transitioned = Transaction.objects.filter(
+            id__in=ids, status=TransactionStatus.PENDING.value
+        ).update(status=status)
+
+        legs = {}
+        for transaction_id, wallet_id, before, after, description in (
+            WalletBalanceHistory.objects.filter(transaction_id__in=ids)
+            .order_by("id")
+            .values_list(
+                "transaction_id", "wallet_id", "balance_before", "balance_after", "description"
+            )
+        ):
+            legs.setdefault(transaction_id, []).append((wallet_id, after - before, description))
+
+        if status == TransactionStatus.SUCCESS.value:
+            postings, distributions, fees = TransactionReconciliationService._success_postings(
+                transactions, legs
+            )
+        else:
+            postings, distributions, fees = TransactionReconciliationService._failure_postings(
+                transactions, legs
+            )
+
+        histories = TransactionReconciliationService._write_postings(postings)
+        FeeDistribution.objects.bulk_create(distributions, batch_size=1000)
+        for transaction in transactions:
+            transaction.status = status
+            if transaction.id in fees:
+                transaction.fee_applied = fees[transaction.id]
+        Transaction.objects.bulk_update(
+            [t for t in transactions if t.id in fees], ["fee_applied"], batch_size=1000
+        )
+
+        TransactionStatusCheck.objects.filter(
+            order_id__in=[transaction.order_id for transaction in transactions]
+        ).update(status=status)
+
+        WalletSummaryService.record_entries(
+            (
+                history.wallet_id,
+                history.timestamp,
+                history.transaction.transaction_type,
+                history.balance_after - history.balance_before,
+                history.description,
+            )
+            for history in histories
+        )
+        FeeRevenueService.record_distributions(distributions)
+
+        db_transaction.on_commit(
+            lambda: TransactionReconciliationService._notify(transactions, status)
+        )
+        return transitioned, len(histories)
+
+    @staticmethod
+    def _fee_payer(transaction):
+        """Wallet qui paie le frais à la confirmation, comme dans les parcours unitaires."""
+        if transaction.transaction_type == TransactionType.TOPUP.value:
+            return transaction.receiver
+        if transaction.sender_id and transaction.receiver_id:
+            return transaction.sender
+        # Transfert partenaire : pas de frais
+        return None
+
+    @staticmethod
+    def _success_postings(transactions, legs):
+        postings = []
+        distributions = []
+        fees = {}
+        resolvers = {}
+        rules = {}
+        platform_wallet = None
+
+        for transaction in transactions:
+            posted = legs.get(transaction.id, [])
+            principal = [
+                (wallet_id, delta)
+                for wallet_id, delta, description in posted
+                if description not in (FEE_DEBIT_DESCRIPTION, FEE_CREDIT_DESCRIPTION)
+            ]
+
+            if transaction.sender_id and not any(
+                wallet_id == transaction.sender_id and delta < 0 for wallet_id, delta in principal
+            ):
+                postings.append(
+                    (transaction.sender, -transaction.amount, transaction, "debit", transaction.description)
+                )
+            if transaction.receiver_id and not any(
+                wallet_id == transaction.receiver_id and delta > 0 for wallet_id, delta in principal
+            ):
+                postings.append(
+                    (transaction.receiver, transaction.amount, transaction, "credit", transaction.description)
+                )
+
+            payer = TransactionReconciliationService._fee_payer(transaction)
+            if payer is None or transaction.fee_applied or getattr(payer.user, "is_subscribed", False):
+                continue
+
+            transaction_type = transaction.transaction_type
+            if transaction_type not in resolvers:
+                resolvers[transaction_type] = FeeService.get_fee_resolver(transaction_type)
+                rules[transaction_type] = FeeService.get_distribution_rule(transaction_type)
+            fee_amount = FeeService.calculate_fee_amount(
+                resolvers[transaction_type](transaction.amount), transaction.amount
+            )
+            if fee_amount <= 0:
+                continue
+
+            if platform_wallet is None:
+                platform_wallet = Wallet.objects.get(is_platform=True)
+            postings += [
+                (payer, -fee_amount, transaction, "debit", FEE_DEBIT_DESCRIPTION),
+                (platform_wallet, fee_amount, transaction, "credit", FEE_CREDIT_DESCRIPTION),
+            ]
+            fees[transaction.id] = fee_amount
+            distributions += FeeService.build_distributions(
+                transaction, fee_amount, rules[transaction_type]
+            )
+
+        return postings, distributions, fees
+
+    @staticmethod
+    def _failure_postings(transactions, legs):
+        wallets = Wallet.objects.in_bulk(
+            {wallet_id for posted in legs.values() for wallet_id, _, _ in posted}
+        )
+        description = "Annulation de la transaction {}"
+
+        postings = []
+        fees = {}
+        for transaction in transactions:
+            for wallet_id, delta, _ in legs.get(transaction.id, []):
+                if delta:
+                    postings.append(
+                        (
+                            wallets[wallet_id],
+                            -delta,
+                            transaction,
+                            "credit" if delta < 0 else "debit",
+                            description.format(transaction.order_id),
+                        )
+                    )
+            if transaction.fee_applied:
+                fees[transaction.id] = Decimal("0.00")
+
+        # Distributions annulées par des lignes de signe opposé
+        transactions_by_id = {transaction.id: transaction for transaction in transactions}
+        distributions = [
+            FeeDistribution(
+                transaction=transactions_by_id[distribution.transaction_id],
+                actor_type=distribution.actor_type,
+                actor_id=distribution.actor_id,
+                amount=-distribution.amount,
+            )
+            for distribution in FeeDistribution.objects.filter(transaction_id__in=list(fees))
+        ]
+        return postings, distributions, fees
+
+    @staticmethod
+    def _write_postings(postings):
+        """Écrit les jambes à la suite du dernier solde de chaque wallet, sous verrou."""
+        if not postings:
+            return []
+
+        balances = TransactionService.lock_balances({wallet.id for wallet, *_ in postings})
+        histories = []
+        for wallet, delta, transaction, leg_type, description in postings:
+            balance_before = balances[wallet.id]
+            balances[wallet.id] = balance_before + delta
+            histories.append(
+                WalletBalanceHistory(
+                    wallet=wallet,
+                    balance_before=balance_before,
+                    balance_after=balances[wallet.id],
+                    transaction=transaction,
+                    transaction_type=leg_type,
+                    description=description,
+                )
+            )
+        return WalletBalanceHistory.objects.bulk_create(histories, batch_size=1000)
+
+    @staticmethod
+    def _notify(transactions, status):
+        for transaction in transactions:
+            try:
+                TransactionService._send_status_notifications(transaction, status)
+            except Exception as e:
+                logger.error(f"Notification failed for {transaction.order_id}: {e}")
@@ -0,0 +1,31 @@
+from django.db import connection
+from django.utils import timezone
+
+
+def upsert_increment(model, keys, increments):
+    """
+    Crée la ligne d'agrégat identifiée par `keys` ou y ajoute `increments`,
+    en une seule requête INSERT ... ON CONFLICT DO UPDATE (PostgreSQL et
+    SQLite). Les champs de `keys` doivent former une contrainte d'unicité.
+    """
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+
+    def column(name):
+        return quote(model._meta.get_field(name).column)
+
+    values = {**keys, **increments, "updated_at": timezone.now()}
+    updates = [
+        f"{column(name)} = {table}.{column(name)} + excluded.{column(name)}"
+        for name in increments
+    ]
+    updates.append(f"{column('updated_at')} = excluded.{column('updated_at')}")
+
+    sql = (
+        f"INSERT INTO {table} ({', '.join(column(name) for name in values)}) "
+        f"VALUES ({', '.join(['%s'] * len(values))}) "
+        f"ON CONFLICT ({', '.join(column(name) for name in keys)}) "
+        f"DO UPDATE SET {', '.join(updates)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(values.values()))
@@ -0,0 +1,73 @@
+from django.db.models import Q
+
+from actor.models import Merchant, Wallet
+from transaction.models import Transaction
+
+
+class SearchService:
+    """
+    Recherche partielle (order_id, référence externe, téléphone, nom
+    commercial) pour le support : admin et API staff.
+
+    Les filtres icontains s'appuient sur les index trigrammes GIN posés sur
+    UPPER(colonne) (migrations transaction 0020 et actor 0007). Un trigramme
+    demande au moins 3 caractères : en dessous, seules les correspondances
+    exactes sont cherchées, sur les index B-tree.
+    """
+
+    MIN_LENGTH = 3
+    LIMIT = 20
+
+    @staticmethod
+    def is_partial(term):
+        return len(term) >= SearchService.MIN_LENGTH
+
+    @staticmethod
+    def transaction_condition(term):
+        """Filtre sur order_id et référence externe, plus les wallets du numéro exact."""
+        if SearchService.is_partial(term):
+            condition = Q(order_id__icontains=term) | Q(external_reference__icontains=term)
+        else:
+            condition = Q(order_id=term) | Q(external_reference=term)
+
+        wallet_ids = list(Wallet.objects.filter(phone_number=term).values_list("id", flat=True))
+        if wallet_ids:
+            condition |= Q(sender_id__in=wallet_ids) | Q(receiver_id__in=wallet_ids)
+        return condition
+
+    @staticmethod
+    def wallet_condition(term):
+        if SearchService.is_partial(term):
+            return Q(phone_number__icontains=term)
+        return Q(phone_number=term)
+
+    @staticmethod
+    def merchant_condition(term):
+        condition = Q(merchant_code=term)
+        if SearchService.is_partial(term):
+            condition |= Q(business_name__icontains=term)
+        return condition
+
+    @staticmethod
+    def search_transactions(term, limit=None):
+        return list(
+            Transaction.objects.filter(SearchService.transaction_condition(term))
+            .select_related("sender", "receiver")
+            .order_by("-id")[: limit or SearchService.LIMIT]
+        )
+
+    @staticmethod
+    def search_wallets(term, limit=None):
+        return list(
+            Wallet.objects.filter(SearchService.wallet_condition(term))
+            .select_related("user")
+            .order_by("phone_number")[: limit or SearchService.LIMIT]
+        )
+
+    @staticmethod
+    def search_merchants(term, limit=None):
+        return list(
+            Merchant.objects.filter(SearchService.merchant_condition(term))
+            .select_related("wallet")
+            .order_by("business_name")[: limit or SearchService.LIMIT]
+        )
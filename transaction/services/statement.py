@@ -0,0 +1,95 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from transaction.models import WalletBalanceHistory
+
+
+class Echo:
+    """Pseudo-fichier pour csv.writer : chaque ligne est retournée au lieu d'être écrite."""
+
+    def write(self, value):
+        return value
+
+
+class StatementService:
+    CHUNK_SIZE = 2000
+    # Nombre de lignes regroupées par morceau envoyé au client
+    LINES_PER_CHUNK = 500
+
+    COLUMNS = [
+        "timestamp",
+        "order_id",
+        "transaction_type",
+        "entry_type",
+        "description",
+        "amount",
+        "fee_applied",
+        "balance_before",
+        "balance_after",
+        "status",
+        "sender_phone",
+        "receiver_phone",
+    ]
+
+    @staticmethod
+    def iter_entries(wallet, start, end):
+        """
+        Lignes du relevé d'un wallet entre start (inclus) et end (exclu) : une
+        par entrée de WalletBalanceHistory, avec sa transaction. Lecture en une
+        seule requête via un curseur côté serveur.
+        """
+        return (
+            WalletBalanceHistory.objects.filter(
+                wallet=wallet, timestamp__gte=start, timestamp__lt=end
+            )
+            .annotate(amount=F("balance_after") - F("balance_before"))
+            .order_by("timestamp", "id")
+            .values_list(
+                "timestamp",
+                "transaction__order_id",
+                "transaction__transaction_type",
+                "transaction_type",
+                "description",
+                "amount",
+                "transaction__fee_applied",
+                "balance_before",
+                "balance_after",
+                "transaction__status",
+                "transaction__sender__phone_number",
+                "transaction__receiver__phone_number",
+            )
+            .iterator(chunk_size=StatementService.CHUNK_SIZE)
+        )
+
+    @staticmethod
+    def _chunked(lines):
+        buffer = []
+        for line in lines:
+            buffer.append(line)
+            if len(buffer) >= StatementService.LINES_PER_CHUNK:
+                yield "".join(buffer)
+                buffer = []
+        if buffer:
+            yield "".join(buffer)
+
+    @staticmethod
+    def stream_csv(wallet, start, end):
+        writer = csv.writer(Echo())
+
+        def lines():
+            yield writer.writerow(StatementService.COLUMNS)
+            for timestamp, *values in StatementService.iter_entries(wallet, start, end):
+                yield writer.writerow([timestamp.isoformat(), *values])
+
+        return StatementService._chunked(lines())
+
+    @staticmethod
+    def stream_jsonl(wallet, start, end):
+        def lines():
+            for row in StatementService.iter_entries(wallet, start, end):
+                yield json.dumps(dict(zip(StatementService.COLUMNS, row)), cls=DjangoJSONEncoder) + "\n"
+
+        return StatementService._chunked(lines())
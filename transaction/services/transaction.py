@@ -1,8 +1,12 @@
 from decimal import Decimal
 
+from django.db.models import OuterRef, Subquery
+
 from rest_framework.exceptions import ValidationError
 
+from actor.models import Wallet
 from transaction.models import Transaction, WalletBalanceHistory, TransactionStatus
+from transaction.services.wallet_summary import WalletSummaryService
 from services.firebase import firebase_service
 
 import random
@@ -24,7 +28,7 @@ class TransactionService:
             # Récupère le dernier historique de solde pour le portefeuille donné
             last_balance_history = WalletBalanceHistory.objects.filter(
                 wallet=sender_wallet
-            ).latest("timestamp")
+            ).latest("timestamp", "id")
             current_balance = last_balance_history.balance_after
         except WalletBalanceHistory.DoesNotExist:
             # Si aucun historique n'existe, le solde est considéré comme 0
@@ -54,7 +58,7 @@ class TransactionService:
         balance_before = 0
         try:
             last_history = WalletBalanceHistory.objects.filter(wallet=wallet).latest(
-                "timestamp"
+                "timestamp", "id"
             )
             balance_before = last_history.balance_after
             balance_after = last_history.balance_after - Decimal(amount)
@@ -62,7 +66,7 @@ class TransactionService:
             balance_after = -Decimal(amount)
 
         # Enregistrement dans WalletBalanceHistory
-        WalletBalanceHistory.objects.create(
+        history = WalletBalanceHistory.objects.create(
             wallet=wallet,
             balance_before=balance_before,
             balance_after=balance_after,
@@ -70,6 +74,13 @@ class TransactionService:
             transaction_type="debit",
             description=description,
         )
+        WalletSummaryService.record_entry(
+            wallet.id,
+            history.timestamp,
+            getattr(transaction, "transaction_type", None) or "debit",
+            balance_after - balance_before,
+            description,
+        )
 
         return balance_after
 
@@ -82,7 +93,7 @@ class TransactionService:
         balance_before = 0
         try:
             last_history = WalletBalanceHistory.objects.filter(wallet=wallet).latest(
-                "timestamp"
+                "timestamp", "id"
             )
 
             balance_before = last_history.balance_after
@@ -92,7 +103,7 @@ class TransactionService:
             balance_after = Decimal(amount)
 
         # Enregistrement dans WalletBalanceHistory
-        WalletBalanceHistory.objects.create(
+        history = WalletBalanceHistory.objects.create(
             wallet=wallet,
             balance_before=balance_before,
             balance_after=balance_after,
@@ -100,9 +111,37 @@ class TransactionService:
             transaction_type="credit",
             description=description,
         )
+        WalletSummaryService.record_entry(
+            wallet.id,
+            history.timestamp,
+            getattr(transaction, "transaction_type", None) or "credit",
+            balance_after - balance_before,
+            description,
+        )
 
         return balance_after
 
+    @staticmethod
+    def lock_balances(wallet_ids):
+        """
+        Verrouille les wallets (dans l'ordre des ids, pour ne pas s'interbloquer
+        avec un autre traitement par lots) et retourne leur dernier solde connu,
+        en une requête. À appeler dans un bloc atomique.
+        """
+        latest = WalletBalanceHistory.objects.filter(wallet=OuterRef("pk")).order_by(
+            "-timestamp", "-id"
+        )
+        wallets = (
+            Wallet.objects.select_for_update()
+            .filter(id__in=wallet_ids)
+            .annotate(balance=Subquery(latest.values("balance_after")[:1]))
+            .order_by("id")
+        )
+        return {
+            wallet.id: wallet.balance if wallet.balance is not None else Decimal("0.00")
+            for wallet in wallets
+        }
+
     @staticmethod
     def create_pending_transaction(
         sender_wallet,
@@ -160,7 +199,7 @@ class TransactionService:
             
             if status_upper == TransactionStatus.SUCCESS.value:
                 if transaction.transaction_type == "TOPUP":
-                    firebase_service.send_transaction_notification(
+                    firebase_service.queue_transaction_notification(
                         fcm_token=sender_fcm_token,
                         action="topup",
                         status="success",
@@ -172,7 +211,7 @@ class TransactionService:
                         }
                     )
                 else:
-                    firebase_service.send_transaction_notification(
+                    firebase_service.queue_transaction_notification(
                         fcm_token=sender_fcm_token,
                         action="send_money",
                         status="success",
@@ -187,7 +226,7 @@ class TransactionService:
             
             elif status_upper == TransactionStatus.FAILED.value:
                 action = "topup" if transaction.transaction_type == "TOPUP" else "send_money"
-                firebase_service.send_transaction_notification(
+                firebase_service.queue_transaction_notification(
                     fcm_token=sender_fcm_token,
                     action=action,
                     status="failed",
@@ -205,7 +244,7 @@ class TransactionService:
             
             if transaction.transaction_type == "PAYMENT":
                 # Notification marchand
-                firebase_service.send_transaction_notification(
+                firebase_service.queue_transaction_notification(
                     fcm_token=receiver_fcm_token,
                     action="payment",
                     status="success",
@@ -219,7 +258,7 @@ class TransactionService:
                 )
             else:
                 # Notification utilisateur normal
-                firebase_service.send_transaction_notification(
+                firebase_service.queue_transaction_notification(
                     fcm_token=receiver_fcm_token,
                     action="receive_money",
                     status="success",
@@ -3,7 +3,7 @@ from transaction.models import TransactionStatusCheck
 
 class TransactionStatusService:
     @staticmethod
-    def register(order_id, external_reference, status, transaction_type, partner):
+    def register(order_id, external_reference, status, transaction_type, partner, gateway=""):
         obj, _ = TransactionStatusCheck.objects.update_or_create(
             external_reference=external_reference,
             defaults={
@@ -11,6 +11,7 @@ class TransactionStatusService:
                 "status": status,
                 "transaction_type": transaction_type,
                 "partner": partner,
+                "gateway": gateway or "",
             },
         )
         return obj
@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import connection, DatabaseError
+from django.utils import timezone
+
+from rest_framework.exceptions import ValidationError
+
+from actor.models import Wallet
+from transaction.models import Transaction, TransactionStatus, TransactionType
+from transaction.services.transaction import TransactionService
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SqlTransferEngine:
+    """
+    Moteur de transfert interne exécuté côté serveur.
+
+    Toute l'écriture (vérification du solde, jambes débit/crédit, frais,
+    distribution des frais et statut final) est faite par la fonction
+    PL/pgSQL `pliz_internal_transfer` (migrations 0013, 0024 et 0025) en un
+    seul aller-retour, agrégats journaliers des wallets et des frais compris.
+    Activé avec TRANSFER_ENGINE=sql, uniquement sur PostgreSQL.
+    """
+
+    ERRORS = {
+        "INSUFFICIENT_FUNDS": lambda: ValidationError(
+            detail="Fonds insuffisants.", code="INSUFFICIENT_FUNDS_ERROR"
+        ),
+        "WALLET_NOT_FOUND": lambda: Wallet.DoesNotExist(
+            "Le portefeuille du destinataire n'existe pas."
+        ),
+        "PLATFORM_WALLET_NOT_FOUND": lambda: Wallet.DoesNotExist(
+            "Le portefeuille de la plateforme n'existe pas."
+        ),
+    }
+
+    @staticmethod
+    def is_enabled():
+        return (
+            getattr(settings, "TRANSFER_ENGINE", "orm") == "sql"
+            and connection.vendor == "postgresql"
+        )
+
+    @staticmethod
+    def execute_internal_transfer(
+        user, sender_wallet, receiver_username, amount, description=None
+    ):
+        """
+        Exécute un transfert interne et retourne la Transaction créée.
+        Les frais ne sont pas appliqués aux utilisateurs abonnés.
+        """
+        order_id = TransactionService.generate_order_id()
+        apply_fee = not getattr(user, "is_subscribed", False)
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT * FROM pliz_internal_transfer(%s, %s, %s, %s, %s, %s, %s)",
+                    [
+                        sender_wallet.id,
+                        receiver_username,
+                        amount,
+                        order_id,
+                        description,
+                        apply_fee,
+                        timezone.get_current_timezone_name(),
+                    ],
+                )
+                (
+                    transaction_id,
+                    receiver_wallet_id,
+                    sender_balance,
+                    fee_amount,
+                    created_at,
+                ) = cursor.fetchone()
+        except DatabaseError as e:
+            error = SqlTransferEngine._translate_error(e)
+            if error is None:
+                logger.error(f"SQL transfer engine failed: {e}")
+                raise
+            raise error from e
+
+        transaction = Transaction(
+            id=transaction_id,
+            order_id=order_id,
+            sender=sender_wallet,
+            receiver_id=receiver_wallet_id,
+            transaction_type=TransactionType.TRANSFER.value,
+            amount=amount,
+            description=description,
+            status=TransactionStatus.SUCCESS.value,
+            fee_applied=fee_amount,
+            timestamp=created_at,
+        )
+        transaction.balance_after_operation = sender_balance
+
+        logger.info(
+            f"TRANSACTION_CREATED: {order_id} | "
+            f"Type: {transaction.transaction_type} | Amount: {amount} | "
+            f"From: {sender_wallet.phone_number} | To wallet: {receiver_wallet_id} | "
+            f"Fee: {fee_amount} | Engine: sql"
+        )
+
+        TransactionService._send_status_notifications(
+            transaction, TransactionStatus.SUCCESS.value
+        )
+
+        return transaction
+
+    @staticmethod
+    def _translate_error(error):
+        """
+        Convertit l'exception levée par la fonction PL/pgSQL en erreur métier,
+        ou None si elle n'est pas connue.
+        """
+        diag = getattr(error.__cause__, "diag", None)
+        message = getattr(diag, "message_primary", None) or str(error)
+        factory = SqlTransferEngine.ERRORS.get(message.strip())
+        return factory() if factory else None
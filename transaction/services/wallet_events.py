@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import json
+import logging
+import threading
+
+import psycopg2
+from django.db import connections
+
+from services.async_views import db_call
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "wallet_events"
+
+
+class _LoopListener:
+    """
+    Abonnés et connexion LISTEN d'une boucle d'événements : les files
+    asyncio et add_reader ne valent que pour la boucle qui les a créés.
+    """
+
+    def __init__(self, hub, loop):
+        self.hub = hub
+        self.loop = loop
+        self.subscribers = {}
+        self.connection = None
+        self.reconnect = None
+
+    def subscriber_count(self):
+        return sum(len(queues) for queues in self.subscribers.values())
+
+    def publish(self, event):
+        data = {key: value for key, value in event.items() if key != "wallets"}
+        for wallet_id in set(event.get("wallets") or []):
+            for queue in self.subscribers.get(wallet_id, ()):
+                try:
+                    queue.put_nowait(dict(data))
+                except asyncio.QueueFull:
+                    logger.warning(f"WALLET_EVENTS_DROPPED: wallet {wallet_id} ({data['event']})")
+
+    async def listen(self):
+        if connections["default"].vendor != "postgresql":
+            return
+        try:
+            connection = await db_call(self.hub._connect)
+        except psycopg2.Error as e:
+            logger.error(f"WALLET_EVENTS_LISTEN_FAILED: {e}")
+            self.schedule_reconnect()
+            return
+        if not self.subscribers:
+            # Tous les flux se sont fermés pendant la connexion
+            connection.close()
+            return
+        self.connection = connection
+        self.loop.add_reader(connection.fileno(), self.on_notify)
+        logger.info(f"WALLET_EVENTS_LISTENING: {CHANNEL}")
+
+    def on_notify(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error as e:
+            logger.error(f"WALLET_EVENTS_CONNECTION_LOST: {e}")
+            self.close()
+            self.schedule_reconnect()
+            return
+
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            try:
+                self.publish(json.loads(notify.payload))
+            except (ValueError, KeyError) as e:
+                logger.warning(f"WALLET_EVENTS_INVALID_PAYLOAD: {notify.payload} ({e})")
+
+    def schedule_reconnect(self):
+        if self.reconnect is None and self.subscribers:
+            self.reconnect = self.loop.call_later(
+                self.hub.RECONNECT_SECONDS, lambda: self.loop.create_task(self.resume())
+            )
+
+    async def resume(self):
+        self.reconnect = None
+        if not self.subscribers or self.connection is not None:
+            return
+        await self.listen()
+        if self.connection is not None:
+            self.publish({"event": "resync", "wallets": list(self.subscribers)})
+
+    def close(self):
+        if self.reconnect is not None:
+            self.reconnect.cancel()
+            self.reconnect = None
+        if self.connection is not None:
+            with contextlib.suppress(ValueError, psycopg2.Error):
+                self.loop.remove_reader(self.connection.fileno())
+            self.connection.close()
+            self.connection = None
+
+
+class WalletEventHub:
+    """
+    Répartit les événements des wallets (nouveau solde, changement de statut
+    d'une transaction) entre les flux SSE ouverts dans le processus.
+
+    Les événements viennent des triggers NOTIFY wallet_events (migration
+    0023) : délivrés au commit, ils ne portent que des écritures validées,
+    quel que soit le chemin d'écriture (ORM, moteur SQL, commandes). Chaque
+    boucle d'événements a ses abonnés et sa connexion LISTEN, ouverte au
+    premier abonné et fermée après le dernier (une seule par worker ASGI) ;
+    elle lit les notifications sans bloquer la boucle (add_reader) et les
+    remet aux abonnés du wallet.
+
+    Si la connexion LISTEN est perdue, elle est rouverte après
+    RECONNECT_SECONDS et un événement "resync" est remis à tous les
+    abonnés : les notifications de l'intervalle sont perdues, le flux
+    renvoie alors le solde courant. Un abonné trop lent (file pleine) perd
+    aussi des événements ; chaque événement de solde porte le solde complet.
+
+    Sans PostgreSQL, aucune notification : seul publish alimente les flux.
+    """
+
+    QUEUE_SIZE = 100
+    RECONNECT_SECONDS = 5
+
+    def __init__(self):
+        self._listeners = {}
+        self._lock = threading.Lock()
+
+    def subscriber_count(self):
+        with self._lock:
+            listeners = list(self._listeners.values())
+        return sum(listener.subscriber_count() for listener in listeners)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, wallet_id):
+        """File des événements de wallet_id, le temps du bloc async with."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            listener = self._listeners.get(loop)
+            if listener is None:
+                listener = self._listeners[loop] = _LoopListener(self, loop)
+
+        queue = asyncio.Queue(self.QUEUE_SIZE)
+        listener.subscribers.setdefault(wallet_id, set()).add(queue)
+        if listener.connection is None and listener.reconnect is None:
+            await listener.listen()
+        try:
+            yield queue
+        finally:
+            queues = listener.subscribers.get(wallet_id, set())
+            queues.discard(queue)
+            if not queues:
+                listener.subscribers.pop(wallet_id, None)
+            if not listener.subscribers:
+                listener.close()
+                with self._lock:
+                    if self._listeners.get(loop) is listener:
+                        del self._listeners[loop]
+
+    def publish(self, event):
+        """
+        Remet event ({"event": ..., "wallets": [...], ...}) aux abonnés des
+        wallets concernés, sans la liste des wallets, sur chaque boucle.
+        """
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        with self._lock:
+            listeners = list(self._listeners.values())
+        for listener in listeners:
+            if listener.loop is current:
+                listener.publish(event)
+            else:
+                # Boucle fermée entre-temps : ses flux sont terminés
+                with contextlib.suppress(RuntimeError):
+                    listener.loop.call_soon_threadsafe(listener.publish, event)
+
+    @staticmethod
+    def _connect():
+        params = connections["default"].get_connection_params()
+        connection = psycopg2.connect(**params)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return connection
+
+
+wallet_event_hub = WalletEventHub()
@@ -0,0 +1,185 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Count, DecimalField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from transaction.models import (
+    FEE_DEBIT_DESCRIPTION,
+    WalletBalanceHistory,
+    WalletDailySummary,
+)
+from transaction.services.rollup import upsert_increment
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WalletSummaryService:
+    """
+    Maintenance et lecture de WalletDailySummary.
+
+    Chaque mouvement compte pour une transaction (tx_count), en entrée ou en
+    sortie selon son signe, sauf les jambes de frais débitées au client qui
+    alimentent `fees`. Le même classement est utilisé par le backfill.
+    Les entrées INIT (création du wallet, solde nul) ne sont pas des
+    mouvements : elles ne sont comptées ni au fil de l'eau ni au backfill.
+    """
+
+    EXCLUDED_TYPES = ("INIT",)
+
+    @staticmethod
+    def classify(delta, description):
+        """Retourne (tx_count, inflow, outflow, fees) pour un mouvement."""
+        if description == FEE_DEBIT_DESCRIPTION and delta < 0:
+            return 0, Decimal("0.00"), Decimal("0.00"), -delta
+        if delta >= 0:
+            return 1, delta, Decimal("0.00"), Decimal("0.00")
+        return 1, Decimal("0.00"), -delta, Decimal("0.00")
+
+    @staticmethod
+    def record_entry(wallet_id, timestamp, transaction_type, delta, description=None):
+        """
+        Ajoute un mouvement à l'agrégat du jour, au commit de la transaction
+        en cours : un mouvement annulé n'est jamais compté.
+        """
+        values = WalletSummaryService.classify(Decimal(delta), description)
+        day = timezone.localdate(timestamp)
+
+        db_transaction.on_commit(
+            lambda: WalletSummaryService._upsert(wallet_id, day, transaction_type, *values)
+        )
+
+    @staticmethod
+    def record_entries(entries):
+        """
+        Variante groupée de record_entry pour les lots : les mouvements
+        (wallet_id, timestamp, transaction_type, delta, description) sont
+        cumulés par wallet, jour et type avant un seul on_commit.
+        """
+        totals = {}
+        for wallet_id, timestamp, transaction_type, delta, description in entries:
+            key = (wallet_id, timezone.localdate(timestamp), transaction_type)
+            values = WalletSummaryService.classify(Decimal(delta), description)
+            current = totals.get(key, (0, Decimal("0.00"), Decimal("0.00"), Decimal("0.00")))
+            totals[key] = tuple(a + b for a, b in zip(current, values))
+
+        def upsert_all():
+            for (wallet_id, day, transaction_type), values in totals.items():
+                WalletSummaryService._upsert(wallet_id, day, transaction_type, *values)
+
+        if totals:
+            db_transaction.on_commit(upsert_all)
+
+    @staticmethod
+    def _upsert(wallet_id, day, transaction_type, tx_count, inflow, outflow, fees):
+        # Une seule requête, sans verrou applicatif : la ligne du jour est
+        # créée ou incrémentée de façon atomique par la base.
+        try:
+            upsert_increment(
+                WalletDailySummary,
+                {"wallet": wallet_id, "day": day, "transaction_type": transaction_type},
+                {"tx_count": tx_count, "inflow": inflow, "outflow": outflow, "fees": fees},
+            )
+        except Exception as e:
+            # L'agrégat est reconstructible : une erreur ne doit pas faire
+            # échouer la requête dont la transaction est déjà commitée.
+            logger.error(
+                f"WALLET_SUMMARY_ERROR: wallet {wallet_id} | {day} | {transaction_type} | {e}"
+            )
+
+    @staticmethod
+    def get_period_totals(wallet, start, end):
+        """
+        Totaux d'un wallet entre les jours start et end inclus, globaux et par
+        type de transaction.
+        """
+        rows = (
+            WalletDailySummary.objects.filter(wallet=wallet, day__gte=start, day__lte=end)
+            .values("transaction_type")
+            .annotate(
+                tx_count=Sum("tx_count"),
+                inflow=Sum("inflow"),
+                outflow=Sum("outflow"),
+                fees=Sum("fees"),
+            )
+            .order_by("transaction_type")
+        )
+
+        totals = {
+            "tx_count": 0,
+            "inflow": Decimal("0.00"),
+            "outflow": Decimal("0.00"),
+            "fees": Decimal("0.00"),
+            "by_type": {},
+        }
+        for row in rows:
+            transaction_type = row.pop("transaction_type")
+            totals["by_type"][transaction_type] = row
+            for key, value in row.items():
+                totals[key] += value
+        return totals
+
+    @staticmethod
+    @db_transaction.atomic
+    def rebuild_day(day, wallet_ids=None):
+        """
+        Recalcule les agrégats d'un jour depuis WalletBalanceHistory (une requête
+        d'agrégation). Retourne le nombre de lignes écrites.
+        """
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        entries = WalletBalanceHistory.objects.filter(
+            timestamp__gte=start, timestamp__lt=start + timedelta(days=1)
+        ).exclude(transaction_type__in=WalletSummaryService.EXCLUDED_TYPES)
+        summaries = WalletDailySummary.objects.filter(day=day)
+        if wallet_ids:
+            entries = entries.filter(wallet_id__in=wallet_ids)
+            summaries = summaries.filter(wallet_id__in=wallet_ids)
+
+        delta = F("balance_after") - F("balance_before")
+        is_fee = Q(description=FEE_DEBIT_DESCRIPTION, balance_after__lt=F("balance_before"))
+        zero = Value(Decimal("0.00"))
+        amount = DecimalField(max_digits=14, decimal_places=2)
+
+        rows = (
+            entries.annotate(
+                summary_type=Coalesce("transaction__transaction_type", "transaction_type"),
+            )
+            .values("wallet_id", "summary_type")
+            .annotate(
+                tx_count=Count("id", filter=~is_fee),
+                inflow=Coalesce(
+                    Sum(delta, filter=~is_fee & Q(balance_after__gte=F("balance_before"))),
+                    zero,
+                    output_field=amount,
+                ),
+                outflow=Coalesce(
+                    Sum(-delta, filter=~is_fee & Q(balance_after__lt=F("balance_before"))),
+                    zero,
+                    output_field=amount,
+                ),
+                fees=Coalesce(Sum(-delta, filter=is_fee), zero, output_field=amount),
+            )
+            .order_by()
+        )
+
+        summaries.delete()
+        created = WalletDailySummary.objects.bulk_create(
+            [
+                WalletDailySummary(
+                    wallet_id=row["wallet_id"],
+                    day=day,
+                    transaction_type=row["summary_type"],
+                    tx_count=row["tx_count"],
+                    inflow=row["inflow"],
+                    outflow=row["outflow"],
+                    fees=row["fees"],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+        return len(created)
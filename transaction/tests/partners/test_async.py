@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.models import Transaction, TransactionStatus, WalletBalanceHistory
+from transaction.partners.registry import gateway_registry
+from transaction.partners.router import GatewayRouter
+from transaction.partners.simulator import PartnerSimulator
+
+INSTANT = {"latency_ms": 0, "settle_seconds": 0}
+
+
+# Les vues asynchrones accèdent à la base depuis d'autres threads (db_call) :
+# les données de test doivent être validées, d'où APITransactionTestCase
+class AsyncPartnerViewTests(APITransactionTestCase):
+    databases = {"default", "partner_state"}
+
+    def setUp(self):
+        caches["shared"].clear()
+        self.simulator = PartnerSimulator(port=0, profiles={"samir": INSTANT}).start()
+        self.addCleanup(self.simulator.stop)
+        env = {
+            "SAMIR_API_KEY": "key",
+            "SAMIR_SECRET_KEY": "secret",
+            "SAMIR_API_BASE_URL": f"{self.simulator.url}/samir",
+        }
+        patcher = mock.patch.dict("os.environ", env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        gateway_registry.reload()
+        self.addCleanup(gateway_registry.reload)
+
+        self.user = CustomUser.objects.create_user(
+            username="770000001", password="password123"
+        )
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="770000001")
+        WalletBalanceHistory.objects.create(wallet=self.wallet, balance_before=0, balance_after=1000)
+        self.client.force_authenticate(user=self.user)
+
+    def test_async_topup_calls_partner(self):
+        response = self.client.post(
+            reverse("wallet-topup-async"), {"partner": "WAVE", "amount": "500"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["code"], "TOPUP_PENDING")
+        transaction = Transaction.objects.get(order_id=response.data["transaction_id"])
+        self.assertEqual(transaction.status, TransactionStatus.PENDING.value)
+        self.assertEqual(self.simulator.counters["samir"]["requests"], 1)
+        # Mesures du routage alimentées comme sur le chemin synchrone
+        self.assertEqual(GatewayRouter("WAVE").stats("samir")["calls"], 1)
+        # Hors ASGI, le client HTTP de la boucle de la requête est fermé avec elle
+        self.assertIsNone(gateway_registry._async_client("samir")._client)
+
+    def test_async_send_money_marks_declined_transfer_failed(self):
+        self.simulator.configure("samir", error_rate=1)
+
+        response = self.client.post(
+            reverse("send-money-async"),
+            {"receiver": "770000002", "amount": "100", "partner": "WAVE"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.data["code"], "TRANSACTION_FAILED")
+        transaction = Transaction.objects.get()
+        self.assertEqual(transaction.status, TransactionStatus.FAILED.value)
+        # Aucun débit : le solde est inchangé
+        latest = self.wallet.wallet_balance_histories.order_by("-timestamp", "-id").first()
+        self.assertEqual(latest.balance_after, 1000)
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from transaction.errors import PartnerBusyError
+from transaction.partners.bulkhead import Bulkhead
+from transaction.partners.factory import PartnerGatewayFactory
+from transaction.partners.processors.samir_pay import SamirPaymentGateway
+from transaction.partners.registry import gateway_registry
+
+
+@override_settings(PARTNER_BULKHEAD_LIMITS={"bulkhead-test": 1})
+class BulkheadTests(TestCase):
+    databases = {"default", "partner_state"}
+
+    def setUp(self):
+        caches["shared"].clear()
+
+    @mock.patch.object(Bulkhead, "MAX_WAIT", 0.01)
+    def test_rejects_when_full(self):
+        with Bulkhead("bulkhead-test"):
+            self.assertEqual(Bulkhead("bulkhead-test").in_flight(), 1)
+            # Compartiment plein : refus rapide, sans appeler le partenaire
+            with self.assertRaises(PartnerBusyError):
+                with Bulkhead("bulkhead-test"):
+                    self.fail("Appel exécuté malgré un compartiment plein")
+
+        stats = Bulkhead("bulkhead-test").stats()
+        self.assertEqual(stats, {"limit": 1, "in_flight": 0, "waiting": 0, "rejected": 1})
+
+        # La place libérée est réutilisable
+        with Bulkhead("bulkhead-test"):
+            pass
+
+    @mock.patch.object(Bulkhead, "MAX_WAIT", 0.01)
+    async def test_async_slot_shares_the_limit(self):
+        async with Bulkhead("bulkhead-test").async_slot():
+            # Même compartiment que le chemin synchrone
+            with self.assertRaises(PartnerBusyError):
+                await sync_to_async(Bulkhead("bulkhead-test").acquire)()
+
+        bulkhead = Bulkhead("bulkhead-test")
+        await sync_to_async(bulkhead.acquire)()
+        await sync_to_async(bulkhead.release)()
+
+    @mock.patch.dict("os.environ", {"SAMIR_API_KEY": "key", "SAMIR_SECRET_KEY": "secret"})
+    def test_factory_calls_take_a_slot(self):
+        def initiate_topup(gateway, transaction):
+            self.assertEqual(Bulkhead("samir").in_flight(), 1)
+            return {"status": "SUCCESS"}
+
+        gateway_registry.reload()
+        self.addCleanup(gateway_registry.reload)
+
+        with mock.patch.object(SamirPaymentGateway, "initiate_topup", initiate_topup):
+            factory = PartnerGatewayFactory("WAVE")
+            self.assertEqual(factory.process_top_up(mock.Mock()), {"status": "SUCCESS"})
+        self.assertEqual(factory.gateway_name, "samir")
+        self.assertEqual(Bulkhead("samir").in_flight(), 0)
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.db import transaction as db_transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.errors import PartnerUnavailableError
+from transaction.models import Transaction, WalletBalanceHistory
+from transaction.partners.circuit_breaker import CircuitBreaker
+from transaction.partners.factory import PartnerGatewayFactory
+from transaction.partners.processors.samir_pay import SamirPaymentGateway
+from transaction.partners.registry import gateway_registry
+from transaction.partners.router import GatewayRouter
+
+
+class CircuitBreakerTests(TestCase):
+    # État des disjoncteurs : connexion partner_state, hors transaction de la requête
+    databases = {"default", "partner_state"}
+
+    def setUp(self):
+        self.breaker = CircuitBreaker("WAVE")
+
+    def test_opens_on_failures_then_probes(self):
+        partner_call = mock.Mock(side_effect=ConnectionError("timeout"))
+        for _ in range(CircuitBreaker.MIN_CALLS):
+            with self.assertRaises(ConnectionError):
+                self.breaker.call(partner_call)
+        self.assertEqual(self.breaker.state(), CircuitBreaker.OPEN)
+
+        # Circuit ouvert : échec immédiat, le partenaire n'est plus appelé
+        with self.assertRaises(PartnerUnavailableError):
+            self.breaker.call(partner_call)
+        self.assertEqual(partner_call.call_count, CircuitBreaker.MIN_CALLS)
+        # L'état est partagé : une autre instance (autre worker) le voit
+        self.assertEqual(CircuitBreaker("WAVE").state(), CircuitBreaker.OPEN)
+        self.assertEqual(CircuitBreaker("DJAMO").state(), CircuitBreaker.CLOSED)
+
+        # Semi-ouvert : un appel de test, dont le succès referme le circuit
+        with mock.patch("transaction.partners.circuit_breaker.time.time", return_value=10**10):
+            self.assertEqual(self.breaker.state(), CircuitBreaker.HALF_OPEN)
+            self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.stats()["state"], CircuitBreaker.CLOSED)
+
+    @mock.patch.dict("os.environ", {"SAMIR_API_KEY": "key", "SAMIR_SECRET_KEY": "secret"})
+    def test_failures_inside_rolled_back_transaction_open_circuit(self):
+        gateway_registry.reload()
+        self.addCleanup(gateway_registry.reload)
+
+        # Comme TopUpSerializer.create : appel partenaire dans un bloc atomic,
+        # annulé par l'exception de la passerelle
+        with mock.patch.object(
+            SamirPaymentGateway, "initiate_topup", side_effect=ConnectionError("timeout")
+        ):
+            for _ in range(CircuitBreaker.MIN_CALLS):
+                with self.assertRaises(ConnectionError), db_transaction.atomic():
+                    PartnerGatewayFactory("WAVE").process_top_up(mock.Mock())
+
+        breaker = GatewayRouter.breaker("WAVE", "samir")
+        self.assertEqual(breaker.state(), CircuitBreaker.OPEN)
+        self.assertEqual(breaker.stats()["failures"], CircuitBreaker.MIN_CALLS)
+
+    def test_successful_calls_keep_circuit_closed(self):
+        for _ in range(CircuitBreaker.MIN_CALLS * 2):
+            self.breaker.call(lambda: {"status": "SUCCESS"})
+        self.assertEqual(self.breaker.stats()["calls"], CircuitBreaker.MIN_CALLS * 2)
+        self.assertEqual(self.breaker.state(), CircuitBreaker.CLOSED)
+
+
+class PartnerFastFailTests(APITestCase):
+    databases = {"default", "partner_state"}
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(username="770000001", password="password123")
+        wallet = Wallet.objects.create(user=user, phone_number="770000001")
+        WalletBalanceHistory.objects.create(wallet=wallet, balance_before=0, balance_after=1000)
+        self.client.force_authenticate(user=user)
+        for gateway in GatewayRouter.ROUTES["WAVE"]:
+            GatewayRouter.breaker("WAVE", gateway).trip()
+
+    def test_send_money_fails_fast_when_circuit_open(self):
+        response = self.client.post(
+            reverse("send-money"), {"receiver": "770000002", "amount": "100", "partner": "WAVE"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["code"], "PARTNER_UNAVAILABLE")
+        self.assertFalse(Transaction.objects.exists())
+
+        response = self.client.post(reverse("wallet-topup"), {"partner": "WAVE", "amount": "100"})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_health_check_reports_open_circuit(self):
+        response = self.client.get(reverse("health_check"))
+        partners = response.json()["checks"]["partners"]
+        self.assertEqual(partners["status"], "degraded")
+        self.assertEqual(partners["circuits"]["WAVE:samir"]["state"], CircuitBreaker.OPEN)
@@ -0,0 +1,51 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from transaction.partners.registry import GatewayRegistry
+
+SAMIR_ENV = {
+    "SAMIR_API_KEY": "key",
+    "SAMIR_SECRET_KEY": "secret",
+    "SAMIR_API_BASE_URL": "https://samir.test",
+}
+
+
+class GatewayRegistryTests(SimpleTestCase):
+    @mock.patch.dict("os.environ", SAMIR_ENV)
+    def test_instances_are_built_once_and_share_sessions(self):
+        registry = GatewayRegistry()
+        registry.build()
+
+        wave = registry.gateway("samir", "WAVE")
+        self.assertIs(registry.gateway("samir", "WAVE"), wave)
+        self.assertEqual(registry.gateway("samir", "ORANGE_MONEY").partner, "ORANGE_MONEY")
+        self.assertIs(registry.gateway("samir", "ORANGE_MONEY").session, wave.session)
+
+        airtime = registry.merchant_processor("AIRTIME")
+        self.assertIs(airtime.session, wave.session)
+        self.assertEqual(airtime.base_url, "https://samir.test/api/invoice/v1/WIZALL")
+        self.assertTrue(registry.is_merchant_service("Woyofal"))
+        self.assertFalse(registry.is_merchant_service("MCH00001"))
+
+    @mock.patch.dict("os.environ", {}, clear=True)
+    def test_missing_configuration_fails_on_use(self):
+        registry = GatewayRegistry()
+        registry.build()
+
+        with self.assertRaisesMessage(ValueError, "SAMIR_API_KEY"):
+            registry.gateway("samir", "WAVE")
+        with self.assertRaisesMessage(ValueError, "inconnu"):
+            registry.merchant_processor("YYY")
+
+    @mock.patch.dict("os.environ", SAMIR_ENV)
+    @override_settings(MERCHANT_API_SERVICES={"seneau": "samir", "senelec": "inconnu"})
+    def test_merchant_services_come_from_settings(self):
+        registry = GatewayRegistry()
+        registry.build()
+
+        self.assertTrue(registry.is_merchant_service("SENEAU"))
+        self.assertFalse(registry.is_merchant_service("airtime"))
+        self.assertEqual(registry.merchant_processor("seneau").merchant_code, "seneau")
+        with self.assertRaisesMessage(ValueError, "Processeur marchand inconnu"):
+            registry.merchant_processor("senelec")
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.db import transaction as db_transaction
+from django.test import TestCase
+
+from transaction.errors import PartnerUnavailableError
+from transaction.models import PartnerRoute
+from transaction.partners.factory import PartnerGatewayFactory
+from transaction.partners.processors.djamo import DjamoPaymentGateway
+from transaction.partners.registry import gateway_registry
+from transaction.partners.router import GatewayRouter
+
+
+class GatewayRouterTests(TestCase):
+    databases = {"default", "partner_state"}
+
+    def setUp(self):
+        self.router = GatewayRouter("WAVE")
+
+    def test_routes_around_slow_gateway(self):
+        self.assertEqual(self.router.select("initiate_transfer"), "samir")
+
+        for _ in range(GatewayRouter.MIN_CALLS):
+            self.router.record("samir", True, GatewayRouter.MAX_P95_SECONDS + 3)
+            self.router.record("djamo", True, 0.4)
+        self.assertEqual(self.router.stats("samir")["p95"], GatewayRouter.MAX_P95_SECONDS + 3)
+        self.assertEqual(self.router.select("initiate_transfer"), "djamo")
+
+        # Djamo ne sait pas recharger : le rechargement reste sur Samir
+        self.assertEqual(self.router.select("initiate_topup"), "samir")
+
+    def test_samples_survive_request_rollback(self):
+        # Échec (résultat FAILED) mesuré dans une transaction ensuite annulée
+        with self.assertRaises(RuntimeError), db_transaction.atomic():
+            self.router.record("samir", False, 0.4)
+            raise RuntimeError("PaymentProcessingError")
+
+        self.assertEqual(self.router.stats("samir"), {"calls": 1, "success_rate": 0.0, "p95": 0.5})
+
+    def test_admin_override_and_open_circuits(self):
+        PartnerRoute.objects.create(partner="WAVE", gateway="djamo")
+        self.assertEqual(self.router.select("initiate_transfer"), "djamo")
+
+        PartnerRoute.objects.update(is_active=False)
+        for gateway in GatewayRouter.ROUTES["WAVE"]:
+            GatewayRouter.breaker("WAVE", gateway).trip()
+        with self.assertRaises(PartnerUnavailableError):
+            self.router.select("initiate_transfer")
+
+    @mock.patch.dict(
+        "os.environ",
+        {"DJAMO_ACCESS_TOKEN": "token", "DJAMO_SECRET_KEY": "secret", "DJAMO_COMPANY_ID": "company"},
+    )
+    def test_status_check_sticks_to_original_gateway(self):
+        gateway_registry.reload()
+        self.addCleanup(gateway_registry.reload)
+
+        with mock.patch.object(
+            DjamoPaymentGateway, "update_transaction_status", return_value={"status": "SUCCESS"}
+        ) as status_call:
+            factory = PartnerGatewayFactory("WAVE", gateway="djamo")
+            self.assertEqual(factory.get_transaction_status("ref-1"), {"status": "SUCCESS"})
+
+        status_call.assert_called_once_with("ref-1")
+        self.assertEqual(self.router.stats("djamo")["calls"], 1)
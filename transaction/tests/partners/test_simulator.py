@@ -0,0 +1,84 @@
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from services.firebase import firebase_service
+from transaction.partners.processors.djamo import DjamoPaymentGateway
+from transaction.partners.processors.samir_pay import SamirPaymentGateway
+from transaction.partners.simulator import PartnerSimulator
+from transaction.views.webhooks import DjamoWebhookView
+
+INSTANT = {"latency_ms": 0, "settle_seconds": 0}
+
+
+class PartnerSimulatorTests(SimpleTestCase):
+    def setUp(self):
+        self.simulator = PartnerSimulator(
+            port=0,
+            profiles={"samir": INSTANT, "djamo": INSTANT, "fcm": INSTANT},
+            webhook_url="http://web.test/api/transaction/webhooks/djamo/",
+            webhook_secret="webhook-secret",
+        ).start()
+        self.addCleanup(self.simulator.stop)
+        env = {
+            "SAMIR_API_KEY": "key",
+            "SAMIR_SECRET_KEY": "secret",
+            "SAMIR_API_BASE_URL": f"{self.simulator.url}/samir",
+            "DJAMO_ACCESS_TOKEN": "token",
+            "DJAMO_SECRET_KEY": "webhook-secret",
+            "DJAMO_COMPANY_ID": "company",
+            "DJAMO_API_BASE_URL": f"{self.simulator.url}/djamo",
+        }
+        patcher = mock.patch.dict("os.environ", env)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.transaction = SimpleNamespace(
+            order_id="TOP-1",
+            amount=Decimal("1000"),
+            receiver=SimpleNamespace(phone_number="770000001"),
+        )
+
+    def test_samir_topup_settles_and_errors_are_injected(self):
+        gateway = SamirPaymentGateway(partner="WAVE")
+        response = gateway.initiate_topup(self.transaction)
+        self.assertEqual(response["status"], "PENDING")
+        status = gateway.update_transaction_status(response["body"]["id"])
+        self.assertEqual(status["status"], "SUCCESS")
+
+        self.simulator.configure("samir", error_rate=1)
+        self.assertEqual(gateway.initiate_topup(self.transaction)["status"], "FAILED")
+        self.assertEqual(self.simulator.counters["samir"], {"requests": 3, "errors": 1})
+
+    def test_djamo_webhook_is_signed(self):
+        gateway = DjamoPaymentGateway(partner="WAVE")
+        with mock.patch("transaction.partners.simulator.threading.Timer") as timer:
+            response = gateway.initiate_transfer(self.transaction, "770000002")
+        self.assertEqual(response["status"], "pending")
+
+        # Le webhook différé est envoyé par le Timer : on le déclenche ici
+        send_webhook, (transaction,) = timer.call_args.args[1:]
+        with mock.patch("transaction.partners.simulator.requests.post") as post:
+            send_webhook(transaction)
+        body = post.call_args.kwargs["data"]
+        headers = post.call_args.kwargs["headers"]
+        self.assertEqual(json.loads(body)["data"]["reference"], "TOP-1")
+        self.assertEqual(headers["x-djamo-webhook-topic"], "transactions/completed")
+        self.assertTrue(DjamoWebhookView()._verify_signature(body, headers["x-djamo-hmac-sha256"]))
+
+    def test_fcm_stub_and_runtime_configuration(self):
+        with mock.patch.object(firebase_service, "simulator_url", f"{self.simulator.url}/fcm"), \
+                mock.patch.object(firebase_service, "_simulator_session", requests.Session(), create=True):
+            self.assertTrue(
+                firebase_service.send_transaction_notification(
+                    "token", action="topup", status="success", title="Pliz", message="OK"
+                )
+            )
+
+        response = requests.post(f"{self.simulator.url}/__simulator", json={"djamo": {"p99_ms": 4000}})
+        self.assertEqual(response.json()["profiles"]["djamo"]["p99_ms"], 4000)
+        response = requests.post(f"{self.simulator.url}/__simulator", json={"djamo": {"unknown": 1}})
+        self.assertEqual(response.status_code, 400)
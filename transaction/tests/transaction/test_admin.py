@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from actor.models import CustomUser, Wallet
+from services.pagination import EstimatedCountPaginator
+from transaction.models import Transaction, WalletBalanceHistory
+
+
+class TransactionAdminTests(TestCase):
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username="ops", password="password123")
+        self.wallets = []
+        for i in range(2):
+            user = CustomUser.objects.create_user(username=f"user{i}", password="password123")
+            self.wallets.append(Wallet.objects.create(user=user, phone_number=f"77000000{i}"))
+        for i in range(5):
+            transaction = Transaction.objects.create(
+                sender=self.wallets[0],
+                receiver=self.wallets[1],
+                transaction_type="TRANSFER",
+                amount=Decimal("100.00"),
+                order_id=f"PLZ-{i}",
+                status="SUCCESS",
+            )
+            WalletBalanceHistory.objects.create(
+                wallet=self.wallets[0],
+                balance_before=0,
+                balance_after=0,
+                transaction=transaction,
+                transaction_type="debit",
+            )
+        Transaction.objects.create(
+            receiver=self.wallets[0], transaction_type="TOPUP", amount=Decimal("10.00"),
+            external_reference="EXT-1",
+        )
+        self.client.force_login(self.admin)
+
+    def test_exact_search_by_reference_and_phone(self):
+        url = reverse("admin:transaction_transaction_changelist")
+
+        response = self.client.get(url, {"q": "PLZ-3"})
+        self.assertEqual(
+            [t.order_id for t in response.context["cl"].result_list], ["PLZ-3"]
+        )
+
+        response = self.client.get(url, {"q": "EXT-1"})
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+
+        response = self.client.get(url, {"q": "770000001"})
+        self.assertEqual(len(response.context["cl"].result_list), 5)
+
+        response = self.client.get(
+            reverse("admin:transaction_walletbalancehistory_changelist"), {"q": "PLZ-3"}
+        )
+        self.assertEqual(len(response.context["cl"].result_list), 1)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        url = reverse("admin:transaction_transaction_changelist")
+        self.client.get(url)
+        # Session, utilisateur, comptage et page : rien par ligne
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    def test_paginator_counts_exactly_on_small_tables(self):
+        paginator = EstimatedCountPaginator(Transaction.objects.order_by("-id"), 2)
+        self.assertEqual(paginator.count, 6)
+
+        filtered = EstimatedCountPaginator(Transaction.objects.filter(status="SUCCESS"), 2)
+        self.assertEqual(filtered.count, 5)
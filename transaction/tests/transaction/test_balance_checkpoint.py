@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.models import WalletBalanceHistory, WalletBalanceCheckpoint
+from transaction.services.balance_checkpoint import BalanceCheckpointService
+
+
+class BalanceCheckpointServiceTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="test_user")
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="1234567890")
+
+        self.add_entry(0, 500)
+        self.add_entry(500, 400)
+        self.add_entry(400, 450)
+
+    def add_entry(self, before, after):
+        return WalletBalanceHistory.objects.create(
+            wallet=self.wallet,
+            balance_before=Decimal(before),
+            balance_after=Decimal(after),
+            transaction_type="credit" if after > before else "debit",
+        )
+
+    def test_create_checkpoint(self):
+        result, checkpoint = BalanceCheckpointService.create_checkpoint(
+            self.wallet.id, settle_seconds=0
+        )
+
+        self.assertEqual(result.mismatches, [])
+        self.assertEqual(checkpoint.balance, Decimal("450.00"))
+        self.assertEqual(checkpoint.entries_count, 3)
+
+        # Seules les entrées postérieures au checkpoint sont relues
+        self.add_entry(450, 300)
+        result = BalanceCheckpointService.verify_wallet(self.wallet.id)
+        self.assertEqual(result.entries, 1)
+        self.assertEqual(result.balance, Decimal("300.00"))
+
+    def test_broken_chain_is_not_checkpointed(self):
+        broken = self.add_entry(420, 500)
+
+        result, checkpoint = BalanceCheckpointService.create_checkpoint(
+            self.wallet.id, settle_seconds=0
+        )
+
+        self.assertIsNone(checkpoint)
+        self.assertEqual(len(result.mismatches), 1)
+        self.assertEqual(result.mismatches[0].history_id, broken.id)
+        self.assertEqual(result.mismatches[0].expected_before, Decimal("450.00"))
+        self.assertFalse(WalletBalanceCheckpoint.objects.exists())
+
+    def test_rebuild_balance_from_checkpoint(self):
+        BalanceCheckpointService.create_checkpoint(self.wallet.id, settle_seconds=0)
+        self.add_entry(450, 470)
+        self.add_entry(470, 420)
+
+        self.assertEqual(
+            BalanceCheckpointService.rebuild_balance(self.wallet.id), Decimal("420.00")
+        )
@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.models import (
+    Fee,
+    FeeDistribution,
+    TariffGrid,
+    Transaction,
+    WalletBalanceHistory,
+)
+
+
+class BulkSendMoneyViewTest(APITestCase):
+    def setUp(self):
+        self.sender = CustomUser.objects.create_user(username="payroll", password="password123")
+        self.sender_wallet = Wallet.objects.create(user=self.sender, phone_number="700000000")
+        self.receivers = []
+        for i in range(3):
+            user = CustomUser.objects.create_user(username=f"employee{i}", password="password123")
+            self.receivers.append(Wallet.objects.create(user=user, phone_number=f"70000000{i + 1}"))
+
+        platform_user = CustomUser.objects.create_user(username="platform", password="password123")
+        self.platform_wallet = Wallet.objects.create(
+            user=platform_user, phone_number="799999999", is_platform=True
+        )
+
+        grid = TariffGrid.objects.create(name="Standard")
+        Fee.objects.create(
+            tariff_grid=grid,
+            transaction_type="TRANSFER",
+            min_amount=Decimal("1.00"),
+            max_amount=Decimal("1000000.00"),
+            percentage=Decimal("1.00"),
+        )
+
+        WalletBalanceHistory.objects.create(
+            wallet=self.sender_wallet, balance_before=0, balance_after=Decimal("1000.00")
+        )
+
+        self.url = reverse("send-money-bulk")
+        self.client.force_authenticate(user=self.sender)
+
+    def balance(self, wallet):
+        return WalletBalanceHistory.objects.filter(wallet=wallet).latest("timestamp", "id").balance_after
+
+    def test_bulk_transfer_with_per_item_status(self):
+        response = self.client.post(
+            self.url,
+            {
+                "items": [
+                    {"receiver": "employee0", "amount": "300.00"},
+                    {"receiver": "unknown", "amount": "50.00"},
+                    {"receiver": "employee1", "amount": "200.00"},
+                    {"receiver": "employee0", "amount": "100.00"},
+                ],
+                "description": "Paie octobre",
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [item["status"] for item in response.data["items"]],
+            ["SUCCESS", "REJECTED", "SUCCESS", "SUCCESS"],
+        )
+        self.assertEqual(response.data["items"][1]["code"], "WALLET_NOT_FOUND_ERROR")
+        self.assertEqual(response.data["total_amount"], "600.00")
+        self.assertEqual(response.data["total_fees"], "6.00")
+        self.assertEqual(response.data["balance_after_operation"], "394.00")
+
+        self.assertEqual(Transaction.objects.filter(status="SUCCESS").count(), 3)
+        self.assertEqual(self.balance(self.sender_wallet), Decimal("394.00"))
+        self.assertEqual(self.balance(self.receivers[0]), Decimal("400.00"))
+        self.assertEqual(self.balance(self.receivers[1]), Decimal("200.00"))
+        self.assertEqual(self.balance(self.platform_wallet), Decimal("6.00"))
+
+        # Chaîne des soldes continue pour le wallet crédité deux fois
+        legs = WalletBalanceHistory.objects.filter(wallet=self.receivers[0]).order_by("id")
+        self.assertEqual(
+            [(leg.balance_before, leg.balance_after) for leg in legs],
+            [(Decimal("0.00"), Decimal("300.00")), (Decimal("300.00"), Decimal("400.00"))],
+        )
+        self.assertEqual(
+            sum(d.amount for d in FeeDistribution.objects.all()), Decimal("6.00")
+        )
+
+    def test_insufficient_funds_rejects_whole_batch(self):
+        response = self.client.post(
+            self.url,
+            {
+                "items": [
+                    {"receiver": "employee0", "amount": "600.00"},
+                    {"receiver": "employee1", "amount": "400.00"},
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "INSUFFICIENT_FUNDS_ERROR")
+        self.assertFalse(Transaction.objects.exists())
+        self.assertEqual(self.balance(self.sender_wallet), Decimal("1000.00"))
+
+    def test_malformed_items_are_rejected_individually(self):
+        response = self.client.post(
+            self.url,
+            {
+                "items": [
+                    {"receiver": "employee0", "amount": "abc"},
+                    {"amount": "10.00"},
+                    "employee1",
+                    {"receiver": "employee1", "amount": "100.00"},
+                ],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(item["status"], item.get("code")) for item in response.data["items"]],
+            [
+                ("REJECTED", "INVALID_AMOUNT"),
+                ("REJECTED", "INVALID_RECEIVER"),
+                ("REJECTED", "INVALID_ITEM"),
+                ("SUCCESS", None),
+            ],
+        )
+        self.assertEqual(response.data["accepted"], 1)
+        self.assertEqual(self.balance(self.receivers[1]), Decimal("100.00"))
@@ -0,0 +1,70 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.models import FeeDistribution, FeeRevenueDaily, Transaction
+from transaction.services.fee_revenue import FeeRevenueService
+
+
+class FeeRevenueTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user1", password="password123")
+        self.staff = CustomUser.objects.create_user(
+            username="staff", password="password123", is_staff=True
+        )
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="1234567890")
+        self.today = timezone.localdate()
+
+    def distribute(self, provider_amount, bank_amount):
+        transaction = Transaction.objects.create(
+            sender=self.wallet, transaction_type="TRANSFER", amount=Decimal("1000.00")
+        )
+        distributions = [
+            FeeDistribution.objects.create(
+                transaction=transaction, actor_type="provider", actor_id=0, amount=provider_amount
+            ),
+            FeeDistribution.objects.create(
+                transaction=transaction, actor_type="bank", actor_id=3, amount=bank_amount
+            ),
+        ]
+        FeeRevenueService.record_distributions(distributions)
+
+    def test_incremental_and_refreshed_reports_match(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.distribute(Decimal("6.00"), Decimal("4.00"))
+            self.distribute(Decimal("3.00"), Decimal("2.00"))
+
+        payouts = FeeRevenueService.get_payouts(self.today, self.today)
+        self.assertEqual(
+            [(p["actor_type"], p["distributions_count"], p["amount"]) for p in payouts],
+            [("bank", 2, Decimal("6.00")), ("provider", 2, Decimal("9.00"))],
+        )
+
+        FeeRevenueDaily.objects.all().delete()
+        call_command(
+            "refresh_fee_reports",
+            start=self.today.isoformat(),
+            end=self.today.isoformat(),
+            stdout=StringIO(),
+        )
+        self.assertEqual(FeeRevenueService.get_payouts(self.today, self.today), payouts)
+
+    def test_payout_statement_requires_staff(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.distribute(Decimal("6.00"), Decimal("4.00"))
+        url = reverse("fee-payout-statement", kwargs={"actor_type": "bank", "actor_id": 3})
+
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["amount"], Decimal("4.00"))
+        self.assertEqual(len(response.data["days"]), 1)
@@ -0,0 +1,164 @@
+import glob
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.models import (
+    Transaction,
+    TransactionStatus,
+    WalletBalanceCheckpoint,
+    WalletBalanceHistory,
+)
+from transaction.services.balance_checkpoint import BalanceCheckpointService
+from transaction.services.ledger_archive import LedgerArchiveReader, LedgerArchiveWriter
+
+
+class ArchiveLedgerTests(APITestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+
+        self.sender = CustomUser.objects.create_user(username="sender", password="password123")
+        self.receiver = CustomUser.objects.create_user(username="receiver", password="password123")
+        self.sender_wallet = Wallet.objects.create(user=self.sender, phone_number="1234567890")
+        self.receiver_wallet = Wallet.objects.create(user=self.receiver, phone_number="0987654321")
+
+        self.add_entry(self.sender_wallet, 0, 100, "INIT")
+        self.add_entry(self.receiver_wallet, 0, 50, "INIT")
+        self.old_transaction = self.transfer("TRF-OLD", 30, 100, 50)
+
+        # Données anciennes, couvertes par des checkpoints anciens
+        past = timezone.now() - timedelta(days=800)
+        Transaction.objects.update(timestamp=past)
+        WalletBalanceHistory.objects.update(timestamp=past)
+        for wallet in (self.sender_wallet, self.receiver_wallet):
+            BalanceCheckpointService.create_checkpoint(wallet.id, settle_seconds=0)
+        WalletBalanceCheckpoint.objects.update(created_at=past)
+
+        self.recent_transaction = self.transfer("TRF-NEW", 10, 70, 80)
+
+    def add_entry(self, wallet, before, after, transaction_type, transaction=None):
+        return WalletBalanceHistory.objects.create(
+            wallet=wallet,
+            balance_before=Decimal(before),
+            balance_after=Decimal(after),
+            transaction_type=transaction_type,
+            transaction=transaction,
+        )
+
+    def transfer(self, order_id, amount, sender_balance, receiver_balance):
+        transaction = Transaction.objects.create(
+            order_id=order_id,
+            sender=self.sender_wallet,
+            receiver=self.receiver_wallet,
+            transaction_type="TRANSFER",
+            amount=Decimal(amount),
+            status=TransactionStatus.SUCCESS.value,
+        )
+        self.add_entry(
+            self.sender_wallet, sender_balance, sender_balance - amount, "DEBIT", transaction
+        )
+        self.add_entry(
+            self.receiver_wallet, receiver_balance, receiver_balance + amount, "CREDIT", transaction
+        )
+        return transaction
+
+    def archive(self):
+        call_command("archive_ledger", months=12, dir=self.archive_dir, stdout=StringIO())
+
+    def test_archive_old_transactions(self):
+        self.archive()
+
+        self.assertFalse(Transaction.objects.filter(id=self.old_transaction.id).exists())
+        self.assertTrue(Transaction.objects.filter(id=self.recent_transaction.id).exists())
+        # Seules les entrées récentes (solde courant) restent en base
+        self.assertEqual(WalletBalanceHistory.objects.count(), 2)
+        self.assertEqual(WalletBalanceCheckpoint.objects.filter(archived=True).count(), 2)
+
+        archived = LedgerArchiveReader(self.archive_dir).get_transaction("TRF-OLD")
+        self.assertEqual(archived.amount, Decimal("30.00"))
+        self.assertEqual(len(archived.archived_histories), 2)
+
+        out = StringIO()
+        call_command("verify_ledger", workers=1, full=True, stdout=out)
+        self.assertIn("Ledger OK", out.getvalue())
+
+    def test_archived_transaction_detail(self):
+        self.archive()
+        self.client.force_authenticate(user=self.sender)
+
+        with override_settings(LEDGER_ARCHIVE_DIR=self.archive_dir):
+            response = self.client.get(
+                reverse("transaction-detail", kwargs={"order_id": "TRF-OLD"})
+            )
+            history = self.client.get(
+                reverse("transaction-history"), {"include_archived": "true"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["archived"])
+        self.assertEqual(len(response.data["balance_histories"]), 2)
+
+        order_ids = [item["order_id"] for item in history.data["results"]]
+        self.assertEqual(order_ids, ["TRF-NEW", "TRF-OLD"])
+
+    def test_reader_skips_segments_outside_window(self):
+        self.archive()
+        reader = LedgerArchiveReader(self.archive_dir)
+
+        with mock.patch.object(reader, "_read_segment", wraps=reader._read_segment) as read:
+            recent = reader.get_wallet_transactions(
+                self.sender_wallet.id, since=timezone.now() - timedelta(days=30)
+            )
+            self.assertEqual(list(recent), [])
+            # Période du manifest antérieure à la fenêtre : segment non relu
+            read.assert_not_called()
+
+            older = list(reader.get_wallet_transactions(self.sender_wallet.id))
+        self.assertEqual([transaction.order_id for transaction in older], ["TRF-OLD"])
+        self.assertEqual(read.call_count, 1)
+
+    def test_reader_pages_through_segments(self):
+        writer = LedgerArchiveWriter(timezone.now(), self.archive_dir)
+        for days in (30, 20, 10):
+            transaction = self.transfer(f"TRF-{days}", 1, 100, 100)
+            Transaction.objects.filter(id=transaction.id).update(
+                timestamp=timezone.now() - timedelta(days=days)
+            )
+            transaction.refresh_from_db()
+            writer.write_segment(
+                [transaction],
+                orders=[transaction.order_id],
+                wallets=[self.sender_wallet.id, self.receiver_wallet.id],
+            )
+        reader = LedgerArchiveReader(self.archive_dir)
+
+        with mock.patch.object(reader, "_read_segment", wraps=reader._read_segment) as read:
+            transactions = reader.get_wallet_transactions(self.sender_wallet.id)
+            # Total lu dans le manifest, première page lue dans un seul segment
+            self.assertEqual(len(transactions), 3)
+            read.assert_not_called()
+            page = transactions[0:1]
+        self.assertEqual([transaction.order_id for transaction in page], ["TRF-10"])
+        self.assertEqual(read.call_count, 1)
+
+    def test_corrupted_segment_is_ignored(self):
+        self.archive()
+        manifest = next(iter(glob.glob(os.path.join(self.archive_dir, "*", "manifest.json"))))
+        segment = os.path.join(os.path.dirname(manifest), "segment-00001.jsonl.gz")
+        with open(segment, "ab") as f:
+            f.write(b"corrupted")
+
+        self.assertIsNone(LedgerArchiveReader(self.archive_dir).get_transaction("TRF-OLD"))
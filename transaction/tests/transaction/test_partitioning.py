@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from actor.models import CustomUser, Wallet
+from transaction.models import WalletBalanceCheckpoint, WalletBalanceHistory
+from transaction.services.partitioning import MonthPartition, PartitionService
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitionnement disponible uniquement sur PostgreSQL")
+class PartitionServiceTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="test_user")
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="1234567890")
+
+    def test_tables_are_partitioned(self):
+        with connection.cursor() as cursor:
+            for table in PartitionService.TABLES:
+                self.assertTrue(PartitionService.is_partitioned(cursor, table))
+
+    def test_ensure_partitions_is_idempotent(self):
+        future = date.today() + timedelta(days=400)
+        with connection.cursor() as cursor:
+            created = PartitionService.ensure_partitions(
+                cursor, "transaction_walletbalancehistory", 0, today=future
+            )
+            self.assertEqual(len(created), 1)
+            self.assertEqual(
+                PartitionService.ensure_partitions(
+                    cursor, "transaction_walletbalancehistory", 0, today=future
+                ),
+                [],
+            )
+
+    def test_latest_balance_blocks_detach(self):
+        entry = WalletBalanceHistory.objects.create(
+            wallet=self.wallet, balance_before=0, balance_after=100, transaction_type="INIT"
+        )
+        month = PartitionService.month_start(timezone.now())
+        partition = MonthPartition(
+            "transaction_walletbalancehistory",
+            PartitionService.partition_name("transaction_walletbalancehistory", month),
+            month,
+            PartitionService.add_months(month, 1),
+        )
+
+        with connection.cursor() as cursor:
+            blockers = PartitionService.detach_blockers(cursor, partition)
+        # Dernier solde du wallet, et aucun checkpoint archivé ne couvre l'entrée
+        self.assertEqual(len(blockers), 2)
+
+        WalletBalanceCheckpoint.objects.create(
+            wallet=self.wallet, balance=100, last_history_id=entry.id, archived=True
+        )
+        with connection.cursor() as cursor:
+            blockers = PartitionService.detach_blockers(cursor, partition)
+        self.assertEqual(len(blockers), 1)
@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from django.test import TestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.models import (
+    Fee,
+    FeeDistribution,
+    TariffGrid,
+    Transaction,
+    WalletBalanceHistory,
+)
+from transaction.services.reconciliation import TransactionReconciliationService
+from transaction.services.transaction import TransactionService
+
+
+class TransactionReconciliationServiceTests(TestCase):
+    def setUp(self):
+        user = CustomUser.objects.create_user(username="client", password="password123")
+        self.wallet = Wallet.objects.create(user=user, phone_number="770000001")
+        platform_user = CustomUser.objects.create_user(username="platform", password="password123")
+        self.platform_wallet = Wallet.objects.create(
+            user=platform_user, phone_number="799999999", is_platform=True
+        )
+        grid = TariffGrid.objects.create(name="Standard")
+        Fee.objects.create(
+            tariff_grid=grid,
+            transaction_type="TOPUP",
+            min_amount=Decimal("1.00"),
+            max_amount=Decimal("1000000.00"),
+            fixed_amount=Decimal("25.00"),
+        )
+        WalletBalanceHistory.objects.create(
+            wallet=self.wallet, balance_before=0, balance_after=Decimal("1000.00")
+        )
+
+    def balance(self, wallet):
+        return WalletBalanceHistory.objects.filter(wallet=wallet).latest("timestamp", "id").balance_after
+
+    def test_success_credits_topups_and_applies_fees(self):
+        topups = [
+            TransactionService.create_pending_transaction(
+                None, self.wallet, "TOPUP", Decimal("500.00"), "Rechargement VIA wave"
+            )
+            for _ in range(3)
+        ]
+        topups[2].status = "SUCCESS"
+        topups[2].save()
+
+        result = TransactionReconciliationService.bulk_transition(
+            [t.id for t in topups], "SUCCESS", batch_size=2
+        )
+
+        self.assertEqual(result["transitioned"], 2)
+        self.assertEqual(result["skipped"], 1)
+        self.assertEqual(self.balance(self.wallet), Decimal("1950.00"))
+        self.assertEqual(self.balance(self.platform_wallet), Decimal("50.00"))
+        self.assertEqual(
+            list(Transaction.objects.order_by("id").values_list("fee_applied", flat=True)),
+            [Decimal("25.00"), Decimal("25.00"), Decimal("0.00")],
+        )
+        self.assertEqual(FeeDistribution.objects.count(), 2)
+
+        # Une seconde passe ne reposte rien
+        again = TransactionReconciliationService.bulk_transition([t.id for t in topups], "SUCCESS")
+        self.assertEqual(again["transitioned"], 0)
+        self.assertEqual(self.balance(self.wallet), Decimal("1950.00"))
+
+    def test_failure_reverses_partner_transfer_debit(self):
+        transfer = TransactionService.create_pending_transaction(
+            self.wallet, None, "TRANSFER", Decimal("300.00"), "Transfer VIA wave à 770000002"
+        )
+        TransactionService.debit_wallet(self.wallet, transfer.amount, transfer, transfer.description)
+        self.assertEqual(self.balance(self.wallet), Decimal("700.00"))
+
+        result = TransactionReconciliationService.bulk_transition([transfer.id], "FAILED")
+
+        transfer.refresh_from_db()
+        self.assertEqual(result["entries"], 1)
+        self.assertEqual(transfer.status, "FAILED")
+        self.assertEqual(self.balance(self.wallet), Decimal("1000.00"))
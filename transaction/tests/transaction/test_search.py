@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from actor.models import CustomUser, Merchant, Wallet
+from transaction.models import Transaction
+
+
+class StaffSearchViewTests(APITestCase):
+    def setUp(self):
+        self.staff = CustomUser.objects.create_user(
+            username="support", password="password123", is_staff=True
+        )
+        user = CustomUser.objects.create_user(
+            username="770012345", password="password123", first_name="Awa", last_name="Diop"
+        )
+        self.wallet = Wallet.objects.create(user=user, phone_number="770012345")
+        Merchant.objects.create(
+            wallet=self.wallet, merchant_code="BOUT01", business_name="Boutique Diop", address=""
+        )
+        Transaction.objects.create(
+            sender=self.wallet,
+            transaction_type="TRANSFER",
+            amount=Decimal("100.00"),
+            order_id="PLZ-20251031-123-456-ABC",
+            external_reference="WAVE-98765",
+        )
+        self.url = reverse("staff-search")
+
+    def test_partial_search_across_types(self):
+        self.client.force_authenticate(user=self.staff)
+
+        response = self.client.get(self.url, {"q": "456-ab"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t["order_id"] for t in response.data["transactions"]], ["PLZ-20251031-123-456-ABC"]
+        )
+
+        response = self.client.get(self.url, {"q": "0012", "type": "wallets"})
+        self.assertEqual([w["phone_number"] for w in response.data["wallets"]], ["770012345"])
+        self.assertNotIn("transactions", response.data)
+
+        response = self.client.get(self.url, {"q": "boutique"})
+        self.assertEqual([m["merchant_code"] for m in response.data["merchants"]], ["BOUT01"])
+
+        # Moins de 3 caractères : correspondance exacte seulement
+        response = self.client.get(self.url, {"q": "77"})
+        self.assertEqual(response.data["wallets"], [])
+
+    def test_requires_staff(self):
+        user = CustomUser.objects.create_user(username="client", password="password123")
+        self.client.force_authenticate(user=user)
+        self.assertEqual(
+            self.client.get(self.url, {"q": "PLZ"}).status_code, status.HTTP_403_FORBIDDEN
+        )
@@ -0,0 +1,90 @@
+import csv
+import json
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from actor.models import CustomUser, Wallet
+from transaction.models import Transaction, WalletBalanceHistory
+
+
+class StatementExportViewTest(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="user1", password="password123")
+        self.other = CustomUser.objects.create_user(username="user2", password="password123")
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="1234567890")
+        self.other_wallet = Wallet.objects.create(user=self.other, phone_number="0987654321")
+
+        transaction = Transaction.objects.create(
+            order_id="TRF-1",
+            sender=self.wallet,
+            receiver=self.other_wallet,
+            transaction_type="TRANSFER",
+            amount=Decimal("30.00"),
+            status="SUCCESS",
+        )
+        WalletBalanceHistory.objects.create(
+            wallet=self.wallet, balance_before=0, balance_after=100, transaction_type="INIT"
+        )
+        WalletBalanceHistory.objects.create(
+            wallet=self.wallet,
+            balance_before=100,
+            balance_after=70,
+            transaction_type="DEBIT",
+            transaction=transaction,
+        )
+        WalletBalanceHistory.objects.create(
+            wallet=self.other_wallet,
+            balance_before=0,
+            balance_after=30,
+            transaction_type="CREDIT",
+            transaction=transaction,
+        )
+
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date().isoformat()
+
+    def export(self, **params):
+        return self.client.get(
+            reverse("wallet-statement"), {"start": self.today, "end": self.today, **params}
+        )
+
+    def test_csv_statement(self):
+        response = self.export()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2][1], "TRF-1")
+        self.assertEqual(Decimal(rows[2][5]), Decimal("-30.00"))
+
+    def test_jsonl_statement(self):
+        response = self.export(file_format="jsonl")
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        entries = [json.loads(line) for line in lines]
+        self.assertEqual([entry["entry_type"] for entry in entries], ["INIT", "DEBIT"])
+        self.assertEqual(entries[1]["receiver_phone"], "0987654321")
+
+    def test_invalid_period(self):
+        response = self.export(end="2000-01-01")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["code"], "INVALID_PERIOD")
+
+    async def test_statement_streams_asynchronously_under_asgi(self):
+        # Sous ASGI, le flux est un itérateur asynchrone : pas de lecture complète avant l'envoi
+        response = await self.async_client.get(
+            reverse("wallet-statement"),
+            {"start": self.today, "end": self.today, "file_format": "jsonl"},
+            headers={"Authorization": f"Bearer {AccessToken.for_user(self.user)}"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 2)
@@ -0,0 +1,91 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import ValidationError
+
+from actor.models import CustomUser, Wallet
+from transaction.models import (
+    Fee,
+    FeeRevenueDaily,
+    Transaction,
+    TransactionStatus,
+    WalletBalanceHistory,
+    WalletDailySummary,
+)
+from transaction.services.transfer_engine import SqlTransferEngine
+
+
+@skipUnless(connection.vendor == "postgresql", "Moteur SQL disponible uniquement sur PostgreSQL")
+@override_settings(TRANSFER_ENGINE="sql")
+class SqlTransferEngineTests(TestCase):
+    def setUp(self):
+        self.sender = CustomUser.objects.create(username="sender")
+        self.receiver = CustomUser.objects.create(username="receiver")
+        self.sender_wallet = Wallet.objects.create(user=self.sender, phone_number="1234567890")
+        self.receiver_wallet = Wallet.objects.create(user=self.receiver, phone_number="0987654321")
+
+        WalletBalanceHistory.objects.create(
+            wallet=self.sender_wallet, balance_before=0, balance_after=100, transaction_type="INIT"
+        )
+        WalletBalanceHistory.objects.create(
+            wallet=self.receiver_wallet, balance_before=0, balance_after=50, transaction_type="INIT"
+        )
+
+    def get_wallet_balance(self, wallet):
+        return WalletBalanceHistory.objects.filter(wallet=wallet).latest("timestamp").balance_after
+
+    def test_internal_transfer(self):
+        transaction = SqlTransferEngine.execute_internal_transfer(
+            self.sender, self.sender_wallet, "receiver", Decimal("30.00")
+        )
+
+        stored = Transaction.objects.get(id=transaction.id)
+        self.assertEqual(stored.status, TransactionStatus.SUCCESS.value)
+        self.assertEqual(stored.receiver, self.receiver_wallet)
+        self.assertEqual(self.get_wallet_balance(self.sender_wallet), Decimal("70.00"))
+        self.assertEqual(self.get_wallet_balance(self.receiver_wallet), Decimal("80.00"))
+        self.assertEqual(transaction.balance_after_operation, Decimal("70.00"))
+
+    def test_internal_transfer_updates_daily_summaries(self):
+        transaction = SqlTransferEngine.execute_internal_transfer(
+            self.sender, self.sender_wallet, "receiver", Decimal("30.00")
+        )
+
+        sender = WalletDailySummary.objects.get(wallet=self.sender_wallet, transaction_type="TRANSFER")
+        receiver = WalletDailySummary.objects.get(
+            wallet=self.receiver_wallet, transaction_type="TRANSFER"
+        )
+        self.assertEqual(sender.day, transaction.timestamp.date())
+        self.assertEqual((sender.tx_count, sender.outflow), (1, Decimal("30.00")))
+        self.assertEqual((receiver.tx_count, receiver.inflow), (1, Decimal("30.00")))
+
+    def test_fee_updates_daily_revenue(self):
+        Wallet.objects.create(
+            user=CustomUser.objects.create(username="platform"),
+            phone_number="0000000000",
+            is_platform=True,
+        )
+        Fee.objects.create(
+            transaction_type="TRANSFER", min_amount=0, max_amount=1000, fixed_amount=2
+        )
+
+        SqlTransferEngine.execute_internal_transfer(
+            self.sender, self.sender_wallet, "receiver", Decimal("30.00")
+        )
+
+        revenue = FeeRevenueDaily.objects.get(actor_type="provider", actor_id=0)
+        self.assertEqual((revenue.distributions_count, revenue.amount), (1, Decimal("2.00")))
+
+    def test_insufficient_funds(self):
+        with self.assertRaises(ValidationError):
+            SqlTransferEngine.execute_internal_transfer(
+                self.sender, self.sender_wallet, "receiver", Decimal("200.00")
+            )
+
+    def test_unknown_receiver(self):
+        with self.assertRaises(Wallet.DoesNotExist):
+            SqlTransferEngine.execute_internal_transfer(
+                self.sender, self.sender_wallet, "nobody", Decimal("10.00")
+            )
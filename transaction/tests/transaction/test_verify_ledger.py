@@ -0,0 +1,47 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from actor.models import CustomUser, Wallet
+from transaction.models import WalletBalanceHistory
+
+
+class VerifyLedgerCommandTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create(username="test_user")
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="1234567890")
+
+        self.add_entry(0, 500)
+        self.add_entry(500, 400)
+
+    def add_entry(self, before, after):
+        return WalletBalanceHistory.objects.create(
+            wallet=self.wallet,
+            balance_before=Decimal(before),
+            balance_after=Decimal(after),
+            transaction_type="credit" if after > before else "debit",
+        )
+
+    def test_consistent_ledger(self):
+        out = StringIO()
+        call_command("verify_ledger", workers=1, stdout=out)
+
+        self.assertIn("Ledger OK", out.getvalue())
+
+    def test_broken_chain_is_reported_and_rebuilt(self):
+        broken = self.add_entry(420, 470)
+        last = self.add_entry(470, 450)
+
+        with self.assertRaises(CommandError):
+            call_command("verify_ledger", workers=1, stdout=StringIO())
+
+        call_command("verify_ledger", workers=1, rebuild=True, stdout=StringIO())
+
+        broken.refresh_from_db()
+        last.refresh_from_db()
+        self.assertEqual(broken.balance_before, Decimal("400.00"))
+        self.assertEqual(broken.balance_after, Decimal("450.00"))
+        self.assertEqual(last.balance_after, Decimal("430.00"))
@@ -0,0 +1,87 @@
+import asyncio
+
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from actor.models import CustomUser, Wallet
+from transaction.models import WalletBalanceHistory
+from transaction.services.wallet_events import wallet_event_hub
+
+
+# Le flux lit la base depuis d'autres threads (db_call) : les données de
+# test doivent être validées, d'où TransactionTestCase
+class WalletEventsViewTest(TransactionTestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username="770000001", password="password123")
+        self.wallet = Wallet.objects.create(user=self.user, phone_number="770000001")
+        WalletBalanceHistory.objects.create(
+            wallet=self.wallet, balance_before=0, balance_after=1000, transaction_type="TOPUP"
+        )
+        self.url = reverse("wallet-events")
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_stream_sends_balance_then_wallet_events(self):
+        response = await self.async_client.get(self.url, {"token": self.token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = response.streaming_content
+        try:
+            self.assertTrue((await anext(stream)).startswith(b"retry:"))
+            snapshot = await anext(stream)
+            self.assertIn(b"event: balance", snapshot)
+            self.assertIn(b'"balance": "1000.00"', snapshot)
+
+            # Événements NOTIFY : seuls ceux du wallet sont remis, sans la liste des wallets
+            wallet_event_hub.publish(
+                {"event": "transaction", "wallets": [self.wallet.id + 1], "order_id": "TRF-0"}
+            )
+            wallet_event_hub.publish(
+                {
+                    "event": "transaction",
+                    "wallets": [self.wallet.id, self.wallet.id + 1],
+                    "order_id": "TRF-1",
+                    "status": "SUCCESS",
+                }
+            )
+            event = await anext(stream)
+            self.assertIn(b"event: transaction", event)
+            self.assertIn(b'"order_id": "TRF-1"', event)
+            self.assertNotIn(b"wallets", event)
+
+            # Déconnexion du client : le serveur ASGI annule la lecture en cours
+            pending = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            pending.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await pending
+            self.assertEqual(wallet_event_hub.subscriber_count(), 0)
+        finally:
+            await stream.aclose()
+
+    async def test_requires_token(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get(
+            self.url,
+            headers={"Authorization": f"Bearer {self.token}", "Accept": "text/event-stream"},
+        )
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.aclose()
+
+    def test_requires_asgi(self):
+        response = self.client.get(self.url, {"token": self.token})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_hub_keeps_other_loops_subscribers(self):
+        async with wallet_event_hub.subscribe(self.wallet.id):
+            # Un flux ouvert sur une autre boucle ne réinitialise pas celle-ci
+            await asyncio.to_thread(asyncio.run, self._subscribe_briefly())
+            self.assertEqual(wallet_event_hub.subscriber_count(), 1)
+        self.assertEqual(wallet_event_hub.subscriber_count(), 0)
+
+    async def _subscribe_briefly(self):
+        async with wallet_event_hub.subscribe(self.wallet.id + 1):
+            self.assertEqual(wallet_event_hub.subscriber_count(), 2)
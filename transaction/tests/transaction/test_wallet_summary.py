@@ -0,0 +1,74 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from actor.models import CustomUser, Wallet
+from transaction.models import Transaction, WalletBalanceHistory, WalletDailySummary
+from transaction.services.transaction import TransactionService
+from transaction.services.wallet_summary import WalletSummaryService
+
+
+class WalletSummaryServiceTests(TestCase):
+    def setUp(self):
+        self.sender = CustomUser.objects.create(username="sender")
+        self.receiver = CustomUser.objects.create(username="receiver")
+        self.sender_wallet = Wallet.objects.create(user=self.sender, phone_number="1234567890")
+        self.receiver_wallet = Wallet.objects.create(user=self.receiver, phone_number="0987654321")
+        self.today = timezone.localdate()
+        # Entrées d'initialisation créées avec chaque wallet (inscription)
+        for wallet in (self.sender_wallet, self.receiver_wallet):
+            WalletBalanceHistory.objects.create(
+                wallet=wallet, balance_before=0, balance_after=0, transaction_type="INIT"
+            )
+
+    def transfer(self, amount, fee):
+        transaction = Transaction.objects.create(
+            sender=self.sender_wallet,
+            receiver=self.receiver_wallet,
+            transaction_type="TRANSFER",
+            amount=Decimal(amount),
+        )
+        TransactionService.debit_wallet(self.sender_wallet, amount, transaction)
+        TransactionService.credit_wallet(self.receiver_wallet, amount, transaction)
+        TransactionService.debit_wallet(
+            self.sender_wallet, fee, transaction, "Frais de transaction"
+        )
+
+    def test_entries_are_recorded_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transfer(100, 1)
+            self.transfer(50, 1)
+
+        totals = WalletSummaryService.get_period_totals(
+            self.sender_wallet, self.today, self.today
+        )
+        self.assertEqual(totals["tx_count"], 2)
+        self.assertEqual(totals["outflow"], Decimal("150.00"))
+        self.assertEqual(totals["fees"], Decimal("2.00"))
+
+    def test_backfill_matches_incremental_updates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.transfer(100, 1)
+        incremental = list(
+            WalletDailySummary.objects.order_by("wallet_id").values(
+                "wallet_id", "transaction_type", "tx_count", "inflow", "outflow", "fees"
+            )
+        )
+
+        WalletDailySummary.objects.all().delete()
+        call_command(
+            "backfill_wallet_summaries",
+            start=self.today.isoformat(),
+            end=self.today.isoformat(),
+            stdout=StringIO(),
+        )
+
+        rebuilt = list(
+            WalletDailySummary.objects.order_by("wallet_id").values(
+                "wallet_id", "transaction_type", "tx_count", "inflow", "outflow", "fees"
+            )
+        )
+        self.assertEqual(rebuilt, incremental)
@@ -1,19 +1,28 @@
 from django.urls import path
 from transaction.views.calculate_fees import CalculateFeesView
-from transaction.views.send_money import SendMoneyView
-from transaction.views.merchant_payment import MerchantPaymentView
+from transaction.views.send_money import SendMoneyView, AsyncSendMoneyView
+from transaction.views.bulk_send_money import BulkSendMoneyView
+from transaction.views.merchant_payment import MerchantPaymentView, AsyncMerchantPaymentView
 from transaction.views.merchant_initiated_payment import MerchantInitiatedPaymentView
 from transaction.views.webhooks import DjamoWebhookView
 
 from transaction.views.history import TransactionHistoryView
-from transaction.views.topup import TopUpView
+from transaction.views.topup import TopUpView, AsyncTopUpView
 from transaction.views.balance import BalanceView
+from transaction.views.events import WalletEventsView
 from transaction.views.transaction_detail import TransactionDetailView
+from transaction.views.statement import StatementExportView
+from transaction.views.summary import WalletSummaryView
+from transaction.views.fee_reports import FeePayoutListView, FeePayoutStatementView
+from transaction.views.search import StaffSearchView
 
 urlpatterns = [
     path(
         "send-money/", SendMoneyView.as_view(), name="send-money"
     ),  # URL pour envoyer de l'argent
+    path(
+        "send-money/bulk/", BulkSendMoneyView.as_view(), name="send-money-bulk"
+    ),  # URL pour les virements groupés (paie, cash-back)
     path(
         "merchant-payment/", MerchantPaymentView.as_view(), name="merchant-payment"
     ),  # URL pour les paiements marchands (client paie le marchand)
@@ -28,12 +37,39 @@ urlpatterns = [
     ),  # URL pour le détail d'une transaction
     path("wallet/topup/", TopUpView.as_view(), name="wallet-topup"),
 
+    # Variantes asynchrones des appels partenaires (servies en ASGI)
+    path("wallet/topup/async/", AsyncTopUpView.as_view(), name="wallet-topup-async"),
+    path("send-money/async/", AsyncSendMoneyView.as_view(), name="send-money-async"),
+    path(
+        "merchant-payment/async/", AsyncMerchantPaymentView.as_view(), name="merchant-payment-async"
+    ),
+
     # URL pour demander le solde du portefeuille
     path("wallet/balance/", BalanceView.as_view(), name="wallet-balance"),
+
+    # Flux temps réel (SSE) des soldes et statuts de transaction
+    path("wallet/events/", WalletEventsView.as_view(), name="wallet-events"),
+
+    # Export du relevé (CSV / JSONL en flux continu)
+    path("wallet/statement/", StatementExportView.as_view(), name="wallet-statement"),
+
+    # Totaux du portefeuille sur une période (agrégats journaliers)
+    path("wallet/summary/", WalletSummaryView.as_view(), name="wallet-summary"),
     
     # Frais de transaction
     path("calculate-fees/", CalculateFeesView.as_view(), name="calculate-fees"),
 
+    # Reversements de frais (staff)
+    path("fees/payouts/", FeePayoutListView.as_view(), name="fee-payouts"),
+    path(
+        "fees/payouts/<str:actor_type>/<int:actor_id>/",
+        FeePayoutStatementView.as_view(),
+        name="fee-payout-statement",
+    ),
+
+    # Recherche du support (staff)
+    path("search/", StaffSearchView.as_view(), name="staff-search"),
+
     # Webhooks
     path("webhooks/djamo/", DjamoWebhookView.as_view(), name="djamo-webhook"),
 ]
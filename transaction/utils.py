@@ -2,11 +2,13 @@ EXTERNAL_REFERENCE_EXTRACTORS = {
     "djamo": lambda response: response.get("id"),
     "wave": lambda response: response.get("body", {}).get("id"),
     "orange_money": lambda response: response.get("body", {}).get("id"),
+    "samir": lambda response: response.get("body", {}).get("id"),
 }
 
 
-def get_external_reference(partner: str, response: dict):
-    extractor = EXTERNAL_REFERENCE_EXTRACTORS.get(partner.lower())
+def get_external_reference(partner: str, response: dict, gateway: str = None):
+    # Le format de réponse dépend de la passerelle qui a porté l'appel
+    extractor = EXTERNAL_REFERENCE_EXTRACTORS.get((gateway or partner).lower())
     if not extractor:
         raise ValueError(f"Unsupported partner: {partner}")
     return extractor(response)
@@ -36,7 +36,7 @@ class BalanceView(APIView):
         user = request.user
 
         try:
-            wallet = Wallet.objects.get(user=user)
+            wallet = user.wallet
         except Wallet.DoesNotExist:
             return Response(
                 {"detail": "Aucun portefeuille associé à cet utilisateur."},
@@ -45,7 +45,7 @@ class BalanceView(APIView):
 
         latest_history = (
             WalletBalanceHistory.objects.filter(wallet=wallet)
-            .order_by("-timestamp")
+            .order_by("-timestamp", "-id")
             .first()
         )
         history_data = (
@@ -0,0 +1,170 @@
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from actor.models import Wallet
+from transaction.serializers import BulkSendMoneySerializer
+from services.throttling import TransactionRateThrottle
+from services.firebase import firebase_service
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BulkSendMoneyView(APIView):
+    """Virements internes groupés : paie, cash-back, reversements"""
+
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [TransactionRateThrottle]
+
+    @swagger_auto_schema(
+        operation_description="Envoyer de l'argent à plusieurs destinataires en un seul appel (transferts internes)",
+        request_body=BulkSendMoneySerializer,
+        responses={
+            201: openapi.Response(
+                description="Lot traité, statut par ligne",
+                examples={
+                    "application/json": {
+                        "accepted": 2,
+                        "rejected": 2,
+                        "total_amount": "15000.00",
+                        "total_fees": "150.00",
+                        "balance_after_operation": "34850.00",
+                        "items": [
+                            {
+                                "index": 0,
+                                "receiver": "770000001",
+                                "amount": "10000.00",
+                                "status": "SUCCESS",
+                                "reference": "PLZ-20251031-123-456-ABC",
+                                "fee": "100.00"
+                            },
+                            {
+                                "index": 1,
+                                "receiver": "770000002",
+                                "amount": "5000.00",
+                                "status": "SUCCESS",
+                                "reference": "PLZ-20251031-789-012-DEF",
+                                "fee": "50.00"
+                            },
+                            {
+                                "index": 2,
+                                "receiver": "770000099",
+                                "amount": "2000.00",
+                                "status": "REJECTED",
+                                "code": "WALLET_NOT_FOUND_ERROR",
+                                "detail": "Le portefeuille du destinataire n'existe pas."
+                            },
+                            {
+                                "index": 3,
+                                "receiver": "770000003",
+                                "status": "REJECTED",
+                                "code": "INVALID_AMOUNT",
+                                "detail": "Un nombre valide est requis."
+                            }
+                        ]
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="Fonds insuffisants pour le total du lot, liste items absente ou vide",
+                examples={
+                    "application/json": {
+                        "detail": "Fonds insuffisants.",
+                        "code": "INSUFFICIENT_FUNDS_ERROR"
+                    }
+                }
+            ),
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        try:
+            serializer = BulkSendMoneySerializer(
+                data=request.data, context={"request": request}
+            )
+            if not serializer.is_valid():
+                field, messages = next(iter(serializer.errors.items()))
+                response_data = {
+                    "detail": messages[0] if isinstance(messages, list) else messages,
+                    "code": field.upper() if field else "VALIDATION_ERROR",
+                }
+                logger.error(f"Validation error: {response_data}")
+                return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+            summary = serializer.save()
+
+        except ValidationError as e:
+            detail = e.detail[0] if isinstance(e.detail, list) else e.detail
+            response_data = {
+                "detail": str(detail),
+                "code": getattr(detail, "code", "VALIDATION_ERROR").upper(),
+            }
+            logger.error(f"Validation error: {response_data}")
+            return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error in BulkSendMoneyView: {str(e)}")
+            return Response(
+                {"detail": str(e), "code": "TRANSACTION_FAILED"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        transactions = summary.pop("transactions")
+        if transactions:
+            self.send_notifications(request.user, summary, transactions)
+
+        for item in summary["items"]:
+            for key in ("amount", "fee"):
+                if key in item:
+                    item[key] = str(item[key])
+        for key in ("total_amount", "total_fees", "balance_after_operation"):
+            summary[key] = str(summary[key])
+
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+    def send_notifications(self, user, summary, transactions):
+        # Notification FCM - sender (une seule pour le lot)
+        firebase_service.queue_transaction_notification(
+            fcm_token=getattr(user, "fcm_token", None),
+            action="send_money",
+            status="success",
+            title="Envoi groupé effectué",
+            message=(
+                f"{summary['accepted']} envois pour un total de "
+                f"{summary['total_amount']} FCFA"
+            ),
+            transaction_data={
+                "amount": float(summary["total_amount"]),
+                "count": summary["accepted"],
+            },
+        )
+
+        # Notification FCM - receivers ayant un token (une requête et un INSERT pour tous)
+        tokens = dict(
+            Wallet.objects.filter(
+                id__in={transaction.receiver_id for transaction in transactions},
+                user__fcm_token__isnull=False,
+            )
+            .exclude(user__fcm_token="")
+            .values_list("id", "user__fcm_token")
+        )
+        firebase_service.queue_transaction_notifications([
+            dict(
+                fcm_token=tokens[transaction.receiver_id],
+                action="receive_money",
+                status="success",
+                title="Argent reçu",
+                message=f"Vous avez reçu {transaction.amount} FCFA",
+                transaction_data={
+                    "transaction_id": transaction.order_id,
+                    "amount": float(transaction.amount),
+                    "sender": transaction.sender.phone_number,
+                },
+            )
+            for transaction in transactions
+            if transaction.receiver_id in tokens
+        ])
@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from actor.models import Wallet
+from services.async_views import AsyncAPIView, db_call, is_asgi
+from services.authentication import QueryTokenJWTAuthentication
+from transaction.models import WalletBalanceHistory
+from transaction.services.wallet_events import wallet_event_hub
+
+
+def format_event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Négociation de contenu pour Accept: text/event-stream (EventSource) ;
+    seules les erreurs (401, 404...) passent par ce renderer, sous forme
+    d'un événement "error".
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event("error", data).encode(self.charset)
+
+
+class WalletEventsView(AsyncAPIView):
+    """
+    Flux server-sent events du wallet de l'utilisateur : remplace le
+    polling de wallet/balance/ et history/.
+
+    À la connexion, un événement "balance" donne le solde courant ; suivent
+    un événement "balance" par nouvelle entrée du grand livre et un
+    événement "transaction" (order_id, status, amount, transaction_type)
+    par création ou changement de statut d'une transaction du wallet, dès
+    leur commit (voir WalletEventHub). Un commentaire ": ping" est envoyé
+    toutes les HEARTBEAT_SECONDS pour garder la connexion ouverte.
+
+    Le jeton JWT est lu dans l'en-tête Authorization ou le paramètre
+    ?token= (EventSource). Le flux est fermé après MAX_STREAM_SECONDS :
+    le client se reconnecte (retry) avec un jeton à jour.
+
+    Servi uniquement en ASGI (uvicorn, voir docker-compose) : sous WSGI,
+    Django lirait tout le flux avant d'en envoyer le premier octet ; la vue
+    répond alors 501.
+    """
+
+    authentication_classes = [QueryTokenJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    HEARTBEAT_SECONDS = 15
+    MAX_STREAM_SECONDS = 3600
+    RETRY_MILLISECONDS = 3000
+
+    @swagger_auto_schema(
+        operation_description="Flux temps réel (SSE) des soldes et statuts de transaction du wallet",
+        manual_parameters=[
+            openapi.Parameter(
+                "token",
+                openapi.IN_QUERY,
+                description="Jeton JWT, si l'en-tête Authorization ne peut être envoyé (EventSource)",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={
+            200: "Flux text/event-stream (événements balance et transaction)",
+            404: "Aucun portefeuille associé à cet utilisateur",
+            501: "Application servie hors ASGI",
+        },
+    )
+    async def get(self, request):
+        if not is_asgi(request):
+            return Response(
+                {"detail": "Flux disponible uniquement sur le serveur ASGI."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+
+        try:
+            wallet = await db_call(lambda: request.user.wallet)
+        except Wallet.DoesNotExist:
+            return Response(
+                {"detail": "Aucun portefeuille associé à cet utilisateur."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        response = StreamingHttpResponse(self._stream(wallet), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # nginx : pas de mise en tampon, chaque événement part immédiatement
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    def _balance(wallet):
+        latest = (
+            WalletBalanceHistory.objects.filter(wallet=wallet)
+            .order_by("-timestamp", "-id")
+            .first()
+        )
+        return {
+            "balance": str(latest.balance_after) if latest else "0",
+            "transaction_type": latest.transaction_type if latest else None,
+            "timestamp": latest.timestamp if latest else None,
+        }
+
+    async def _stream(self, wallet):
+        deadline = time.monotonic() + self.MAX_STREAM_SECONDS
+        async with wallet_event_hub.subscribe(wallet.id) as queue:
+            yield f"retry: {self.RETRY_MILLISECONDS}\n\n"
+            yield format_event("balance", await db_call(self._balance, wallet))
+
+            while time.monotonic() < deadline:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+
+                name = event.pop("event")
+                if name == "resync":
+                    # Notifications perdues (reconnexion LISTEN) : solde courant
+                    yield format_event("balance", await db_call(self._balance, wallet))
+                else:
+                    yield format_event(name, event)
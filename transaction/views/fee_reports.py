@@ -0,0 +1,115 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from transaction.services.fee_revenue import FeeRevenueService
+
+
+PERIOD_PARAMETERS = [
+    openapi.Parameter(
+        "start",
+        openapi.IN_QUERY,
+        description="Premier jour (YYYY-MM-DD), défaut : début du mois",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+    openapi.Parameter(
+        "end",
+        openapi.IN_QUERY,
+        description="Dernier jour inclus (YYYY-MM-DD), défaut : aujourd'hui",
+        type=openapi.TYPE_STRING,
+        format=openapi.FORMAT_DATE,
+    ),
+]
+
+
+def get_period(request):
+    """Période demandée (start, end), ou None si elle est invalide."""
+    today = timezone.localdate()
+    try:
+        start = parse_date(request.query_params.get("start", "")) or today.replace(day=1)
+        end = parse_date(request.query_params.get("end", "")) or today
+    except ValueError:
+        return None
+    if start > end:
+        return None
+    return start, end
+
+
+INVALID_PERIOD = {"detail": "Période invalide.", "code": "INVALID_PERIOD"}
+
+
+class FeePayoutListView(APIView):
+    """Montants de frais dus à chaque acteur (staff uniquement)"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Reversements de frais par acteur sur une période (staff)",
+        manual_parameters=PERIOD_PARAMETERS
+        + [
+            openapi.Parameter(
+                "actor_type",
+                openapi.IN_QUERY,
+                description="provider, bank ou merchant",
+                type=openapi.TYPE_STRING,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Montants par acteur",
+                examples={
+                    "application/json": {
+                        "start": "2025-10-01",
+                        "end": "2025-10-31",
+                        "payouts": [
+                            {
+                                "actor_type": "bank",
+                                "actor_id": 3,
+                                "distributions_count": 1240,
+                                "amount": 31000.00
+                            }
+                        ]
+                    }
+                }
+            ),
+            400: "Période invalide",
+        },
+    )
+    def get(self, request):
+        period = get_period(request)
+        if period is None:
+            return Response(INVALID_PERIOD, status=status.HTTP_400_BAD_REQUEST)
+        start, end = period
+
+        payouts = FeeRevenueService.get_payouts(
+            start, end, request.query_params.get("actor_type")
+        )
+        return Response(
+            {"start": start, "end": end, "payouts": payouts}, status=status.HTTP_200_OK
+        )
+
+
+class FeePayoutStatementView(APIView):
+    """Relevé journalier des frais d'un acteur (staff uniquement)"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Relevé journalier des frais d'un acteur (staff)",
+        manual_parameters=PERIOD_PARAMETERS,
+        responses={200: "Relevé de l'acteur", 400: "Période invalide"},
+    )
+    def get(self, request, actor_type, actor_id):
+        period = get_period(request)
+        if period is None:
+            return Response(INVALID_PERIOD, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            FeeRevenueService.get_statement(actor_type, actor_id, *period),
+            status=status.HTTP_200_OK,
+        )
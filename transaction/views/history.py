@@ -2,9 +2,13 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from actor.models import Wallet
+from rest_framework.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, time
 from transaction.models import Transaction
-from transaction.serializers import TransactionSerializer
+from transaction.serializers import ArchivedTransactionSerializer, TransactionSerializer
+from transaction.services.ledger_archive import LedgerArchiveReader
 
 
 class TransactionHistoryView(generics.ListAPIView):
@@ -13,6 +17,21 @@ class TransactionHistoryView(generics.ListAPIView):
 
     @swagger_auto_schema(
         operation_description="Récupérer l'historique complet des transactions de l'utilisateur (envoyées et reçues)",
+        manual_parameters=[
+            openapi.Parameter(
+                "since",
+                openapi.IN_QUERY,
+                description="Limiter aux transactions depuis cette date (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+            ),
+            openapi.Parameter(
+                "include_archived",
+                openapi.IN_QUERY,
+                description="Inclure les transactions archivées (true/false)",
+                type=openapi.TYPE_BOOLEAN,
+            ),
+        ],
         responses={
             200: openapi.Response(
                 description="Liste des transactions",
@@ -57,12 +76,75 @@ class TransactionHistoryView(generics.ListAPIView):
     )
     def get_queryset(self):
         user = self.request.user
-        wallet = Wallet.objects.get(user=user)
+        self.wallet = user.wallet
         
         # Utiliser Q objects pour une requête unique et sécurisée
         from django.db.models import Q
         transactions = Transaction.objects.filter(
-            Q(sender=wallet) | Q(receiver=wallet)
-        ).distinct()
-        
+            Q(sender=self.wallet) | Q(receiver=self.wallet)
+        )
+
+        # Un filtre sur timestamp limite la lecture aux partitions concernées
+        since = self.get_since()
+        if since:
+            transactions = transactions.filter(timestamp__gte=since)
+
         return transactions.order_by('-timestamp')
+
+    def get_since(self):
+        since = self.request.query_params.get("since")
+        if not since:
+            return None
+        try:
+            since = parse_date(since)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({"since": "Date invalide (YYYY-MM-DD)."})
+        return timezone.make_aware(datetime.combine(since, time.min))
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("include_archived") not in ("1", "true"):
+            return super().list(request, *args, **kwargs)
+
+        # Les transactions archivées (plus anciennes) suivent celles en base
+        queryset = self.filter_queryset(self.get_queryset())
+        archived = LedgerArchiveReader().get_wallet_transactions(
+            self.wallet.id, since=self.get_since()
+        )
+        page = self.paginate_queryset(ChainedResults(queryset, archived))
+        context = self.get_serializer_context()
+        data = [
+            ArchivedTransactionSerializer(item, context=context).data
+            if hasattr(item, "archived_histories")
+            else self.get_serializer(item).data
+            for item in page
+        ]
+        return self.get_paginated_response(data)
+
+
+class ChainedResults:
+    """
+    Concatène un queryset et une séquence (transactions archivées) pour la
+    pagination : seules les lignes et segments de la page demandée sont lus.
+    """
+
+    def __init__(self, queryset, items):
+        self.queryset = queryset
+        self.items = items
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.queryset.count()
+        return self._count + len(self.items)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        live = self.count() - len(self.items)
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        results = list(self.queryset[start:stop]) if start < live else []
+        return results + self.items[max(start - live, 0):max(stop - live, 0)]
@@ -109,8 +109,8 @@ class MerchantInitiatedPaymentView(APIView):
             
             try:
                 # Récupérer le wallet et le profil marchand
-                merchant_wallet = Wallet.objects.get(user=user)
-                merchant = Merchant.objects.get(wallet=merchant_wallet)
+                merchant_wallet = user.wallet
+                merchant = merchant_wallet.merchant_wallet
                 
                 # Enrichir la description
                 full_description = f"Paiement chez {merchant.business_name} - {description}"
@@ -167,7 +167,7 @@ class MerchantInitiatedPaymentView(APIView):
                     
                     # Notification push FCM supplémentaire pour scan & pay
                     customer_fcm_token = getattr(customer_wallet.user, 'fcm_token', None)
-                    firebase_service.send_transaction_notification(
+                    firebase_service.queue_transaction_notification(
                         fcm_token=customer_fcm_token,
                         action="payment",
                         status="success",
@@ -4,9 +4,10 @@ from rest_framework.views import APIView
 from rest_framework import status
 
 from actor.models import Wallet, Merchant
-from transaction.errors import PaymentProcessingError
+from transaction.errors import PartnerUnavailableError, PaymentProcessingError
 from transaction.serializers import MerchantPaymentSerializer
 from transaction.merchants.service import MerchantPaymentService
+from services.async_views import AsyncAPIView, db_call
 from services.throttling import TransactionRateThrottle
 from services.firebase import firebase_service
 
@@ -22,7 +23,7 @@ class MerchantPaymentView(APIView):
     permission_classes = [IsAuthenticated]
     throttle_classes = [TransactionRateThrottle]
 
-    @swagger_auto_schema(
+    SCHEMA = dict(
         operation_description="Payer un marchand (Woyofal, Rapido, Airtime, etc.) via leur API spécifique",
         request_body=MerchantPaymentSerializer,
         responses={
@@ -59,6 +60,8 @@ class MerchantPaymentView(APIView):
             )
         }
     )
+
+    @swagger_auto_schema(**SCHEMA)
     def post(self, request, *args, **kwargs):
         sender = request.user
         serializer = MerchantPaymentSerializer(data=request.data)
@@ -69,68 +72,113 @@ class MerchantPaymentView(APIView):
             details = serializer.validated_data["details"]
 
             try:
-                sender_wallet = Wallet.objects.get(user=sender)
+                sender_wallet = sender.wallet
                 merchant = Merchant.objects.get(merchant_code=merchant_code)
 
                 response = MerchantPaymentService.process_payment(
                     merchant, sender_wallet, amount, details
                 )
-                
-                # Notification FCM - paiement marchand
-                firebase_service.send_transaction_notification(
-                    fcm_token=getattr(sender, "fcm_token", None),
-                    action="payment",
-                    status="success",
-                    title="Paiement marchand",
-                    message=f"Paiement de {amount} FCFA via {merchant_code}",
-                    transaction_data={
-                        "merchant_code": merchant_code,
-                        "amount": float(amount),
-                    },
-                )
+                return self._paid_response(sender, merchant_code, amount, response)
 
-                return Response(response, status=status.HTTP_200_OK)
-
-            except ValueError as e:
-                return Response(
-                    {"detail": str(e), "code": "VALUE_ERROR"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            except Merchant.DoesNotExist:
-                return Response(
-                    {
-                        "detail": "Le marchand spécifié n'existe pas.",
-                        "code": "MERCHANT_NOT_FOUND",
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-            except Wallet.DoesNotExist:
-                return Response(
-                    {
-                        "detail": "Le portefeuille de l'envoyeur n'existe pas.",
-                        "code": "WALLET_NOT_FOUND",
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-            except PaymentProcessingError as e:
-                logger.error(f"Payment processing error: {str(e)}")
-                return Response(
-                    {"detail": str(e), "code": "PAYMENT_PROCESSING_ERROR"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
+            except PartnerUnavailableError:
+                # Réponse 503 PARTNER_BUSY via le gestionnaire d'exceptions DRF
+                raise
             except Exception as e:
-                logger.error(f"Unexpected error in merchant payment: {str(e)}")
-                return Response(
-                    {
-                        "detail": f"Une erreur inattendue est survenue: {str(e)}",
-                        "code": "INTERNAL_SERVER_ERROR",
-                    },
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                )
+                return self._error_response(e)
+
+        return self._invalid_response(serializer)
+
+    def _paid_response(self, sender, merchant_code, amount, response):
+        # Notification FCM - paiement marchand
+        firebase_service.queue_transaction_notification(
+            fcm_token=getattr(sender, "fcm_token", None),
+            action="payment",
+            status="success",
+            title="Paiement marchand",
+            message=f"Paiement de {amount} FCFA via {merchant_code}",
+            transaction_data={
+                "merchant_code": merchant_code,
+                "amount": float(amount),
+            },
+        )
 
+        return Response(response, status=status.HTTP_200_OK)
+
+    def _error_response(self, e):
+        if isinstance(e, ValueError):
+            return Response(
+                {"detail": str(e), "code": "VALUE_ERROR"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if isinstance(e, Merchant.DoesNotExist):
+            return Response(
+                {
+                    "detail": "Le marchand spécifié n'existe pas.",
+                    "code": "MERCHANT_NOT_FOUND",
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if isinstance(e, Wallet.DoesNotExist):
+            return Response(
+                {
+                    "detail": "Le portefeuille de l'envoyeur n'existe pas.",
+                    "code": "WALLET_NOT_FOUND",
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if isinstance(e, PaymentProcessingError):
+            logger.error(f"Payment processing error: {str(e)}")
+            return Response(
+                {"detail": str(e), "code": "PAYMENT_PROCESSING_ERROR"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        logger.error(f"Unexpected error in merchant payment: {str(e)}")
+        return Response(
+            {
+                "detail": f"Une erreur inattendue est survenue: {str(e)}",
+                "code": "INTERNAL_SERVER_ERROR",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    def _invalid_response(self, serializer):
         # Renvoie les erreurs du serializer avec détail et code
         field, messages = next(iter(serializer.errors.items()))
         return Response(
             {"detail": messages[0], "code": field.upper() + "_ERROR"},
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+
+class AsyncMerchantPaymentView(AsyncAPIView, MerchantPaymentView):
+    """
+    Variante asynchrone de MerchantPaymentView (ASGI) : l'appel à l'API du
+    service marchand est attendu sans bloquer de thread
+    (MerchantPaymentService.aprocess_payment).
+    """
+
+    @swagger_auto_schema(**MerchantPaymentView.SCHEMA)
+    async def post(self, request, *args, **kwargs):
+        sender = request.user
+        serializer = MerchantPaymentSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return self._invalid_response(serializer)
+
+        merchant_code = serializer.validated_data["merchant_code"]
+        amount = serializer.validated_data["amount"]
+        details = serializer.validated_data["details"]
+
+        try:
+            sender_wallet = await db_call(lambda: sender.wallet)
+            merchant = await db_call(Merchant.objects.get, merchant_code=merchant_code)
+
+            response = await MerchantPaymentService.aprocess_payment(
+                merchant, sender_wallet, amount, details
+            )
+            return await db_call(self._paid_response, sender, merchant_code, amount, response)
+
+        except PartnerUnavailableError:
+            raise
+        except Exception as e:
+            return self._error_response(e)
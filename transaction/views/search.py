@@ -0,0 +1,113 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from transaction.services.search import SearchService
+
+
+def transaction_result(transaction):
+    return {
+        "order_id": transaction.order_id,
+        "external_reference": transaction.external_reference,
+        "transaction_type": transaction.transaction_type,
+        "status": transaction.status,
+        "amount": transaction.amount,
+        "sender": transaction.sender.phone_number if transaction.sender else None,
+        "receiver": transaction.receiver.phone_number if transaction.receiver else None,
+        "timestamp": transaction.timestamp,
+    }
+
+
+def wallet_result(wallet):
+    return {
+        "id": wallet.id,
+        "phone_number": wallet.phone_number,
+        "name": f"{wallet.user.first_name} {wallet.user.last_name}".strip(),
+        "is_active": wallet.user.is_active,
+        "currency": wallet.currency,
+    }
+
+
+def merchant_result(merchant):
+    return {
+        "id": merchant.id,
+        "merchant_code": merchant.merchant_code,
+        "business_name": merchant.business_name,
+        "phone_number": merchant.wallet.phone_number if merchant.wallet else None,
+    }
+
+
+SEARCHES = {
+    "transactions": (SearchService.search_transactions, transaction_result),
+    "wallets": (SearchService.search_wallets, wallet_result),
+    "merchants": (SearchService.search_merchants, merchant_result),
+}
+
+
+class StaffSearchView(APIView):
+    """Recherche partielle du support : transactions, wallets, marchands (staff uniquement)"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="Recherche partielle par order_id, référence externe, téléphone ou nom commercial (staff)",
+        manual_parameters=[
+            openapi.Parameter(
+                "q",
+                openapi.IN_QUERY,
+                description="Terme recherché (3 caractères minimum pour une recherche partielle)",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            openapi.Parameter(
+                "type",
+                openapi.IN_QUERY,
+                description="transactions, wallets ou merchants (défaut : tous)",
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Résultats par type",
+                examples={
+                    "application/json": {
+                        "q": "770012",
+                        "transactions": [],
+                        "wallets": [
+                            {
+                                "id": 42,
+                                "phone_number": "770012345",
+                                "name": "Awa Diop",
+                                "is_active": True,
+                                "currency": "XOF"
+                            }
+                        ],
+                        "merchants": []
+                    }
+                }
+            ),
+            400: "Terme ou type invalide",
+        },
+    )
+    def get(self, request):
+        term = request.query_params.get("q", "").strip()
+        if not term:
+            return Response(
+                {"detail": "Le paramètre q est requis.", "code": "INVALID_QUERY"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        kind = request.query_params.get("type")
+        if kind and kind not in SEARCHES:
+            return Response(
+                {"detail": "Type de recherche invalide.", "code": "INVALID_TYPE"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = {"q": term}
+        for name, (search, serialize) in SEARCHES.items():
+            if kind in (None, name):
+                results[name] = [serialize(item) for item in search(term)]
+        return Response(results, status=status.HTTP_200_OK)
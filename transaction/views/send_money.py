@@ -2,8 +2,15 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from django.db import transaction as db_transaction
 
+from transaction.errors import PartnerUnavailableError
+from transaction.models import TransactionStatus
+from transaction.partners.factory import PartnerGatewayFactory
 from transaction.serializers import SendMoneySerializer
+from transaction.services.transaction import TransactionService
+from services.async_views import AsyncAPIView, db_call
 from services.throttling import TransactionRateThrottle
 from services.firebase import firebase_service
 from drf_yasg.utils import swagger_auto_schema
@@ -18,7 +25,7 @@ class SendMoneyView(APIView):
     permission_classes = [IsAuthenticated]
     throttle_classes = [TransactionRateThrottle]
 
-    @swagger_auto_schema(
+    SCHEMA = dict(
         operation_description="Envoyer de l'argent - Transfert interne ou via partenaire (Wave, Orange Money, MTN)",
         request_body=SendMoneySerializer,
         responses={
@@ -52,6 +59,8 @@ class SendMoneyView(APIView):
             )
         }
     )
+
+    @swagger_auto_schema(**SCHEMA)
     def post(self, request, *args, **kwargs):
         data = request.data.copy()
 
@@ -61,72 +70,147 @@ class SendMoneyView(APIView):
             serializer = SendMoneySerializer(data=data, context={"request": request})
             if serializer.is_valid():
                 transaction = serializer.save()
-                logging.info(f"Transaction created: {transaction}")
+                return self._created_response(request, transaction)
+            else:
+                return self._invalid_response(serializer)
 
-                order_id = transaction.order_id
-                amount = transaction.amount
+        except ValidationError as e:
+            return self._validation_error_response(e)
+        except PartnerUnavailableError:
+            # Réponse 503 PARTNER_UNAVAILABLE via le gestionnaire d'exceptions DRF
+            raise
+        except Exception as e:
+            return self._failed_response(e)
 
-                wallet = (
-                    transaction.sender
-                )
-                new_balance = (
-                    wallet.wallet_balance_histories.order_by("-timestamp")
-                    .first()
-                    .balance_after
-                )
+    def _created_response(self, request, transaction):
+        logging.info(f"Transaction created: {transaction}")
 
-                logger.info(
-                    f"Transaction successful: {order_id}, Amount: {amount}, New Balance: {new_balance}"
-                )
-                
-                # Notification FCM - sender
-                firebase_service.send_transaction_notification(
-                    fcm_token=getattr(request.user, "fcm_token", None),
-                    action="send_money",
-                    status="success",
-                    title="Envoi en cours",
-                    message=f"Votre envoi de {amount} FCFA est en cours de traitement",
-                    transaction_data={
-                        "transaction_id": order_id,
-                        "amount": float(amount),
-                        "receiver": transaction.receiver.phone_number if transaction.receiver else "N/A",
-                    },
+        order_id = transaction.order_id
+        amount = transaction.amount
+
+        wallet = (
+            transaction.sender
+        )
+        new_balance = getattr(transaction, "balance_after_operation", None)
+        if new_balance is None:
+            new_balance = (
+                wallet.wallet_balance_histories.order_by("-timestamp", "-id")
+                .first()
+                .balance_after
+            )
+
+        logger.info(
+            f"Transaction successful: {order_id}, Amount: {amount}, New Balance: {new_balance}"
+        )
+
+        # Notification FCM - sender
+        firebase_service.queue_transaction_notification(
+            fcm_token=getattr(request.user, "fcm_token", None),
+            action="send_money",
+            status="success",
+            title="Envoi en cours",
+            message=f"Votre envoi de {amount} FCFA est en cours de traitement",
+            transaction_data={
+                "transaction_id": order_id,
+                "amount": float(amount),
+                "receiver": transaction.receiver.phone_number if transaction.receiver else "N/A",
+            },
+        )
+        # Notification FCM - receiver (argent reçu)
+        if transaction.receiver and transaction.receiver.user:
+            firebase_service.queue_transaction_notification(
+                fcm_token=getattr(transaction.receiver.user, "fcm_token", None),
+                action="receive_money",
+                status="success",
+                title="Argent reçu",
+                message=f"Vous avez reçu {amount} FCFA",
+                transaction_data={
+                    "transaction_id": order_id,
+                    "amount": float(amount),
+                    "sender": transaction.sender.phone_number if transaction.sender else "N/A",
+                },
+            )
+
+        return Response(
+            {
+                "reference": order_id,
+                "amount": str(amount),
+                "balance_after_operation": str(new_balance),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _invalid_response(self, serializer):
+        field, messages = next(iter(serializer.errors.items()))
+        response_data = {
+            "detail": messages[0],
+            "code": field.upper() if field else "VALIDATION_ERROR",
+        }
+        logger.error(f"Validation error: {response_data}")
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    def _validation_error_response(self, e):
+        # Erreurs métier levées à l'exécution (ex: moteur de transfert SQL)
+        detail = e.detail[0] if isinstance(e.detail, list) else e.detail
+        response_data = {
+            "detail": str(detail),
+            "code": getattr(detail, "code", "VALIDATION_ERROR").upper(),
+        }
+        logger.error(f"Validation error: {response_data}")
+        return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+
+    def _failed_response(self, e):
+        logger.error(f"Error in SendMoneyView: {str(e)}")
+        return Response(
+            {"detail": str(e), "code": "TRANSACTION_FAILED"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+class AsyncSendMoneyView(AsyncAPIView, SendMoneyView):
+    """
+    Variante asynchrone de SendMoneyView (ASGI). Les transferts internes
+    restent synchrones (db_call) ; pour un transfert via partenaire, la
+    transaction en attente est enregistrée avant l'appel, qui est attendu
+    sans bloquer de thread, puis complétée (ou passée en échec) après.
+    """
+
+    @swagger_auto_schema(**SendMoneyView.SCHEMA)
+    async def post(self, request, *args, **kwargs):
+        serializer = SendMoneySerializer(data=request.data.copy(), context={"request": request})
+
+        try:
+            if not await db_call(serializer.is_valid):
+                return self._invalid_response(serializer)
+
+            validated_data = serializer.validated_data
+            if "partner" not in validated_data:
+                transaction = await db_call(serializer.save)
+            else:
+                transaction = await db_call(
+                    db_transaction.atomic(serializer.prepare_partner_transfer), validated_data
                 )
-                # Notification FCM - receiver (argent reçu)
-                if transaction.receiver and transaction.receiver.user:
-                    firebase_service.send_transaction_notification(
-                        fcm_token=getattr(transaction.receiver.user, "fcm_token", None),
-                        action="receive_money",
-                        status="success",
-                        title="Argent reçu",
-                        message=f"Vous avez reçu {amount} FCFA",
-                        transaction_data={
-                            "transaction_id": order_id,
-                            "amount": float(amount),
-                            "sender": transaction.sender.phone_number if transaction.sender else "N/A",
-                        },
+                try:
+                    factory = PartnerGatewayFactory(validated_data["partner"])
+                    response = await factory.aprocess_transfer(
+                        transaction, receiver=validated_data["receiver"]
+                    )
+                    await db_call(
+                        db_transaction.atomic(serializer.complete_partner_transfer),
+                        transaction, factory, response,
                     )
+                except Exception:
+                    await db_call(
+                        TransactionService.update_transaction_status,
+                        transaction, TransactionStatus.FAILED.value,
+                    )
+                    raise
 
-                return Response(
-                    {
-                        "reference": order_id,
-                        "amount": str(amount),
-                        "balance_after_operation": str(new_balance),
-                    },
-                    status=status.HTTP_201_CREATED,
-                )
-            else:
-                field, messages = next(iter(serializer.errors.items()))
-                response_data = {
-                    "detail": messages[0],
-                    "code": field.upper() if field else "VALIDATION_ERROR",
-                }
-                logger.error(f"Validation error: {response_data}")
-                return Response(response_data, status=status.HTTP_400_BAD_REQUEST)
+            return await db_call(self._created_response, request, transaction)
 
+        except ValidationError as e:
+            return self._validation_error_response(e)
+        except PartnerUnavailableError:
+            raise
         except Exception as e:
-            logger.error(f"Error in SendMoneyView: {str(e)}")
-            return Response(
-                {"detail": str(e), "code": "TRANSACTION_FAILED"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return self._failed_response(e)
@@ -0,0 +1,114 @@
+from datetime import datetime, time, timedelta
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from actor.models import Wallet
+from services.async_views import aiter_sync, is_asgi
+from transaction.services.statement import StatementService
+
+
+class StatementExportView(APIView):
+    """
+    Export du relevé complet d'un wallet sur une période, en flux continu :
+    la mémoire utilisée ne dépend pas du nombre de lignes.
+
+    Le paramètre s'appelle file_format car `format` est réservé par DRF
+    (sélection du renderer).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    FORMATS = {
+        "csv": ("text/csv; charset=utf-8", StatementService.stream_csv),
+        "jsonl": ("application/x-ndjson", StatementService.stream_jsonl),
+    }
+
+    @swagger_auto_schema(
+        operation_description="Exporter le relevé du portefeuille (CSV ou JSONL) entre deux dates",
+        manual_parameters=[
+            openapi.Parameter(
+                "start",
+                openapi.IN_QUERY,
+                description="Date de début incluse (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+                required=True,
+            ),
+            openapi.Parameter(
+                "end",
+                openapi.IN_QUERY,
+                description="Date de fin incluse (YYYY-MM-DD)",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+                required=True,
+            ),
+            openapi.Parameter(
+                "file_format",
+                openapi.IN_QUERY,
+                description="csv (défaut) ou jsonl",
+                type=openapi.TYPE_STRING,
+                enum=["csv", "jsonl"],
+            ),
+        ],
+        responses={
+            200: "Relevé en flux continu (text/csv ou application/x-ndjson)",
+            400: openapi.Response(
+                description="Paramètres invalides",
+                examples={
+                    "application/json": {
+                        "detail": "Période invalide.",
+                        "code": "INVALID_PERIOD"
+                    }
+                }
+            ),
+            404: "Aucun portefeuille associé à cet utilisateur",
+        },
+    )
+    def get(self, request):
+        try:
+            wallet = request.user.wallet
+        except Wallet.DoesNotExist:
+            return Response(
+                {"detail": "Aucun portefeuille associé à cet utilisateur."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in self.FORMATS:
+            return Response(
+                {"detail": "Format non supporté.", "code": "INVALID_FORMAT"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            start = parse_date(request.query_params.get("start", ""))
+            end = parse_date(request.query_params.get("end", ""))
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end:
+            return Response(
+                {"detail": "Période invalide.", "code": "INVALID_PERIOD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        content_type, stream = self.FORMATS[file_format]
+        content = stream(
+            wallet,
+            timezone.make_aware(datetime.combine(start, time.min)),
+            timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+        )
+        # Sous ASGI, un générateur synchrone serait lu en entier avant l'envoi
+        if is_asgi(request):
+            content = aiter_sync(content)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="releve-{wallet.phone_number}-{start}-{end}.{file_format}"'
+        )
+        return response
@@ -0,0 +1,92 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from actor.models import Wallet
+from transaction.services.wallet_summary import WalletSummaryService
+
+
+class WalletSummaryView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Récupérer les totaux (envois, réceptions, frais) du portefeuille sur une période",
+        manual_parameters=[
+            openapi.Parameter(
+                "start",
+                openapi.IN_QUERY,
+                description="Premier jour (YYYY-MM-DD), défaut : début du mois",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+            ),
+            openapi.Parameter(
+                "end",
+                openapi.IN_QUERY,
+                description="Dernier jour inclus (YYYY-MM-DD), défaut : aujourd'hui",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description="Totaux de la période",
+                examples={
+                    "application/json": {
+                        "start": "2025-10-01",
+                        "end": "2025-10-31",
+                        "currency": "XOF",
+                        "tx_count": 12,
+                        "inflow": 75000.00,
+                        "outflow": 42000.00,
+                        "fees": 420.00,
+                        "by_type": {
+                            "TRANSFER": {
+                                "tx_count": 8,
+                                "inflow": 25000.00,
+                                "outflow": 42000.00,
+                                "fees": 420.00
+                            },
+                            "TOPUP": {
+                                "tx_count": 4,
+                                "inflow": 50000.00,
+                                "outflow": 0.00,
+                                "fees": 0.00
+                            }
+                        }
+                    }
+                }
+            ),
+            400: "Période invalide",
+            404: "Aucun portefeuille associé à cet utilisateur",
+        },
+    )
+    def get(self, request):
+        try:
+            wallet = request.user.wallet
+        except Wallet.DoesNotExist:
+            return Response(
+                {"detail": "Aucun portefeuille associé à cet utilisateur."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        today = timezone.localdate()
+        try:
+            start = parse_date(request.query_params.get("start", "")) or today.replace(day=1)
+            end = parse_date(request.query_params.get("end", "")) or today
+        except ValueError:
+            start = end = None
+        if start is None or start > end:
+            return Response(
+                {"detail": "Période invalide.", "code": "INVALID_PERIOD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        totals = WalletSummaryService.get_period_totals(wallet, start, end)
+        return Response(
+            {"start": start, "end": end, "currency": wallet.currency, **totals},
+            status=status.HTTP_200_OK,
+        )
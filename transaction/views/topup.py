@@ -1,9 +1,15 @@
+from django.db import transaction as db_transaction
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 
+from transaction.errors import PartnerUnavailableError, PaymentProcessingError
+from transaction.models import TransactionStatus
+from transaction.partners.factory import PartnerGatewayFactory
 from transaction.serializers import TopUpSerializer
+from transaction.services.transaction import TransactionService
+from services.async_views import AsyncAPIView, db_call
 from services.throttling import TransactionRateThrottle
 from services.firebase import firebase_service
 from drf_yasg.utils import swagger_auto_schema
@@ -14,7 +20,7 @@ class TopUpView(APIView):
     permission_classes = [IsAuthenticated]
     throttle_classes = [TransactionRateThrottle]
 
-    @swagger_auto_schema(
+    SCHEMA = dict(
         operation_description="Recharger son wallet via Orange Money, MTN Money ou Wave",
         request_body=TopUpSerializer,
         responses={
@@ -29,6 +35,7 @@ class TopUpView(APIView):
                     }
                 }
             ),
+            503: "Partenaire momentanément indisponible (PARTNER_UNAVAILABLE)",
             400: openapi.Response(
                 description="Partenaire non supporté ou montant invalide",
                 examples={
@@ -40,6 +47,8 @@ class TopUpView(APIView):
             )
         }
     )
+
+    @swagger_auto_schema(**SCHEMA)
     def post(self, request, *args, **kwargs):
         user = request.user
         data = request.data.copy()
@@ -49,36 +58,76 @@ class TopUpView(APIView):
 
         if serializer.is_valid():
             transaction = serializer.save()
-            
-            # Notification FCM - recharge en cours
-            firebase_service.send_transaction_notification(
-                fcm_token=getattr(request.user, "fcm_token", None),
-                action="topup",
-                status="pending",
-                title="Recharge en cours",
-                message=f"Votre recharge de {transaction.amount} FCFA est en cours",
-                transaction_data={
-                    "transaction_id": transaction.order_id,
-                    "amount": float(transaction.amount),
-                    "payment_url": transaction.additional_data.get("urlTransaction") if transaction.additional_data else None,
-                },
-            )
-            
-            return Response(
-                {
-                    "detail": "Topup en cours",
-                    "code": "TOPUP_PENDING",
-                    "transaction_id": transaction.order_id,
-                    "payment_url": transaction.additional_data.get("urlTransaction")
-                    if transaction.additional_data
-                    else None,
-                },
-                status=status.HTTP_201_CREATED,
-            )
+            return self._pending_response(request, transaction)
+
+        return self._invalid_response(serializer)
+
+    def _pending_response(self, request, transaction):
+        # Notification FCM - recharge en cours
+        firebase_service.queue_transaction_notification(
+            fcm_token=getattr(request.user, "fcm_token", None),
+            action="topup",
+            status="pending",
+            title="Recharge en cours",
+            message=f"Votre recharge de {transaction.amount} FCFA est en cours",
+            transaction_data={
+                "transaction_id": transaction.order_id,
+                "amount": float(transaction.amount),
+                "payment_url": transaction.additional_data.get("urlTransaction") if transaction.additional_data else None,
+            },
+        )
 
+        return Response(
+            {
+                "detail": "Topup en cours",
+                "code": "TOPUP_PENDING",
+                "transaction_id": transaction.order_id,
+                "payment_url": transaction.additional_data.get("urlTransaction")
+                if transaction.additional_data
+                else None,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def _invalid_response(self, serializer):
         # On renvoie la première erreur du serializer avec detail et code
         field, messages = next(iter(serializer.errors.items()))
         return Response(
             {"detail": messages[0], "code": field.upper() + "_ERROR"},
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+
+class AsyncTopUpView(AsyncAPIView, TopUpView):
+    """
+    Variante asynchrone de TopUpView (ASGI) : l'appel partenaire est attendu
+    sans bloquer de thread ; la transaction en attente est enregistrée avant
+    l'appel, puis complétée (ou passée en échec) après.
+    """
+
+    @swagger_auto_schema(**TopUpView.SCHEMA)
+    async def post(self, request, *args, **kwargs):
+        data = request.data.copy()
+        data["sender"] = request.user.id
+
+        serializer = TopUpSerializer(data=data, context={"request": request})
+        if not await db_call(serializer.is_valid):
+            return self._invalid_response(serializer)
+
+        transaction = await db_call(
+            db_transaction.atomic(serializer.prepare), serializer.validated_data
+        )
+        factory = PartnerGatewayFactory(serializer.validated_data["partner"])
+        try:
+            result = await factory.aprocess_top_up(transaction)
+            await db_call(db_transaction.atomic(serializer.complete), transaction, factory, result)
+        except (PaymentProcessingError, PartnerUnavailableError) as e:
+            await db_call(
+                TransactionService.update_transaction_status,
+                transaction, TransactionStatus.FAILED.value,
+            )
+            if isinstance(e, PartnerUnavailableError):
+                raise
+            raise serializers.ValidationError(detail=str(e), code="TRANSACTION_FAILED")
+
+        return await db_call(self._pending_response, request, transaction)
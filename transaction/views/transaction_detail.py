@@ -5,6 +5,7 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 from transaction.models import Transaction, FeeDistribution, WalletBalanceHistory
+from transaction.services.ledger_archive import LedgerArchiveReader
 
 
 class TransactionDetailView(APIView):
@@ -65,7 +66,8 @@ class TransactionDetailView(APIView):
                                 "description": "Transfert à Fatou"
                             }
                         ],
-                        "additional_data": {}
+                        "additional_data": {},
+                        "archived": False
                     }
                 }
             ),
@@ -93,9 +95,15 @@ class TransactionDetailView(APIView):
         """Récupérer le détail d'une transaction"""
         user = request.user
         
+        archived = False
         try:
             transaction = Transaction.objects.get(order_id=order_id)
         except Transaction.DoesNotExist:
+            # Les transactions anciennes peuvent avoir été archivées (archive_ledger)
+            transaction = LedgerArchiveReader().get_transaction(order_id)
+            archived = transaction is not None
+
+        if transaction is None:
             return Response(
                 {
                     "detail": "Transaction non trouvée.",
@@ -106,7 +114,7 @@ class TransactionDetailView(APIView):
         
         # Vérifier que l'utilisateur a le droit de voir cette transaction
         user_wallet = user.wallet
-        if transaction.sender != user_wallet and transaction.receiver != user_wallet:
+        if transaction.sender_id != user_wallet.id and transaction.receiver_id != user_wallet.id:
             return Response(
                 {
                     "detail": "Vous n'êtes pas autorisé à voir cette transaction.",
@@ -116,7 +124,10 @@ class TransactionDetailView(APIView):
             )
         
         # Récupérer les distributions de frais
-        fee_distributions = FeeDistribution.objects.filter(transaction=transaction)
+        if archived:
+            fee_distributions = transaction.archived_fee_distributions
+        else:
+            fee_distributions = FeeDistribution.objects.filter(transaction=transaction)
         fee_distributions_data = [
             {
                 "actor_type": dist.actor_type,
@@ -127,7 +138,12 @@ class TransactionDetailView(APIView):
         ]
         
         # Récupérer l'historique des wallets liés à cette transaction
-        balance_histories = WalletBalanceHistory.objects.filter(transaction=transaction)
+        if archived:
+            balance_histories = transaction.archived_histories
+        else:
+            balance_histories = WalletBalanceHistory.objects.filter(
+                transaction=transaction
+            ).select_related("wallet")
         balance_histories_data = [
             {
                 "wallet_owner": history.wallet.phone_number,
@@ -159,7 +175,8 @@ class TransactionDetailView(APIView):
             } if transaction.receiver else None,
             "fee_distributions": fee_distributions_data,
             "balance_histories": balance_histories_data,
-            "additional_data": transaction.additional_data or {}
+            "additional_data": transaction.additional_data or {},
+            "archived": archived
         }
         
         return Response(response_data, status=status.HTTP_200_OK)